@@ -1,6 +1,21 @@
-from .core import AliceTask, Workflow, AliceAgent, AliceModel, Prompt, AliceChat, MessageDict, TaskResponse
-from .api_app import WORKFLOW_APP
-from .db_app import BackendAPI, ContainerAPI, DB_STRUCTURE, DBInitManager, DBStructure
+import importlib
+
+# Resolved on first access, so importing a submodule (workflow.util, workflow.worker, ...) doesn't
+# load the whole core, the FastAPI app and every API engine first
+_EXPORTS = {
+    "AliceTask": ".core", "Workflow": ".core", "AliceAgent": ".core", "AliceModel": ".core", "Prompt": ".core",
+    "AliceChat": ".core", "MessageDict": ".core", "TaskResponse": ".core",
+    "WORKFLOW_APP": ".api_app",
+    "BackendAPI": ".db_app", "ContainerAPI": ".db_app", "DB_STRUCTURE": ".db_app", "DBInitManager": ".db_app", "DBStructure": ".db_app",
+}
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
 __all__ = ['AliceTask', 'Workflow', 'AliceAgent', 'AliceModel', 'TaskResponse', 'DB_STRUCTURE', 'DBInitManager', 'DBStructure',
-           'FunctionConfig', 'MessageDict', 'TaskResponse','AliceChat', 'WORKFLOW_APP', 'BackendAPI', 'ContainerAPI', 'Prompt']
\ No newline at end of file
+           'FunctionConfig', 'MessageDict', 'TaskResponse','AliceChat', 'WORKFLOW_APP', 'BackendAPI', 'ContainerAPI', 'Prompt']
@@ -9,9 +9,12 @@ from workflow.api_app.routes import (
     health_route, task_execute, chat_response, db_init, file_transcript,
     task_resume, chat_resume, validate_apis
 )
-from workflow.util import LOGGER
+from workflow.util import LOGGER, DockerCodeRunner, get_model_residency, get_web_fetcher
+from workflow.util.code_utils import close_container_pools
+from workflow.util.const import QUEUE_CONSUME_IN_APP
 from workflow.test.component_tests import TestEnvironment, DBTests
 from workflow.api_app.util.queue_manager import QueueManager
+from workflow.core.api import APIManager
 
 db_app = None
 thread_pool = None
@@ -42,10 +45,18 @@ async def lifespan(app: FastAPI):
     await queue_manager.initialize()
     app.state.queue_manager = queue_manager
 
-    # Start request processing
-    app.state.request_processor = asyncio.create_task(
-        queue_manager.process_requests()
-    )
+    # Start request processing, unless dedicated consumers (python -m workflow.worker) handle the queue
+    app.state.request_processor = None
+    app.state.code_runner_warm_up = None
+    if QUEUE_CONSUME_IN_APP:
+        app.state.request_processor = asyncio.create_task(
+            queue_manager.process_requests()
+        )
+        app.state.code_runner_warm_up = DockerCodeRunner().start_warm_up(thread_pool)
+
+    # Keep local models (Bark, PixArt) warm, and unload the ones that sit idle
+    await APIManager.warm_up_local_models()
+    model_unloader = asyncio.create_task(get_model_residency().run_idle_unloader())
 
     # Run initial tests
     await run_initial_tests(app)
@@ -53,9 +64,17 @@ async def lifespan(app: FastAPI):
     yield
 
     # Cleanup
+    if app.state.code_runner_warm_up:
+        app.state.code_runner_warm_up.cancel()
     thread_pool.shutdown()
-    app.state.request_processor.cancel()
+    if app.state.request_processor:
+        app.state.request_processor.cancel()
+    model_unloader.cancel()
     await queue_manager.cleanup()
+    await APIManager.close_clients()
+    await db_app.close_session()
+    await get_web_fetcher().close()
+    await asyncio.get_running_loop().run_in_executor(None, close_container_pools)
 
 # Initialize FastAPI app
 WORKFLOW_APP = FastAPI(lifespan=lifespan)
@@ -100,7 +119,7 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
         })()
 
         # Validate token using the mock request
-        validation = token_validation_middleware(db_app)(mock_request)
+        validation = await token_validation_middleware(db_app)(mock_request)
         if not validation["valid"]:
             await websocket.close(code=1008, reason=validation["message"])
             return
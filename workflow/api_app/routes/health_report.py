@@ -16,6 +16,13 @@ async def health_check() -> dict:
     """
     return {"status": "OK", "message": "Workflow service is healthy"}
 
+@router.get("/health/queue")
+async def queue_health_check(queue_manager=Depends(get_queue_manager)) -> dict:
+    """
+    Worker pool status: per-endpoint queue depth, in-flight requests, limits and wait times.
+    """
+    return await queue_manager.get_queue_stats()
+
 @router.get("/health/api")
 async def api_health_check(
     request: Request,
@@ -1,15 +1,19 @@
 import asyncio
 import json
+import math
 import os
-from typing import Dict, Any, Optional
+import socket
+import time
+from typing import Dict, Any, List, Optional, Set, Tuple
 from uuid import uuid4
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PrivateAttr
 from fastapi import WebSocket
 import redis.asyncio as aioredis  # Renamed to avoid conflict
 from redis.asyncio.client import PubSub
 
-from workflow.util import LOGGER, get_traceback
+from workflow.util import LOGGER, get_traceback, stream_deltas
+from workflow.util.const import STREAM_LLM_RESPONSES
 from workflow.api_app.routes.task_execute import execute_task_endpoint
 from workflow.api_app.routes.task_resume import resume_task_endpoint
 from workflow.api_app.routes.chat_resume import chat_resume
@@ -19,43 +23,323 @@ from workflow.api_app.routes.health_report import api_health_check
 from workflow.api_app.util.utils import TaskResumeRequest, TaskExecutionRequest, ChatResumeRequest, ChatResponseRequest, FileTranscriptRequest, HealthAPIRequest
 from workflow.api_app.routes.validate_apis import validate_chat_apis, validate_task_apis, ValidationRequest
 
+REQUEST_QUEUE = "request_queue"
+PROCESSING_PREFIX = "request_processing"  # request_processing:<consumer_id>:<queue name>
+HEARTBEAT_PREFIX = "request_consumer"  # request_consumer:<consumer_id>, expires after the visibility timeout
+WAKEUP_PREFIX = "request_wakeup"  # request_wakeup:<queue name>, a token per enqueued message for idle consumers to block on
+WAKEUP_MAX_TOKENS = 1024  # Tokens kept per wake-up list; leftovers only cause a spurious wake-up
+CREDENTIALS_PREFIX = "request_credentials"  # request_credentials:<task_id>, the caller's token, kept out of the queue lists
+RESULT_TTL = 3600  # Seconds a finished request's result stays readable under result:<task_id>
+DEFAULT_QUEUE_NAME = "default"  # Stats name of the shared queue for endpoints without their own limit
+STREAMING_ENDPOINTS = {"/chat_response", "/chat_resume"}  # Endpoints whose LLM output is published as delta events
+
+# Concurrent requests allowed per endpoint; LLM pipelines are heavy, health checks and validations light
+DEFAULT_ENDPOINT_LIMITS: Dict[str, int] = {
+    "/execute_task": 4,
+    "/resume_task": 4,
+    "/chat_response": 8,
+    "/chat_resume": 8,
+    "/file_transcript": 2,
+    "/health/api": 4,
+    "/validate_chat_apis": 4,
+    "/validate_task_apis": 4,
+}
+
+def load_endpoint_limits() -> Dict[str, int]:
+    """Default per-endpoint limits, overridden by the QUEUE_ENDPOINT_LIMITS env var (JSON object of endpoint -> limit)."""
+    limits = dict(DEFAULT_ENDPOINT_LIMITS)
+    overrides = os.getenv("QUEUE_ENDPOINT_LIMITS")
+    if overrides:
+        try:
+            limits.update({endpoint: int(limit) for endpoint, limit in json.loads(overrides).items()})
+        except (ValueError, AttributeError) as e:
+            LOGGER.error(f"Ignoring invalid QUEUE_ENDPOINT_LIMITS: {e}")
+    return limits
+
+def new_consumer_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+
+def get_user_id(user_data: Optional[Dict[str, Any]]) -> Optional[str]:
+    user_obj = (user_data or {}).get("user_obj")
+    if isinstance(user_obj, dict):
+        user_id = user_obj.get("_id") or user_obj.get("id")
+    else:
+        user_id = getattr(user_obj, "id", None)
+    return str(user_id) if user_id else None
+
 class QueueMessage(BaseModel):
     """Pydantic model for queue messages."""
     task_id: str
     endpoint: str
     data: Dict[str, Any]
+    enqueued_at: Optional[float] = None
+    user_id: Optional[str] = None  # Caller's user id; their token is under request_credentials:<task_id>
+
+class EndpointStats(BaseModel):
+    """Worker pool counters for one endpoint queue."""
+    limit: int
+    in_flight: int = 0
+    processed: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    last_wait: float = 0.0
+
+    def record_start(self, wait: float) -> None:
+        self.in_flight += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.last_wait = wait
+
+    def record_finish(self) -> None:
+        self.in_flight -= 1
+        self.processed += 1
+
+    @property
+    def avg_wait(self) -> float:
+        started = self.processed + self.in_flight
+        return self.total_wait / started if started else 0.0
 
 class QueueManager(BaseModel):
+    """
+    Redis-backed request queue feeding a bounded worker pool.
+
+    Each endpoint with a configured limit gets its own Redis list (`request_queue:<endpoint>`);
+    other endpoints share `request_queue` under `default_endpoint_limit`. The dispatcher only pops
+    a message once a worker slot is free both overall (`max_workers`) and for the message's
+    endpoint, so bursts wait in Redis instead of piling up as tasks in this process.
+    Per-endpoint queue depth, in-flight count and wait times are reported by `get_queue_stats`.
+
+    Consumption is reliable: a popped message is moved onto a per-consumer processing list and only
+    removed once its result is published. Each consumer refreshes a heartbeat key; when one stops
+    for longer than `visibility_timeout`, another consumer moves its unfinished messages back to the
+    queues. Results are stored under `result:<task_id>` and published on `updates:<task_id>`, so any
+    process (the FastAPI app or `python -m workflow.worker`) can consume while the app holds the
+    WebSocket.
+
+    An idle consumer blocks on the wake-up lists of all the queues it can take from, so a message
+    on any of them is picked up at once. The caller's token never enters the queue or processing
+    lists: it is stored under `request_credentials:<task_id>`, expires after `credentials_ttl`
+    seconds and is deleted once the request is handled. A request still queued when its
+    credentials expire fails instead of running without them.
+    """
     db_app: Any
-    message_buffer: Dict[str, list] = {}
     redis_url: str = os.getenv("REDIS_URL", "redis://redis:6379/0")
     redis_client: Optional[aioredis.Redis] = None  # Renamed field
     connections: Dict[str, WebSocket] = {}
+    max_workers: int = Field(default_factory=lambda: int(os.getenv("QUEUE_MAX_WORKERS", "16")), description="Requests processed concurrently by this process")
+    endpoint_limits: Dict[str, int] = Field(default_factory=load_endpoint_limits, description="Requests processed concurrently per endpoint")
+    default_endpoint_limit: int = Field(default_factory=lambda: int(os.getenv("QUEUE_DEFAULT_ENDPOINT_LIMIT", "2")), description="Limit for endpoints without their own")
+    poll_timeout: float = Field(1.0, description="Seconds a blocking pop waits before re-checking which endpoints have free slots")
+    endpoint_stats: Dict[str, EndpointStats] = {}
+    consumer_id: str = Field(default_factory=new_consumer_id, description="Identifies this consumer's processing lists and heartbeat")
+    visibility_timeout: float = Field(default_factory=lambda: float(os.getenv("QUEUE_VISIBILITY_TIMEOUT", "60")), description="Seconds without a heartbeat before a consumer's messages are re-queued")
+    credentials_ttl: int = Field(default_factory=lambda: int(os.getenv("QUEUE_CREDENTIALS_TTL", "900")), description="Seconds a queued request's user token is kept in Redis")
+    _stopping: Optional[asyncio.Event] = PrivateAttr(default=None)
+    _workers: Set[asyncio.Task] = PrivateAttr(default_factory=set)
+    _slot_freed: Optional[asyncio.Event] = PrivateAttr(default=None)
 
     class Config:
         arbitrary_types_allowed = True
 
     async def initialize(self):
         self.redis_client = aioredis.from_url(self.redis_url)
+        self.endpoint_stats = {name: EndpointStats(limit=limit) for name, limit in self.endpoint_limits.items()}
+        self.endpoint_stats[DEFAULT_QUEUE_NAME] = EndpointStats(limit=self.default_endpoint_limit)
         LOGGER.debug(f"Connected to Redis at {self.redis_url}")
 
+    def queue_name(self, endpoint: str) -> str:
+        return endpoint if endpoint in self.endpoint_limits else DEFAULT_QUEUE_NAME
+
+    @staticmethod
+    def queue_key(queue_name: str) -> str:
+        return REQUEST_QUEUE if queue_name == DEFAULT_QUEUE_NAME else f"{REQUEST_QUEUE}:{queue_name}"
+
+    @staticmethod
+    def wakeup_key(queue_name: str) -> str:
+        return f"{WAKEUP_PREFIX}:{queue_name}"
+
+    @staticmethod
+    def credentials_key(task_id: str) -> str:
+        return f"{CREDENTIALS_PREFIX}:{task_id}"
+
     async def enqueue_request(self, endpoint: str, data: Dict[str, Any]) -> str:
         task_id = str(uuid4())
+        user_data = self.db_app.user_data if self.db_app is not None else None
         message = QueueMessage(
             task_id=task_id,
             endpoint=endpoint,
-            data=data
+            data=data,
+            enqueued_at=time.time(),
+            user_id=get_user_id(user_data)
         )
-        await self.redis_client.lpush("request_queue", message.json())
+        queue_name = self.queue_name(endpoint)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            if user_data and user_data.get("user_token"):
+                pipe.set(self.credentials_key(task_id), json.dumps(user_data, default=str), ex=max(1, self.credentials_ttl))
+            pipe.lpush(self.queue_key(queue_name), message.json())
+            self.push_wakeup(pipe, queue_name)
+            await pipe.execute()
         LOGGER.debug(f"Enqueued task {task_id} for endpoint {endpoint}")
         return task_id
 
+    def push_wakeup(self, pipe: Any, queue_name: str, count: int = 1) -> None:
+        """Queue `count` wake-up tokens for consumers blocked on `queue_name` (see pop_message)."""
+        pipe.lpush(self.wakeup_key(queue_name), *([b"1"] * count))
+        pipe.ltrim(self.wakeup_key(queue_name), 0, WAKEUP_MAX_TOKENS - 1)
+
+    def available_queues(self) -> List[str]:
+        return [name for name, stats in self.endpoint_stats.items() if stats.in_flight < stats.limit]
+
+    async def pop_message(self, queue_names: List[str]) -> Optional[Tuple[str, bytes]]:
+        """
+        Atomically move the oldest message of the first non-empty queue onto this consumer's
+        processing list for that queue (RPOPLPUSH). If every queue is empty, block for up to
+        `poll_timeout` on the wake-up lists of all of them (BLPOP over several keys), then try again.
+        Moves can't block on several lists at once, hence the separate wake-up tokens.
+        """
+        for attempt in range(2):
+            for name in queue_names:
+                message = await self.redis_client.rpoplpush(self.queue_key(name), self.processing_key(name))
+                if message is not None:
+                    return name, message
+            if attempt == 0:
+                await self.redis_client.blpop([self.wakeup_key(name) for name in queue_names], timeout=self.poll_timeout)
+        return None
+
     async def process_requests(self):
+        """
+        Dispatch loop: waits for a free worker slot, then takes a message from the queues of the endpoints
+        that still have capacity. The order is rotated every round so no endpoint starves the others.
+        Messages stay on this consumer's processing list until handled, and a heartbeat keeps them from
+        being re-queued by other consumers (see requeue_orphaned_messages).
+        """
+        worker_slots = asyncio.Semaphore(self.max_workers)
+        self._slot_freed = asyncio.Event()
+        self._stopping = asyncio.Event()
+        await self.send_heartbeat()
+        maintenance = asyncio.create_task(self.maintain_consumer())
+        rotation = 0
+        try:
+            while not self._stopping.is_set():
+                await worker_slots.acquire()
+                self._slot_freed.clear()
+                queue_names = self.available_queues()
+                if not queue_names:
+                    # Every endpoint is at its limit: wait for a worker to finish
+                    worker_slots.release()
+                    await self._slot_freed.wait()
+                    continue
+                rotation = (rotation + 1) % len(queue_names)
+                queue_names = queue_names[rotation:] + queue_names[:rotation]
+                popped = await self.pop_message(queue_names)
+                if popped is None:
+                    worker_slots.release()
+                    continue
+                queue_name, message = popped
+                try:
+                    queue_message = QueueMessage.parse_raw(message)
+                except ValueError as e:
+                    LOGGER.error(f"Dropping malformed queue message {message!r}: {e}")
+                    await self.redis_client.lrem(self.processing_key(queue_name), 1, message)
+                    worker_slots.release()
+                    continue
+                wait = time.time() - queue_message.enqueued_at if queue_message.enqueued_at else 0.0
+                self.endpoint_stats[queue_name].record_start(wait)
+                # Process the request asynchronously, keeping a reference so the task isn't garbage collected
+                worker = asyncio.create_task(self.run_worker(queue_message, message, queue_name, worker_slots))
+                self._workers.add(worker)
+                worker.add_done_callback(self._workers.discard)
+        finally:
+            maintenance.cancel()
+
+    async def run_worker(self, queue_message: QueueMessage, raw_message: bytes, queue_name: str, worker_slots: asyncio.Semaphore):
+        try:
+            await self.handle_request(queue_message)
+            # Acknowledge: the result has been published, so the message can leave the processing list
+            await self.redis_client.lrem(self.processing_key(queue_name), 1, raw_message)
+            await self.redis_client.delete(self.credentials_key(queue_message.task_id))
+        finally:
+            self.endpoint_stats[queue_name].record_finish()
+            worker_slots.release()
+            self._slot_freed.set()
+
+    def request_stop(self) -> None:
+        """Stop taking new messages; requests already running carry on (see drain)."""
+        if self._stopping is not None:
+            self._stopping.set()
+        if self._slot_freed is not None:
+            self._slot_freed.set()
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """Wait for the requests this process is running to finish."""
+        if self._workers:
+            LOGGER.info(f"Waiting for {len(self._workers)} running requests to finish")
+            await asyncio.wait(set(self._workers), timeout=timeout)
+
+    def processing_key(self, queue_name: str) -> str:
+        return f"{PROCESSING_PREFIX}:{self.consumer_id}:{queue_name}"
+
+    @staticmethod
+    def heartbeat_key(consumer_id: str) -> str:
+        return f"{HEARTBEAT_PREFIX}:{consumer_id}"
+
+    async def send_heartbeat(self) -> None:
+        await self.redis_client.set(self.heartbeat_key(self.consumer_id), str(time.time()), ex=max(1, math.ceil(self.visibility_timeout)))
+
+    async def requeue_orphaned_messages(self) -> int:
+        """
+        Move messages back from the processing lists of consumers whose heartbeat has expired
+        (i.e. crashed or killed for longer than `visibility_timeout`) to their request queues.
+
+        Returns:
+            Number of messages re-queued
+        """
+        requeued = 0
+        async for key in self.redis_client.scan_iter(match=f"{PROCESSING_PREFIX}:*"):
+            key = key.decode() if isinstance(key, bytes) else key
+            _, consumer_id, queue_name = key.split(":", 2)
+            if consumer_id == self.consumer_id or await self.redis_client.exists(self.heartbeat_key(consumer_id)):
+                continue
+            moved = 0
+            while await self.redis_client.rpoplpush(key, self.queue_key(queue_name)) is not None:
+                moved += 1
+            if moved:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    self.push_wakeup(pipe, queue_name, moved)
+                    await pipe.execute()
+            requeued += moved
+        if requeued:
+            LOGGER.warning(f"Re-queued {requeued} messages from expired consumers")
+        return requeued
+
+    async def maintain_consumer(self) -> None:
+        """Refresh this consumer's heartbeat and recover other consumers' orphaned messages."""
         while True:
-            _, message = await self.redis_client.brpop("request_queue")
-            queue_message = QueueMessage.parse_raw(message)
-            # Process the request asynchronously
-            asyncio.create_task(self.handle_request(queue_message))
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                await self.send_heartbeat()
+                await self.requeue_orphaned_messages()
+            except Exception as e:
+                LOGGER.error(f"Queue maintenance failed: {e}")
+
+    async def get_queue_stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight count and wait times (seconds) per endpoint queue."""
+        endpoints = {}
+        for name, stats in self.endpoint_stats.items():
+            endpoints[name] = {
+                "queue_depth": await self.redis_client.llen(self.queue_key(name)),
+                "in_flight": stats.in_flight,
+                "limit": stats.limit,
+                "processed": stats.processed,
+                "avg_wait": round(stats.avg_wait, 3),
+                "max_wait": round(stats.max_wait, 3),
+                "last_wait": round(stats.last_wait, 3),
+            }
+        return {
+            "max_workers": self.max_workers,
+            "in_flight": sum(stats.in_flight for stats in self.endpoint_stats.values()),
+            "endpoints": endpoints,
+        }
 
     async def handle_request(self, queue_message: QueueMessage):
         task_id = queue_message.task_id
@@ -63,36 +347,30 @@ class QueueManager(BaseModel):
         data = queue_message.data
 
         try:
-            # Dispatch to the appropriate method based on endpoint
-            if endpoint == "/execute_task":
-                result = await self.execute_task(data)
-            elif endpoint == "/resume_task":
-                result = await self.resume_task(data)
-            elif endpoint == "/chat_resume":
-                result = await self.chat_resume(data)
-            elif endpoint == "/chat_response":
-                result = await self.chat_response(data)
-            elif endpoint == "/file_transcript":
-                result = await self.generate_file_transcript(data)
-            elif endpoint == "/health/api":
-                result = await self.health_api_check(data)
-            elif endpoint == "/validate_chat_apis":
-                result = await self.validate_chat_apis_handler(data)
-            elif endpoint == "/validate_task_apis":
-                result = await self.validate_task_apis_handler(data)
-            else:
-                raise ValueError(f"Unknown endpoint: {endpoint} - Maybe forgot to add it to the Queue manager?")
-
-            # Publish the result to a Redis channel
-            result = {"status": "completed", "result": result}
-            if task_id in self.connections:
-                await self.redis_client.publish(f"updates:{task_id}", json.dumps(result))
-            else:
-                # Buffer the message if connection isn't ready
-                if task_id not in self.message_buffer:
-                    self.message_buffer[task_id] = []
-                self.message_buffer[task_id].append(result)
-                
+            db_app = await self.db_app_for(queue_message)
+            with stream_deltas(self.stream_sink_for(task_id) if endpoint in STREAMING_ENDPOINTS and STREAM_LLM_RESPONSES else None):
+                # Dispatch to the appropriate method based on endpoint
+                if endpoint == "/execute_task":
+                    result = await self.execute_task(data, db_app)
+                elif endpoint == "/resume_task":
+                    result = await self.resume_task(data, db_app)
+                elif endpoint == "/chat_resume":
+                    result = await self.chat_resume(data, db_app)
+                elif endpoint == "/chat_response":
+                    result = await self.chat_response(data, db_app)
+                elif endpoint == "/file_transcript":
+                    result = await self.generate_file_transcript(data, db_app)
+                elif endpoint == "/health/api":
+                    result = await self.health_api_check(data, db_app)
+                elif endpoint == "/validate_chat_apis":
+                    result = await self.validate_chat_apis_handler(data, db_app)
+                elif endpoint == "/validate_task_apis":
+                    result = await self.validate_task_apis_handler(data, db_app)
+                else:
+                    raise ValueError(f"Unknown endpoint: {endpoint} - Maybe forgot to add it to the Queue manager?")
+
+            # Store the result and publish it to the task's Redis channel
+            await self.publish_result(task_id, {"status": "completed", "result": result})
             LOGGER.debug(f"Task {task_id} completed successfully")
         except Exception as e:
             import traceback
@@ -102,23 +380,55 @@ class QueueManager(BaseModel):
                 "traceback": traceback.format_exc(),
                 "task_id": task_id
             }
-            # Publish the error to the Redis channel
-            await self.redis_client.publish(f"updates:{task_id}", json.dumps(error_result))
+            # Store the error and publish it to the task's Redis channel
+            await self.publish_result(task_id, error_result)
             LOGGER.error(f"Task {task_id} failed with error: {e}\n{get_traceback()}")
 
+    async def db_app_for(self, queue_message: QueueMessage) -> Any:
+        """
+        The backend client to use for a message: a shallow copy carrying the enqueuing user's data,
+        read from request_credentials:<task_id>, so concurrent requests from different users (or from
+        another process) don't share a token.
+
+        Raises:
+            PermissionError: If the message has a user whose credentials have expired
+        """
+        if self.db_app is None:
+            return None
+        stored = await self.redis_client.get(self.credentials_key(queue_message.task_id))
+        if stored is None:
+            if queue_message.user_id:
+                raise PermissionError(f"Credentials for user {queue_message.user_id} expired before the request was processed")
+            return self.db_app
+        return self.db_app.model_copy(update={"user_data": json.loads(stored)})
+
+    def stream_sink_for(self, task_id: str):
+        """
+        A sink publishing generation deltas to the task's channel. Unlike results they aren't stored:
+        a client connecting late gets the final message from result:<task_id> instead.
+        """
+        async def sink(event: Dict[str, Any]) -> None:
+            await self.redis_client.publish(f"updates:{task_id}", json.dumps({"status": "delta", "task_id": task_id, **event}))
+        return sink
+
+    async def publish_result(self, task_id: str, result: Dict[str, Any]) -> None:
+        payload = json.dumps(result)
+        await self.redis_client.set(f"result:{task_id}", payload, ex=RESULT_TTL)
+        await self.redis_client.publish(f"updates:{task_id}", payload)
+
     async def connect(self, websocket: WebSocket, task_id: str):
         await websocket.accept()
         self.connections[task_id] = websocket
-        
-        # Send any buffered messages
-        if task_id in self.message_buffer:
-            for message in self.message_buffer[task_id]:
-                await websocket.send_json(message)
-            del self.message_buffer[task_id]
-            
-        # Continue with Redis subscription
+
+        # Subscribe before checking for a stored result, so a result published in between isn't missed
         pubsub = self.redis_client.pubsub()
         await pubsub.subscribe(f"updates:{task_id}")
+        result = await self.get_task_result(task_id)
+        if result:
+            await websocket.send_json(result)
+            await pubsub.unsubscribe(f"updates:{task_id}")
+            await pubsub.close()
+            return
         asyncio.create_task(self.listen_to_channel(websocket, pubsub, task_id))
 
     async def listen_to_channel(self, websocket: WebSocket, pubsub: PubSub, task_id: str):
@@ -157,61 +467,61 @@ class QueueManager(BaseModel):
             LOGGER.debug("Redis connection closed")
 
     # Implementations of the methods
-    async def execute_task(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute_task(self, data: Dict[str, Any], db_app: Any = None) -> Dict[str, Any]:
         request_model = TaskExecutionRequest(**data)
         result = await execute_task_endpoint(
             request=request_model,
-            db_app=self.db_app,
+            db_app=db_app or self.db_app,
             queue_manager=self,
             enqueue=False  # Indicate not to enqueue again
         )
         return result
 
-    async def resume_task(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def resume_task(self, data: Dict[str, Any], db_app: Any = None) -> Dict[str, Any]:
         request_model = TaskResumeRequest(**data)
         result = await resume_task_endpoint(
             request=request_model,
-            db_app=self.db_app,
+            db_app=db_app or self.db_app,
             queue_manager=self,
             enqueue=False
         )
         return result
 
-    async def chat_resume(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def chat_resume(self, data: Dict[str, Any], db_app: Any = None) -> Dict[str, Any]:
         request_model = ChatResumeRequest(**data)
         result = await chat_resume(
             request=request_model,
-            db_app=self.db_app,
+            db_app=db_app or self.db_app,
             queue_manager=self,
             enqueue=False
         )
         return result
 
-    async def chat_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def chat_response(self, data: Dict[str, Any], db_app: Any = None) -> Dict[str, Any]:
         request_model = ChatResponseRequest(**data)
         result = await chat_response(
             request=request_model,
-            db_app=self.db_app,
+            db_app=db_app or self.db_app,
             queue_manager=self,
             enqueue=False
         )
         return result
         
-    async def health_api_check(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def health_api_check(self, data: Dict[str, Any], db_app: Any = None) -> Dict[str, Any]:
         request_model = HealthAPIRequest(**data)
         result = await api_health_check(
             request=request_model,
-            db_app=self.db_app,
+            db_app=db_app or self.db_app,
             queue_manager=self,
             enqueue=False
         )
         return result
 
-    async def generate_file_transcript(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def generate_file_transcript(self, data: Dict[str, Any], db_app: Any = None) -> Dict[str, Any]:
         request_model = FileTranscriptRequest(**data)
         result = await generate_file_transcript(
             request=request_model,
-            db_app=self.db_app,
+            db_app=db_app or self.db_app,
             queue_manager=self,
             enqueue=False
         )
@@ -225,7 +535,7 @@ class QueueManager(BaseModel):
         result = await self.redis_client.get(f"result:{task_id}")
         return json.loads(result) if result else None
     
-    async def validate_chat_apis_handler(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def validate_chat_apis_handler(self, data: Dict[str, Any], db_app: Any = None) -> Dict[str, Any]:
         """
         Handle chat API validation requests in the queue.
         
@@ -238,13 +548,13 @@ class QueueManager(BaseModel):
         request_model = ValidationRequest(**data)
         result = await validate_chat_apis(
             request=request_model,
-            db_app=self.db_app,
+            db_app=db_app or self.db_app,
             queue_manager=self,
             enqueue=False
         )
         return result
 
-    async def validate_task_apis_handler(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def validate_task_apis_handler(self, data: Dict[str, Any], db_app: Any = None) -> Dict[str, Any]:
         """
         Handle task API validation requests in the queue.
         
@@ -257,7 +567,7 @@ class QueueManager(BaseModel):
         request_model = ValidationRequest(**data)
         result = await validate_task_apis(
             request=request_model,
-            db_app=self.db_app,
+            db_app=db_app or self.db_app,
             queue_manager=self,
             enqueue=False
         )
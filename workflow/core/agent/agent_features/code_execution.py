@@ -1,6 +1,6 @@
-import re
+import re, asyncio
 from enum import IntEnum
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 from pydantic import Field, BaseModel
 from workflow.core.data_structures import (
     MessageDict, CodeBlock, CodeExecution, CodeOutput, get_run_commands
@@ -32,6 +32,7 @@ class CodeExecutionAgent(BaseModel):
         description="Level of code execution permission"
     )
     execution_languages: List[Language] = Field(default=[Language.PYTHON, Language.SHELL, Language.JAVASCRIPT, Language.TYPESCRIPT], description="Languages available for code execution")
+    max_parallel_executions: int = Field(default=4, description="Maximum number of code execution groups run concurrently")
 
     # TODO: These prompts should be adjustable by the user. However, a similar example is tool calls, where the prompt 
     # is decided by the llm provider, so this can be considered a similar case. 
@@ -141,16 +142,48 @@ If you need to install packages, please provide the necessary setup commands in
         LOGGER.debug(f"Collected {len(code_blocks)} valid code blocks")
         return code_blocks
 
+    @staticmethod
+    def plan_code_executions(run_commands: List[Tuple[str, Language, Optional[str]]]) -> List[List[int]]:
+        """
+        Group run commands into execution groups. Commands of the same language that share setup
+        commands depend on that setup, so they form one group that runs in sequence in a single
+        container session. Every other command is independent and gets a group of its own.
+
+        Note that get_run_commands already merges all blocks of a language (and their setup) into
+        one command, so the commands built by process_code_execution always form single-command
+        groups, one per language. Multi-command sessions only happen for callers that pass
+        unmerged commands.
+
+        Returns:
+            Groups of indexes into `run_commands`, each in original order
+        """
+        groups: List[List[int]] = []
+        shared_setup: Dict[Tuple[Language, str], List[int]] = {}
+        for index, (_, language, setup) in enumerate(run_commands):
+            if setup:
+                if (language, setup) not in shared_setup:
+                    shared_setup[(language, setup)] = []
+                    groups.append(shared_setup[(language, setup)])
+                shared_setup[(language, setup)].append(index)
+            else:
+                groups.append([index])
+        return groups
+
     async def process_code_execution(self, messages: List[MessageDict]) -> Tuple[List[CodeExecution], int]:
         """
         Process and execute code blocks found in messages.
+
+        Independent execution groups (see plan_code_executions) run concurrently, up to
+        `max_parallel_executions` at a time. Blocks are merged per language first, so in practice
+        each language runs concurrently with the others and a message takes roughly as long as
+        its slowest language.
         
         Args:
             messages: List of messages that may contain code blocks
         
         Returns:
             Tuple containing:
-            - List of CodeExecution objects with results
+            - List of CodeExecution objects with results, in the order of the run commands
             - Exit code indicating overall success/failure
         """            
         code_blocks = self.collect_code_blocks(messages)
@@ -161,34 +194,32 @@ If you need to install packages, please provide the necessary setup commands in
         # Get processed run commands
         run_commands = get_run_commands(code_blocks)
         
-        code_executions: List[CodeExecution] = []
-        exit_code = 0
+        code_executions: List[Optional[CodeExecution]] = [None] * len(run_commands)
         runner = DockerCodeRunner(log_level=LOG_LEVEL)
-        for code, language, setup in run_commands:
-            code_block = CodeBlock(code=code, language=language, setup_commands=setup)
-            try:
-                logs, current_exit_code = await runner.run(code, language, setup)
-
-                exit_code = current_exit_code if current_exit_code != 0 else exit_code
-                code_executions.append(
-                    CodeExecution(
-                        code_block=code_block,
-                        code_output=CodeOutput(
-                            output=logs,
-                            exit_code=current_exit_code
-                        )
-                    )
-                )
-            except Exception as e:
-                LOGGER.error(f"Error executing code: {e}")
-                code_executions.append(
-                    CodeExecution(
-                        code_block=code_block,
-                        code_output=CodeOutput(
-                            output=str(e),
-                            exit_code=1
-                        )
+        semaphore = asyncio.Semaphore(max(1, self.max_parallel_executions))
+
+        async def execute_group(group: List[int]) -> None:
+            _, language, setup = run_commands[group[0]]
+            async with semaphore:
+                try:
+                    outputs = await runner.run_session([run_commands[index][0] for index in group], language, setup)
+                except Exception as e:
+                    LOGGER.error(f"Error executing code: {e}")
+                    outputs = [(str(e), 1)] * len(group)
+            for index, (logs, exit_code) in zip(group, outputs):
+                code, language, setup = run_commands[index]
+                code_executions[index] = CodeExecution(
+                    code_block=CodeBlock(code=code, language=language, setup_commands=setup),
+                    code_output=CodeOutput(
+                        output=logs,
+                        exit_code=exit_code
                     )
                 )
-                
-        return code_executions, exit_code
\ No newline at end of file
+
+        await asyncio.gather(*(execute_group(group) for group in self.plan_code_executions(run_commands)))
+
+        exit_code = 0
+        for execution in code_executions:
+            if execution.code_output.exit_code != 0:
+                exit_code = execution.code_output.exit_code
+        return code_executions, exit_code
@@ -1,4 +1,4 @@
-import json
+import json, asyncio
 from pydantic import Field, BaseModel
 from typing import Dict, List, Callable, Any, Optional, Tuple
 from workflow.core.data_structures import (
@@ -19,6 +19,9 @@ class ToolExecutionAgent(BaseModel):
         default=ToolPermission.DISABLED,
         description="Level of tool usage permission"
     )
+    max_concurrent_tool_calls: int = Field(default=4, description="Maximum number of tool calls executed concurrently")
+    tool_call_timeout: Optional[float] = Field(default=None, description="Timeout in seconds for a single tool call (None for no timeout)")
+    tool_timeouts: Dict[str, Optional[float]] = Field(default_factory=dict, description="Per-tool timeouts in seconds, keyed by function name, overriding tool_call_timeout (None for no timeout)")
 
     async def process_tool_calls(self, tool_calls: List[ToolCall] = [], tool_map: Dict[str, Callable] = {}, tools_list: List[ToolFunction] = []) -> List[MessageDict]:
         """
@@ -39,68 +42,78 @@ class ToolExecutionAgent(BaseModel):
             - Respects tool permission levels (DISABLED, NORMAL, WITH_PERMISSION, DRY_RUN)
             - Validates tool inputs against their schemas
             - Creates structured responses for all tool interactions
+            - Runs up to `max_concurrent_tool_calls` calls at once, each bounded by its entry in
+              `tool_timeouts` or else `tool_call_timeout` (unbounded by default); responses keep
+              the order of `tool_calls`
         """
         if self.has_tools == ToolPermission.DISABLED:
             return []
-            
-        tool_messages: List[MessageDict] = []
+
+        tools_by_name: Dict[str, ToolFunction] = {}
+        for tool in tools_list:
+            tool = ensure_tool_function(tool)
+            tools_by_name.setdefault(tool.function.name, tool)
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent_tool_calls))
+
+        # Independent calls run concurrently; gather keeps the messages in tool call order
+        return list(await asyncio.gather(*(
+            self._process_tool_call(tool_call, tool_map, tools_by_name, semaphore) for tool_call in tool_calls
+        )))
+
+    async def _process_tool_call(self, tool_call: ToolCall, tool_map: Dict[str, Callable], tools_by_name: Dict[str, ToolFunction], semaphore: asyncio.Semaphore) -> MessageDict:
+        """Validate and execute (or dry-run) a single tool call, returning its response message."""
+        function_name = tool_call.function.name
+        arguments_str = tool_call.function.arguments
         
-        for tool_call in tool_calls:
-            function_name = tool_call.function.name
-            arguments_str = tool_call.function.arguments
-            
-            try:
-                if not isinstance(arguments_str, dict):
-                    LOGGER.debug(f"Decoding JSON arguments: {arguments_str}")
-                    arguments = json.loads(arguments_str)
-                else:
-                    arguments = arguments_str
-            except json.JSONDecodeError:
-                error_msg = f"Error decoding JSON arguments: {arguments_str}"
-                tool_messages.append(self._create_tool_error_message(error_msg, function_name))
-                continue
+        try:
+            if not isinstance(arguments_str, dict):
+                LOGGER.debug(f"Decoding JSON arguments: {arguments_str}")
+                arguments = json.loads(arguments_str)
+            else:
+                arguments = arguments_str
+        except json.JSONDecodeError:
+            error_msg = f"Error decoding JSON arguments: {arguments_str}"
+            return self._create_tool_error_message(error_msg, function_name)
 
-            if function_name not in tool_map:
-                tool_messages.append(self._create_tool_error_message(f"Tool '{function_name}' not found\nTool map: {tool_map}", function_name))
-                continue
-            
-            tool_function = next((tool for tool in (ensure_tool_function(tool) for tool in tools_list) if tool.function.name == function_name), None)
-            if not tool_function:
-                tool_messages.append(self._create_tool_error_message(f"Tool function '{function_name}' not found in tools list", function_name))
-                continue
-            
-            valid_inputs, error_message = self._validate_tool_inputs(ensure_tool_function(tool_function), arguments)
-            if not valid_inputs:
-                tool_messages.append(self._create_tool_error_message(f"Error in tool '{function_name}': {error_message}", function_name))
-                continue
-            
-            # Handle dry run mode
-            if self.has_tools == ToolPermission.DRY_RUN:
-                tool_messages.append(MessageDict(
-                    role=RoleTypes.TOOL,
-                    content=f"DRY RUN: Would execute {function_name} with arguments: {json.dumps(arguments, indent=2)}",
-                    generated_by=MessageGenerators.TOOL,
-                    step=function_name,
-                    type=ContentType.TEXT
-                ))
-                continue
-            
-            # Execute tool
-            try:
-                result = await tool_map[function_name](**arguments)
-                task_result = result if isinstance(result, TaskResponse) else None
-                tool_messages.append(MessageDict(
-                    role=RoleTypes.TOOL,
-                    content=str(result),
-                    generated_by=MessageGenerators.TOOL,
-                    step=function_name,
-                    type=ContentType.TASK_RESULT if task_result else ContentType.TEXT,
-                    references=References(task_responses=[task_result] if task_result else None),
-                ))
-            except Exception as e:
-                tool_messages.append(self._create_tool_error_message(f"Error executing tool '{function_name}': {str(e)}", function_name))
+        if function_name not in tool_map:
+            return self._create_tool_error_message(f"Tool '{function_name}' not found\nTool map: {tool_map}", function_name)
+        
+        tool_function = tools_by_name.get(function_name)
+        if not tool_function:
+            return self._create_tool_error_message(f"Tool function '{function_name}' not found in tools list", function_name)
+        
+        valid_inputs, error_message = self._validate_tool_inputs(tool_function, arguments)
+        if not valid_inputs:
+            return self._create_tool_error_message(f"Error in tool '{function_name}': {error_message}", function_name)
+        
+        # Handle dry run mode
+        if self.has_tools == ToolPermission.DRY_RUN:
+            return MessageDict(
+                role=RoleTypes.TOOL,
+                content=f"DRY RUN: Would execute {function_name} with arguments: {json.dumps(arguments, indent=2)}",
+                generated_by=MessageGenerators.TOOL,
+                step=function_name,
+                type=ContentType.TEXT
+            )
         
-        return tool_messages
+        # Execute tool
+        timeout = self.tool_timeouts.get(function_name, self.tool_call_timeout)
+        try:
+            async with semaphore:
+                result = await asyncio.wait_for(tool_map[function_name](**arguments), timeout=timeout)
+            task_result = result if isinstance(result, TaskResponse) else None
+            return MessageDict(
+                role=RoleTypes.TOOL,
+                content=str(result),
+                generated_by=MessageGenerators.TOOL,
+                step=function_name,
+                type=ContentType.TASK_RESULT if task_result else ContentType.TEXT,
+                references=References(task_responses=[task_result] if task_result else None),
+            )
+        except asyncio.TimeoutError:
+            return self._create_tool_error_message(f"Error executing tool '{function_name}': timed out after {timeout} seconds", function_name)
+        except Exception as e:
+            return self._create_tool_error_message(f"Error executing tool '{function_name}': {str(e)}", function_name)
 
     def _create_tool_error_message(self, error_msg: str, function_name: str) -> MessageDict:
         """Helper method to create consistent tool error messages."""
@@ -1,13 +1,18 @@
-from .api import API 
+from workflow.util.lazy_imports import lazy_exports
+from .api import API
 from .api_manager import APIManager
+from .client_pool import APIClientPool, get_api_client_pool
 from .api_config import APIConfig
-from .engines import (
-    ArxivSearchAPI, ExaSearchAPI, GoogleSearchAPI, RedditSearchAPI, WikipediaSearchAPI, 
-    APIEngine, LLMEngine, LLMAnthropic, VisionModelEngine, ImageGenerationEngine, AnthropicVisionEngine, 
-    SpeechToTextEngine, TextToSpeechEngine, 
-    EmbeddingEngine, GoogleGraphEngine, WolframAlphaEngine, ApiEngineMap
-    )
-__all__ = ["API", "APIManager", "ArxivSearchAPI", "ExaSearchAPI", "GoogleSearchAPI", "RedditSearchAPI", "APIConfig",
-           "WikipediaSearchAPI", "APIEngine", "LLMEngine", "LLMAnthropic", "ImageGenerationEngine", 
-           "VisionModelEngine", "AnthropicVisionEngine", "SpeechToTextEngine", 
-           "TextToSpeechEngine", "EmbeddingEngine", "GoogleGraphEngine", "WolframAlphaEngine", "ApiEngineMap"]
\ No newline at end of file
+from .engines import APIEngine, ApiEngineMap
+
+_EXPORTS = {name: ".engines" for name in [
+    "ArxivSearchAPI", "ExaSearchAPI", "GoogleSearchAPI", "RedditSearchAPI", "WikipediaSearchAPI",
+    "LLMEngine", "LLMAnthropic", "VisionModelEngine", "ImageGenerationEngine", "AnthropicVisionEngine",
+    "SpeechToTextEngine", "TextToSpeechEngine", "EmbeddingEngine", "GoogleGraphEngine", "WolframAlphaEngine",
+]}
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = ["API", "APIManager", "APIClientPool", "get_api_client_pool", "ArxivSearchAPI", "ExaSearchAPI", "GoogleSearchAPI", "RedditSearchAPI", "APIConfig",
+           "WikipediaSearchAPI", "APIEngine", "LLMEngine", "LLMAnthropic", "ImageGenerationEngine",
+           "VisionModelEngine", "AnthropicVisionEngine", "SpeechToTextEngine",
+           "TextToSpeechEngine", "EmbeddingEngine", "GoogleGraphEngine", "WolframAlphaEngine", "ApiEngineMap"]
@@ -1,10 +1,21 @@
 from pydantic import BaseModel
-from typing import Dict, Any, Union, Optional
+from typing import Dict, Any, Union, Optional, Tuple, Type
 from workflow.core.api.api import API
+from workflow.core.api.client_pool import APIClientPool, get_api_client_pool
 from workflow.core.data_structures import References, ApiType, ApiName, ModelConfig, AliceModel
-from workflow.util import LOGGER
-from workflow.core.api.engines import APIEngine, ApiEngineMap
-    
+from workflow.util import LOGGER, check_cuda_availability, get_model_residency
+from workflow.util.model_residency import parse_warmup_spec
+from workflow.core.api.engines import APIEngine, get_engine_class
+
+# Engines are stateless, so one instance per engine class is shared by every APIManager
+_ENGINE_INSTANCES: Dict[Type[APIEngine], APIEngine] = {}
+
+# Engines running local models that can be kept resident (see ModelResidencyManager)
+LOCAL_MODEL_ENGINES: Dict[str, Tuple[ApiType, ApiName]] = {
+    ApiName.BARK.value: (ApiType.TEXT_TO_SPEECH, ApiName.BARK),
+    ApiName.PIXART.value: (ApiType.IMG_GENERATION, ApiName.PIXART),
+}
+
 class APIManager(BaseModel):
     """
     Central manager for API configurations and interactions within the workflow system.
@@ -22,6 +33,7 @@ class APIManager(BaseModel):
     - Validating API availability and health
     - Routing API requests to appropriate engines
     - Providing standardized access to API configurations
+    - Owning the pool of reusable SDK clients the engines borrow (see APIClientPool)
     
     Attributes:
         apis (Dict[str, API]): Collection of configured APIs indexed by their IDs
@@ -44,6 +56,40 @@ class APIManager(BaseModel):
     """
     apis: Dict[str, API] = {}
 
+    @property
+    def client_pool(self) -> APIClientPool:
+        """The process-wide pool of SDK clients, shared by every APIManager instance."""
+        return get_api_client_pool()
+
+    @staticmethod
+    async def close_clients() -> None:
+        """Close the pooled SDK clients. Called on application shutdown."""
+        await get_api_client_pool().close()
+
+    @staticmethod
+    async def warm_up_local_models(spec: Optional[str] = None) -> None:
+        """
+        Load the local models listed in LOCAL_MODEL_WARMUP (e.g. 'bark=suno/bark-small') so the
+        first request doesn't pay for the load.
+        """
+        device = "cuda" if check_cuda_availability() else "cpu"
+        models = []
+        for engine_name, model_name in parse_warmup_spec(spec) if spec is not None else parse_warmup_spec():
+            engine = LOCAL_MODEL_ENGINES.get(engine_name)
+            if engine is None:
+                LOGGER.warning(f"No local model engine named {engine_name}, skipping warm-up of {model_name}")
+                continue
+            engine_class = get_engine_class(*engine)
+            models.append(engine_class.resident_model(model_name, device))
+        if models:
+            await get_model_residency().warm_up(models)
+
+    @staticmethod
+    def get_engine_instance(engine_class: Type[APIEngine]) -> APIEngine:
+        if engine_class not in _ENGINE_INSTANCES:
+            _ENGINE_INSTANCES[engine_class] = engine_class()
+        return _ENGINE_INSTANCES[engine_class]
+
     def add_api(self, api: API):
         """
         Add a new API to the manager.
@@ -126,16 +172,12 @@ class APIManager(BaseModel):
             api_data = self.retrieve_api_data(api_type, api_name, model)
             LOGGER.debug(f"API data: {api_data}")
             
-            api_engine = ApiEngineMap.get(api_type, {})
-            if api_name:
-                api_engine = api_engine.get(api_name)
-            else:
-                api_engine = next(iter(api_engine.values()), None)
+            api_engine = get_engine_class(api_type, api_name)
             if api_engine is None:
                 raise ValueError(f"No API engine found for {api_type} and {api_name}")
 
             # Validate inputs against the API engine's input_variables
-            engine_instance: APIEngine = api_engine()
+            engine_instance: APIEngine = self.get_engine_instance(api_engine)
             LOGGER.debug(f"Selected API engine: {engine_instance.__class__.__name__}")
             self._validate_inputs(engine_instance, kwargs)
 
@@ -0,0 +1,102 @@
+import asyncio, hashlib
+import httpx
+import openai, anthropic
+from typing import Any, Callable, Dict, Optional, Tuple
+from workflow.core.data_structures import ModelConfig
+from workflow.util import LOGGER
+from workflow.util.const import API_CLIENT_MAX_CONNECTIONS, API_CLIENT_MAX_KEEPALIVE, API_CLIENT_KEEPALIVE_EXPIRY
+
+ClientKey = Tuple[str, str, str]
+
+class APIClientPool:
+    """
+    Pool of reusable SDK clients (AsyncOpenAI, AsyncAnthropic), so API engines share HTTP
+    connections instead of paying a new connection and TLS handshake on every call.
+
+    Clients are keyed by (client kind, base_url, sha256 of the api key) and each one owns a
+    keep-alive httpx connection pool sized by `max_connections` / `max_keepalive_connections`.
+    httpx clients are bound to the event loop they first run on, so the pool keeps a separate
+    set of clients per loop and drops the sets of loops that have since closed.
+
+    The process-wide instance is returned by `get_api_client_pool()`, exposed as
+    `APIManager.client_pool` and closed from the FastAPI lifespan with `APIManager.close_clients()`.
+    """
+    def __init__(
+        self,
+        max_connections: int = API_CLIENT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = API_CLIENT_MAX_KEEPALIVE,
+        keepalive_expiry: float = API_CLIENT_KEEPALIVE_EXPIRY
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._clients: Dict[asyncio.AbstractEventLoop, Dict[ClientKey, Any]] = {}
+
+    @staticmethod
+    def client_key(kind: str, api_key: Optional[str], base_url: Optional[str]) -> ClientKey:
+        key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+        return kind, (base_url or "").rstrip("/"), key_hash
+
+    def _loop_clients(self) -> Dict[ClientKey, Any]:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        for stale in [stale for stale in self._clients if stale is not None and stale.is_closed()]:
+            del self._clients[stale]
+        return self._clients.setdefault(loop, {})
+
+    def _get(self, kind: str, api_key: Optional[str], base_url: Optional[str], factory: Callable[[], Any]) -> Any:
+        clients = self._loop_clients()
+        key = self.client_key(kind, api_key, base_url)
+        if key not in clients:
+            LOGGER.debug(f"Creating pooled {kind} client for {key[1] or 'default base URL'}")
+            clients[key] = factory()
+        return clients[key]
+
+    def openai(self, api_data: ModelConfig) -> openai.AsyncOpenAI:
+        """Borrow the AsyncOpenAI client for this api key and base URL."""
+        base_url = api_data.base_url.rstrip("/") if api_data.base_url else None
+        return self._get("openai", api_data.api_key, base_url, lambda: openai.AsyncOpenAI(
+            api_key=api_data.api_key,
+            base_url=base_url,
+            http_client=openai.DefaultAsyncHttpxClient(limits=self.limits)
+        ))
+
+    def anthropic(self, api_data: ModelConfig) -> anthropic.AsyncAnthropic:
+        """Borrow the AsyncAnthropic client for this api key and base URL."""
+        base_url = api_data.base_url.rstrip("/") if api_data.base_url else None
+        return self._get("anthropic", api_data.api_key, base_url, lambda: anthropic.AsyncAnthropic(
+            api_key=api_data.api_key,
+            base_url=base_url,
+            http_client=anthropic.DefaultAsyncHttpxClient(limits=self.limits)
+        ))
+
+    def __len__(self) -> int:
+        return sum(len(clients) for clients in self._clients.values())
+
+    async def close(self) -> None:
+        """Close every pooled client owned by the running event loop and forget the others."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        clients = self._clients.pop(loop, {})
+        self._clients.clear()
+        for client in clients.values():
+            try:
+                await client.close()
+            except Exception as e:
+                LOGGER.warning(f"Error closing pooled API client: {e}")
+        LOGGER.info(f"Closed {len(clients)} pooled API clients")
+
+_API_CLIENT_POOL: Optional[APIClientPool] = None
+
+def get_api_client_pool() -> APIClientPool:
+    """Returns the process-wide API client pool."""
+    global _API_CLIENT_POOL
+    if _API_CLIENT_POOL is None:
+        _API_CLIENT_POOL = APIClientPool()
+    return _API_CLIENT_POOL
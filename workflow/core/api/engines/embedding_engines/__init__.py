@@ -1,4 +1,9 @@
-from .embedding_engine import EmbeddingEngine
-from .gemini_embedding import GeminiEmbeddingsEngine
+from workflow.util.lazy_imports import lazy_exports
 
-__all__ = ["EmbeddingEngine", "GeminiEmbeddingsEngine"]
\ No newline at end of file
+_EXPORTS = {
+    "EmbeddingEngine": ".embedding_engine",
+    "GeminiEmbeddingsEngine": ".gemini_embedding",
+}
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = list(_EXPORTS)
@@ -1,7 +1,7 @@
 import re
 from pydantic import Field
-from typing import List
-from openai import AsyncOpenAI
+from typing import List, Union
+from workflow.core.api.client_pool import get_api_client_pool
 from workflow.core.data_structures import (
     ModelConfig,
     ApiType,
@@ -12,7 +12,8 @@ from workflow.core.data_structures import (
     CostDict
 )
 from workflow.core.api.engines.api_engine import APIEngine
-from workflow.util import LOGGER, est_token_count, Language, TextSplitter, SemanticTextSplitter, SplitterType, get_language_matching, get_traceback
+from workflow.util.const import SEMANTIC_POOL_EMBEDDINGS
+from workflow.util import LOGGER, est_token_count, get_embedding_cache, Language, TextSplitter, SemanticTextSplitter, SplitterType, get_language_matching, get_traceback
 
 class EmbeddingEngine(APIEngine):
     """
@@ -47,7 +48,7 @@ class EmbeddingEngine(APIEngine):
             properties={
                 "input": ParameterDefinition(
                     type="string",
-                    description="The input text to generate embeddings for.",
+                    description="The input text to generate embeddings for. A list of strings is treated as already-split chunks and embedded as given.",
                 ),
                 "language": ParameterDefinition(
                     type="string",
@@ -66,11 +67,15 @@ class EmbeddingEngine(APIEngine):
     required_api: ApiType = Field(ApiType.EMBEDDINGS, title="The API engine required")
 
     async def generate_api_response(
-        self, api_data: ModelConfig, input: str, language: str = "text", splitter_method: str = SplitterType.RECURSIVE
+        self, api_data: ModelConfig, input: Union[str, List[str]], language: str = "text", splitter_method: str = SplitterType.RECURSIVE
     ) -> References:
         """
         Generates embeddings for the given input using the specified language and OpenAI's API.
         """
+        if isinstance(input, list):
+            # Pre-split chunks (e.g. batched across several items): one request, results in input order
+            return References(embeddings=await self.generate_embedding_chunks(input, api_data))
+
         # Validate the language input
         try:
             if language == 'text':
@@ -85,60 +90,92 @@ class EmbeddingEngine(APIEngine):
         if splitter_method == SplitterType.SEMANTIC:
             splitter = SemanticTextSplitter(
                 language=language_enum,
+                tokenizer_model=api_data.model,
             )
+            if SEMANTIC_POOL_EMBEDDINGS:
+                # The windows were embedded to find the breakpoints; pool those instead of embedding the chunks again
+                chunks, vectors = await splitter.split_text_with_embeddings(input, embedding_generator=self, api_data=api_data)
+                if vectors is not None:
+                    return References(embeddings=self.pooled_embedding_chunks(chunks, vectors, api_data))
+            else:
+                chunks = await splitter.split_text(input, embedding_generator=self, api_data=api_data)
         else:
             splitter = TextSplitter(
                 language=language_enum,
+                tokenizer_model=api_data.model,
             )
-
-        chunks = splitter.split_text(input, embedding_generator=self, api_data=api_data)
+            chunks = splitter.split_text(input)
 
         # Step 2: Generate embeddings for the chunks
         embedding_chunks = await self.generate_embedding_chunks(chunks, api_data)
 
         return References(embeddings=embedding_chunks)
     
+    @staticmethod
+    def cache_namespace(api_data: ModelConfig) -> str:
+        """Embedding cache namespace: vectors are only interchangeable for the same model on the same endpoint."""
+        return f"{api_data.base_url or ''}|{api_data.model}"
+
+    def validate_inputs(self, inputs: List[str], api_data: ModelConfig) -> None:
+        for input in inputs:
+            if not input:
+                continue
+            if est_token_count(input, model=api_data.model) > api_data.ctx_size:
+                raise ValueError(f"Input text (tokens est.: {est_token_count(input, model=api_data.model)}) exceeds the maximum token limit: {api_data.ctx_size}")
+
     async def generate_embedding_chunks(
         self, inputs: List[str], api_data: ModelConfig
     ) -> List[EmbeddingChunk]:
         """
         Generates embeddings for the given inputs using OpenAI's API.
+        Inputs already in the embedding cache are served from it; only the misses are sent to the API.
         """
-
-        client = AsyncOpenAI(api_key=api_data.api_key, base_url=api_data.base_url)
         model = api_data.model
+        cache = get_embedding_cache()
+        namespace = self.cache_namespace(api_data)
 
         LOGGER.info(f"Generating embeddings for {len(inputs)} with total char length {[len(input) for input in inputs]} inputs using model: {model}")
-        # Check if total tokens exceed context size
         chunks: List[EmbeddingChunk] = []
 
         try:
-            for input in inputs:
-                if not input:
-                    continue
-                if est_token_count(input) > api_data.ctx_size:
-                    raise ValueError(f"Input text (tokens est.: {est_token_count(input)}) exceeds the maximum token limit: {api_data.ctx_size}")
-            response = await client.embeddings.create(input=inputs, model=model)
-
-            # Extract embeddings from the response
-            embeddings = [data.embedding for data in response.data]
-            
-            individual_usage = {
-                "prompt_tokens": response.usage.prompt_tokens // len(embeddings),
-                "total_tokens": response.usage.total_tokens // len(embeddings),
-            }
+            vectors = cache.get_many(namespace, inputs)
+            misses = [idx for idx, vector in enumerate(vectors) if vector is None]
+            LOGGER.info(f"Embedding cache: {len(inputs) - len(misses)} of {len(inputs)} inputs cached ({cache.stats})")
+            # Check if total tokens exceed context size
+            self.validate_inputs([inputs[idx] for idx in misses], api_data)
+            individual_usage = {"prompt_tokens": 0, "total_tokens": 0}
+            response_model = model
+            if misses:
+                client = get_api_client_pool().openai(api_data)
+                response = await client.embeddings.create(input=[inputs[idx] for idx in misses], model=model)
+
+                # Extract embeddings from the response
+                embeddings = [data.embedding for data in response.data]
+                for idx, embedding in zip(misses, embeddings):
+                    vectors[idx] = embedding
+                cache.put_many(namespace, [inputs[idx] for idx in misses[:len(embeddings)]], embeddings)
+                response_model = response.model
+                individual_usage = {
+                    "prompt_tokens": response.usage.prompt_tokens // len(embeddings),
+                    "total_tokens": response.usage.total_tokens // len(embeddings),
+                }
+            missed = set(misses)
 
             # Create EmbeddingChunks objects for each input
-            for idx, (input_text, embedding) in enumerate(zip(inputs, embeddings)):
+            for idx, (input_text, embedding) in enumerate(zip(inputs, vectors)):
+                if embedding is None:
+                    break
+                usage = individual_usage if idx in missed else {"prompt_tokens": 0, "total_tokens": 0}
                 embedding_chunk = EmbeddingChunk(
                     vector=embedding,
                     text_content=input_text,
                     index=idx,
                     creation_metadata={
-                        "model": response.model,
-                        "usage": individual_usage,
-                        "estimated_tokens": est_token_count(input_text),
-                        "cost": self.calculate_costs(individual_usage["prompt_tokens"], api_data)
+                        "model": response_model if idx in missed else model,
+                        "usage": usage,
+                        "estimated_tokens": est_token_count(input_text, model=api_data.model),
+                        "cost": self.calculate_costs(usage["prompt_tokens"], api_data),
+                        "generation_details": {"cache_hit": idx not in missed}
                         },
                 )
                 chunks.append(embedding_chunk)
@@ -147,30 +184,56 @@ class EmbeddingEngine(APIEngine):
             LOGGER.error(f"Error in OpenAI embeddings API call: {str(e)} - Traceback: {get_traceback()}")
             return chunks
 
+    def pooled_embedding_chunks(self, inputs: List[str], vectors: List[List[float]], api_data: ModelConfig) -> List[EmbeddingChunk]:
+        """
+        EmbeddingChunks for vectors pooled from already-paid window embeddings. They cost nothing
+        more and aren't cached: they are close to, but not, the embedding of their text.
+        """
+        no_usage = {"prompt_tokens": 0, "total_tokens": 0}
+        return [
+            EmbeddingChunk(
+                vector=vector,
+                text_content=input_text,
+                index=idx,
+                creation_metadata={
+                    "model": api_data.model,
+                    "usage": no_usage,
+                    "estimated_tokens": est_token_count(input_text, model=api_data.model),
+                    "cost": self.calculate_costs(0, api_data),
+                    "generation_details": {"cache_hit": False, "pooled": True}
+                    },
+            )
+            for idx, (input_text, vector) in enumerate(zip(inputs, vectors))
+        ]
+
     async def generate_embedding(
         self, inputs: List[str], api_data: ModelConfig
     ) -> List[List[float]]:
         """
-        Generates embeddings for the given inputs using OpenAI's API.
+        Generates embeddings for the given inputs using OpenAI's API, serving cached inputs from the embedding cache.
         """
-        client = AsyncOpenAI(api_key=api_data.api_key, base_url=api_data.base_url)
         model = api_data.model
+        cache = get_embedding_cache()
+        namespace = self.cache_namespace(api_data)
 
         LOGGER.info(f"Generating embeddings for {len(inputs)} with total char length {[len(input) for input in inputs]} inputs using model: {model}")
-        # Check if total tokens exceed context size
         embeddings: List[List[float]] = []
 
         try:
-            for input in inputs:
-                if not input:
-                    continue
-                if est_token_count(input) > api_data.ctx_size:
-                    raise ValueError(f"Input text (tokens est.: {est_token_count(input)}) exceeds the maximum token limit: {api_data.ctx_size}")
-            response = await client.embeddings.create(input=inputs, model=model)
-
-            # Extract embeddings from the response
-            embeddings = [data.embedding for data in response.data]
+            vectors = cache.get_many(namespace, inputs)
+            misses = [idx for idx, vector in enumerate(vectors) if vector is None]
+            # Check if total tokens exceed context size
+            self.validate_inputs([inputs[idx] for idx in misses], api_data)
+            if misses:
+                client = get_api_client_pool().openai(api_data)
+                response = await client.embeddings.create(input=[inputs[idx] for idx in misses], model=model)
+                generated = [data.embedding for data in response.data]
+                for idx, embedding in zip(misses, generated):
+                    vectors[idx] = embedding
+                cache.put_many(namespace, [inputs[idx] for idx in misses[:len(generated)]], generated)
+
             # This method loses the context of the usage information
+            embeddings = [vector for vector in vectors if vector is not None]
             return embeddings
         except Exception as e:
             LOGGER.error(f"Error in OpenAI embeddings API call: {str(e)} - Traceback: {get_traceback()}")
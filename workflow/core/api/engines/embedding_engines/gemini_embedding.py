@@ -22,8 +22,8 @@ class GeminiEmbeddingsEngine(EmbeddingEngine):
                 if not input_text:
                     continue
 
-                if est_token_count(input_text) > api_data.ctx_size:
-                    raise ValueError(f"Input text (tokens est.: {est_token_count(input_text)}) exceeds the maximum token limit: {api_data.ctx_size}")
+                if est_token_count(input_text, model=api_data.model) > api_data.ctx_size:
+                    raise ValueError(f"Input text (tokens est.: {est_token_count(input_text, model=api_data.model)}) exceeds the maximum token limit: {api_data.ctx_size}")
                     
                 result = genai.embed_content(
                     model=model,
@@ -56,8 +56,8 @@ class GeminiEmbeddingsEngine(EmbeddingEngine):
             for input in inputs:
                 if not input:
                     continue
-                if est_token_count(input) > api_data.ctx_size:
-                    raise ValueError(f"Input text (tokens est.: {est_token_count(input)}) exceeds the maximum token limit: {api_data.ctx_size}")
+                if est_token_count(input, model=api_data.model) > api_data.ctx_size:
+                    raise ValueError(f"Input text (tokens est.: {est_token_count(input, model=api_data.model)}) exceeds the maximum token limit: {api_data.ctx_size}")
             result = genai.embed_content(
                     model=model,
                     content=inputs,
@@ -77,10 +77,10 @@ class GeminiEmbeddingsEngine(EmbeddingEngine):
                     creation_metadata={
                         "model": model,
                         "usage": {
-                            "prompt_tokens": est_token_count(input_text)
+                            "prompt_tokens": est_token_count(input_text, model=api_data.model)
                             },
-                        "estimated_tokens": est_token_count(input_text),
-                        "cost": self.calculate_costs(est_token_count(input_text), api_data)
+                        "estimated_tokens": est_token_count(input_text, model=api_data.model),
+                        "cost": self.calculate_costs(est_token_count(input_text, model=api_data.model), api_data)
                         },
                 )
                 chunks.append(embedding_chunk)
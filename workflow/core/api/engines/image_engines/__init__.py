@@ -1,5 +1,10 @@
-from .image_gen_engine import ImageGenerationEngine
-from .gemini_img_gen import GeminiImageGenerationEngine
-from .pixart_img_gen_engine import PixArtImgGenEngine
+from workflow.util.lazy_imports import lazy_exports
 
-__all__ = ['ImageGenerationEngine', 'GeminiImageGenerationEngine', 'PixArtImgGenEngine'] 
\ No newline at end of file
+_EXPORTS = {
+    "ImageGenerationEngine": ".image_gen_engine",
+    "GeminiImageGenerationEngine": ".gemini_img_gen",
+    "PixArtImgGenEngine": ".pixart_img_gen_engine",
+}
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = list(_EXPORTS)
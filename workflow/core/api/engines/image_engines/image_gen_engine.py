@@ -1,6 +1,6 @@
 from pydantic import Field
 from typing import List
-from openai import AsyncOpenAI
+from workflow.core.api.client_pool import get_api_client_pool
 from workflow.core.data_structures import (
     ModelConfig,
     ApiType,
@@ -96,7 +96,7 @@ class ImageGenerationEngine(APIEngine):
         Returns:
             References: Generated image information wrapped in a MessageDict object.
         """
-        client = AsyncOpenAI(api_key=api_data.api_key, base_url=api_data.base_url)
+        client = get_api_client_pool().openai(api_data)
         model = api_data.model
         if quality not in ["standard", "hd"]:
             quality = "standard"
@@ -1,5 +1,5 @@
-import torch, gc, base64, os
-from typing import List, Optional
+import torch, base64, os
+from typing import List, Optional, Tuple
 from diffusers import PixArtAlphaPipeline
 from workflow.core.data_structures import (
     FileContentReference,
@@ -12,9 +12,26 @@ from workflow.core.data_structures import (
     RoleTypes
 )
 from workflow.core.api.engines.image_engines.image_gen_engine import ImageGenerationEngine
-from workflow.util import LOGGER, get_traceback, check_cuda_availability
+from workflow.util import LOGGER, get_traceback, check_cuda_availability, get_model_residency, model_key
+from workflow.util.model_residency import ModelKey, ModelLoader
 
 class PixArtImgGenEngine(ImageGenerationEngine):
+    @staticmethod
+    def load_model(model_name: str, device: str, dtype: torch.dtype) -> PixArtAlphaPipeline:
+        return PixArtAlphaPipeline.from_pretrained(
+            model_name,
+            cache_dir="/app/model_cache",
+            local_files_only=False,
+            token=os.getenv("HUGGINGFACE_TOKEN"),
+            torch_dtype=dtype,
+        ).to(device)
+
+    @classmethod
+    def resident_model(cls, model_name: str, device: str) -> Tuple[ModelKey, ModelLoader]:
+        """Residency key and loader for `model_name` on `device`."""
+        dtype = torch.float32 if device == "cpu" else torch.float16
+        return model_key(model_name, device, dtype), lambda: cls.load_model(model_name, device, dtype)
+
     async def generate_api_response(
         self,
         api_data: ModelConfig,
@@ -40,24 +57,10 @@ class PixArtImgGenEngine(ImageGenerationEngine):
         device = "cuda" if cuda_available else "cpu"
         LOGGER.info(f"Using device: {device}")
 
-        def flush():
-            LOGGER.debug("Performing memory flush")
-            gc.collect()
-            if cuda_available:
-                torch.cuda.empty_cache()
-                LOGGER.debug(f"Current CUDA memory allocated: {torch.cuda.memory_allocated() / 1e9:.2f}GB")
-
+        key, loader = self.resident_model(model_name, device)
         try:
-            # Load the pipeline
-            LOGGER.info("Loading PixArtAlphaPipeline")
-            pipe = PixArtAlphaPipeline.from_pretrained(
-                model_name,
-                cache_dir="/app/model_cache",
-                local_files_only=False,
-                token=os.getenv("HUGGINGFACE_TOKEN"),
-                torch_dtype=torch.float32 if device == "cpu" else torch.float16,
-            ).to(device)
-            
+            pipe = await get_model_residency().acquire(key, loader)
+
             LOGGER.info("Generating images")
             images = []
             batch_size = 1
@@ -125,7 +128,4 @@ class PixArtImgGenEngine(ImageGenerationEngine):
             )
 
         finally:
-            LOGGER.info("Cleaning up resources")
-            if 'pipe' in locals():
-                del pipe
-            flush()
\ No newline at end of file
+            get_model_residency().release(key)
\ No newline at end of file
@@ -1,6 +1,11 @@
-from .llm_engine import LLMEngine
-from .anthropic_llm_engine import LLMAnthropic
-from .cohere_llm_engine import CohereLLMEngine
-from .gemini_llm_engine import GeminiLLMEngine
+from workflow.util.lazy_imports import lazy_exports
 
-__all__ = ['LLMEngine', 'LLMAnthropic', 'CohereLLMEngine', 'GeminiLLMEngine'] 
\ No newline at end of file
+_EXPORTS = {
+    "LLMEngine": ".llm_engine",
+    "LLMAnthropic": ".anthropic_llm_engine",
+    "CohereLLMEngine": ".cohere_llm_engine",
+    "GeminiLLMEngine": ".gemini_llm_engine",
+}
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = list(_EXPORTS)
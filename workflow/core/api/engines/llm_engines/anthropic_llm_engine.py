@@ -1,7 +1,7 @@
 import traceback, json
 from pydantic import Field
 from typing import Dict, Any, List, Optional
-from anthropic import AsyncAnthropic
+from workflow.core.api.client_pool import get_api_client_pool
 from anthropic.types import TextBlock, ToolUseBlock, ToolParam, Message
 from workflow.core.data_structures import ToolCall, ToolCallConfig, ToolFunction
 from workflow.core.api.engines.llm_engines.llm_engine import LLMEngine
@@ -17,10 +17,13 @@ from workflow.util import (
     LOGGER,
     est_messages_token_count,
     est_token_count,
-    CHAR_TO_TOKEN,
+    get_token_counter,
     MessagePruner,
+    get_pruning_states,
     ScoreConfig,
     MessageApiFormat,
+    is_streaming,
+    emit_delta,
 )
 from workflow.core.api.engines.llm_engines.anthropic_tool_util import ToolNameMapping
 
@@ -194,24 +197,23 @@ class LLMAnthropic(LLMEngine):
         if not api_data.api_key:
             raise ValueError("Anthropic API key not found in API data")
 
-        client = AsyncAnthropic(api_key=api_data.api_key, base_url=api_data.base_url)
+        client = get_api_client_pool().anthropic(api_data)
 
         # Handle token estimation and pruning
-        estimated_tokens = est_messages_token_count(messages, tools) + est_token_count(
-            system
-        )
+        estimated_tokens = est_messages_token_count(messages, tools, model=api_data.model) + est_token_count(system, model=api_data.model)
         if estimated_tokens > api_data.ctx_size:
             LOGGER.warning(
                 f"Estimated tokens ({estimated_tokens}) exceed context size ({api_data.ctx_size}) of model {api_data.model}. Pruning."
             )
             pruner = MessagePruner(
-                max_total_size=api_data.ctx_size * CHAR_TO_TOKEN,
+                max_total_size=api_data.ctx_size,
+                token_counter=get_token_counter(api_data.model),
                 score_config=ScoreConfig(),
             )
-            messages = await pruner.prune(messages, self, api_data)
-            estimated_tokens = est_messages_token_count(
-                messages, tools
-            ) + est_token_count(system)
+            # Same conversation, same pruned prefix: keeps turns cheap and provider prompt caches warm
+            pruning_state = get_pruning_states().for_messages(messages, scope=f"{api_data.model}:{pruner.max_total_size}")
+            messages = await pruner.prune(messages, self, api_data, state=pruning_state)
+            estimated_tokens = est_messages_token_count(messages, tools, model=api_data.model) + est_token_count(system, model=api_data.model)
             LOGGER.debug(f"Pruned message len: {estimated_tokens}")
         elif estimated_tokens > 0.8 * api_data.ctx_size:
             LOGGER.warning(
@@ -239,7 +241,13 @@ class LLMAnthropic(LLMEngine):
         LOGGER.debug(f"API parameters: {api_params}")
 
         try:
-            response: Message = await client.messages.create(**api_params)
+            if is_streaming():
+                async with client.messages.stream(**api_params) as stream:
+                    async for text in stream.text_stream:
+                        await emit_delta(text)
+                    response: Message = await stream.get_final_message()
+            else:
+                response: Message = await client.messages.create(**api_params)
 
             message_text = ""
             tool_calls: Optional[List[ToolCall]] = None
@@ -16,8 +16,9 @@ from workflow.util import (
     LOGGER,
     est_messages_token_count,
     est_token_count,
-    CHAR_TO_TOKEN,
+    get_token_counter,
     MessagePruner,
+    get_pruning_states,
     ScoreConfig,
     MessageApiFormat,
 )
@@ -48,9 +49,7 @@ class CohereLLMEngine(LLMEngine):
                 role = message["role"].upper()
                 cohere_messages.append({"role": role, "message": message["content"]})
 
-            estimated_tokens = est_messages_token_count(
-                messages, tools
-            ) + est_token_count(system)
+            estimated_tokens = est_messages_token_count(messages, tools, model=api_data.model) + est_token_count(system, model=api_data.model)
 
             # Prune messages if estimated tokens exceed context size
             if estimated_tokens > api_data.ctx_size:
@@ -58,13 +57,14 @@ class CohereLLMEngine(LLMEngine):
                     f"Estimated tokens ({estimated_tokens}) exceed context size ({api_data.ctx_size}) of model {api_data.model}. Pruning. "
                 )
                 pruner = MessagePruner(
-                    max_total_size=api_data.ctx_size * CHAR_TO_TOKEN,
+                    max_total_size=api_data.ctx_size,
+                    token_counter=get_token_counter(api_data.model),
                     score_config=ScoreConfig(),
                 )
-                messages = await pruner.prune(messages, self, api_data)
-                estimated_tokens = est_messages_token_count(
-                    messages, tools
-                ) + est_token_count(system)
+                # Same conversation, same pruned prefix: keeps turns cheap and provider prompt caches warm
+                pruning_state = get_pruning_states().for_messages(messages, scope=f"{api_data.model}:{pruner.max_total_size}")
+                messages = await pruner.prune(messages, self, api_data, state=pruning_state)
+                estimated_tokens = est_messages_token_count(messages, tools, model=api_data.model) + est_token_count(system, model=api_data.model)
                 LOGGER.debug(f"Pruned message len: {estimated_tokens}")
             elif estimated_tokens > 0.8 * api_data.ctx_size:
                 LOGGER.warning(
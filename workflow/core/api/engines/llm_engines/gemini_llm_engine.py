@@ -17,10 +17,13 @@ from workflow.util import (
     LOGGER,
     est_messages_token_count,
     est_token_count,
-    CHAR_TO_TOKEN,
+    get_token_counter,
     MessagePruner,
+    get_pruning_states,
     ScoreConfig,
     MessageApiFormat,
+    is_streaming,
+    emit_delta,
 )
 
 class GeminiLLMEngine(LLMEngine):
@@ -61,22 +64,21 @@ class GeminiLLMEngine(LLMEngine):
             tool_config = {"function_declarations": function_declarations}
         LOGGER.debug(f"Tool config: {tool_config}")
 
-        estimated_tokens = est_messages_token_count(messages, tools) + est_token_count(
-            system
-        )
+        estimated_tokens = est_messages_token_count(messages, tools, model=api_data.model) + est_token_count(system, model=api_data.model)
         # Prune messages if estimated tokens exceed context size
         if estimated_tokens > api_data.ctx_size:
             LOGGER.warning(
                 f"Estimated tokens ({estimated_tokens}) exceed context size ({api_data.ctx_size}) of model {api_data.model}. Pruning. "
             )
             pruner = MessagePruner(
-                max_total_size=api_data.ctx_size * CHAR_TO_TOKEN,
+                max_total_size=api_data.ctx_size,
+                token_counter=get_token_counter(api_data.model),
                 score_config=ScoreConfig(),
             )
-            messages = await pruner.prune(messages, self, api_data)
-            estimated_tokens = est_messages_token_count(
-                messages, tools
-            ) + est_token_count(system)
+            # Same conversation, same pruned prefix: keeps turns cheap and provider prompt caches warm
+            pruning_state = get_pruning_states().for_messages(messages, scope=f"{api_data.model}:{pruner.max_total_size}")
+            messages = await pruner.prune(messages, self, api_data, state=pruning_state)
+            estimated_tokens = est_messages_token_count(messages, tools, model=api_data.model) + est_token_count(system, model=api_data.model)
             LOGGER.debug(f"Pruned message len: {estimated_tokens}")
         elif estimated_tokens > 0.8 * api_data.ctx_size:
             LOGGER.warning(
@@ -116,10 +118,23 @@ class GeminiLLMEngine(LLMEngine):
             )
 
             # Send the new message to get the response
-            response: GenerateContentResponse = chat.send_message(
-                new_message,
-                generation_config=generation_config,
-            )
+            if is_streaming():
+                # Iterating the stream also aggregates it, so afterwards the response reads like a regular one
+                response = await chat.send_message_async(
+                    new_message,
+                    generation_config=generation_config,
+                    stream=True,
+                )
+                async for chunk in response:
+                    for candidate in chunk.candidates[:1]:
+                        for part in candidate.content.parts:
+                            if part.text:
+                                await emit_delta(part.text)
+            else:
+                response: GenerateContentResponse = chat.send_message(
+                    new_message,
+                    generation_config=generation_config,
+                )
 
             # Process tool calls
             tool_calls = []
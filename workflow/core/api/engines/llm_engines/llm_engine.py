@@ -1,15 +1,19 @@
 import traceback
-from openai import AsyncOpenAI
+from workflow.core.api.client_pool import get_api_client_pool
+from openai import APIStatusError
 from openai.types.chat import ChatCompletion
 from pydantic import Field
-from typing import List, Optional, TypedDict
+from typing import Any, Dict, List, Optional, Set, TypedDict
 from workflow.core.api.engines.api_engine import APIEngine
-from workflow.util import LOGGER, est_messages_token_count, ScoreConfig, est_token_count, MessagePruner, CHAR_TO_TOKEN, MessageApiFormat
+from workflow.util import LOGGER, est_messages_token_count, ScoreConfig, est_token_count, MessagePruner, get_token_counter, MessageApiFormat, get_pruning_states, is_streaming, emit_delta
 from workflow.core.data_structures import (
     MessageDict, ContentType, ModelConfig, ApiType, References, FunctionParameters, ParameterDefinition, ToolCall, RoleTypes, MessageGenerators, ToolFunction,
     MetadataDict, CostDict
     )
 
+# Base URLs of endpoints that answered `stream_options` with a 4xx (e.g. Mistral, older Azure API versions)
+_STREAM_OPTIONS_UNSUPPORTED: Set[str] = set()
+
 class LLMEngine(APIEngine):
     """
     Language Model API engine implementing the OpenAI chat completions interface.
@@ -101,7 +105,7 @@ class LLMEngine(APIEngine):
         Generates the API response for the task, using the provided API data and messages.
 
         This method can work with any OpenAI-compatible endpoint (OpenAI, Azure, LMStudio).
-        It creates an AsyncOpenAI client with the provided configuration and generates
+        It borrows a pooled AsyncOpenAI client for the provided configuration and generates
         a chat completion based on the input parameters.
 
         Args:
@@ -134,28 +138,28 @@ class LLMEngine(APIEngine):
         LOGGER.debug(f"Generating API response for model {api_data.model} with base URL {base_url}")
 
         # Create the client with the correct base_url
-        client = AsyncOpenAI(
-            api_key=api_data.api_key,
-            base_url=base_url
-        )
+        client = get_api_client_pool().openai(api_data)
         if system:
             messages = [{"role": "system", "content": system}] + messages
         
         if tools:
             tools = [tool.get_dict() for tool in tools]
-        estimated_tokens = est_messages_token_count(messages, tools) + est_token_count(system)
+        estimated_tokens = est_messages_token_count(messages, tools, model=api_data.model) + est_token_count(system, model=api_data.model)
         if not api_data.ctx_size:
             LOGGER.warning(f"Context size not set for model {api_data.model}. Using default value of 4096.")
             api_data.ctx_size = 4096
 
         if estimated_tokens > api_data.ctx_size:
             pruner = MessagePruner(
-                max_total_size=api_data.ctx_size * CHAR_TO_TOKEN,
+                max_total_size=api_data.ctx_size,
+                token_counter=get_token_counter(api_data.model),
                 score_config=ScoreConfig(),
                 )
             LOGGER.warning(f"Estimated tokens ({estimated_tokens}) exceed context size ({api_data.ctx_size}) of model {api_data.model}. Pruning. ")
-            messages = await pruner.prune(messages, self, api_data)
-            estimated_tokens = est_messages_token_count(messages, tools) + est_token_count(system)
+            # Same conversation, same pruned prefix: keeps turns cheap and provider prompt caches warm
+            pruning_state = get_pruning_states().for_messages(messages, scope=f"{api_data.model}:{pruner.max_total_size}")
+            messages = await pruner.prune(messages, self, api_data, state=pruning_state)
+            estimated_tokens = est_messages_token_count(messages, tools, model=api_data.model) + est_token_count(system, model=api_data.model)
             LOGGER.debug(f"Pruned message len: {estimated_tokens}")
         elif estimated_tokens > 0.8 * api_data.ctx_size:
             LOGGER.warning(f"Estimated tokens ({estimated_tokens}) are over 80% of context size ({api_data.ctx_size}).")
@@ -177,7 +181,10 @@ class LLMEngine(APIEngine):
                 api_params["tool_choice"] = tool_choice
                 
             LOGGER.debug(f"API call parameters: {api_params}")
-            response: ChatCompletion = await client.chat.completions.create(**api_params)
+            if is_streaming():
+                response: ChatCompletion = await self._stream_chat_completion(client, api_params, int(estimated_tokens))
+            else:
+                response: ChatCompletion = await client.chat.completions.create(**api_params)
 
             # We'll use the first choice for the MessageDict
             choice = response.choices[0]
@@ -220,6 +227,77 @@ class LLMEngine(APIEngine):
             LOGGER.error(traceback.format_exc())
             raise Exception(f"Error in LLM API call: {str(e)}")
 
+    async def _stream_chat_completion(self, client: Any, api_params: Dict[str, Any], estimated_prompt_tokens: int) -> ChatCompletion:
+        """
+        Run the request with `stream=True`, forwarding content deltas to the current stream sink, and
+        assemble the chunks of the first choice into the ChatCompletion a non-streaming call returns.
+        """
+        stream = await self._create_stream(client, api_params)
+        completion: Dict[str, Any] = {}
+        content_parts: List[str] = []
+        tool_calls: Dict[int, Dict[str, Any]] = {}
+        finish_reason, usage = None, None
+        async for chunk in stream:
+            for field in ("id", "created", "model", "system_fingerprint"):
+                if completion.get(field) is None:
+                    completion[field] = getattr(chunk, field, None)
+            if chunk.usage:
+                usage = chunk.usage.model_dump()
+            for choice in chunk.choices:
+                if choice.index != 0:
+                    continue
+                if choice.delta.content:
+                    content_parts.append(choice.delta.content)
+                    await emit_delta(choice.delta.content)
+                # Tool calls arrive in fragments keyed by index: id and name once, arguments in pieces
+                for tool_call in choice.delta.tool_calls or []:
+                    entry = tool_calls.setdefault(tool_call.index, {"id": None, "type": "function", "function": {"name": "", "arguments": ""}})
+                    entry["id"] = entry["id"] or tool_call.id
+                    if tool_call.function:
+                        entry["function"]["name"] = entry["function"]["name"] or tool_call.function.name or ""
+                        entry["function"]["arguments"] += tool_call.function.arguments or ""
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+
+        content = "".join(content_parts)
+        if usage is None:
+            # Endpoint ignored stream_options; fall back to estimates
+            completion_tokens = est_token_count(content, model=api_params["model"])
+            usage = {"prompt_tokens": estimated_prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": estimated_prompt_tokens + completion_tokens}
+        return ChatCompletion.model_validate({
+            **completion,
+            "object": "chat.completion",
+            "choices": [{
+                "index": 0,
+                "finish_reason": finish_reason or "stop",
+                "message": {
+                    "role": "assistant",
+                    "content": content or None,
+                    "tool_calls": [tool_calls[index] for index in sorted(tool_calls)] or None,
+                },
+            }],
+            "usage": usage,
+        })
+
+    async def _create_stream(self, client: Any, api_params: Dict[str, Any]) -> Any:
+        """
+        Start a streaming request that asks for usage in the last chunk. Endpoints that reject
+        `stream_options` with a 400/422 are retried without it, and remembered so later requests
+        skip it; their usage is then estimated.
+        """
+        endpoint = str(getattr(client, "base_url", ""))
+        if endpoint in _STREAM_OPTIONS_UNSUPPORTED:
+            return await client.chat.completions.create(**{**api_params, "stream": True})
+        try:
+            return await client.chat.completions.create(**{**api_params, "stream": True, "stream_options": {"include_usage": True}})
+        except APIStatusError as e:
+            if e.status_code not in (400, 422):
+                raise
+            LOGGER.warning(f"Streaming request with stream_options failed ({e.status_code}), retrying without it: {str(e)}")
+            stream = await client.chat.completions.create(**{**api_params, "stream": True})
+            _STREAM_OPTIONS_UNSUPPORTED.add(endpoint)
+            return stream
+
     def calculate_cost(self, prompt_tokens: int, completion_tokens: int, model_config: ModelConfig) -> CostDict:
         """
         Calculate the cost of the API call based on token usage and model.
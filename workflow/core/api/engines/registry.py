@@ -0,0 +1,126 @@
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Type
+from workflow.core.data_structures import ApiType, ApiName
+from workflow.core.api.engines.api_engine import APIEngine
+from workflow.util.lazy_imports import import_from_path
+
+_ENGINES = "workflow.core.api.engines"
+LLM_ENGINE = f"{_ENGINES}.llm_engines.llm_engine.LLMEngine"
+VISION_ENGINE = f"{_ENGINES}.vision_engines.vision_model_engine.VisionModelEngine"
+IMAGE_ENGINE = f"{_ENGINES}.image_engines.image_gen_engine.ImageGenerationEngine"
+STT_ENGINE = f"{_ENGINES}.stt_engines.stt_engine.SpeechToTextEngine"
+TTS_ENGINE = f"{_ENGINES}.tts_engines.text_to_speech_engine.TextToSpeechEngine"
+EMBEDDING_ENGINE = f"{_ENGINES}.embedding_engines.embedding_engine.EmbeddingEngine"
+
+# (ApiType, ApiName) -> dotted path of the engine class. Engines are imported on first use, so a
+# deployment only pays for the SDKs it calls (torch/transformers/diffusers for the local models,
+# praw, wikipedia, the Gemini and Cohere SDKs, ...).
+ENGINE_PATHS: Dict[ApiType, Dict[ApiName, str]] = {
+    ApiType.LLM_MODEL: {
+        ApiName.OPENAI: LLM_ENGINE,
+        ApiName.AZURE: LLM_ENGINE,
+        ApiName.MISTRAL: LLM_ENGINE,
+        ApiName.LLAMA: LLM_ENGINE,
+        ApiName.GROQ: LLM_ENGINE,
+        ApiName.ANTHROPIC: f"{_ENGINES}.llm_engines.anthropic_llm_engine.LLMAnthropic",
+        ApiName.GEMINI: f"{_ENGINES}.llm_engines.gemini_llm_engine.GeminiLLMEngine",
+        ApiName.COHERE: f"{_ENGINES}.llm_engines.cohere_llm_engine.CohereLLMEngine",
+        ApiName.LM_STUDIO: LLM_ENGINE,
+        ApiName.DEEPSEEK: LLM_ENGINE
+    },
+    ApiType.GOOGLE_SEARCH: {
+        ApiName.GOOGLE_SEARCH: f"{_ENGINES}.search_engines.google_search_engine.GoogleSearchAPI",
+    },
+    ApiType.REDDIT_SEARCH: {
+        ApiName.REDDIT: f"{_ENGINES}.search_engines.reddit_search_engine.RedditSearchAPI",
+    },
+    ApiType.WIKIPEDIA_SEARCH: {
+        ApiName.WIKIPEDIA: f"{_ENGINES}.search_engines.wikipedia_search_engine.WikipediaSearchAPI",
+    },
+    ApiType.EXA_SEARCH: {
+        ApiName.EXA: f"{_ENGINES}.search_engines.exa_search_engine.ExaSearchAPI",
+    },
+    ApiType.ARXIV_SEARCH: {
+        ApiName.ARXIV: f"{_ENGINES}.search_engines.arxiv_search_engine.ArxivSearchAPI",
+    },
+    ApiType.GOOGLE_KNOWLEDGE_GRAPH: {
+        ApiName.GOOGLE_KNOWLEDGE_GRAPH: f"{_ENGINES}.search_engines.google_knowledge_graph_engine.GoogleGraphEngine",
+    },
+    ApiType.WOLFRAM_ALPHA: {
+        ApiName.WOLFRAM_ALPHA: f"{_ENGINES}.search_engines.wolfram_alpha_engine.WolframAlphaEngine",
+    },
+    ApiType.IMG_VISION: {
+        ApiName.OPENAI: VISION_ENGINE,
+        ApiName.ANTHROPIC: f"{_ENGINES}.vision_engines.anthropic_vision_engine.AnthropicVisionEngine",
+        ApiName.LLAMA: VISION_ENGINE,
+        ApiName.MISTRAL: VISION_ENGINE,
+        ApiName.GEMINI: f"{_ENGINES}.vision_engines.gemini_vision.GeminiVisionEngine",
+        ApiName.GROQ: VISION_ENGINE,
+        ApiName.LM_STUDIO: VISION_ENGINE,
+    },
+    ApiType.IMG_GENERATION: {
+        ApiName.OPENAI: IMAGE_ENGINE,
+        ApiName.GEMINI: f"{_ENGINES}.image_engines.gemini_img_gen.GeminiImageGenerationEngine",
+        ApiName.PIXART: f"{_ENGINES}.image_engines.pixart_img_gen_engine.PixArtImgGenEngine"
+    },
+    ApiType.SPEECH_TO_TEXT: {
+        ApiName.OPENAI: STT_ENGINE,
+        ApiName.GEMINI: f"{_ENGINES}.stt_engines.gemini_stt.GeminiSpeechToTextEngine"
+    },
+    ApiType.TEXT_TO_SPEECH: {
+        ApiName.OPENAI: TTS_ENGINE,
+        ApiName.GROQ: TTS_ENGINE,
+        ApiName.BARK: f"{_ENGINES}.tts_engines.bark_engine.BarkEngine"
+    },
+    ApiType.EMBEDDINGS: {
+        ApiName.OPENAI: EMBEDDING_ENGINE,
+        ApiName.MISTRAL: EMBEDDING_ENGINE,
+        ApiName.GEMINI: f"{_ENGINES}.embedding_engines.gemini_embedding.GeminiEmbeddingsEngine",
+        ApiName.LM_STUDIO: EMBEDDING_ENGINE
+    },
+}
+
+@lru_cache(maxsize=None)
+def load_engine(path: str) -> Type[APIEngine]:
+    """Import the engine class at `path` (once)."""
+    return import_from_path(path)
+
+def get_engine_class(api_type: ApiType, api_name: Optional[ApiName] = None) -> Optional[Type[APIEngine]]:
+    """
+    Engine class for an API, imported on first use. Without `api_name`, the first engine
+    registered for `api_type` is returned. None if nothing is registered.
+    """
+    engines = ENGINE_PATHS.get(api_type, {})
+    path = engines.get(api_name) if api_name else next(iter(engines.values()), None)
+    return load_engine(path) if path else None
+
+class _LazyEngines(Mapping):
+    """ApiName -> engine class for one ApiType; a class is imported when its entry is read."""
+    def __init__(self, paths: Dict[ApiName, str]):
+        self._paths = paths
+
+    def __getitem__(self, api_name: ApiName) -> Type[APIEngine]:
+        return load_engine(self._paths[api_name])
+
+    def __iter__(self) -> Iterator[ApiName]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+class LazyEngineMap(Mapping):
+    """Read-only ApiType -> ApiName -> engine class view of ENGINE_PATHS, with the interface of the old ApiEngineMap dict."""
+    def __init__(self, paths: Dict[ApiType, Dict[ApiName, str]]):
+        self._engines = {api_type: _LazyEngines(engines) for api_type, engines in paths.items()}
+
+    def __getitem__(self, api_type: ApiType) -> _LazyEngines:
+        return self._engines[api_type]
+
+    def __iter__(self) -> Iterator[ApiType]:
+        return iter(self._engines)
+
+    def __len__(self) -> int:
+        return len(self._engines)
+
+ApiEngineMap = LazyEngineMap(ENGINE_PATHS)
@@ -1,10 +1,15 @@
-from .search_engine import APISearchEngine
-from .arxiv_search_engine import ArxivSearchAPI
-from .exa_search_engine import ExaSearchAPI
-from .google_knowledge_graph_engine import GoogleGraphEngine
-from .google_search_engine import GoogleSearchAPI
-from .reddit_search_engine import RedditSearchAPI
-from .wikipedia_search_engine import WikipediaSearchAPI
-from .wolfram_alpha_engine import WolframAlphaEngine
+from workflow.util.lazy_imports import lazy_exports
 
-__all__ = ['ArxivSearchAPI', 'ExaSearchAPI', 'GoogleGraphEngine', 'RedditSearchAPI', 'WikipediaSearchAPI', 'WolframAlphaAPI', 'APISearchEngine', 'GoogleSearchAPI']
\ No newline at end of file
+_EXPORTS = {
+    "APISearchEngine": ".search_engine",
+    "ArxivSearchAPI": ".arxiv_search_engine",
+    "ExaSearchAPI": ".exa_search_engine",
+    "GoogleGraphEngine": ".google_knowledge_graph_engine",
+    "GoogleSearchAPI": ".google_search_engine",
+    "RedditSearchAPI": ".reddit_search_engine",
+    "WikipediaSearchAPI": ".wikipedia_search_engine",
+    "WolframAlphaEngine": ".wolfram_alpha_engine",
+}
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = list(_EXPORTS)
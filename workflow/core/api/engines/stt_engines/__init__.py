@@ -1,4 +1,9 @@
-from .stt_engine import SpeechToTextEngine
-from .gemini_stt import GeminiSpeechToTextEngine
+from workflow.util.lazy_imports import lazy_exports
 
-__all__ = ['SpeechToTextEngine', 'GeminiSpeechToTextEngine'] 
\ No newline at end of file
+_EXPORTS = {
+    "SpeechToTextEngine": ".stt_engine",
+    "GeminiSpeechToTextEngine": ".gemini_stt",
+}
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = list(_EXPORTS)
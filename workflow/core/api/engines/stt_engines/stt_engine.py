@@ -1,6 +1,6 @@
 from typing import List
 from pydantic import Field
-from openai import AsyncOpenAI
+from workflow.core.api.client_pool import get_api_client_pool
 from workflow.core.data_structures import (
     ModelConfig, ApiType, FileReference, MessageDict, References, FunctionParameters, ParameterDefinition, MessageGenerators, ContentType, RoleTypes
     )
@@ -71,10 +71,7 @@ class SpeechToTextEngine(APIEngine):
         """
         LOGGER.info(f"Transcribing audio file {file_reference.storage_path} using OpenAI speech-to-text model {model}")
         LOGGER.info(f"API data: {api_data}")
-        client = AsyncOpenAI(
-            api_key=api_data.api_key,
-            base_url=api_data.base_url
-        )
+        client = get_api_client_pool().openai(api_data)
         model = api_data.model
         if model != 'whisper-1':
             LOGGER.debug(f"Model {model} not recognized. Defaulting to whisper-1.")
@@ -1,4 +1,9 @@
-from .text_to_speech_engine import TextToSpeechEngine
-from .bark_engine import BarkEngine
+from workflow.util.lazy_imports import lazy_exports
 
-__all__ = ['TextToSpeechEngine', 'BarkEngine'] 
\ No newline at end of file
+_EXPORTS = {
+    "TextToSpeechEngine": ".text_to_speech_engine",
+    "BarkEngine": ".bark_engine",
+}
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = list(_EXPORTS)
@@ -1,5 +1,5 @@
-import base64, asyncio, torch, scipy.io.wavfile, numpy as np, os, gc
-from typing import List
+import io, wave, base64, asyncio, torch, numpy as np, os
+from typing import List, Tuple
 from workflow.core.data_structures import (
     FileContentReference,
     MessageDict,
@@ -20,11 +20,23 @@ from workflow.util import (
     TextSplitter,
     Language,
     LengthType,
+    get_model_residency,
+    model_key,
 )
+from workflow.util.const import BARK_BATCH_SIZE
+from workflow.util.model_residency import get_inference_executor
+from workflow.util.model_residency import ModelKey, ModelLoader
 from transformers import AutoProcessor, BarkModel, AutoTokenizer
 
 
 class BarkEngine(TextToSpeechEngine):
+    """
+    Text-to-speech with a local Bark model.
+
+    Long input is split into chunks, and chunks are synthesized `BARK_BATCH_SIZE` at a time in one
+    forward pass. Inference runs on the dedicated local-model executor (see get_inference_executor)
+    so it never blocks the event loop, and the audio of every chunk is appended to a single WAV.
+    """
     async def generate_api_response(
         self,
         api_data: ModelConfig,
@@ -34,7 +46,7 @@ class BarkEngine(TextToSpeechEngine):
         **kwargs,
     ) -> References:
         """
-        Converts text to speech using the Bark model and creates FileContentReferences.
+        Converts text to speech using the Bark model and creates a FileContentReference.
         """
         LOGGER.info(
             f"Starting audio generation with text: '{input[:100]}...', voice: '{voice}'"
@@ -52,50 +64,9 @@ class BarkEngine(TextToSpeechEngine):
         device = "cuda" if cuda_available else "cpu"
         LOGGER.info(f"Using device: {device}")
 
-        def flush():
-            LOGGER.debug("Performing memory flush")
-            gc.collect()
-            if cuda_available:
-                torch.cuda.empty_cache()
-                LOGGER.debug(
-                    f"Current CUDA memory allocated: {torch.cuda.memory_allocated() / 1e9:.2f}GB"
-                )
-
+        key, loader = self.resident_model(model_name, device)
         try:
-            # Load the processor, tokenizer, and model with caching
-            LOGGER.info("Loading Bark processor and model")
-            processor = AutoProcessor.from_pretrained(
-                model_name,
-                cache_dir="/app/model_cache",
-                local_files_only=False,
-                token=os.getenv("HUGGINGFACE_TOKEN"),
-            )
-
-            tokenizer = AutoTokenizer.from_pretrained(
-                model_name,
-                cache_dir="/app/model_cache",
-                local_files_only=False,
-                token=os.getenv("HUGGINGFACE_TOKEN"),
-            )
-
-            model = BarkModel.from_pretrained(
-                model_name,
-                cache_dir="/app/model_cache",
-                local_files_only=False,
-                token=os.getenv("HUGGINGFACE_TOKEN"),
-                torch_dtype=torch.float32 if device == "cpu" else torch.float16,
-            ).to(device)
-
-            # Configure the model's generation settings
-            model.generation_config.pad_token_id = (
-                tokenizer.pad_token_id
-                if tokenizer.pad_token_id is not None
-                else tokenizer.eos_token_id
-            )
-            model.generation_config.eos_token_id = tokenizer.eos_token_id
-
-            # Get sample rate from the model's generation configuration
-            sample_rate = model.generation_config.sample_rate
+            processor, tokenizer, model = await get_model_residency().acquire(key, loader)
 
             # Define maximum input length per chunk based on Bark's limitations
             max_length = api_data.ctx_size or 512  # Reduced from 1024 to be safer
@@ -111,47 +82,43 @@ class BarkEngine(TextToSpeechEngine):
             else:
                 inputs = [input]
 
-            responses: List[References] = []
-
-            # Generate audio for each chunk
-            for idx, chunk in enumerate(inputs):
-                try:
-                    response = await self.generate_audio_chunk(
-                        processor,
-                        model,
-                        device,
-                        sample_rate,
-                        chunk,
-                        voice,
-                        idx,
-                        model_name,
-                    )
-                    responses.append(response)
-                except Exception as e:
-                    LOGGER.error(f"Error generating audio chunk: {str(e)}")
-                    responses.append(
-                        References(
-                            messages=[
-                                MessageDict(
-                                    role="system",
-                                    content=f"Error generating audio chunk: {str(e)}\n Traceback: {get_traceback()}",
-                                    type=ContentType.TEXT,
-                                )
-                            ]
-                        )
-                    )
+            audio_data = await asyncio.get_running_loop().run_in_executor(
+                get_inference_executor(),
+                self.synthesize,
+                processor,
+                model,
+                device,
+                inputs,
+                voice,
+            )
 
-            # Combine all file references
-            all_files = []
-            all_messages = []
-            for ref in responses:
-                if ref.files:
-                    all_files.extend(ref.files)
-                if ref.messages:
-                    all_messages.extend(ref.messages)
-                    LOGGER.error("Error messages: " + str(ref.messages))
+            creation_metadata = {
+                "model": model_name,
+                "generation_details": {
+                    "voice": voice,
+                    "input_text_length": len(input),
+                    "chunks": len(inputs),
+                    "sample_rate": model.generation_config.sample_rate,
+                },
+                "cost": {},
+            }
 
-            return References(files=all_files, messages=all_messages)
+            return References(
+                files=[
+                    FileContentReference(
+                        filename=self.generate_filename(input, voice, 0, "wav"),
+                        type=FileType.AUDIO,
+                        content=base64.b64encode(audio_data).decode("utf-8"),
+                        transcript=MessageDict(
+                            role=RoleTypes.TOOL,
+                            content=input,
+                            type=ContentType.TEXT,
+                            generated_by=MessageGenerators.USER,
+                            creation_metadata=creation_metadata,
+                        ),
+                    )
+                ]
+            )
 
         except Exception as e:
             LOGGER.error(f"Error in Bark audio generation: {str(e)}")
@@ -168,110 +135,126 @@ class BarkEngine(TextToSpeechEngine):
             )
 
         finally:
-            LOGGER.info("Cleaning up resources")
-            if "model" in locals():
-                del model
-            flush()
-
-    async def generate_audio_chunk(
-        self,
-        processor: AutoProcessor,
-        model: BarkModel,
-        device: torch.device,
-        input: str,
-        voice: str = "alloy",
-        speed: float = 1.0,
-        index: int = 0,
-        model_name: str = None,
-    ) -> FileContentReference:
-        try:
-            LOGGER.debug(f"Generating audio for chunk {index} with voice {voice}")
-
-            # Process the input text with attention mask
-            inputs = processor(
-                text=[input],  # Wrap in list to ensure batch processing
-                voice_preset=voice,
-                return_tensors="pt",
-            )
-
-            # Move all inputs to the correct device
-            inputs = {
-                k: v.to(device) if isinstance(v, torch.Tensor) else v
-                for k, v in inputs.items()
-            }
-
-            # Create attention mask if not present
-            if "attention_mask" not in inputs:
-                LOGGER.debug("Creating attention mask")
-                # Create attention mask (1 for tokens, 0 for padding)
-                attention_mask = torch.ones_like(inputs["input_ids"])
-                inputs["attention_mask"] = attention_mask
-
-            # Define a function to generate and encode audio synchronously
-            def generate_and_encode_audio():
-                with torch.no_grad():
-                    # Generate audio using the model with attention mask
-                    speech_output = model.generate(
-                        **inputs,
-                        do_sample=True,
-                        max_length=None,  # Let model decide based on input
-                        pad_token_id=model.generation_config.pad_token_id,
-                        eos_token_id=model.generation_config.eos_token_id,
-                    )
-
-                    audio_array = speech_output.cpu().numpy().squeeze()
-
-                    # Save audio to a BytesIO buffer
-                    import io
-
-                    buffer = io.BytesIO()
-                    scipy.io.wavfile.write(
-                        buffer,
-                        rate=speed,
-                        data=(audio_array * 32767).astype(np.int16),
-                    )
-                    buffer.seek(0)
-                    return buffer.read()
-
-            # Run the synchronous code in an executor
-            audio_data = await asyncio.get_running_loop().run_in_executor(
-                None, generate_and_encode_audio
-            )
+            get_model_residency().release(key)
+
+    @staticmethod
+    def load_model(model_name: str, device: str, dtype: torch.dtype):
+        """Load the Bark processor, tokenizer and model, ready for generation on `device`."""
+        processor = AutoProcessor.from_pretrained(
+            model_name,
+            cache_dir="/app/model_cache",
+            local_files_only=False,
+            token=os.getenv("HUGGINGFACE_TOKEN"),
+        )
 
-            # Generate filename
-            output_filename = self.generate_filename(input, voice, index, "wav")
+        tokenizer = AutoTokenizer.from_pretrained(
+            model_name,
+            cache_dir="/app/model_cache",
+            local_files_only=False,
+            token=os.getenv("HUGGINGFACE_TOKEN"),
+        )
 
-            creation_metadata = {
-                "model": model_name,
-                "generation_details": {
-                    "voice": voice,
-                    "input_text_length": len(input),
-                    "sample_rate": speed,
-                },
-                "cost": {},
-            }
+        model = BarkModel.from_pretrained(
+            model_name,
+            cache_dir="/app/model_cache",
+            local_files_only=False,
+            token=os.getenv("HUGGINGFACE_TOKEN"),
+            torch_dtype=dtype,
+        ).to(device)
+
+        # Configure the model's generation settings
+        model.generation_config.pad_token_id = (
+            tokenizer.pad_token_id
+            if tokenizer.pad_token_id is not None
+            else tokenizer.eos_token_id
+        )
+        model.generation_config.eos_token_id = tokenizer.eos_token_id
+        return processor, tokenizer, model
 
-            # Create transcript message
-            transcript_message = MessageDict(
-                role=RoleTypes.TOOL,
-                content=input,
-                type=ContentType.TEXT,
-                generated_by=MessageGenerators.USER,
-                creation_metadata=creation_metadata,
-            )
+    @classmethod
+    def resident_model(cls, model_name: str, device: str) -> Tuple[ModelKey, ModelLoader]:
+        """Residency key and loader for `model_name` on `device`."""
+        dtype = torch.float32 if device == "cpu" else torch.float16
+        return model_key(model_name, device, dtype), lambda: cls.load_model(model_name, device, dtype)
 
-            # Create FileContentReference
-            file_reference = FileContentReference(
-                filename=output_filename,
-                type=FileType.AUDIO,
-                content=base64.b64encode(audio_data).decode("utf-8"),
-                transcript=transcript_message,
+    @staticmethod
+    def generate_audio_batch(
+        processor: AutoProcessor,
+        model: BarkModel,
+        device: str,
+        chunks: List[str],
+        voice: str,
+    ) -> List[np.ndarray]:
+        """Synthesize several text chunks in one forward pass. Blocking; returns one float waveform per chunk."""
+        inputs = processor(text=chunks, voice_preset=voice, return_tensors="pt")
+        inputs = {
+            k: v.to(device) if isinstance(v, torch.Tensor) else v
+            for k, v in inputs.items()
+        }
+        if "attention_mask" not in inputs:
+            inputs["attention_mask"] = torch.ones_like(inputs["input_ids"])
+
+        with torch.no_grad():
+            speech_output, output_lengths = model.generate(
+                **inputs,
+                do_sample=True,
+                return_output_lengths=True,
+                pad_token_id=model.generation_config.pad_token_id,
+                eos_token_id=model.generation_config.eos_token_id,
             )
+        # Batched outputs are padded to the longest chunk, so trim each one to its own length
+        audio = speech_output.float().cpu().numpy()
+        return [audio[i, :int(length)] for i, length in enumerate(output_lengths)]
 
-            return file_reference
-
+    def generate_audio_with_fallback(
+        self,
+        processor: AutoProcessor,
+        model: BarkModel,
+        device: str,
+        chunks: List[str],
+        voice: str,
+    ) -> List[np.ndarray]:
+        """
+        Synthesize `chunks` as one batch; if the batch fails (e.g. out of memory on a long chunk),
+        synthesize them one at a time instead, so one bad batch doesn't fail the whole request.
+        Errors of a single chunk are raised.
+        """
+        if len(chunks) == 1:
+            return self.generate_audio_batch(processor, model, device, chunks, voice)
+        try:
+            return self.generate_audio_batch(processor, model, device, chunks, voice)
         except Exception as e:
-            LOGGER.error(
-                f"Error generating audio chunk: {e}\n Traceback: {get_traceback()}"
-            )
-            raise e
+            LOGGER.warning(f"Batched Bark synthesis of {len(chunks)} chunks failed, retrying chunk by chunk: {str(e)}")
+            if device.startswith("cuda"):
+                torch.cuda.empty_cache()
+        return [self.generate_audio_batch(processor, model, device, [chunk], voice)[0] for chunk in chunks]
+
+    def synthesize(
+        self,
+        processor: AutoProcessor,
+        model: BarkModel,
+        device: str,
+        chunks: List[str],
+        voice: str,
+    ) -> bytes:
+        """
+        Synthesize every chunk, batch by batch (see generate_audio_with_fallback), appending each
+        batch's PCM frames to one 16-bit mono WAV as soon as it is generated. Blocking; run it in
+        the inference executor.
+        """
+        sample_rate = model.generation_config.sample_rate
+        pause = np.zeros(int(0.25 * sample_rate), dtype=np.int16)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            for start in range(0, len(chunks), BARK_BATCH_SIZE):
+                batch = chunks[start:start + BARK_BATCH_SIZE]
+                LOGGER.debug(f"Generating audio for chunks {start}-{start + len(batch) - 1} of {len(chunks)}")
+                for index, audio_array in enumerate(self.generate_audio_with_fallback(processor, model, device, batch, voice)):
+                    if start + index:
+                        wav.writeframes(pause.tobytes())
+                    pcm = (np.clip(audio_array, -1.0, 1.0) * 32767).astype(np.int16)
+                    wav.writeframes(pcm.tobytes())
+        return buffer.getvalue()
@@ -2,6 +2,7 @@ import base64
 from typing import List
 from pydantic import Field
 from openai import AsyncOpenAI
+from workflow.core.api.client_pool import get_api_client_pool
 from workflow.core.data_structures import (
     ModelConfig,
     ApiType,
@@ -88,7 +89,7 @@ class TextToSpeechEngine(APIEngine):
         Returns:
             References: A message dict containing information about the generated audio file.
         """
-        client = AsyncOpenAI(api_key=api_data.api_key, base_url=api_data.base_url)
+        client = get_api_client_pool().openai(api_data)
         model = api_data.model
         inputs: List[str] = []
         if len(input) > api_data.ctx_size:
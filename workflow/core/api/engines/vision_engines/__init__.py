@@ -1,5 +1,10 @@
-from .vision_model_engine import VisionModelEngine
-from .anthropic_vision_engine import AnthropicVisionEngine
-from.gemini_vision import GeminiVisionEngine
+from workflow.util.lazy_imports import lazy_exports
 
-__all__ = ['VisionModelEngine', 'AnthropicVisionEngine', 'GeminiVisionEngine'] 
\ No newline at end of file
+_EXPORTS = {
+    "VisionModelEngine": ".vision_model_engine",
+    "AnthropicVisionEngine": ".anthropic_vision_engine",
+    "GeminiVisionEngine": ".gemini_vision",
+}
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = list(_EXPORTS)
@@ -13,7 +13,7 @@ from workflow.core.data_structures import (
 from workflow.core.api.engines.vision_engines.vision_model_engine import (
     VisionModelEngine,
 )
-from anthropic import AsyncAnthropic
+from workflow.core.api.client_pool import get_api_client_pool
 
 
 class AnthropicVisionEngine(VisionModelEngine):
@@ -36,7 +36,7 @@ class AnthropicVisionEngine(VisionModelEngine):
         Returns:
             MessageDict: Analysis results wrapped in a MessageDict object.
         """
-        client = AsyncAnthropic(api_key=api_data.api_key)
+        client = get_api_client_pool().anthropic(api_data)
 
         content = []
         for file_ref in file_references:
@@ -1,7 +1,7 @@
 import base64
 from pydantic import Field
 from typing import List, Union, Optional
-from openai import AsyncOpenAI
+from workflow.core.api.client_pool import get_api_client_pool
 from workflow.core.data_structures import (
     MessageDict, ModelConfig, FileReference, get_file_content, ApiType, References, FunctionParameters, ParameterDefinition, 
     RoleTypes, MessageGenerators, ContentType, MetadataDict)
@@ -73,10 +73,7 @@ class VisionModelEngine(LLMEngine):
         Returns:
             References: Analysis results wrapped in a References object.
         """
-        client = AsyncOpenAI(
-            api_key=api_data.api_key,
-            base_url=api_data.base_url
-        )
+        client = get_api_client_pool().openai(api_data)
         content = [{"type": "text", "text": prompt}]
         for file_ref in file_references:
             image_data = get_file_content(file_ref)
@@ -1,7 +1,7 @@
 from enum import Enum
 from pydantic import Field, model_validator, BaseModel
 from typing import List, Optional, Dict, Any, Callable, Union
-from workflow.util import LOGGER, get_traceback
+from workflow.util import LOGGER, get_traceback, get_stream_sink, stream_deltas, pruning_conversation
 from workflow.core.data_structures import (
     MessageDict, ContentType, ToolFunction,
     UserInteraction, UserCheckpoint, Prompt, User, 
@@ -354,7 +354,9 @@ class AliceChat(BaseDataStructure):
         
         while turn_count < self.alice_agent.max_consecutive_auto_reply:
             try:
-                turn_message = await self._execute_single_turn(api_manager, all_generated_messages, user_data)
+                # Every turn's LLM call prunes against this chat's state, so its pruned prefix stays byte-stable
+                with pruning_conversation(self.id):
+                    turn_message = await self._execute_single_turn(api_manager, all_generated_messages, user_data)
                 
                 if not turn_message:
                     break
@@ -382,47 +384,54 @@ class AliceChat(BaseDataStructure):
     async def _execute_single_turn(self, api_manager: APIManager, previous_messages: List[MessageDict], user_data: Optional[User] = None) -> MessageDict:
         """Execute a single turn of the conversation (LLM -> tools -> code)."""
         try:
-            # Generate LLM response first
-            llm_message = await self._generate_llm_response(
-                api_manager,
-                self.messages + previous_messages,
-                self._get_available_tool_functions(api_manager),
-                user_data=user_data
-            )
+            # Generate LLM response first, streaming its deltas tagged with the turn they belong to
+            outer_sink = get_stream_sink()
+            turn = len(previous_messages)
+            async def turn_sink(event: Dict[str, Any]) -> None:
+                await outer_sink({**event, "turn": turn})
+            with stream_deltas(turn_sink if outer_sink else None):
+                llm_message = await self._generate_llm_response(
+                    api_manager,
+                    self.messages + previous_messages,
+                    self._get_available_tool_functions(api_manager),
+                    user_data=user_data
+                )
             
             # If LLM generation failed, raise the exception
             if not llm_message:
                 raise ValueError("Failed to generate LLM response")
                 
             try:
-                # Handle tool calls
-                can_tool_call = self._can_tool_call(llm_message)
-                if can_tool_call and not isinstance(can_tool_call, UserInteraction):
-                    tool_responses: List[TaskResponse] = await self._handle_tool_calls(
-                        api_manager,
-                        llm_message.references.tool_calls
-                    )
-                    if tool_responses:
-                        if not llm_message.references.task_responses:
-                            llm_message.references.task_responses = []
-                        llm_message.references.task_responses.extend(tool_responses)
-                elif can_tool_call and isinstance(can_tool_call, UserInteraction):
-                    if not llm_message.references.user_interactions:
-                        llm_message.references.user_interactions = []
-                    llm_message.references.user_interactions.append(can_tool_call)
-
-                # Handle code execution
-                can_execute_code = self._can_execute_code(llm_message)
-                if can_execute_code and not isinstance(can_execute_code, UserInteraction):
-                    code_executions: List[CodeExecution] = await self._handle_code_execution([llm_message], False)
-                    if code_executions:
-                        if not llm_message.references.code_executions:
-                            llm_message.references.code_executions = []
-                        llm_message.references.code_executions.extend(code_executions)
-                elif can_execute_code and isinstance(can_execute_code, UserInteraction):
-                    if not llm_message.references.user_interactions:
-                        llm_message.references.user_interactions = []
-                    llm_message.references.user_interactions.append(can_execute_code)
+                # Tools and code run their own LLM calls; those aren't part of this turn's text or conversation
+                with stream_deltas(None), pruning_conversation(None):
+                    # Handle tool calls
+                    can_tool_call = self._can_tool_call(llm_message)
+                    if can_tool_call and not isinstance(can_tool_call, UserInteraction):
+                        tool_responses: List[TaskResponse] = await self._handle_tool_calls(
+                            api_manager,
+                            llm_message.references.tool_calls
+                        )
+                        if tool_responses:
+                            if not llm_message.references.task_responses:
+                                llm_message.references.task_responses = []
+                            llm_message.references.task_responses.extend(tool_responses)
+                    elif can_tool_call and isinstance(can_tool_call, UserInteraction):
+                        if not llm_message.references.user_interactions:
+                            llm_message.references.user_interactions = []
+                        llm_message.references.user_interactions.append(can_tool_call)
+
+                    # Handle code execution
+                    can_execute_code = self._can_execute_code(llm_message)
+                    if can_execute_code and not isinstance(can_execute_code, UserInteraction):
+                        code_executions: List[CodeExecution] = await self._handle_code_execution([llm_message], False)
+                        if code_executions:
+                            if not llm_message.references.code_executions:
+                                llm_message.references.code_executions = []
+                            llm_message.references.code_executions.extend(code_executions)
+                    elif can_execute_code and isinstance(can_execute_code, UserInteraction):
+                        if not llm_message.references.user_interactions:
+                            llm_message.references.user_interactions = []
+                        llm_message.references.user_interactions.append(can_execute_code)
                     
                 return llm_message
                 
@@ -1,5 +1,7 @@
-import os
-from typing import List, Dict, Any, Union, TypedDict
+import os, hashlib, asyncio
+import numpy as np
+from enum import Enum
+from typing import List, Dict, Any, Union, TypedDict, Tuple, Optional, Iterator, Callable
 from pydantic import Field, BaseModel
 from workflow.core.tasks.task import AliceTask
 from workflow.core.agent import AliceAgent
@@ -8,6 +10,8 @@ from workflow.core.data_structures import (
     ParameterDefinition,
     MessageDict,
     ApiType,
+    ModelType,
+    ModelConfig,
     References,
     NodeResponse,
     TasksEndCodeRouting,
@@ -20,9 +24,17 @@ from workflow.core.data_structures import (
     DataCluster
 )
 from workflow.core.api import APIManager
-from workflow.util import LOGGER, cosine_similarity, Language, get_traceback
+from workflow.util import LOGGER, Language, TextSplitter, est_token_count, get_traceback, get_embedding_cache
+from workflow.util.const import EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_TOKENS, EMBEDDING_CONCURRENCY
+from workflow.util.vector_index import SimilarityEngine, VectorIndex, relax_similarity_threshold, select_top_k
 
 MIN_SIMILARITY_THRESHOLD = 0.2
+DEFAULT_ANN_PROBES = 8
+
+class RetrievalSearchMode(str, Enum):
+    """How retrieve_relevant_embeddings searches the data cluster"""
+    EXACT = "exact"  # Score every chunk
+    ANN = "ann"  # Score only the closest IVF lists of the cluster's vector index
 
 class ChunkedEmbedding(TypedDict):
     similarity: float
@@ -30,6 +42,9 @@ class ChunkedEmbedding(TypedDict):
     reference: BaseModel
     embedding_chunk: EmbeddingChunk
 
+EmbeddingEntry = Tuple[str, BaseModel, EmbeddingChunk]
+EntryLocation = Tuple[str, int, int]  # (field name, item position, chunk position) in the data cluster
+
 class RetrievalTask(AliceTask):
     """
     A specialized task for managing and querying embedded content within a DataCluster,
@@ -62,11 +77,13 @@ class RetrievalTask(AliceTask):
     * Embedding Management:
         - Automatic embedding generation for new content
         - Support for multiple content types
-        - Batch processing capabilities
+        - Batch processing capabilities: chunks from many items share requests, sent concurrently
         - Language-specific handling
 
     * Similarity Search:
         - Configurable similarity thresholds
+        - Persistent, memory-mapped vector index per data cluster (under SHARED_UPLOAD_DIR)
+        - Optional approximate (IVF-flat) search for large clusters
         - Result count limiting
         - Multi-type content retrieval
         - Contextual result bundling
@@ -82,6 +99,8 @@ class RetrievalTask(AliceTask):
         - max_results (int, optional): Result limit (default: 10)
         - similarity_threshold (float, optional): Minimum similarity score (default: 0.6)
         - update_all (bool, optional): Force embedding updates (default: False)
+        - search_mode (str, optional): 'exact' or 'ann' (default: 'exact')
+        - ann_probes (int, optional): IVF lists to probe in 'ann' mode (default: 8)
         
     required_apis : List[ApiType]
         [ApiType.EMBEDDINGS]
@@ -126,6 +145,16 @@ class RetrievalTask(AliceTask):
                     type="boolean",
                     description="Whether to update all items in the data cluster.",
                     default=False
+                ),
+                "search_mode": ParameterDefinition(
+                    type="string",
+                    description="How to search the data cluster: 'exact' scores every chunk, 'ann' uses an approximate IVF index (faster on large clusters).",
+                    default=RetrievalSearchMode.EXACT.value
+                ),
+                "ann_probes": ParameterDefinition(
+                    type="integer",
+                    description="Number of IVF lists to search in 'ann' mode. Higher values improve recall at the cost of latency.",
+                    default=DEFAULT_ANN_PROBES
                 )
             },
             required=["prompt"]
@@ -176,7 +205,12 @@ class RetrievalTask(AliceTask):
 
         try:
             update_all: bool = kwargs.get("update_all", False)
+            search_mode = RetrievalSearchMode(kwargs.get('search_mode') or RetrievalSearchMode.EXACT)
             updated_data_cluster = await self.ensure_embeddings_for_data_cluster(self.data_cluster, api_manager, update_all)
+            # Index maintenance reads or hashes every chunk, so it runs here, once per cluster change, off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.sync_vector_index, updated_data_cluster, search_mode == RetrievalSearchMode.ANN, update_all
+            )
             self.data_cluster = updated_data_cluster
             return NodeResponse(
                 parent_task_id=self.id,
@@ -208,18 +242,24 @@ class RetrievalTask(AliceTask):
         """
         For each non-string and non-embedding object in data_cluster,
         ensure embeddings are available. Update the objects with embeddings if they are missing.
+        Items from every field are embedded together, so their chunks share batched requests.
         """
-        updated_data_cluster = DataCluster()
+        updated_data_cluster = DataCluster(_id=data_cluster.id)
         fields_to_process = [field for field in references_model_map.keys()
                              if field not in ['embeddings']]
         
         LOGGER.info(f"Fields to process: {fields_to_process}")
 
+        pending = [item for field_name in fields_to_process for item in (getattr(data_cluster, field_name) or [])
+                   if isinstance(item, Embeddable) and (not item.embedding or update_all)]
+        await self.generate_embeddings_for_items(pending, api_manager)
+
         for field_name in fields_to_process:
             items = getattr(data_cluster, field_name)
             if items:
-                updated_items = await self.ensure_embeddings_for_items(items, api_manager, update_all)
+                updated_items = await self.ensure_embeddings_for_items(items, api_manager)
                 setattr(updated_data_cluster, field_name, updated_items)
+        LOGGER.info(f"Embedding cache: {get_embedding_cache().stats}")
         return updated_data_cluster
 
     async def ensure_embeddings_for_items(
@@ -231,27 +271,103 @@ class RetrievalTask(AliceTask):
         """
         For a list of items, ensure each has embeddings.
         """
-        updated_items = []
-        for item in items:
-            if not isinstance(item, Embeddable):
-                continue  # Skip if the item doesn't have an embedding field
-            if not item.embedding or update_all:
-                # Need to generate embeddings
-                content = self.get_item_content(item)
-                LOGGER.info(f"Generating embeddings for item with content length of {len(content)}")
-                language = self.get_item_language(item)
-                embeddings_reference: List[EmbeddingChunk] = await self.agent.generate_embeddings(
-                    api_manager=api_manager, input=content, language=language
-                )
-                if embeddings_reference:
-                    LOGGER.info(f"Generated embeddings for item: {len(embeddings_reference)}")
-                    item.embedding = embeddings_reference
-                else:
-                    raise ValueError(f"Failed to generate embeddings for item: {item}")
-            updated_items.append(item)
+        updated_items = [item for item in items if isinstance(item, Embeddable)]  # Skip items without an embedding field
+        pending = [item for item in updated_items if not item.embedding or update_all]
+        await self.generate_embeddings_for_items(pending, api_manager)
         LOGGER.info(f"Updated items: {len(updated_items)}")
         LOGGER.info(f"Embedding chunks: {[len(item.embedding) for item in updated_items if item.embedding]}")
         return updated_items
+
+    def get_embeddings_config(self, api_manager: APIManager) -> Optional[ModelConfig]:
+        """
+        The model configuration the embedding engine will receive: the agent's embeddings model,
+        or the embeddings API's default model, resolved by the API manager.
+        """
+        embeddings_model = self.agent.models[ModelType.EMBEDDINGS]
+        if not embeddings_model:
+            api = api_manager.get_api_by_type(ApiType.EMBEDDINGS)
+            embeddings_model = api.default_model if api else None
+        if not embeddings_model:
+            return None
+        api_data = api_manager.retrieve_api_data(ApiType.EMBEDDINGS, embeddings_model.api_name, embeddings_model)
+        return api_data if isinstance(api_data, ModelConfig) else None
+
+    def split_item_content(self, item: BaseModel, tokenizer_model: Optional[str] = None) -> List[str]:
+        """
+        Splits an item's content into the chunks that get embedded, the same way the embedding engine
+        would split it on its own (recursive splitter for the item's language, counting tokens with
+        the embedding model's tokenizer).
+        """
+        language = self.get_item_language(item)
+        try:
+            splitter = TextSplitter(language=language, tokenizer_model=tokenizer_model)
+        except ValueError:
+            splitter = TextSplitter(language=Language.TEXT, tokenizer_model=tokenizer_model)
+        return [chunk for chunk in splitter.split_text(self.get_item_content(item)) if chunk]
+
+    @staticmethod
+    def batch_chunks(
+        chunks: List[Tuple[int, str]],
+        max_inputs: int = EMBEDDING_BATCH_SIZE,
+        max_tokens: int = EMBEDDING_BATCH_TOKENS,
+        tokenizer_model: Optional[str] = None
+    ) -> List[List[Tuple[int, str]]]:
+        """
+        Packs (owner, text) chunks, in order, into request batches of at most `max_inputs` inputs
+        and `max_tokens` estimated tokens, counted with `tokenizer_model`'s tokenizer. A single
+        chunk over the token budget gets its own batch.
+        """
+        batches: List[List[Tuple[int, str]]] = []
+        current: List[Tuple[int, str]] = []
+        current_tokens = 0
+        for owner, text in chunks:
+            tokens = est_token_count(text, model=tokenizer_model)
+            if current and (len(current) >= max_inputs or current_tokens + tokens > max_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append((owner, text))
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def generate_embeddings_for_items(self, items: List[BaseModel], api_manager: APIManager) -> None:
+        """
+        Generates embeddings for the given items in place. Chunks from all items are packed into
+        batched requests, which are sent with at most EMBEDDING_CONCURRENCY in flight, and the
+        resulting chunks are mapped back to their owning items. A request's token budget is
+        EMBEDDING_BATCH_TOKENS, or the embedding model's ctx_size when that is smaller.
+        """
+        if not items:
+            return
+        api_data = self.get_embeddings_config(api_manager)
+        tokenizer_model = api_data.model if api_data else None
+        chunks = [(owner, text) for owner, item in enumerate(items) for text in self.split_item_content(item, tokenizer_model)]
+        max_tokens = min(EMBEDDING_BATCH_TOKENS, api_data.ctx_size) if api_data and api_data.ctx_size else EMBEDDING_BATCH_TOKENS
+        batches = self.batch_chunks(chunks, max_tokens=max_tokens, tokenizer_model=tokenizer_model)
+        LOGGER.info(f"Generating embeddings for {len(items)} items: {len(chunks)} chunks in {len(batches)} requests")
+        semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+
+        async def embed_batch(batch: List[Tuple[int, str]]) -> List[EmbeddingChunk]:
+            async with semaphore:
+                embeddings: List[EmbeddingChunk] = await self.agent.generate_embeddings(
+                    api_manager=api_manager, input=[text for _, text in batch], language=Language.TEXT
+                )
+            if len(embeddings) != len(batch):
+                raise ValueError(f"Expected {len(batch)} embeddings for batch, got {len(embeddings)}")
+            return embeddings
+
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+
+        item_chunks: List[List[EmbeddingChunk]] = [[] for _ in items]
+        for batch, embeddings in zip(batches, results):
+            for (owner, _), embedding_chunk in zip(batch, embeddings):
+                embedding_chunk.index = len(item_chunks[owner])
+                item_chunks[owner].append(embedding_chunk)
+        for item, embeddings_reference in zip(items, item_chunks):
+            if not embeddings_reference:
+                raise ValueError(f"Failed to generate embeddings for item: {item}")
+            item.embedding = embeddings_reference
     
     def get_item_content(self, item: BaseModel) -> Union[str, List[str]]:
         """
@@ -328,6 +444,7 @@ class RetrievalTask(AliceTask):
         prompt: str = kwargs.get('prompt', "")
         max_results: int = kwargs.get('max_results', 10)
         similarity_threshold: float = kwargs.get('similarity_threshold', 0.6)
+        ann_probes: int = kwargs.get('ann_probes') or DEFAULT_ANN_PROBES
 
         if self.data_cluster is None:
             LOGGER.error("DataCluster cannot be None.")
@@ -345,6 +462,7 @@ class RetrievalTask(AliceTask):
 
         try:
             LOGGER.info(f"Retrieving embeddings for prompt: {prompt}")
+            search_mode = RetrievalSearchMode(kwargs.get('search_mode') or RetrievalSearchMode.EXACT)
             # Step 1: Create embedding for the prompt
             embedding_chunks: List[EmbeddingChunk] = await self.agent.generate_embeddings(
                 api_manager=api_manager, input=prompt, language=Language.TEXT
@@ -354,9 +472,10 @@ class RetrievalTask(AliceTask):
 
             prompt_embedding_vector: List[float] = embedding_chunks[0].vector
 
-            # Step 2: Retrieve top embeddings from data_cluster
-            top_embeddings = self.retrieve_top_embeddings(
-                prompt_embedding_vector, self.data_cluster, similarity_threshold, max_results
+            # Step 2: Retrieve top embeddings from data_cluster, off the event loop
+            top_embeddings = await asyncio.get_running_loop().run_in_executor(
+                None, self.retrieve_top_embeddings, prompt_embedding_vector, self.data_cluster, similarity_threshold,
+                max_results, ann_probes if search_mode == RetrievalSearchMode.ANN else None
             )
 
             # Step 3: Prepare the References object to return
@@ -385,32 +504,164 @@ class RetrievalTask(AliceTask):
                 execution_order=len(execution_history)
             )
 
-    def get_similarity_chunks_from_data_cluster(self, data_cluster: DataCluster, prompt_embedding: List[float]) -> List[ChunkedEmbedding]:
-        embedding_chunks: List[Dict[str, Any]] = []
+    def iter_embedding_entries(self, data_cluster: DataCluster) -> Iterator[Tuple[EntryLocation, EmbeddingEntry]]:
+        """
+        Yield every embedding chunk in the data cluster as its location and its
+        (reference_type, reference, chunk) entry, in cluster order.
+        """
         fields_to_process = [field for field in references_model_map.keys()
                              if field not in ['embeddings']]
         for field_name in fields_to_process:
             items = getattr(data_cluster, field_name)
             if items:
-                for item in items:
+                for item_position, item in enumerate(items):
                     if hasattr(item, 'embedding') and item.embedding:
-                        for embedding_chunk in item.embedding:
-                            if not isinstance(embedding_chunk, EmbeddingChunk):
-                                try:
-                                    embedding_chunk = EmbeddingChunk(**embedding_chunk)
-                                except Exception as e:
-                                    LOGGER.error(f"Failed to parse embedding chunk: {e}")
-                                    continue
-                            similarity = cosine_similarity(prompt_embedding, embedding_chunk.vector)
-                            embedding_chunks.append({
-                                'similarity': similarity,
-                                'reference_type': field_name,
-                                'reference': item,
-                                'embedding_chunk': embedding_chunk
-                            })
+                        for chunk_position in range(len(item.embedding)):
+                            entry = self.resolve_entry(data_cluster, (field_name, item_position, chunk_position))
+                            if entry is not None:
+                                yield (field_name, item_position, chunk_position), entry
                     else:
                         LOGGER.info(f"Item {item} has no embedding.")
-        return embedding_chunks
+
+    def collect_embedding_entries(self, data_cluster: DataCluster) -> List[EmbeddingEntry]:
+        """
+        Flatten every embedding chunk in the data cluster into (reference_type, reference, chunk) entries,
+        in cluster order.
+        """
+        return [entry for _, entry in self.iter_embedding_entries(data_cluster)]
+
+    def resolve_entry(self, data_cluster: DataCluster, location: Optional[EntryLocation]) -> Optional[EmbeddingEntry]:
+        """The entry at `location` in the data cluster, or None if there is none or its chunk can't be parsed."""
+        if location is None:
+            return None
+        field_name, item_position, chunk_position = location
+        items = getattr(data_cluster, field_name, None) or []
+        if item_position >= len(items) or not getattr(items[item_position], 'embedding', None):
+            return None
+        item = items[item_position]
+        if chunk_position >= len(item.embedding):
+            return None
+        embedding_chunk = item.embedding[chunk_position]
+        if not isinstance(embedding_chunk, EmbeddingChunk):
+            try:
+                embedding_chunk = EmbeddingChunk(**embedding_chunk)
+            except Exception as e:
+                LOGGER.error(f"Failed to parse embedding chunk: {e}")
+                return None
+        return field_name, item, embedding_chunk
+
+    def get_cluster_version(self, data_cluster: DataCluster) -> Tuple:
+        """
+        Cheap fingerprint of the cluster's contents, per field: every item's id and a hash of its chunks'
+        ids and texts, so content re-embedded under the same ids still changes the version.
+        String hashes are cached on each string, but salted per process, so this is only valid in-process.
+        """
+        fields_to_process = [field for field in references_model_map.keys()
+                             if field not in ['embeddings']]
+        return tuple(
+            (field_name, tuple((getattr(item, 'id', None), self.get_chunks_fingerprint(getattr(item, 'embedding', None) or []))
+                               for item in getattr(data_cluster, field_name) or []))
+            for field_name in fields_to_process
+        )
+
+    def get_chunks_fingerprint(self, embedding: List[Union[EmbeddingChunk, Dict[str, Any]]]) -> int:
+        """Hash of the (id, text) of each chunk, whether stored as a model or as a raw dict."""
+        return hash(tuple([(chunk.get('id'), chunk.get('text_content')) if isinstance(chunk, dict) else (chunk.id, chunk.text_content)
+                           for chunk in embedding]))
+
+    def build_chunked_embedding(self, entry: EmbeddingEntry, similarity: float) -> ChunkedEmbedding:
+        reference_type, reference, embedding_chunk = entry
+        return {
+            'similarity': float(similarity),
+            'reference_type': reference_type,
+            'reference': reference,
+            'embedding_chunk': embedding_chunk
+        }
+
+    def get_entry_key(self, entry: EmbeddingEntry) -> str:
+        """
+        Stable key for an embedding chunk in the vector index: the chunk's id if it has been stored,
+        otherwise its owner and position, followed by a hash of its text, so a chunk whose content
+        changes under the same id gets a new key, and its vector is replaced.
+        """
+        reference_type, reference, embedding_chunk = entry
+        content_hash = hashlib.sha256(embedding_chunk.text_content.encode('utf-8')).hexdigest()[:16]
+        if embedding_chunk.id:
+            return f"{embedding_chunk.id}:{content_hash}"
+        return f"{reference_type}:{getattr(reference, 'id', None) or ''}:{embedding_chunk.index}:{content_hash}"
+
+    def get_vector_index(self, data_cluster: DataCluster) -> Optional[VectorIndex]:
+        """
+        Returns the persistent vector index for the data cluster, or None if the cluster
+        has no id or the shared volume is unavailable.
+        """
+        if not data_cluster.id:
+            return None
+        try:
+            return VectorIndex.for_cluster(data_cluster.id)
+        except OSError as e:
+            LOGGER.warning(f"Vector index unavailable for data cluster {data_cluster.id}: {e}")
+            return None
+
+    def sync_vector_index(self, data_cluster: DataCluster, build_ann: bool = False, rebuild: bool = False) -> Optional[VectorIndex]:
+        """
+        Bring the cluster's vector index in line with its chunks: only new chunks are written and
+        removed ones dropped, and nothing is read when the cluster hasn't changed since the last sync
+        in this process (see get_cluster_version). With `rebuild`, the stored vectors are dropped
+        first, as regenerated vectors may keep their keys. With `build_ann`, the ANN structure is
+        trained if the index has none.
+
+        Blocking: called from an executor when the cluster is updated, before retrieval.
+
+        Returns:
+            The synced index, or None if the cluster has no index or it couldn't be updated
+        """
+        vector_index = self.get_vector_index(data_cluster)
+        if vector_index is None:
+            return None
+        try:
+            if rebuild:
+                vector_index.clear()
+            added, removed = vector_index.sync_version(
+                self.get_cluster_version(data_cluster),
+                lambda: ((self.get_entry_key(entry), location, entry[2].vector)
+                         for location, entry in self.iter_embedding_entries(data_cluster))
+            )
+            if added or removed:
+                LOGGER.info(f"Updated vector index for data cluster {data_cluster.id}: {added} added, {removed} removed")
+            if build_ann and not vector_index.has_ann:
+                vector_index.build_ann()
+            return vector_index
+        except OSError as e:
+            LOGGER.warning(f"Vector index update failed for data cluster {data_cluster.id}: {e}")
+            return None
+
+    def select_top_entries(
+        self,
+        get_entry: Callable[[int], Optional[EmbeddingEntry]],
+        scores: np.ndarray,
+        max_results: int,
+        similarity_threshold: float
+    ) -> List[ChunkedEmbedding]:
+        """
+        The top results among `scores`, relaxing the threshold if needed. Only the selected
+        entries are looked up, through `get_entry(position)`; entries it can't find are skipped.
+        """
+        if len(scores) <= max_results:
+            positions = range(len(scores))
+        else:
+            threshold = self.get_relaxed_threshold(scores, max_results, similarity_threshold)
+            positions = select_top_k(scores, max_results, threshold)
+        selected = ((get_entry(position), scores[position]) for position in positions)
+        return [self.build_chunked_embedding(entry, score) for entry, score in selected if entry is not None]
+
+    def get_similarity_chunks_from_data_cluster(self, data_cluster: DataCluster, prompt_embedding: List[float]) -> List[ChunkedEmbedding]:
+        entries = self.collect_embedding_entries(data_cluster)
+        if not entries:
+            return []
+        engine = SimilarityEngine.from_vectors([chunk.vector for _, _, chunk in entries])
+        scores = engine.score(prompt_embedding)
+        return [self.build_chunked_embedding(entry, score) for entry, score in zip(entries, scores)]
     
     def filter_chunks_by_similarity_threshold(self, embedding_chunks: List[ChunkedEmbedding], similarity_threshold: float) -> List[ChunkedEmbedding]:
         return [chunk for chunk in embedding_chunks if chunk['similarity'] >= similarity_threshold]
@@ -418,46 +669,65 @@ class RetrievalTask(AliceTask):
     def get_final_embedding_chunks(self, embedding_chunks: List[ChunkedEmbedding], max_results: int, similarity_threshold: float) -> List[ChunkedEmbedding]:
         if len(embedding_chunks) <= max_results:
             return embedding_chunks
-        else:
-            filtered_chunks = self.filter_chunks_by_similarity_threshold(embedding_chunks, similarity_threshold)
-            if len(filtered_chunks) < max_results and similarity_threshold > MIN_SIMILARITY_THRESHOLD:
-                # If we don't have enough results, reduce the threshold and try again 
-                LOGGER.info(f"Found only {len(filtered_chunks)} matches for a max_result of {max_results}. Reducing threshold from {similarity_threshold}.")
-                return self.get_final_embedding_chunks(embedding_chunks, max_results, similarity_threshold * 0.75)
-            # Sort by similarity
-            filtered_chunks.sort(key=lambda x: x['similarity'], reverse=True)
-            # Return top N results
-            return filtered_chunks[:max_results]
+        scores = np.fromiter((chunk['similarity'] for chunk in embedding_chunks), dtype=np.float64, count=len(embedding_chunks))
+        threshold = self.get_relaxed_threshold(scores, max_results, similarity_threshold)
+        return [embedding_chunks[idx] for idx in select_top_k(scores, max_results, threshold)]
+
+    def get_relaxed_threshold(self, scores: np.ndarray, max_results: int, similarity_threshold: float) -> float:
+        """
+        If fewer than max_results chunks pass the threshold, reduce it by 25% at a time
+        until enough do or it reaches MIN_SIMILARITY_THRESHOLD.
+        """
+        threshold = relax_similarity_threshold(scores, max_results, similarity_threshold, MIN_SIMILARITY_THRESHOLD)
+        if threshold != similarity_threshold:
+            LOGGER.info(f"Not enough matches for a max_result of {max_results}. Reduced threshold from {similarity_threshold} to {threshold}.")
+        return threshold
     
     def retrieve_top_embeddings(
         self,
         prompt_embedding: List[float],
         data_cluster: DataCluster,
         similarity_threshold: float,
-        max_results: int
+        max_results: int,
+        n_probes: Optional[int] = None
     ) -> List[ChunkedEmbedding]:
         """
         Compute cosine similarity between the prompt_embedding and each embedding in data_cluster.
         Return top embeddings that exceed the similarity threshold, up to max_results.
-        """
-        # Step 1: Compute similarity between prompt and each embedding in data_cluster
-        embedding_similarity_chunk: List[ChunkedEmbedding] = self.get_similarity_chunks_from_data_cluster(data_cluster, prompt_embedding)
-
-        LOGGER.info(f"Embedding similarity chunk:  ({len(embedding_similarity_chunk)})  {[{emb['embedding_chunk'].text_content, emb['similarity']} for emb in embedding_similarity_chunk]}")
 
-        actual_max_results = min(max_results, len(embedding_similarity_chunk))
+        Clusters with a vector index are searched on disk, approximately (IVF-flat) if n_probes is
+        set, and only the selected chunks are looked up in the cluster. The index is normally
+        synced by the ensure_embeddings node; here the sync is a no-op unless the cluster changed.
+        Other clusters are scored in memory.
 
-        if not embedding_similarity_chunk:
-            LOGGER.info(f"No embeddings found in data cluster. max_results: {max_results} - actual_max_results: {actual_max_results}")
+        Blocking: called from an executor.
+        """
+        vector_index = self.sync_vector_index(data_cluster, build_ann=bool(n_probes))
+        if vector_index is not None:
+            try:
+                locations, scores = vector_index.search(prompt_embedding, n_probes=n_probes)
+                LOGGER.info(f"Scored {len(locations)} embedding chunks against the prompt")
+                final_chunks = self.select_top_entries(
+                    lambda position: self.resolve_entry(data_cluster, locations[position]),
+                    scores, max_results, similarity_threshold
+                )
+                LOGGER.info(f"Final chunks: ({len(final_chunks)}) {[{emb['embedding_chunk'].text_content, emb['similarity']} for emb in final_chunks]}")
+                return final_chunks
+            except OSError as e:
+                LOGGER.warning(f"Vector index search failed for data cluster {data_cluster.id}, scoring in memory: {e}")
+        elif n_probes:
+            LOGGER.info("Approximate search requires a stored data cluster, using exact search.")
+
+        # Score every chunk in the data cluster against the prompt
+        entries = self.collect_embedding_entries(data_cluster)
+        if not entries:
+            LOGGER.info(f"No embeddings found in data cluster. max_results: {max_results}")
             return []
-        
-        if len(embedding_similarity_chunk) <= max_results:
-            return embedding_similarity_chunk
-        
-        final_chunks: List[ChunkedEmbedding] = self.get_final_embedding_chunks(embedding_similarity_chunk, max_results, similarity_threshold)
-
+        engine = SimilarityEngine.from_vectors([chunk.vector for _, _, chunk in entries])
+        scores = engine.score(prompt_embedding)
+        LOGGER.info(f"Scored {len(entries)} embedding chunks against the prompt")
+        final_chunks = self.select_top_entries(entries.__getitem__, scores, max_results, similarity_threshold)
         LOGGER.info(f"Final chunks: ({len(final_chunks)}) {[{emb['embedding_chunk'].text_content, emb['similarity']} for emb in final_chunks]}")
-
         return final_chunks
 
     def prepare_result_references(
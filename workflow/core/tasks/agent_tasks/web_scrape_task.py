@@ -1,6 +1,7 @@
 from typing import List, Tuple, Optional, Dict, Any
 from pydantic import Field, BaseModel
-import json
+import json, asyncio
+from bs4 import BeautifulSoup
 from workflow.core.tasks.task import AliceTask
 from workflow.core.agent import AliceAgent
 from workflow.core.data_structures import (
@@ -9,10 +10,11 @@ from workflow.core.data_structures import (
 )
 from workflow.core.api import APIManager
 from workflow.util.web_scrape_utils import (
-    clean_text, fetch_webpage_and_title, preprocess_html, sample_html,
+    clean_text, fetch_webpage_and_title_async, prepare_html, sample_html,
     extract_json, fallback_parsing_strategy, apply_parsing_strategy
 )
 from workflow.util import LOGGER, get_traceback
+from workflow.util.selector_cache import get_selector_cache, structural_fingerprint
 
 class SelectorModel(BaseModel):
     selectors: List[str]
@@ -37,7 +39,8 @@ class WebScrapeBeautifulSoupTask(AliceTask):
             * FAILURE (1): Fetch failed, retry
 
     2. generate_selectors_and_parse:
-        - Uses LLM to generate optimal CSS selectors
+        - Reuses cached selectors for pages with the same domain and layout
+        - Otherwise uses LLM to generate optimal CSS selectors
         - Applies selectors to extract main content
         - Falls back to default selectors if needed
         - Exit codes:
@@ -152,7 +155,7 @@ class WebScrapeBeautifulSoupTask(AliceTask):
     async def execute_fetch_url(self, execution_history: List[NodeResponse], node_responses: List[NodeResponse], **kwargs) -> NodeResponse:
         url: str = kwargs.get('url', "")
         try:
-            html_content, title = fetch_webpage_and_title(url)
+            html_content, title = await fetch_webpage_and_title_async(url)
             return NodeResponse(
                 parent_task_id=self.id,
                 node_name="fetch_url",
@@ -200,43 +203,44 @@ class WebScrapeBeautifulSoupTask(AliceTask):
         entity_reference = fetch_url_reference.entity_references[-1]
         html_content = entity_reference.content
         LOGGER.debug(f"HTML content length: {len(html_content)} characters.")
-        cleaned_html = preprocess_html(html_content)
+        # Parse once, off the event loop; the cleaned tree is reused by every parsing strategy
+        loop = asyncio.get_running_loop()
+        soup, cleaned_html = await loop.run_in_executor(None, prepare_html, html_content)
         LOGGER.debug(f"Cleaned HTML length: {len(cleaned_html)} characters.")
-        html_samples = sample_html(cleaned_html)
         
         try:
+            # Pages sharing a site's template reuse its selectors instead of asking the LLM again
+            selector_cache = get_selector_cache()
+            fingerprint, page_text_length = await loop.run_in_executor(None, self._page_profile, soup)
+            selectors = selector_cache.get(entity_reference.url, fingerprint)
+            if selectors:
+                content = await loop.run_in_executor(None, apply_parsing_strategy, soup, selectors)
+                final_content = clean_text(content) if content else None
+                if await loop.run_in_executor(None, selector_cache.validate, entity_reference.url, fingerprint, final_content, page_text_length):
+                    LOGGER.debug(f"Content extracted using cached selectors: {len(final_content)} characters. Selector cache: {selector_cache.stats}")
+                    return self._parsed_response(execution_history, entity_reference, final_content, selectors, {"origin": "selector_cache"}, cleaned_html)
+                LOGGER.debug(f"Cached selectors extracted too little content from {entity_reference.url}, regenerating.")
+
+            html_samples = sample_html(cleaned_html)
             selectors, creation_metadata = await self._generate_parsing_instructions(html_samples, api_manager)
             if selectors:
-                content = apply_parsing_strategy(cleaned_html, selectors)
+                content = await loop.run_in_executor(None, apply_parsing_strategy, soup, selectors)
                 LOGGER.debug(f"Content extracted using selectors: {len(content)} characters.")
                 if content:
                     final_content = clean_text(content)
                     LOGGER.debug(f"Final content length: {len(final_content)} characters.")
-                    final_reference = entity_reference.model_copy(update={"content": final_content, "metadata": {"selectors": selectors, "creation_metadata": creation_metadata, "original_content": cleaned_html}})
-                    return NodeResponse(
-                        parent_task_id=self.id,
-                        node_name="generate_selectors_and_parse",
-                        exit_code=0,
-                        references=References(entity_references=[final_reference]),
-                        execution_order=len(execution_history)
-                    )
+                    if selector_cache.is_sufficient(final_content, page_text_length):
+                        await loop.run_in_executor(None, selector_cache.put, entity_reference.url, fingerprint, selectors)
+                    return self._parsed_response(execution_history, entity_reference, final_content, selectors, creation_metadata, cleaned_html)
             
             # Fallback to default method
             LOGGER.debug('Falling back to default parsing strategy.')
             selectors = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']
-            content = fallback_parsing_strategy(cleaned_html, selectors)
+            content = await loop.run_in_executor(None, fallback_parsing_strategy, soup, selectors)
             LOGGER.debug(f"Content extracted using fallback selectors: {len(content)} characters.")
             final_content = clean_text(content)
             LOGGER.debug(f"Final content length: {len(final_content)} characters.")
-            final_reference = entity_reference.model_copy(update={"content": final_content, "metadata": {"selectors": selectors, "original_content": cleaned_html, "creation_metadata": {"origin": "fallback_parsing"}}})
-
-            return NodeResponse(
-                parent_task_id=self.id,
-                node_name="generate_selectors_and_parse",
-                exit_code=0,
-                references=References(entity_references=[final_reference]),
-                execution_order=len(execution_history)
-            )
+            return self._parsed_response(execution_history, entity_reference, final_content, selectors, {"origin": "fallback_parsing"}, cleaned_html)
         except Exception as e:
             LOGGER.error(f"Error in generate_selectors_and_parse: {e}")
             return NodeResponse(
@@ -251,6 +255,21 @@ class WebScrapeBeautifulSoupTask(AliceTask):
                 execution_order=len(execution_history)
             )
     
+    @staticmethod
+    def _page_profile(soup: BeautifulSoup) -> Tuple[str, int]:
+        """Structural fingerprint of the cleaned page and the length of its text, for the selector cache."""
+        return structural_fingerprint(soup), len(soup.get_text(" ", strip=True))
+
+    def _parsed_response(self, execution_history: List[NodeResponse], entity_reference: EntityReference, content: str, selectors: List[str], creation_metadata: Optional[Dict[str, Any]], cleaned_html: str) -> NodeResponse:
+        final_reference = entity_reference.model_copy(update={"content": content, "metadata": {"selectors": selectors, "creation_metadata": creation_metadata, "original_content": cleaned_html}})
+        return NodeResponse(
+            parent_task_id=self.id,
+            node_name="generate_selectors_and_parse",
+            exit_code=0,
+            references=References(entity_references=[final_reference]),
+            execution_order=len(execution_history)
+        )
+
     async def _generate_parsing_instructions(self, html_samples: List[str], api_manager: APIManager) -> Tuple[Optional[List[str]], Optional[Dict[str, Any]]]:
         """
         Use an LLM agent to generate CSS selectors in JSON format.
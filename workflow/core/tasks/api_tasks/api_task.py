@@ -2,7 +2,7 @@ from typing import List, Type, Dict
 from pydantic import Field, model_validator
 from workflow.core.api import APIEngine
 from workflow.core.api import APIManager
-from workflow.core.api.engines import ApiEngineMap
+from workflow.core.api.engines import get_engine_class
 from workflow.core.data_structures import ApiType, ApiName
 from workflow.core.data_structures import NodeResponse, References, TasksEndCodeRouting
 from workflow.core.tasks.task import AliceTask
@@ -123,13 +123,11 @@ class APITask(AliceTask):
         if api_type not in ApiType.__members__.values() or api_type == ApiType.LLM_MODEL:
             raise ValueError(f"{api_type} is not a valid API type for APITask")
 
-        # Get the correct API engine class
-        api_engines_dict: Dict[ApiName, APIEngine] = ApiEngineMap.get(api_type)
-        if api_engines_dict is None:
+        # Get the API engine class of the first ApiName registered for this type
+        api_engine_class = get_engine_class(api_type)
+        if api_engine_class is None:
             raise ValueError(f"No API engine class found for {api_type}")
 
-        # Retrieve the first ApiName from the API engine map
-        api_engine_class = next(iter(api_engines_dict.values()))
         # Instantiate the API engine to access its input_variables
         api_engine_instance = api_engine_class()
 
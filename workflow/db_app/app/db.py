@@ -1,13 +1,15 @@
-import requests, aiohttp, asyncio, json
+import aiohttp, asyncio, json, hashlib
 from aiohttp import ClientError
 from bson import ObjectId
-from typing import Dict, Any, Optional, Literal, Union
-from pydantic import BaseModel, Field, ConfigDict
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Literal, Union, AsyncIterator
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
 from workflow.core.tasks import available_task_types
 from workflow.core import AliceChat, AliceTask, API, MessageDict, FileReference, FileContentReference, ChatThread
-from workflow.util.const import BACKEND_PORT, DOCKER_HOST, WORKFLOW_SERVICE_KEY
+from workflow.util.const import BACKEND_PORT, DOCKER_HOST, WORKFLOW_SERVICE_KEY, TOKEN_CACHE_TTL, TOKEN_CACHE_MAX_SIZE
 from workflow.core.data_structures import EntityType
-from workflow.util import LOGGER
+from workflow.util import LOGGER, AsyncTTLCache
+from workflow.util.http_session import create_client_session
 
 class BackendAPI(BaseModel):
     """
@@ -23,6 +25,9 @@ class BackendAPI(BaseModel):
         available_task_types (list[AliceTask]): List of available task types.
         collection_map (Dict[EntityType, str]): Mapping of entity types to collection names.
 
+    Requests share one long-lived aiohttp session (keep-alive TCPConnector with DNS caching and
+    a default per-request timeout), opened lazily and closed with `close_session` on shutdown.
+
     Methods:
         get_prompts(prompt_id: Optional[str] = None) -> Dict[str, Prompt]: Retrieves prompts.
         get_users(user_id: Optional[str] = None) -> Dict[str, User]: Retrieves users.
@@ -34,7 +39,7 @@ class BackendAPI(BaseModel):
         get_chat(chat_id: str) -> AliceChat: Retrieves chat.
         store_chat_message(chat_id: str, message: MessageDict) -> AliceChat: Stores a chat message.
         store_task_response(task_response: TaskResponse) -> TaskResponse: Stores a task response.
-        validate_token(token: str) -> dict: Validates an authentication token.
+        validate_token(token: str) -> dict: Validates an authentication token (async, cached).
         create_entity_in_db(entity_type: EntityType, entity_data: dict) -> str: Creates an entity in the database.
         check_existing_data(max_retries=3, retry_delay=1) -> bool: Checks for existing data in the database.
 
@@ -70,6 +75,9 @@ class BackendAPI(BaseModel):
         "api_configs": "apiconfigs"
     }, description="Map of entity types to collection names")
     model_config = ConfigDict(protected_namespaces=(), json_encoders = {ObjectId: str}, arbitrary_types_allowed=True)
+    _session: Optional[aiohttp.ClientSession] = PrivateAttr(default=None)
+    _session_loop: Optional[asyncio.AbstractEventLoop] = PrivateAttr(default=None)
+    _token_cache: AsyncTTLCache[dict] = PrivateAttr(default_factory=lambda: AsyncTTLCache(ttl=TOKEN_CACHE_TTL, max_size=TOKEN_CACHE_MAX_SIZE))
     
     def model_dump(self, *args, **kwargs):
         # Ensure we exclude model_config from serialization
@@ -85,6 +93,28 @@ class BackendAPI(BaseModel):
         return {task.__name__: task for task in self.available_task_types}
 
 
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the shared client session, creating it on first use. Sessions are bound to their event loop,
+        so a new one is created if this is called from a different loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = create_client_session()
+            self._session_loop = loop
+        return self._session
+
+    @asynccontextmanager
+    async def http_session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Drop-in for `aiohttp.ClientSession()` blocks that borrows the shared session instead of closing it."""
+        yield self.get_session()
+
+    async def close_session(self) -> None:
+        """Close the shared client session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session, self._session_loop = None, None
+
     def _get_headers(self):
         return {
             "Content-Type": "application/json",
@@ -117,7 +147,7 @@ class BackendAPI(BaseModel):
         url = f"{self.base_url}/tasks/{task_id}/populated"
         headers = self._get_headers()
         
-        async with aiohttp.ClientSession() as session:
+        async with self.http_session() as session:
             try:
                 async with session.get(url, headers=headers) as response:
                     if response is None:
@@ -135,7 +165,7 @@ class BackendAPI(BaseModel):
         url = f"{self.base_url}/workflow/api_request"
         headers = self._get_headers_workflow()
         
-        async with aiohttp.ClientSession() as session:
+        async with self.http_session() as session:
             try:
                 async with session.get(url, headers=headers) as response:
                     response.raise_for_status()
@@ -153,7 +183,7 @@ class BackendAPI(BaseModel):
         headers = self._get_headers()
         data = {"health_status": health_status}
 
-        async with aiohttp.ClientSession() as session:
+        async with self.http_session() as session:
             try:
                 async with session.patch(url, json=data, headers=headers) as response:
                     response.raise_for_status()
@@ -185,7 +215,7 @@ class BackendAPI(BaseModel):
         url = f"{self.base_url}/workflow/chat_without_threads/{chat_id}"
         headers = self._get_headers_workflow()
         
-        async with aiohttp.ClientSession() as session:
+        async with self.http_session() as session:
             try:
                 async with session.get(url, headers=headers) as response:
                     response.raise_for_status()
@@ -202,7 +232,7 @@ class BackendAPI(BaseModel):
         url = f"{self.base_url}/chatthreads/{thread_id}/populated"
         headers = self._get_headers()
         
-        async with aiohttp.ClientSession() as session:
+        async with self.http_session() as session:
             try:
                 async with session.get(url, headers=headers) as response:
                     response.raise_for_status()
@@ -218,7 +248,7 @@ class BackendAPI(BaseModel):
         headers = self._get_headers()
         data = {"message": message.model_dump(by_alias=True), "threadId": thread_id}
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self.http_session() as session:
                 async with session.patch(url, json=data, headers=headers) as response:
                     response.raise_for_status()
                     return True
@@ -226,17 +256,30 @@ class BackendAPI(BaseModel):
             LOGGER.error(f"Error storing messages: {e}")
             return None
         
-    def validate_token(self, token: str) -> dict:
+    async def validate_token(self, token: str) -> dict:
+        """
+        Validates a user token against the backend without blocking the event loop.
+        Valid results are cached by token hash for TOKEN_CACHE_TTL seconds, and concurrent
+        checks of the same token share a single backend request.
+        """
+        key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        return await self._token_cache.get_or_load(
+            key,
+            lambda: self._request_token_validation(token),
+            should_cache=lambda validation: bool(validation.get("valid"))
+        )
+
+    async def _request_token_validation(self, token: str) -> dict:
         url = f"{self.base_url}/users/validate"
         headers = {"Authorization": f"Bearer {token}"}
         LOGGER.debug(f"Attempting to validate token at URL: {url}")
-        LOGGER.debug(f"Headers: {headers}")
         try:
-            response = requests.get(url, headers=headers)
-            LOGGER.debug(f"Token validation response: {response}")
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            async with self.http_session() as session:
+                async with session.get(url, headers=headers) as response:
+                    LOGGER.debug(f"Token validation response: {response.status}")
+                    response.raise_for_status()
+                    return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             LOGGER.error(f"Error validating token: {e}")
             return {"valid": False, "message": str(e)}
         
@@ -245,7 +288,7 @@ class BackendAPI(BaseModel):
         url = f"{self.base_url}/{collection_name}/{entity_id}/populated"
         headers = self._get_headers()
         
-        async with aiohttp.ClientSession() as session:
+        async with self.http_session() as session:
             try:
                 async with session.get(url, headers=headers) as response:
                     response.raise_for_status()
@@ -260,7 +303,7 @@ class BackendAPI(BaseModel):
         url = f"{self.base_url}/{collection_name}"
         headers = self._get_headers()
 
-        async with aiohttp.ClientSession() as session:
+        async with self.http_session() as session:
             try:
                 async with session.post(url, json=entity_data, headers=headers) as response:
                     if response.status == 400:
@@ -285,7 +328,7 @@ class BackendAPI(BaseModel):
         url = f"{self.base_url}/{collection_name}/{entity_id}"
         headers = self._get_headers()
         
-        async with aiohttp.ClientSession() as session:
+        async with self.http_session() as session:
             try:
                 async with session.patch(url, json=entity_data, headers=headers) as response:
                     if response.status == 400:
@@ -312,7 +355,7 @@ class BackendAPI(BaseModel):
                         continue
                     url = f"{self.base_url}/{collection}"
                     headers = self._get_headers()
-                    async with aiohttp.ClientSession() as session:
+                    async with self.http_session() as session:
                         async with session.get(url, headers=headers, timeout=30) as response:
                             if response.status == 200:
                                 data = await response.json()
@@ -331,7 +374,7 @@ class BackendAPI(BaseModel):
         url = f"{self.base_url}/files/{file_reference_id}"
         headers = self._get_headers()
         
-        async with aiohttp.ClientSession() as session:
+        async with self.http_session() as session:
             try:
                 async with session.get(url, headers=headers) as response:
                     response.raise_for_status()
@@ -349,7 +392,7 @@ class BackendAPI(BaseModel):
         data = file_reference.model_dump(by_alias=True)
         LOGGER.info(f"Updating file reference: {json.dumps(data, indent=2)}")
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self.http_session() as session:
                 async with session.patch(url, json=data, headers=headers) as response:
                     file = response.raise_for_status()
                     file = await self.preprocess_data(file)
@@ -359,20 +402,20 @@ class BackendAPI(BaseModel):
             return None
 
 def token_validation_middleware(api: BackendAPI):
-    def middleware(request) -> dict[str, Any]:
+    async def middleware(request) -> dict[str, Any]:
         token = request.headers.get("Authorization")
         if not token:
             return {"valid": False, "message": "Access denied. No token provided."}
 
         token = token.split(" ")[1]
-        validation_response = api.validate_token(token)
+        validation_response = await api.validate_token(token)
         if not validation_response.get("valid"):
             return {
                 "valid": False, 
                 "message": validation_response.get("message", "Invalid token"), 
                 "user": validation_response.get("user", None)
                 }
-        LOGGER.error('validation_response', validation_response)
+        LOGGER.debug(f"Token validation response: {validation_response}")
         request.state.user_id = validation_response["user"]["_id"]
         return {
             "valid": True, 
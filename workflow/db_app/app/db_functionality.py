@@ -82,7 +82,7 @@ class BackendFunctionalityAPI(BackendAPI):
                 url = f"{self.base_url}/{self.collection_map[entity_type]}"
                 headers = self._get_headers()
                 
-                async with aiohttp.ClientSession() as session:
+                async with self.http_session() as session:
                     async with session.get(url, headers=headers) as response:
                         response.raise_for_status()
                         db_entities = await response.json()
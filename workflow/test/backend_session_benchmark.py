@@ -0,0 +1,71 @@
+import sys, time, asyncio, argparse
+import numpy as np
+from aiohttp import web, ClientSession
+from pathlib import Path
+
+current_dir = Path(__file__).parent.absolute()
+parent_dir = current_dir.parent
+if parent_dir not in sys.path:
+    sys.path.insert(0, str(parent_dir))
+from workflow.util import LOGGER
+from workflow.util.http_session import create_client_session
+
+PAYLOAD = {"message": "Success", "chat": {"_id": "0" * 24, "name": "Benchmark chat", "messages": []}}
+
+async def start_backend(port: int) -> web.AppRunner:
+    """Stand-in for the Node backend: a JSON endpoint shaped like the chat/task routes."""
+    async def handler(request: web.Request) -> web.Response:
+        return web.json_response(PAYLOAD)
+    app = web.Application()
+    app.router.add_get("/api/{tail:.*}", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+async def request_new_session(url: str) -> None:
+    # The previous BackendAPI pattern: a session (and TCP connection) per call
+    async with ClientSession() as session:
+        async with session.get(url) as response:
+            await response.json()
+
+async def request_shared_session(session: ClientSession, url: str) -> None:
+    async with session.get(url) as response:
+        await response.json()
+
+async def timed(calls: int, concurrency: int, make_call) -> np.ndarray:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await make_call(i)
+            latencies.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    wall = time.perf_counter() - start
+    return np.array(latencies) * 1000, wall
+
+async def run_benchmark(calls: int, concurrency: int, port: int):
+    runner = await start_backend(port)
+    url = f"http://127.0.0.1:{port}/api/workflow/chat_without_threads/benchmark"
+    try:
+        LOGGER.info(f"{'mode':<16}{'calls':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        per_call_ms, wall = await timed(calls, concurrency, lambda i: request_new_session(url))
+        LOGGER.info(f"{'new session':<16}{calls:>8}{calls / wall:>10.0f}{np.percentile(per_call_ms, 50):>10.2f}{np.percentile(per_call_ms, 95):>10.2f}")
+        session = create_client_session()
+        try:
+            shared_ms, wall = await timed(calls, concurrency, lambda i: request_shared_session(session, url))
+        finally:
+            await session.close()
+        LOGGER.info(f"{'shared session':<16}{calls:>8}{calls / wall:>10.0f}{np.percentile(shared_ms, 50):>10.2f}{np.percentile(shared_ms, 95):>10.2f}")
+    finally:
+        await runner.cleanup()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-request overhead of a session per call vs the shared BackendAPI session")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.calls, args.concurrency, args.port))
@@ -0,0 +1,57 @@
+import sys, json, argparse, subprocess
+import numpy as np
+from pathlib import Path
+
+current_dir = Path(__file__).parent.absolute()
+parent_dir = current_dir.parent
+if parent_dir not in sys.path:
+    sys.path.insert(0, str(parent_dir))
+from workflow.util import LOGGER
+
+DEFAULT_MODULES = ["workflow.util", "workflow.worker", "workflow.core.api", "workflow.core", "workflow.api_app"]
+# Dependencies that only specific engines need; none of them should load on a cold start
+HEAVY_PACKAGES = ["torch", "transformers", "diffusers", "scipy", "praw", "wikipedia", "google.generativeai", "cohere", "googleapiclient"]
+
+PROBE = """
+import sys, json, time
+start = time.perf_counter()
+error = None
+try:
+    import {module}
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{str(e).splitlines()[0] if str(e) else e}}"
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "error": error, "loaded": [p for p in {heavy!r} if p in sys.modules]}}))
+"""
+
+def measure(module: str, repeats: int) -> dict:
+    """Import `module` in `repeats` fresh interpreters and collect the timings."""
+    runs = []
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_PACKAGES)],
+            cwd=str(parent_dir.parent), capture_output=True, text=True
+        )
+        lines = result.stdout.strip().splitlines()
+        if not lines:
+            return {"seconds": [], "error": result.stderr.strip().splitlines()[-1:] or ["no output"], "loaded": []}
+        runs.append(json.loads(lines[-1]))
+    return {"seconds": [run["seconds"] for run in runs], "error": runs[-1]["error"], "loaded": runs[-1]["loaded"]}
+
+def run_benchmark(modules: list, repeats: int):
+    LOGGER.info(f"Cold import time over {repeats} fresh interpreters ({sys.executable})")
+    LOGGER.info(f"{'module':<26}{'p50 ms':>10}{'max ms':>10}  heavy packages loaded")
+    for module in modules:
+        result = measure(module, repeats)
+        if result["seconds"]:
+            p50, worst = np.percentile(result["seconds"], 50) * 1000, max(result["seconds"]) * 1000
+            LOGGER.info(f"{module:<26}{p50:>10.1f}{worst:>10.1f}  {', '.join(result['loaded']) or '-'}")
+        if result["error"]:
+            LOGGER.warning(f"{module}: import failed: {result['error']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start import time of workflow modules, each in a fresh interpreter")
+    parser.add_argument("--modules", type=str, nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run_benchmark(args.modules, args.repeats)
@@ -0,0 +1,91 @@
+import sys, time, random, string, asyncio, argparse
+from copy import deepcopy
+from pathlib import Path
+
+current_dir = Path(__file__).parent.absolute()
+parent_dir = current_dir.parent
+if parent_dir not in sys.path:
+    sys.path.insert(0, str(parent_dir))
+from workflow.util import LOGGER
+from workflow.util.message_prune.message_prune import MessagePruner
+from workflow.util.message_prune.message_prune_utils import calculate_message_size, replace_content
+
+ROLE_WEIGHTS = {"user": 0.2, "assistant": 0.35, "tool": 0.45}
+
+def build_history(size: int, seed: int = 0) -> list:
+    """A chat of `size` messages: a system prompt, then user/assistant turns with many tool calls and results."""
+    rng = random.Random(seed)
+    text = lambda n: "".join(rng.choices(string.ascii_letters + " ", k=n))
+    history = [{"role": "system", "content": text(800)}]
+    for _ in range(size - 1):
+        role = rng.choices(list(ROLE_WEIGHTS), weights=list(ROLE_WEIGHTS.values()))[0]
+        message = {"role": role, "content": text(rng.randint(50, 3000) if role == "tool" else rng.randint(20, 600))}
+        if role == "assistant" and rng.random() < 0.5:
+            message["tool_calls"] = [{"type": "function", "function": {"name": "search", "arguments": text(rng.randint(20, 300))}}]
+        history.append(message)
+    return history
+
+def legacy_prune(pruner: MessagePruner, messages: list) -> list:
+    """The previous algorithm: full sort, a rescan for every pruned message, sizes recomputed, every message copied."""
+    total_size = sum(calculate_message_size(m) for m in messages)
+    if total_size <= pruner.max_total_size:
+        return messages
+    scored_messages = pruner._score_messages(messages)
+    sorted_with_idx = sorted(
+        [(msg, score, stats, idx) for idx, (msg, score, stats) in enumerate(scored_messages)],
+        key=lambda x: x[1].final_score,
+        reverse=True
+    )
+    pruned_messages = [deepcopy(msg) for msg, _, _ in scored_messages]
+    remaining_to_reduce = total_size - pruner.max_total_size
+    processed_indices = set()
+    while remaining_to_reduce > 0:
+        next_message = next((entry for entry in sorted_with_idx if entry[3] not in processed_indices), None)
+        if next_message is None:
+            break
+        message, _, _, original_idx = next_message
+        processed_indices.add(original_idx)
+        message_size = calculate_message_size(message)
+        target_size = max(len(pruner.replacement_marker), message_size - remaining_to_reduce)
+        pruned_message, new_size = replace_content(message, target_size, pruner.replacement_marker)
+        pruned_messages[original_idx] = pruned_message
+        remaining_to_reduce -= message_size - new_size
+    return pruned_messages
+
+def time_call(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmark(sizes: list, keep_ratio: float, repeats: int, skip_legacy_above: int):
+    LOGGER.setLevel("WARNING")  # The pruner logs every pruned message
+    rows = []
+    for size in sizes:
+        history = build_history(size)
+        total = sum(calculate_message_size(m) for m in history)
+        pruner = MessagePruner(max_total_size=int(total * keep_ratio))
+        current = lambda: asyncio.run(pruner.prune(history))
+        if asyncio.run(pruner.prune(history)) != legacy_prune(pruner, history):
+            raise AssertionError(f"Heap pruner diverged from the previous algorithm on {size} messages")
+        current_s = time_call(current, repeats)
+        legacy_s = time_call(lambda: legacy_prune(pruner, history), repeats) if size <= skip_legacy_above else None
+        rows.append((size, total, legacy_s, current_s))
+    LOGGER.setLevel("INFO")
+    LOGGER.info(f"Pruning to {keep_ratio:.0%} of the history size (best of {repeats})")
+    LOGGER.info(f"{'messages':>10}{'chars':>12}{'previous ms':>14}{'heap ms':>10}{'speedup':>9}")
+    for size, total, legacy_s, current_s in rows:
+        legacy_ms = f"{legacy_s * 1000:.1f}" if legacy_s is not None else "skipped"
+        speedup = f"{legacy_s / current_s:.1f}x" if legacy_s is not None else "-"
+        LOGGER.info(f"{size:>10}{total:>12}{legacy_ms:>14}{current_s * 1000:>10.1f}{speedup:>9}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MessagePruner cost on long chat histories, against the previous sort-and-rescan algorithm")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2500, 5000, 10000])
+    parser.add_argument("--keep-ratio", type=float, default=0.5, help="Target size as a fraction of the history size")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--skip-legacy-above", type=int, default=10000, help="Don't time the previous algorithm on larger histories")
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.keep_ratio, args.repeats, args.skip_legacy_above)
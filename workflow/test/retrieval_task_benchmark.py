@@ -0,0 +1,114 @@
+import sys, time, asyncio, argparse, tempfile
+import numpy as np
+from pathlib import Path
+
+current_dir = Path(__file__).parent.absolute()
+parent_dir = current_dir.parent
+if parent_dir not in sys.path:
+    sys.path.insert(0, str(parent_dir))
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))  # Sibling benchmark for the synthetic vectors
+from workflow.util import LOGGER
+import workflow.util.vector_index.disk_index as disk_index
+from workflow.core.data_structures import DataCluster, MessageDict, EmbeddingChunk
+from workflow.core.tasks.agent_tasks.retrieval_task import RetrievalTask
+from vector_search_benchmark import generate_clustered_vectors
+
+def build_cluster(vectors: np.ndarray, chunks_per_item: int) -> DataCluster:
+    """A stored data cluster of messages whose embedding chunks hold `vectors`, without validating every float."""
+    messages = []
+    for start in range(0, len(vectors), chunks_per_item):
+        chunks = [
+            EmbeddingChunk.model_construct(vector=vectors[row].tolist(), text_content=f"chunk {row}", index=row - start, creation_metadata={})
+            for row in range(start, min(start + chunks_per_item, len(vectors)))
+        ]
+        messages.append(MessageDict.model_construct(content=f"message {start}", embedding=chunks))
+    return DataCluster.model_construct(id="benchmark_cluster", messages=messages)
+
+def previous_query_path(task: RetrievalTask, cluster: DataCluster, query: np.ndarray, n_probes: int = None):
+    """What every query used to do before scoring: collect and hash every chunk, then diff the index."""
+    entries = task.collect_embedding_entries(cluster)
+    entry_map = {task.get_entry_key(entry): entry for entry in entries}
+    vector_index = task.get_vector_index(cluster)
+    vector_index.sync(entry_map.keys(), lambda key: entry_map[key][2].vector)
+    return vector_index.score(query, n_probes=n_probes)
+
+def latencies_ms(fn, queries: np.ndarray) -> np.ndarray:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+async def max_loop_lag_ms(run_queries, tick: float = 0.001) -> float:
+    """Largest delay of a 1 ms ticker on the event loop while `run_queries` runs."""
+    loop = asyncio.get_running_loop()
+    lag, done = 0.0, False
+
+    async def ticker():
+        nonlocal lag
+        while not done:
+            start = loop.time()
+            await asyncio.sleep(tick)
+            lag = max(lag, loop.time() - start - tick)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(tick * 5)
+    await run_queries()
+    done = True
+    await ticker_task
+    return lag * 1000
+
+def run_benchmark(n_chunks: int, dimension: int, chunks_per_item: int, n_queries: int, k: int, n_probes: int):
+    LOGGER.setLevel("WARNING")  # The task logs every query's results
+    vectors = generate_clustered_vectors(n_chunks, dimension, n_topics=max(10, n_chunks // 500)).astype(np.float64)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(0, n_chunks, size=n_queries)] + 0.3 * rng.normal(size=(n_queries, dimension))
+    cluster = build_cluster(vectors, chunks_per_item)
+    task = RetrievalTask.model_construct(data_cluster=cluster)
+
+    with tempfile.TemporaryDirectory() as directory:
+        disk_index.VECTOR_INDEX_ROOT = directory
+        start = time.perf_counter()
+        task.sync_vector_index(cluster, build_ann=True)
+        update_s = time.perf_counter() - start
+
+        rows = [
+            ("exact, per-query sync (previous)", latencies_ms(lambda q: previous_query_path(task, cluster, q), queries)),
+            ("exact, task path", latencies_ms(lambda q: task.retrieve_top_embeddings(q.tolist(), cluster, 0.6, k), queries)),
+            (f"ivf/{n_probes}, per-query sync (previous)", latencies_ms(lambda q: previous_query_path(task, cluster, q, n_probes), queries)),
+            (f"ivf/{n_probes}, task path", latencies_ms(lambda q: task.retrieve_top_embeddings(q.tolist(), cluster, 0.6, k, n_probes), queries)),
+        ]
+
+        async def inline_queries():
+            for query in queries:
+                previous_query_path(task, cluster, query, n_probes)
+
+        async def executor_queries():
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(
+                loop.run_in_executor(None, task.retrieve_top_embeddings, query.tolist(), cluster, 0.6, k, n_probes) for query in queries
+            ))
+
+        inline_lag = asyncio.run(max_loop_lag_ms(inline_queries))
+        executor_lag = asyncio.run(max_loop_lag_ms(executor_queries))
+
+    LOGGER.setLevel("INFO")
+    LOGGER.info(f"RetrievalTask over {n_chunks} chunks of dimension {dimension} ({n_chunks // chunks_per_item} items), top {k}")
+    LOGGER.info(f"Index update on cluster change (sync + IVF training): {update_s:.2f}s")
+    LOGGER.info(f"{'query path':<36}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, ms in rows:
+        LOGGER.info(f"{name:<36}{np.percentile(ms, 50):>10.2f}{np.percentile(ms, 95):>10.2f}")
+    LOGGER.info(f"Max event loop stall over {n_queries} ANN queries: {inline_lag:.1f} ms inline (previous), {executor_lag:.1f} ms via executor")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-query latency and event loop stalls of RetrievalTask retrieval on a stored cluster")
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--chunks-per-item", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--probes", type=int, default=8)
+    args = parser.parse_args()
+    run_benchmark(args.chunks, args.dimension, args.chunks_per_item, args.queries, args.k, args.probes)
@@ -0,0 +1,134 @@
+import sys, os, time, asyncio, hashlib, argparse
+import numpy as np
+from pathlib import Path
+
+current_dir = Path(__file__).parent.absolute()
+parent_dir = current_dir.parent
+if parent_dir not in sys.path:
+    sys.path.insert(0, str(parent_dir))
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))  # Sibling benchmark for the synthetic corpus
+from workflow.util import LOGGER, est_token_count
+from workflow.util.text_splitters import SemanticTextSplitter
+from text_splitter_benchmark import build_corpus
+
+class OpenAIEmbedder:
+    """Real embeddings from an OpenAI-compatible endpoint, counting embedded tokens."""
+    def __init__(self, model: str, batch_size: int = 512):
+        from openai import AsyncOpenAI
+        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=os.getenv("OPENAI_BASE_URL"))
+        self.model = model
+        self.batch_size = batch_size
+        self.tokens = 0
+
+    async def generate_embedding(self, inputs, api_data=None):
+        vectors = []
+        for start in range(0, len(inputs), self.batch_size):
+            response = await self.client.embeddings.create(input=inputs[start:start + self.batch_size], model=self.model)
+            vectors.extend(data.embedding for data in response.data)
+            self.tokens += response.usage.prompt_tokens
+        return vectors
+
+class HashingEmbedder:
+    """
+    Offline stand-in: hashed word unigrams and bigrams, L2-normalized. Nearly additive, so it
+    flatters pooling; use it to exercise the harness, and real embeddings to judge quality.
+    """
+    def __init__(self, dimensions: int = 1024):
+        self.dimensions = dimensions
+        self.tokens = 0
+
+    def embed(self, text: str) -> list:
+        vector = np.zeros(self.dimensions)
+        words = text.lower().split()
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            vector[int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=4).digest(), "little") % self.dimensions] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    async def generate_embedding(self, inputs, api_data=None):
+        self.tokens += sum(est_token_count(text) for text in inputs)
+        return [self.embed(text) for text in inputs]
+
+def normalized(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float64)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+async def compare(text: str, splitter: SemanticTextSplitter, embedder, queries_per_chunk: int, seed: int) -> dict:
+    """Pooled chunk vectors against re-embedding the chunks: agreement, retrieval quality and embedding cost."""
+    start_tokens = embedder.tokens
+    started = time.perf_counter()
+    chunks, pooled = await splitter.split_text_with_embeddings(text, embedder, None)
+    pooled_seconds = time.perf_counter() - started
+    window_tokens = embedder.tokens - start_tokens
+    if pooled is None:
+        raise ValueError("Text too short to be split semantically; use a longer document or a smaller --chunk-size")
+
+    started = time.perf_counter()
+    true_vectors = await embedder.generate_embedding(chunks)
+    reembed_seconds = time.perf_counter() - started
+    pooled_matrix, true_matrix = normalized(pooled), normalized(true_vectors)
+    agreement = np.einsum("ij,ij->i", pooled_matrix, true_matrix)
+
+    # Queries: sentences taken from each chunk; the chunk they came from is the right answer
+    rng = np.random.default_rng(seed)
+    queries, answers = [], []
+    for idx, chunk in enumerate(chunks):
+        sentences = [s.strip() for s in chunk.replace("\n", " ").split(". ") if len(s.split()) >= 4]
+        for sentence in rng.choice(sentences, size=min(queries_per_chunk, len(sentences)), replace=False) if sentences else []:
+            queries.append(sentence)
+            answers.append(idx)
+    query_matrix = normalized(await embedder.generate_embedding(queries))
+    true_ranking = np.argmax(query_matrix @ true_matrix.T, axis=1)
+    pooled_ranking = np.argmax(query_matrix @ pooled_matrix.T, axis=1)
+    answers = np.asarray(answers)
+    return {
+        "chunks": len(chunks),
+        "agreement_mean": float(agreement.mean()),
+        "agreement_p10": float(np.percentile(agreement, 10)),
+        "agreement_min": float(agreement.min()),
+        "queries": len(queries),
+        "recall_true": float((true_ranking == answers).mean()) if len(queries) else 0.0,
+        "recall_pooled": float((pooled_ranking == answers).mean()) if len(queries) else 0.0,
+        "top1_overlap": float((true_ranking == pooled_ranking).mean()) if len(queries) else 0.0,
+        "window_tokens": window_tokens,
+        "reembed_tokens": sum(est_token_count(chunk) for chunk in chunks),
+        "pooled_seconds": pooled_seconds,
+        "reembed_seconds": reembed_seconds,
+    }
+
+def run_benchmark(documents: dict, embedder, chunk_size: int, chunk_overlap: int, queries_per_chunk: int):
+    LOGGER.setLevel("WARNING")  # The splitter logs every step
+    splitter = SemanticTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    rows = [(name, asyncio.run(compare(text, splitter, embedder, queries_per_chunk, seed=0))) for name, text in documents.items()]
+    LOGGER.setLevel("INFO")
+    LOGGER.info(f"Pooled window vectors vs re-embedded chunks ({type(embedder).__name__}, chunk_size {chunk_size}, overlap {chunk_overlap})")
+    LOGGER.info(f"{'document':<24}{'chunks':>7}{'cos mean':>10}{'cos p10':>9}{'cos min':>9}{'R@1 true':>10}{'R@1 pool':>10}{'top1 same':>11}{'tokens saved':>14}")
+    for name, r in rows:
+        saved = r["reembed_tokens"] / (r["window_tokens"] + r["reembed_tokens"]) if r["window_tokens"] else 0.0
+        LOGGER.info(f"{name[:23]:<24}{r['chunks']:>7}{r['agreement_mean']:>10.3f}{r['agreement_p10']:>9.3f}{r['agreement_min']:>9.3f}"
+                    f"{r['recall_true']:>10.1%}{r['recall_pooled']:>10.1%}{r['top1_overlap']:>11.1%}{saved:>14.1%}")
+        LOGGER.info(f"{'':<24}re-embedding pass skipped: {r['reembed_tokens']} tokens, {r['reembed_seconds'] * 1000:.0f} ms "
+                    f"(window pass: {r['window_tokens']} tokens, {r['pooled_seconds'] * 1000:.0f} ms)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quality of pooled semantic chunk vectors against true re-embedding of the chunks")
+    parser.add_argument("--files", type=str, nargs="*", default=[], help="Documents to split; defaults to a synthetic corpus")
+    parser.add_argument("--corpus-size", type=int, default=200_000, help="Characters of synthetic corpus when no --files are given")
+    parser.add_argument("--model", type=str, default="text-embedding-3-small", help="Embedding model, used when OPENAI_API_KEY is set")
+    parser.add_argument("--offline", action="store_true", help="Use the hashing embedder even if OPENAI_API_KEY is set")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chunk-overlap", type=int, default=0)
+    parser.add_argument("--queries-per-chunk", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = {Path(path).name: Path(path).read_text(encoding="utf-8", errors="replace") for path in args.files}
+    if not documents:
+        documents = {f"synthetic-{args.corpus_size}": build_corpus(args.corpus_size)}
+    if os.getenv("OPENAI_API_KEY") and not args.offline:
+        embedder = OpenAIEmbedder(args.model)
+    else:
+        LOGGER.warning("No OPENAI_API_KEY (or --offline): using the hashing embedder, which overstates pooling quality")
+        embedder = HashingEmbedder()
+    run_benchmark(documents, embedder, args.chunk_size, args.chunk_overlap, args.queries_per_chunk)
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+
+import workflow.core.agent.agent_features.code_execution as code_execution
+from workflow.core.agent.agent_features.code_execution import CodeExecutionAgent, CodePermission
+from workflow.core.data_structures import MessageDict, CodeBlock, get_run_commands
+from workflow.util import Language
+
+class FakeRunner:
+    """Runs sessions with a per-language delay, recording the order they start in and how many overlap."""
+    DELAYS = {Language.PYTHON: 0.05, Language.JAVASCRIPT: 0.01, Language.SHELL: 0.0}
+
+    def __init__(self, log_level=None):
+        self.started = []
+        self.running = 0
+        self.max_running = 0
+        FakeRunner.instance = self
+
+    async def run_session(self, codes, language, setup_commands=None):
+        self.started.append(language)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.DELAYS.get(language, 0.0))
+            if "fail" in codes[0]:
+                raise RuntimeError("container failed")
+            return [(f"{language.value}: {code}", 0) for code in codes]
+        finally:
+            self.running -= 1
+
+def message(*blocks):
+    return MessageDict(role="assistant", content="\n".join(f"```{lang}\n{code}\n```" for lang, code in blocks))
+
+# Fixtures
+@pytest.fixture(autouse=True)
+def runner(monkeypatch):
+    monkeypatch.setattr(code_execution, "DockerCodeRunner", FakeRunner)
+
+@pytest.fixture
+def agent():
+    return CodeExecutionAgent(has_code_exec=CodePermission.NORMAL)
+
+# Planning Tests
+def test_commands_sharing_setup_form_one_group():
+    commands = [
+        ("a", Language.PYTHON, "pip install x"),
+        ("b", Language.SHELL, None),
+        ("c", Language.PYTHON, "pip install x"),
+        ("d", Language.PYTHON, None),
+        ("e", Language.JAVASCRIPT, "pip install x"),
+    ]
+    assert CodeExecutionAgent.plan_code_executions(commands) == [[0, 2], [1], [3], [4]]
+
+def test_merged_commands_give_one_group_per_language():
+    blocks = [
+        CodeBlock(code="print(1)", language=Language.PYTHON),
+        CodeBlock(code="print(2)", language=Language.PYTHON),
+        CodeBlock(code="console.log(1)", language=Language.JAVASCRIPT),
+    ]
+    groups = CodeExecutionAgent.plan_code_executions(get_run_commands(blocks))
+    assert groups == [[0], [1]]
+
+# Execution Tests
+def test_results_follow_command_order(agent):
+    messages = [message(("python", "print(1)"), ("javascript", "console.log(1)"), ("bash", "echo hi"))]
+    executions, exit_code = asyncio.run(agent.process_code_execution(messages))
+    expected = [language for _, language, _ in get_run_commands(agent.collect_code_blocks(messages))]
+    assert [execution.code_block.language for execution in executions] == expected
+    assert all(execution.code_output.output.startswith(execution.code_block.language.value) for execution in executions)
+    assert exit_code == 0
+    assert FakeRunner.instance.max_running == 3  # The slow python block didn't hold the others back
+
+def test_concurrency_is_capped(agent):
+    agent.max_parallel_executions = 2
+    messages = [message(("python", "print(1)"), ("javascript", "console.log(1)"), ("bash", "echo hi"))]
+    asyncio.run(agent.process_code_execution(messages))
+    assert FakeRunner.instance.max_running == 2
+    assert len(FakeRunner.instance.started) == 3
+
+def test_failed_group_does_not_affect_others(agent):
+    messages = [message(("python", "fail()"), ("javascript", "console.log(1)"))]
+    executions, exit_code = asyncio.run(agent.process_code_execution(messages))
+    outputs = {execution.code_block.language: execution.code_output for execution in executions}
+    assert outputs[Language.PYTHON].exit_code == 1 and "container failed" in outputs[Language.PYTHON].output
+    assert outputs[Language.JAVASCRIPT].exit_code == 0
+    assert exit_code == 1
@@ -0,0 +1,149 @@
+import pytest
+
+from workflow.util.code_utils.container_pool import DockerContainerPool, RESET_COMMAND, RUN_DIR_COMMAND, SKIPPED_AFTER_TIMEOUT
+
+class FakeContainer:
+    """
+    Records exec calls and keeps a toy filesystem: `write <name>` creates a file in the working
+    directory, `ls` lists every file in the container and `sleep` gets killed by the timeout.
+    """
+    def __init__(self, image: str, exit_code: int = 0, output: bytes = b"ok\n"):
+        self.image = image
+        self.exit_code = exit_code
+        self.output = output
+        self.commands = []
+        self.environments = []
+        self.files = set()
+        self.run_dirs = 0
+        self.removed = False
+
+    def exec_run(self, command, workdir=None, environment=None):
+        self.commands.append(command)
+        if command == RUN_DIR_COMMAND:
+            self.run_dirs += 1
+            return 0, f"/tmp/run.{self.run_dirs}\n".encode()
+        if command == RESET_COMMAND:
+            self.files = {path for path in self.files if not path.startswith(("/tmp/", "/dev/shm/"))}
+            return 0, b""
+        self.environments.append(environment)
+        program = command.split(" ", 4)[-1]
+        if program.startswith("write "):
+            self.files.add(f"{workdir}/{program[len('write '):]}")
+        elif program == "ls":
+            return 0, "\n".join(sorted(self.files)).encode()
+        elif program.startswith("sleep "):
+            return 137, b"partial"
+        return self.exit_code, self.output
+
+    def remove(self, force=False):
+        self.removed = True
+
+class FakeContainers:
+    def __init__(self):
+        self.started = []
+        self.exit_code = 0
+
+    def run(self, image, command, **kwargs):
+        container = FakeContainer(image, exit_code=self.exit_code)
+        self.started.append(container)
+        return container
+
+class FakeClient:
+    def __init__(self):
+        self.containers = FakeContainers()
+
+# Fixtures
+@pytest.fixture
+def client():
+    return FakeClient()
+
+@pytest.fixture
+def pool(client):
+    images = {"python": "mypython:latest", "shell": "mybash:latest"}
+    return DockerContainerPool(images, pool_size=2, max_runs=3, client_factory=lambda: client)
+
+# Reuse Tests
+def test_containers_are_reused_and_reset(pool, client):
+    assert pool.execute("python -c 'print(1)'", "python", timeout=5) == ("ok\n", 0)
+    assert pool.execute("python -c 'print(2)'", "python", timeout=5) == ("ok\n", 0)
+    assert len(client.containers.started) == 1
+    container = client.containers.started[0]
+    assert container.commands[:2] == [RUN_DIR_COMMAND, "timeout -s KILL 5 python -c 'print(1)'"]
+    assert container.commands.count(RESET_COMMAND) == 2
+
+# Isolation Tests
+def test_containers_are_unprivileged_and_read_only(pool, client):
+    pool.execute("print(1)", "python", timeout=5)
+    assert pool.container_options["read_only"] and pool.container_options["user"] == "nobody"
+    assert "/tmp" in pool.container_options["tmpfs"]
+
+def test_runs_do_not_see_files_of_earlier_runs(pool, client):
+    pool.execute("write secret.txt", "python", timeout=5)
+    logs, _ = pool.execute("ls", "python", timeout=5)
+    assert len(client.containers.started) == 1
+    assert "secret.txt" not in logs
+
+def test_each_run_has_its_own_home(pool, client):
+    pool.execute("print(1)", "python", timeout=5)
+    pool.execute("print(2)", "python", timeout=5)
+    first, second = client.containers.started[0].environments
+    assert first["HOME"] != second["HOME"]
+    assert first["PYTHONUSERBASE"].startswith(first["HOME"])
+
+def test_session_commands_share_their_run_directory(pool, client):
+    outputs = pool.execute_session(["write data.csv", "ls"], "python", timeout=5)
+    assert outputs[1][0] == "/tmp/run.1/data.csv"
+    assert pool.execute("ls", "python", timeout=5)[0] == ""
+
+def test_containers_without_isolation_are_not_reused(client):
+    pool = DockerContainerPool({"python": "mypython:latest"}, container_options={"mem_limit": "512m"}, client_factory=lambda: client)
+    pool.execute("print(1)", "python", timeout=5)
+    pool.execute("print(2)", "python", timeout=5)
+    assert len(client.containers.started) == 2
+    assert all(container.removed for container in client.containers.started)
+
+def test_languages_have_separate_pools(pool, client):
+    pool.execute("echo hi", "shell", timeout=5)
+    pool.execute("print(1)", "python", timeout=5)
+    assert [c.image for c in client.containers.started] == ["mybash:latest", "mypython:latest"]
+    assert pool.idle_count("shell") == 1 and pool.idle_count("python") == 1
+
+def test_container_recycled_after_max_runs(pool, client):
+    for _ in range(4):
+        pool.execute("print(1)", "python", timeout=5)
+    first, second = client.containers.started
+    assert first.removed and not second.removed
+
+def test_setup_runs_are_not_reused(pool, client):
+    pool.execute("pip install numpy", "python", timeout=5, reusable=False)
+    assert client.containers.started[0].removed
+    assert pool.idle_count("python") == 0
+
+def test_timeout_discards_container(pool, client):
+    client.containers.exit_code = 137
+    with pytest.raises(TimeoutError):
+        pool.execute("sleep 100", "python", timeout=1)
+    assert client.containers.started[0].removed
+    assert pool.idle_count("python") == 0
+
+def test_session_timeout_keeps_earlier_outputs(pool, client):
+    outputs = pool.execute_session(["write data.csv", "sleep 100", "ls"], "python", timeout=1)
+    assert outputs[0] == ("ok\n", 0)
+    assert outputs[1][0].startswith("Timeout") and outputs[1][1] == 1
+    assert outputs[2] == (SKIPPED_AFTER_TIMEOUT, 1)
+    assert len(client.containers.started[0].environments) == 2  # Nothing ran after the timeout
+    assert client.containers.started[0].removed
+
+def test_unsupported_language(pool):
+    with pytest.raises(ValueError):
+        pool.execute("code", "cobol", timeout=5)
+
+# Lifecycle Tests
+def test_warm_up_and_close(pool, client):
+    pool.warm_up()
+    assert pool.idle_count("python") == 2 and pool.idle_count("shell") == 2
+    pool.execute("print(1)", "python", timeout=5)
+    assert len(client.containers.started) == 4
+    pool.close()
+    assert all(container.removed for container in client.containers.started)
+    assert pool.idle_count("python") == 0
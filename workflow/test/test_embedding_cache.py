@@ -0,0 +1,84 @@
+import pytest
+import numpy as np
+
+from workflow.util.embedding_cache import EmbeddingCache, EmbeddingDiskStore
+
+NAMESPACE = "http://localhost|text-embedding-3-small"
+
+# Fixtures
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(directory=str(tmp_path), max_memory_items=100)
+
+@pytest.fixture
+def texts():
+    return ["first chunk", "second chunk", "third chunk"]
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(3, 8)).astype(np.float32).tolist()
+
+# Lookup Tests
+def test_misses_then_memory_hits(cache, texts, vectors):
+    assert cache.get_many(NAMESPACE, texts) == [None, None, None]
+    assert cache.stats.misses == 3
+    cache.put_many(NAMESPACE, texts, vectors)
+    cached = cache.get_many(NAMESPACE, texts)
+    np.testing.assert_allclose(cached, vectors, rtol=1e-6)
+    assert cache.stats.memory_hits == 3
+    assert cache.stats.bytes_saved == sum(len(text.encode("utf-8")) for text in texts)
+
+def test_namespaces_are_separate(cache, texts, vectors):
+    cache.put_many(NAMESPACE, texts, vectors)
+    assert cache.get_many("other-model", texts) == [None, None, None]
+
+def test_partial_hits_keep_order(cache, texts, vectors):
+    cache.put_many(NAMESPACE, texts[1:2], vectors[1:2])
+    cached = cache.get_many(NAMESPACE, texts)
+    assert cached[0] is None and cached[2] is None
+    np.testing.assert_allclose(cached[1], vectors[1], rtol=1e-6)
+
+def test_lru_evicts_oldest(tmp_path, texts, vectors):
+    cache = EmbeddingCache(directory=None, max_memory_items=2)
+    cache.put_many(NAMESPACE, texts, vectors)
+    assert cache.get_many(NAMESPACE, texts[:1]) == [None]
+    assert cache.get_many(NAMESPACE, texts[2:])[0] is not None
+
+# Disk Tier Tests
+def test_disk_tier_shared_between_instances(tmp_path, texts, vectors):
+    EmbeddingCache(directory=str(tmp_path)).put_many(NAMESPACE, texts, vectors)
+    fresh = EmbeddingCache(directory=str(tmp_path))
+    cached = fresh.get_many(NAMESPACE, texts)
+    np.testing.assert_allclose(cached, vectors, rtol=1e-6)
+    assert fresh.stats.disk_hits == 3
+    assert fresh.get_many(NAMESPACE, texts)[0] is not None
+    assert fresh.stats.memory_hits == 3
+
+def test_disk_store_picks_up_other_writers(tmp_path, vectors):
+    reader = EmbeddingDiskStore(str(tmp_path), NAMESPACE)
+    writer = EmbeddingDiskStore(str(tmp_path), NAMESPACE)
+    digest = EmbeddingCache.text_digest("late chunk")
+    assert reader.get([digest]) == {}
+    writer.put({digest: np.asarray(vectors[0], dtype=np.float32)})
+    np.testing.assert_allclose(reader.get([digest])[digest], vectors[0], rtol=1e-6)
+
+def test_disk_store_ignores_partial_rows(tmp_path, vectors):
+    store = EmbeddingDiskStore(str(tmp_path), NAMESPACE)
+    first, second = EmbeddingCache.text_digest("a"), EmbeddingCache.text_digest("b")
+    store.put({first: np.asarray(vectors[0], dtype=np.float32)})
+    # Simulate a crash after writing part of a vector but before its digest
+    with open(store.vectors_path, "ab") as f:
+        f.write(b"\x00" * 12)
+    store.put({second: np.asarray(vectors[1], dtype=np.float32)})
+    reopened = EmbeddingDiskStore(str(tmp_path), NAMESPACE)
+    found = reopened.get([first, second])
+    np.testing.assert_allclose(found[first], vectors[0], rtol=1e-6)
+    np.testing.assert_allclose(found[second], vectors[1], rtol=1e-6)
+
+def test_dimension_mismatch_is_not_stored(tmp_path, vectors):
+    store = EmbeddingDiskStore(str(tmp_path), NAMESPACE)
+    store.put({EmbeddingCache.text_digest("a"): np.asarray(vectors[0], dtype=np.float32)})
+    odd = EmbeddingCache.text_digest("b")
+    store.put({odd: np.zeros(4, dtype=np.float32)})
+    assert odd not in store.offsets
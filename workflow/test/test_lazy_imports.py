@@ -0,0 +1,50 @@
+import sys
+import pytest
+
+from workflow.util.lazy_imports import import_from_path, lazy_exports
+
+# Fixtures
+@pytest.fixture
+def lazy_package(tmp_path, monkeypatch):
+    """A throwaway package whose only export lives in a submodule that records being imported."""
+    package_dir = tmp_path / "lazy_pkg"
+    package_dir.mkdir()
+    (package_dir / "__init__.py").write_text(
+        "from workflow.util.lazy_imports import lazy_exports\n"
+        "__getattr__, __dir__ = lazy_exports(__name__, {'Heavy': '.heavy'})\n"
+    )
+    (package_dir / "heavy.py").write_text("import builtins\nbuiltins.heavy_imports = getattr(builtins, 'heavy_imports', 0) + 1\nclass Heavy: pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "lazy_pkg"
+    for name in ["lazy_pkg", "lazy_pkg.heavy"]:
+        sys.modules.pop(name, None)
+    import builtins
+    if hasattr(builtins, "heavy_imports"):
+        del builtins.heavy_imports
+
+# Lazy Export Tests
+def test_submodule_imported_on_first_access_only(lazy_package):
+    import builtins
+    package = __import__(lazy_package)
+    assert "lazy_pkg.heavy" not in sys.modules
+    assert package.Heavy.__name__ == "Heavy"
+    assert package.Heavy is sys.modules["lazy_pkg.heavy"].Heavy
+    assert builtins.heavy_imports == 1
+
+def test_from_import_and_dir(lazy_package):
+    from lazy_pkg import Heavy
+    import lazy_pkg
+    assert "Heavy" in dir(lazy_pkg)
+    assert Heavy is lazy_pkg.Heavy
+
+def test_unknown_name_raises_attribute_error(lazy_package):
+    package = __import__(lazy_package)
+    with pytest.raises(AttributeError):
+        package.Missing
+    with pytest.raises(ImportError):
+        exec("from lazy_pkg import Missing", {})
+
+def test_import_from_path():
+    assert import_from_path("collections.OrderedDict").__name__ == "OrderedDict"
+    with pytest.raises(AttributeError):
+        import_from_path("collections.NotThere")
@@ -0,0 +1,59 @@
+import asyncio
+import httpx
+import pytest
+from openai import BadRequestError, AuthenticationError
+
+import workflow.core.api.engines.llm_engines.llm_engine as llm_engine
+from workflow.core.api.engines.llm_engines.llm_engine import LLMEngine
+
+def status_error(error_class, status_code: int):
+    response = httpx.Response(status_code, request=httpx.Request("POST", "https://api.example.com/v1/chat/completions"))
+    return error_class("rejected", response=response, body=None)
+
+class FakeCompletions:
+    """Fails requests that carry stream_options with `error`, recording every request's parameters."""
+    def __init__(self, error=None):
+        self.error = error
+        self.requests = []
+
+    async def create(self, **params):
+        self.requests.append(params)
+        if self.error and "stream_options" in params:
+            raise self.error
+        return "stream"
+
+class FakeClient:
+    def __init__(self, base_url: str, error=None):
+        self.base_url = base_url
+        self.chat = type("Chat", (), {"completions": FakeCompletions(error)})()
+
+# Fixtures
+@pytest.fixture(autouse=True)
+def unsupported_endpoints(monkeypatch):
+    monkeypatch.setattr(llm_engine, "_STREAM_OPTIONS_UNSUPPORTED", set())
+
+@pytest.fixture
+def engine():
+    return LLMEngine()
+
+# stream_options Tests
+def test_usage_requested_by_default(engine):
+    client = FakeClient("https://api.openai.com/v1/")
+    assert asyncio.run(engine._create_stream(client, {"model": "gpt-4o"})) == "stream"
+    assert client.chat.completions.requests == [{"model": "gpt-4o", "stream": True, "stream_options": {"include_usage": True}}]
+
+def test_rejected_stream_options_are_dropped_and_remembered(engine):
+    client = FakeClient("https://api.mistral.ai/v1/", status_error(BadRequestError, 400))
+    asyncio.run(engine._create_stream(client, {"model": "mistral-large"}))
+    asyncio.run(engine._create_stream(client, {"model": "mistral-large"}))
+    requests = client.chat.completions.requests
+    assert len(requests) == 3
+    assert "stream_options" in requests[0]
+    assert all("stream_options" not in request and request["stream"] for request in requests[1:])
+
+def test_other_errors_are_raised(engine):
+    client = FakeClient("https://api.openai.com/v1/", status_error(AuthenticationError, 401))
+    with pytest.raises(AuthenticationError):
+        asyncio.run(engine._create_stream(client, {"model": "gpt-4o"}))
+    assert len(client.chat.completions.requests) == 1
+    assert not llm_engine._STREAM_OPTIONS_UNSUPPORTED
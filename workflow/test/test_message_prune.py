@@ -0,0 +1,104 @@
+import pytest
+import asyncio
+
+from workflow.util.message_prune.message_prune import MessagePruner
+from workflow.util.message_prune.message_prune_utils import calculate_message_size
+from workflow.util.message_prune.pruning_state import PruningState, PruningStateStore, message_fingerprint, pruning_conversation
+
+def conversation():
+    return [
+        {"role": "system", "content": "s" * 200},
+        {"role": "user", "content": "u" * 300},
+        {"role": "assistant", "content": "a" * 400, "tool_calls": [{"type": "function", "function": {"name": "search", "arguments": "q" * 200}}]},
+        {"role": "tool", "content": "t" * 2000},
+        {"role": "assistant", "content": "b" * 1500},
+        {"role": "tool", "content": "r" * 2000},
+        {"role": "user", "content": "v" * 300},
+    ]
+
+def prune(messages, max_total_size):
+    return asyncio.run(MessagePruner(max_total_size=max_total_size).prune(messages))
+
+# Fixtures
+@pytest.fixture
+def messages():
+    return conversation()
+
+# Pruning Tests
+def test_under_limit_returns_input(messages):
+    assert prune(messages, 100_000) is messages
+
+def test_reaches_target_size(messages):
+    pruned = prune(messages, 4000)
+    assert sum(calculate_message_size(m) for m in pruned) <= 4000
+    assert [m["role"] for m in pruned] == [m["role"] for m in messages]
+
+def test_only_pruned_messages_are_copied(messages):
+    original = conversation()
+    pruned = prune(messages, 5500)
+    changed = [i for i, (before, after) in enumerate(zip(messages, pruned)) if before is not after]
+    assert changed and len(changed) < len(messages)
+    assert all(pruned[i] is messages[i] for i in range(len(messages)) if i not in changed)
+    assert messages == original  # Inputs are never modified
+
+def test_highest_score_pruned_first(messages):
+    pruner = MessagePruner(max_total_size=6000)
+    scores = [score.final_score for _, score, _ in pruner._score_messages(messages)]
+    pruned = asyncio.run(pruner.prune(messages))
+    changed = [i for i, (before, after) in enumerate(zip(messages, pruned)) if before is not after]
+    assert changed == [max(range(len(scores)), key=lambda i: scores[i])]
+
+def test_tool_calls_truncated_without_touching_input(messages):
+    pruned = prune(messages, 1000)
+    assert messages[2]["tool_calls"][0]["function"]["arguments"] == "q" * 200
+    assert "[ctx_exceeded]" in pruned[2]["content"]
+
+def test_unreachable_target_prunes_everything(messages):
+    pruned = prune(messages, 10)
+    assert all("[ctx_exceeded]" in m["content"] for m in pruned)
+
+# Pruning State Tests
+def test_state_keeps_pruned_prefix_identical_across_turns(messages):
+    pruner, state = MessagePruner(max_total_size=5000, headroom=0.2), PruningState()
+    first = asyncio.run(pruner.prune(messages, state=state))
+    assert sum(calculate_message_size(m) for m in first) <= 4000
+    next_turn = messages + [{"role": "assistant", "content": "c" * 200}]
+    second = asyncio.run(pruner.prune(next_turn, state=state))
+    assert second[:len(first)] == first
+    assert all(second[i] is first[i] for i in range(len(first)))
+    assert second[-1] is next_turn[-1]
+
+def test_state_prunes_untruncated_messages_on_overflow(messages):
+    pruner, state = MessagePruner(max_total_size=5000, headroom=0.2), PruningState()
+    first = asyncio.run(pruner.prune(messages, state=state))
+    truncated = set(state.truncated)
+    next_turn = messages + [{"role": "tool", "content": "x" * 1500}, {"role": "user", "content": "w" * 300}]
+    second = asyncio.run(pruner.prune(next_turn, state=state))
+    assert sum(calculate_message_size(m) for m in second) <= 4000
+    assert all(second[i] is first[i] for i in truncated)
+    assert state.truncated > truncated
+
+def test_state_changed_message_is_not_reused(messages):
+    pruner, state = MessagePruner(max_total_size=5000), PruningState()
+    asyncio.run(pruner.prune(messages, state=state))
+    edited = [dict(m) for m in messages]
+    edited[1]["content"] = "edited"
+    assert state.matching_prefix([message_fingerprint(m) for m in edited]) == 1
+
+def test_state_store_keys_and_eviction(messages):
+    store = PruningStateStore(max_conversations=2)
+    with pruning_conversation("chat-1"):
+        state = store.for_messages(messages, scope="model:5000")
+        assert store.for_messages(messages + [{"role": "user", "content": "more"}], scope="model:5000") is state
+        assert store.for_messages(messages, scope="model:9000") is not state
+    store.for_messages(messages, scope="model:5000", conversation_id="chat-2")
+    assert len(store) == 2
+    assert store.for_messages(messages, scope="model:5000", conversation_id="chat-1") is not state
+
+def test_identical_conversations_keep_separate_states(messages):
+    store = PruningStateStore()
+    first = store.for_messages(messages, scope="model:5000", conversation_id="chat-1")
+    second = store.for_messages(messages, scope="model:5000", conversation_id="chat-2")
+    assert first is not second
+    assert store.for_messages(messages, scope="model:5000") is not store.for_messages(messages, scope="model:5000")
+    assert len(store) == 2  # Calls outside a conversation keep no state
@@ -0,0 +1,108 @@
+import pytest
+import asyncio
+import threading
+
+from workflow.util.model_residency import ModelResidencyManager, model_key, parse_warmup_spec
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class FakeModel:
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+
+class CountingLoader:
+    def __init__(self, name: str, size: int = 10):
+        self.name = name
+        self.size = size
+        self.calls = 0
+
+    def __call__(self) -> FakeModel:
+        self.calls += 1
+        return FakeModel(self.name, self.size)
+
+# Fixtures
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def manager(clock):
+    return ModelResidencyManager(memory_budget=25, idle_timeout=60, clock=clock, size_estimator=lambda model: model.size)
+
+# Residency Tests
+def test_model_is_loaded_once(manager):
+    loader = CountingLoader("bark")
+    key = model_key("suno/bark-small", "cpu", "torch.float32")
+    first = manager.load(key, loader)
+    second = manager.load(key, loader)
+    assert first is second
+    assert loader.calls == 1
+
+def test_keys_include_device_and_dtype(manager):
+    loader = CountingLoader("bark")
+    manager.load(model_key("suno/bark-small", "cpu", "torch.float32"), loader)
+    manager.load(model_key("suno/bark-small", "cuda", "torch.float16"), loader)
+    assert loader.calls == 2
+
+def test_lru_eviction_within_budget(manager):
+    a, b, c = CountingLoader("a"), CountingLoader("b"), CountingLoader("c")
+    manager.load(("a", "cpu", "f32"), a)
+    manager.load(("b", "cpu", "f32"), b)
+    manager.load(("a", "cpu", "f32"), a)  # a is now the most recently used
+    manager.load(("c", "cpu", "f32"), c)
+    assert ("b", "cpu", "f32") not in manager
+    assert ("a", "cpu", "f32") in manager and ("c", "cpu", "f32") in manager
+    assert manager.loaded_bytes == 20
+
+def test_models_in_use_are_not_evicted(manager):
+    manager.load(("a", "cpu", "f32"), CountingLoader("a"), acquire=True)
+    manager.load(("b", "cpu", "f32"), CountingLoader("b"))
+    manager.load(("c", "cpu", "f32"), CountingLoader("c"))
+    assert ("a", "cpu", "f32") in manager
+    assert ("b", "cpu", "f32") not in manager
+    manager.release(("a", "cpu", "f32"))
+    manager.load(("d", "cpu", "f32"), CountingLoader("d"))
+    assert ("a", "cpu", "f32") not in manager
+
+def test_idle_models_are_unloaded(manager, clock):
+    manager.load(("a", "cpu", "f32"), CountingLoader("a"))
+    clock.now = 30
+    manager.load(("b", "cpu", "f32"), CountingLoader("b"))
+    clock.now = 70
+    assert manager.unload_idle() == [("a", "cpu", "f32")]
+    assert len(manager) == 1
+
+def test_concurrent_loads_share_one_load(manager):
+    loader = CountingLoader("a")
+    barrier = threading.Barrier(4)
+    def load():
+        barrier.wait()
+        manager.load(("a", "cpu", "f32"), loader)
+    threads = [threading.Thread(target=load) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loader.calls == 1
+
+def test_lease_releases_model(manager):
+    async def run():
+        async with manager.lease(("a", "cpu", "f32"), CountingLoader("a")) as model:
+            assert model.name == "a"
+            assert manager.unload(("a", "cpu", "f32")) is False
+        assert manager.unload(("a", "cpu", "f32")) is True
+    asyncio.run(run())
+
+# Warm-up Tests
+def test_parse_warmup_spec():
+    assert parse_warmup_spec("bark=suno/bark-small, pixart=PixArt-alpha/PixArt-XL-2-512x512,") == [
+        ("bark", "suno/bark-small"), ("pixart", "PixArt-alpha/PixArt-XL-2-512x512")
+    ]
+    assert parse_warmup_spec("") == []
+    assert parse_warmup_spec("bark") == []
@@ -0,0 +1,90 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from workflow.util.selector_cache import SelectorCache, structural_fingerprint, normalize_class, url_domain
+
+ARTICLE_TEMPLATE = """
+<html><body>
+<nav class="menu"><a href="/">Home</a></nav>
+<main id="content"><article class="post">
+<h1 class="title">{title}</h1>
+{paragraphs}
+</article></main>
+<footer class="site-footer">Footer</footer>
+</body></html>
+"""
+
+def article(title: str, paragraph_count: int) -> BeautifulSoup:
+    paragraphs = "\n".join(f"<p>{title} paragraph {i}</p>" for i in range(paragraph_count))
+    return BeautifulSoup(ARTICLE_TEMPLATE.format(title=title, paragraphs=paragraphs), "html.parser")
+
+# Fixtures
+@pytest.fixture
+def cache(tmp_path):
+    return SelectorCache(directory=str(tmp_path / "selector_cache"), min_content_ratio=0.5)
+
+# Fingerprint Tests
+def test_same_template_shares_fingerprint():
+    assert structural_fingerprint(article("First", 3)) == structural_fingerprint(article("Second", 12))
+
+def test_different_layout_changes_fingerprint():
+    redesigned = BeautifulSoup(ARTICLE_TEMPLATE.replace('class="post"', 'class="story"').format(title="A", paragraphs="<p>x</p>"), "html.parser")
+    assert structural_fingerprint(article("A", 1)) != structural_fingerprint(redesigned)
+
+def test_ids_and_numeric_class_parts_are_ignored():
+    first = article("A", 1).decode().replace('class="post"', 'id="post-101" class="post post-101 css-1x8b2"')
+    second = article("B", 2).decode().replace('class="post"', 'id="post-2077" class="post post-2077 css-9zq4f"')
+    assert structural_fingerprint(BeautifulSoup(first, "html.parser")) == structural_fingerprint(BeautifulSoup(second, "html.parser"))
+
+def test_normalize_class():
+    assert normalize_class("post-1234") == normalize_class("post-99") == "post-#"
+    assert normalize_class("css_1x8b2") == "css_#"
+    assert normalize_class("site-footer") == "site-footer"
+
+def test_url_domain_ignores_www_and_path():
+    assert url_domain("https://www.Example.com/a/b?c=1") == url_domain("http://example.com/other") == "example.com"
+
+# Cache Tests
+def test_hit_after_put_for_other_page_on_same_site(cache):
+    fingerprint = structural_fingerprint(article("First", 3))
+    assert cache.get("https://example.com/first", fingerprint) is None
+    cache.put("https://example.com/first", fingerprint, ["article p", "h1.title"])
+    assert cache.get("https://example.com/second", fingerprint) == ["article p", "h1.title"]
+    assert cache.stats.hits == 0  # Not a hit until the extracted content is validated
+    assert cache.validate("https://example.com/second", fingerprint, "x" * 60, page_text_length=100)
+    assert cache.get("https://other.org/first", fingerprint) is None
+    assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+    assert cache.stats.hit_rate == pytest.approx(1 / 3)
+
+def test_insufficient_content_is_a_miss_and_invalidates(cache):
+    cache.put("https://example.com/a", "abc", ["main p"])
+    assert cache.get("https://example.com/b", "abc") == ["main p"]
+    assert not cache.validate("https://example.com/b", "abc", "x" * 10, page_text_length=100)
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.invalidations) == (0, 1, 1)
+    assert cache.get("https://example.com/a", "abc") is None
+
+def test_entries_persist_across_instances(cache):
+    cache.put("https://example.com/a", "abc", ["main p"])
+    reloaded = SelectorCache(directory=cache.directory)
+    assert reloaded.get("https://example.com/b", "abc") == ["main p"]
+
+def test_invalidate_removes_entry(cache):
+    cache.put("https://example.com/a", "abc", ["main p"])
+    cache.invalidate("https://example.com/a", "abc")
+    assert cache.get("https://example.com/a", "abc") is None
+    assert SelectorCache(directory=cache.directory).get("https://example.com/a", "abc") is None
+    assert cache.stats.invalidations == 1
+
+def test_is_sufficient(cache):
+    assert cache.is_sufficient("x" * 60, page_text_length=100)
+    assert not cache.is_sufficient("x" * 10, page_text_length=100)
+    assert not cache.is_sufficient("   ", page_text_length=0)
+    assert not cache.is_sufficient(None, page_text_length=0)
+
+def test_unwritable_directory_keeps_memory_cache(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    cache = SelectorCache(directory=str(blocker / "cache"))
+    cache.put("https://example.com/a", "abc", ["main p"])
+    assert cache.directory is None
+    assert cache.get("https://example.com/a", "abc") == ["main p"]
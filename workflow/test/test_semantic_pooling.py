@@ -0,0 +1,64 @@
+import asyncio
+import numpy as np
+import pytest
+
+from workflow.util.text_splitters import SemanticTextSplitter, LengthType
+from workflow.util.text_splitters.utils import cosine_similarity, adjacent_cosine_similarities, weighted_mean_pool
+
+class TopicEmbeddingGenerator:
+    """Embeds text by which topic words it mentions, counting calls and inputs."""
+    TOPICS = ["apple", "river", "engine"]
+
+    def __init__(self):
+        self.calls = 0
+        self.inputs = 0
+
+    async def generate_embedding(self, inputs, api_data=None):
+        self.calls += 1
+        self.inputs += len(inputs)
+        return [[text.count(topic) + 0.1 for topic in self.TOPICS] for text in inputs]
+
+# Fixtures
+@pytest.fixture
+def generator():
+    return TopicEmbeddingGenerator()
+
+@pytest.fixture
+def document():
+    return " ".join(["The apple tree grows apples."] * 30 + ["The river runs to the sea."] * 30 + ["The engine needs oil."] * 30)
+
+# Vector Utility Tests
+def test_adjacent_similarities_match_pairwise():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(20, 8)).tolist()
+    vectors[5] = [0.0] * 8
+    expected = [cosine_similarity(vectors[i], vectors[i + 1]) for i in range(len(vectors) - 1)]
+    assert np.allclose(adjacent_cosine_similarities(vectors), expected)
+    assert len(adjacent_cosine_similarities(vectors[:1])) == 0
+
+def test_weighted_mean_pool():
+    pooled = weighted_mean_pool([[1.0, 0.0], [0.0, 1.0]], [3, 1])
+    assert np.isclose(np.linalg.norm(pooled), 1.0)
+    assert pooled[0] == pytest.approx(3 * pooled[1])
+
+# Pooling Tests
+def test_pooled_split_matches_plain_split(generator, document):
+    splitter = SemanticTextSplitter(chunk_size=60, chunk_overlap=10, length_function=LengthType.CHARACTER)
+    chunks = asyncio.run(splitter.split_text(document, generator, None))
+    pooled_chunks, vectors = asyncio.run(splitter.split_text_with_embeddings(document, generator, None))
+    assert pooled_chunks == chunks
+    assert len(vectors) == len(chunks)
+    assert generator.calls == 2  # One window pass per split, no pass over the final chunks
+
+def test_pooled_vectors_follow_their_topic(generator, document):
+    splitter = SemanticTextSplitter(chunk_size=60, length_function=LengthType.CHARACTER)
+    chunks, vectors = asyncio.run(splitter.split_text_with_embeddings(document, generator, None))
+    true_vectors = asyncio.run(generator.generate_embedding(chunks))
+    for pooled, true in zip(vectors, true_vectors):
+        assert cosine_similarity(pooled, true) > 0.95
+
+def test_short_text_has_no_pooled_vectors(generator):
+    splitter = SemanticTextSplitter(chunk_size=500)
+    chunks, vectors = asyncio.run(splitter.split_text_with_embeddings("A short text.", generator, None))
+    assert chunks == ["A short text."] and vectors is None
+    assert generator.calls == 0
@@ -2,6 +2,7 @@ import pytest
 from typing import List
 from workflow.util import (
     SemanticTextSplitter,
+    TextSplitter,
     SplitterType,
     LengthType,
     Language,
@@ -24,6 +25,12 @@ def mock_embedding_generator():
 def default_splitter():
     return SemanticTextSplitter()
 
+def test_no_sync_streaming_api():
+    """Semantic splitting needs embeddings, so the recursive splitter's sync API isn't inherited"""
+    splitter = SemanticTextSplitter()
+    assert not isinstance(splitter, TextSplitter)
+    assert not hasattr(splitter, "iter_split_text")
+
 def test_initialization_defaults():
     """Test default initialization parameters"""
     splitter = SemanticTextSplitter()
@@ -0,0 +1,76 @@
+import pytest
+import numpy as np
+
+from workflow.util.utils import cosine_similarity
+from workflow.util.vector_index import SimilarityEngine, relax_similarity_threshold, select_top_k
+
+# Fixtures
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(42)
+    return rng.normal(size=(200, 32)).tolist()
+
+@pytest.fixture
+def query():
+    rng = np.random.default_rng(7)
+    return rng.normal(size=32).tolist()
+
+# Scoring Tests
+def test_scores_match_cosine_similarity(vectors, query):
+    engine = SimilarityEngine.from_vectors(vectors)
+    scores = engine.score(query)
+    expected = [cosine_similarity(query, vec) for vec in vectors]
+    assert scores.dtype == np.float32
+    np.testing.assert_allclose(scores, expected, atol=1e-5)
+
+def test_zero_vectors_score_zero(query):
+    engine = SimilarityEngine.from_vectors([[0.0] * 32, query])
+    scores = engine.score(query)
+    assert scores[0] == 0.0
+    assert scores[1] == pytest.approx(1.0, abs=1e-6)
+    assert np.all(engine.score([0.0] * 32) == 0.0)
+
+def test_dimension_mismatch():
+    with pytest.raises(ValueError):
+        SimilarityEngine.from_vectors([[1.0, 0.0], [1.0, 0.0, 0.0]])
+    engine = SimilarityEngine.from_vectors([[1.0, 0.0]])
+    with pytest.raises(ValueError):
+        engine.score([1.0, 0.0, 0.0])
+
+def test_empty_engine():
+    engine = SimilarityEngine.from_vectors([], dimension=4)
+    assert len(engine) == 0
+    indices, scores = engine.top_k([1.0, 0.0, 0.0, 0.0], 5)
+    assert len(indices) == 0 and len(scores) == 0
+
+# Top-k Selection Tests
+def test_top_k_matches_full_sort(vectors, query):
+    engine = SimilarityEngine.from_vectors(vectors)
+    indices, scores = engine.top_k(query, 10)
+    full = engine.score(query)
+    expected = np.argsort(-full, kind="stable")[:10]
+    assert indices.tolist() == expected.tolist()
+    assert np.all(np.diff(scores) <= 0)
+
+def test_select_top_k_respects_threshold():
+    scores = np.array([0.9, 0.1, 0.5, 0.7, 0.3])
+    assert select_top_k(scores, 10, threshold=0.5).tolist() == [0, 3, 2]
+    assert select_top_k(scores, 2).tolist() == [0, 3]
+    assert select_top_k(scores, 0).tolist() == []
+
+def test_select_top_k_ties_keep_order():
+    scores = np.array([0.5, 0.8, 0.5, 0.8])
+    assert select_top_k(scores, 4).tolist() == [1, 3, 0, 2]
+
+# Threshold Relaxation Tests
+def test_relax_threshold_reaches_enough_results():
+    scores = np.array([0.9, 0.5, 0.4, 0.3])
+    threshold = relax_similarity_threshold(scores, 3, 0.6, min_threshold=0.2)
+    assert threshold == pytest.approx(0.6 * 0.75 * 0.75)
+    assert np.count_nonzero(scores >= threshold) >= 3
+
+def test_relax_threshold_stops_at_minimum():
+    scores = np.array([0.9, 0.01, 0.02])
+    threshold = relax_similarity_threshold(scores, 3, 0.6, min_threshold=0.2)
+    assert threshold <= 0.2
+    assert threshold > 0.2 * 0.75
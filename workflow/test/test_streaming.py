@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+
+from workflow.util.streaming import emit_delta, is_streaming, stream_deltas
+
+# Fixtures
+@pytest.fixture
+def collected():
+    """A sink recording every event it receives."""
+    events = []
+    async def sink(event):
+        events.append(event)
+    return events, sink
+
+# Stream Sink Tests
+def test_deltas_reach_the_sink(collected):
+    events, sink = collected
+    async def run():
+        assert not is_streaming()
+        with stream_deltas(sink):
+            assert is_streaming()
+            await emit_delta("Hel", turn=0)
+            await emit_delta("")
+            await emit_delta("lo", turn=0)
+        assert not is_streaming()
+        await emit_delta("ignored")
+    asyncio.run(run())
+    assert events == [{"type": "delta", "content": "Hel", "turn": 0}, {"type": "delta", "content": "lo", "turn": 0}]
+
+def test_none_disables_streaming_for_the_block(collected):
+    events, sink = collected
+    async def run():
+        with stream_deltas(sink):
+            with stream_deltas(None):
+                assert not is_streaming()
+                await emit_delta("from a tool")
+            await emit_delta("from the chat")
+    asyncio.run(run())
+    assert [event["content"] for event in events] == ["from the chat"]
+
+def test_failing_sink_is_swallowed():
+    async def broken(event):
+        raise ConnectionError("redis went away")
+    async def run():
+        with stream_deltas(broken):
+            await emit_delta("still fine")
+    asyncio.run(run())
+
+def test_spawned_tasks_inherit_the_sink(collected):
+    events, sink = collected
+    async def run():
+        with stream_deltas(sink):
+            await asyncio.gather(*(asyncio.create_task(emit_delta(str(i))) for i in range(3)))
+    asyncio.run(run())
+    assert sorted(event["content"] for event in events) == ["0", "1", "2"]
@@ -0,0 +1,39 @@
+import json
+import types
+import pytest
+from pathlib import Path
+
+from workflow.util.text_splitters.text_splitter import TextSplitter
+import workflow.util.token_counter as token_counter
+
+# Chunks produced by the list-based splitter for a set of inputs and configurations. The
+# splitter must keep producing exactly these, whatever its internals.
+GOLDEN = json.loads((Path(__file__).parent / "golden" / "text_splitter.json").read_text(encoding="utf-8"))
+
+# Fixtures
+@pytest.fixture(autouse=True)
+def heuristic_tokens(monkeypatch):
+    """The golden token counts are the character heuristic, whichever tokenizers are installed."""
+    monkeypatch.setattr(token_counter, "TOKENIZER_ENCODING", token_counter.HEURISTIC)
+    token_counter.get_token_counter.cache_clear()
+    yield
+    token_counter.get_token_counter.cache_clear()
+
+# Golden Tests
+@pytest.mark.parametrize("config", sorted(GOLDEN["configs"]))
+@pytest.mark.parametrize("name", sorted(GOLDEN["inputs"]))
+def test_matches_golden_chunks(config, name):
+    splitter = TextSplitter(**GOLDEN["configs"][config])
+    assert splitter.split_text(GOLDEN["inputs"][name]) == GOLDEN["expected"][config][name]
+
+@pytest.mark.parametrize("config", sorted(GOLDEN["configs"]))
+def test_streaming_matches_golden_chunks(config):
+    splitter = TextSplitter(**GOLDEN["configs"][config])
+    for name, text in GOLDEN["inputs"].items():
+        assert list(splitter.iter_split_text(text)) == GOLDEN["expected"][config][name]
+
+def test_iter_split_text_is_lazy():
+    splitter = TextSplitter(**GOLDEN["configs"]["python_char"])
+    chunks = splitter.iter_split_text(GOLDEN["inputs"]["mixed"])
+    assert isinstance(chunks, types.GeneratorType)
+    assert next(chunks) == GOLDEN["expected"]["python_char"]["mixed"][0]
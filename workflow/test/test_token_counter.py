@@ -0,0 +1,86 @@
+import sys
+import asyncio
+import logging
+import pytest
+
+from workflow.util.const import CHAR_TO_TOKEN, EST_TOKENS_PER_TOOL
+from workflow.util.message_prune import MessagePruner
+import workflow.util.token_counter as token_counter
+from workflow.util.token_counter import TokenCounter, TiktokenCounter, get_token_counter, register_token_counter
+
+class WordEncoding:
+    """Stands in for a tiktoken Encoding: one token per whitespace-separated word, counting calls."""
+    name = "words"
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode_ordinary(self, text):
+        self.calls += 1
+        return text.split()
+
+# Fixtures
+@pytest.fixture
+def encoding():
+    return WordEncoding()
+
+@pytest.fixture
+def counter(encoding):
+    return TiktokenCounter(encoding, max_entries=2)
+
+# Heuristic Tests
+def test_heuristic_matches_character_estimate():
+    counter = TokenCounter()
+    assert counter.count("") == 0
+    assert counter.count("x" * 64) == int(64 // CHAR_TO_TOKEN)
+    assert counter.count_messages([{"role": "user", "content": "x" * 64}], tools=[{}, {}]) == int(64 // CHAR_TO_TOKEN) + 2 * EST_TOKENS_PER_TOOL
+
+def test_missing_tokenizer_warns_once(monkeypatch, caplog):
+    monkeypatch.setitem(sys.modules, "tiktoken", None)  # Makes `import tiktoken` raise ImportError
+    monkeypatch.setattr(token_counter, "_fallback_warned", False)
+    token_counter._counter_for_encoding.cache_clear()
+    try:
+        with caplog.at_level(logging.DEBUG, logger=token_counter.LOGGER.name):
+            assert type(token_counter._counter_for_encoding("cl100k_base")) is TokenCounter
+            assert type(token_counter._counter_for_encoding("o200k_base")) is TokenCounter
+        assert len([record for record in caplog.records if record.levelno == logging.WARNING]) == 1
+    finally:
+        token_counter._counter_for_encoding.cache_clear()
+
+# Tokenizer Tests
+def test_counts_are_memoized_by_content(counter, encoding):
+    assert counter.count("one two three") == 3
+    assert counter.count("one two " + "three") == 3
+    assert encoding.calls == 1
+
+def test_memo_evicts_least_recently_used(counter, encoding):
+    counter.count("a")
+    counter.count("b b")
+    counter.count("a")
+    counter.count("c c c")  # evicts "b b"
+    counter.count("a")
+    assert encoding.calls == 3
+    counter.count("b b")
+    assert encoding.calls == 4
+
+def test_message_sizes_and_overhead(counter):
+    message = {"role": "assistant", "content": "calling a tool", "tool_calls": [{"function": {"name": "search", "arguments": "{}"}}]}
+    content_tokens, tool_tokens = counter.message_sizes(message)
+    assert content_tokens == 3 and tool_tokens > 0
+    assert counter.count_messages([message]) == content_tokens + tool_tokens + counter.tokens_per_message
+
+def test_registered_counter_wins_for_its_models(counter):
+    register_token_counter("my-local-", counter)
+    try:
+        assert get_token_counter("my-local-llama") is counter
+        assert get_token_counter("other-model") is not counter
+    finally:
+        register_token_counter("my-local-", TokenCounter())
+
+# Pruner Tests
+def test_pruner_budget_in_tokens(counter):
+    messages = [{"role": "user", "content": " ".join(["word"] * 200)} for _ in range(5)]
+    pruner = MessagePruner(max_total_size=600, token_counter=counter)
+    pruned = asyncio.run(pruner.prune(messages))
+    assert sum(sum(counter.message_sizes(m)) for m in pruned) <= 600
+    assert sum(m["content"] == messages[0]["content"] for m in pruned) >= 2
@@ -0,0 +1,137 @@
+import asyncio
+import pytest
+
+from workflow.core.agent.agent_features.tool_execution import ToolExecutionAgent, ToolPermission
+from workflow.core.data_structures import ToolCall, ToolFunction, FunctionConfig, FunctionParameters, ParameterDefinition
+
+class FakeTools:
+    """Async tools that record how many calls overlap: `slow` sleeps, `fail` raises and `hang` never returns in time."""
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.finished = []
+
+    async def _run(self, name: str, delay: float, value: str) -> str:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(delay)
+            self.finished.append(name)
+            return f"{name}: {value}"
+        finally:
+            self.running -= 1
+
+    async def slow(self, value: str) -> str:
+        return await self._run("slow", 0.05, value)
+
+    async def fast(self, value: str) -> str:
+        return await self._run("fast", 0.0, value)
+
+    async def fail(self, value: str) -> str:
+        await self._run("fail", 0.0, value)
+        raise RuntimeError("boom")
+
+    async def hang(self, value: str) -> str:
+        return await self._run("hang", 10, value)
+
+    @property
+    def tool_map(self):
+        return {"slow": self.slow, "fast": self.fast, "fail": self.fail, "hang": self.hang}
+
+def tool_function(name: str) -> ToolFunction:
+    return ToolFunction(function=FunctionConfig(
+        name=name,
+        description=f"The {name} tool",
+        parameters=FunctionParameters(
+            properties={"value": ParameterDefinition(type="string", description="Value to echo")},
+            required=["value"]
+        )
+    ))
+
+def tool_call(name: str, value: str = "x") -> ToolCall:
+    return ToolCall(id=f"call_{name}_{value}", function={"name": name, "arguments": f'{{"value": "{value}"}}'})
+
+# Fixtures
+@pytest.fixture
+def tools():
+    return FakeTools()
+
+@pytest.fixture
+def tools_list(tools):
+    return [tool_function(name) for name in tools.tool_map]
+
+@pytest.fixture
+def agent():
+    return ToolExecutionAgent(has_tools=ToolPermission.NORMAL, max_concurrent_tool_calls=4, tool_call_timeout=0.5)
+
+def process(agent, tools, tools_list, calls):
+    return asyncio.run(agent.process_tool_calls(calls, tools.tool_map, tools_list))
+
+# Ordering Tests
+def test_responses_keep_tool_call_order(agent, tools, tools_list):
+    messages = process(agent, tools, tools_list, [tool_call("slow", "1"), tool_call("fast", "2"), tool_call("slow", "3")])
+    assert [message.content for message in messages] == ["slow: 1", "fast: 2", "slow: 3"]
+    assert [message.step for message in messages] == ["slow", "fast", "slow"]
+    assert tools.finished[0] == "fast"  # The fast call didn't wait for the slow one before it
+
+def test_mixed_outcomes_keep_their_positions(agent, tools, tools_list):
+    messages = process(agent, tools, tools_list, [tool_call("hang"), tool_call("fail"), tool_call("slow"), tool_call("missing")])
+    assert [message.step for message in messages] == ["hang", "fail", "slow", "missing"]
+    assert messages[2].content == "slow: x"
+
+# Concurrency Tests
+def test_calls_run_concurrently_up_to_the_cap(agent, tools, tools_list):
+    agent.max_concurrent_tool_calls = 2
+    process(agent, tools, tools_list, [tool_call("slow", str(i)) for i in range(5)])
+    assert tools.max_running == 2
+    assert len(tools.finished) == 5
+
+def test_uncapped_calls_overlap(agent, tools, tools_list):
+    process(agent, tools, tools_list, [tool_call("slow", str(i)) for i in range(4)])
+    assert tools.max_running == 4
+
+# Error Tests
+def test_timeout_only_affects_its_call(agent, tools, tools_list):
+    agent.tool_call_timeout = 0.1
+    messages = process(agent, tools, tools_list, [tool_call("hang"), tool_call("fast")])
+    assert messages[0].content == "Error executing tool 'hang': timed out after 0.1 seconds"
+    assert messages[1].content == "fast: x"
+
+def test_no_timeout_by_default():
+    agent = ToolExecutionAgent()
+    assert agent.tool_call_timeout is None and agent.tool_timeouts == {}
+
+def test_per_tool_timeouts_override_the_default(agent, tools, tools_list):
+    agent.tool_call_timeout = 0.01
+    agent.tool_timeouts = {"slow": None, "hang": 0.1}
+    messages = process(agent, tools, tools_list, [tool_call("hang"), tool_call("slow")])
+    assert messages[0].content == "Error executing tool 'hang': timed out after 0.1 seconds"
+    assert messages[1].content == "slow: x"  # Would time out under the 0.01 second default
+
+def test_error_messages_are_unchanged(agent, tools, tools_list):
+    messages = process(agent, tools, tools_list, [
+        tool_call("fail"),
+        ToolCall(function={"name": "fast", "arguments": "{not json"}),
+        ToolCall(function={"name": "fast", "arguments": "{}"}),
+        ToolCall(function={"name": "fast", "arguments": '{"value": "x", "extra": 1}'}),
+    ])
+    assert messages[0].content == "Error executing tool 'fail': boom"
+    assert messages[1].content == "Error decoding JSON arguments: {not json"
+    assert messages[2].content == "Error in tool 'fast': Missing required parameter: value"
+    assert messages[3].content == "Error in tool 'fast': Unexpected parameter: extra"
+
+def test_unknown_tools(agent, tools, tools_list):
+    messages = asyncio.run(agent.process_tool_calls([tool_call("missing"), tool_call("fast")], tools.tool_map, tools_list[:1]))
+    assert messages[0].content.startswith("Tool 'missing' not found\nTool map: ")
+    assert messages[1].content == "Tool function 'fast' not found in tools list"
+
+# Permission Tests
+def test_dry_run_does_not_execute(agent, tools, tools_list):
+    agent.has_tools = ToolPermission.DRY_RUN
+    messages = process(agent, tools, tools_list, [tool_call("fast")])
+    assert messages[0].content.startswith("DRY RUN: Would execute fast")
+    assert tools.finished == []
+
+def test_disabled_tools_return_nothing(agent, tools, tools_list):
+    agent.has_tools = ToolPermission.DISABLED
+    assert process(agent, tools, tools_list, [tool_call("fast")]) == []
@@ -0,0 +1,90 @@
+import pytest
+import asyncio
+
+from workflow.util.ttl_cache import AsyncTTLCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+# Fixtures
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def cache(clock):
+    return AsyncTTLCache(ttl=60, max_size=3, clock=clock)
+
+# Expiry and Eviction Tests
+def test_entries_expire_after_ttl(cache, clock):
+    cache.set("token", {"valid": True})
+    clock.now = 59
+    assert cache.get("token") == {"valid": True}
+    clock.now = 60
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+def test_least_recently_used_is_evicted(cache):
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    cache.get("a")
+    cache.set("d", "d")
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+
+# Loading Tests
+@pytest.mark.asyncio
+async def test_concurrent_loads_share_one_call(cache):
+    calls = 0
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"valid": True}
+    results = await asyncio.gather(*(cache.get_or_load("token", loader) for _ in range(10)))
+    assert calls == 1
+    assert all(result == {"valid": True} for result in results)
+    assert await cache.get_or_load("token", loader) == {"valid": True}
+    assert calls == 1
+
+@pytest.mark.asyncio
+async def test_uncacheable_values_are_reloaded(cache):
+    calls = 0
+    async def loader():
+        nonlocal calls
+        calls += 1
+        return {"valid": False}
+    for _ in range(2):
+        await cache.get_or_load("token", loader, should_cache=lambda value: value["valid"])
+    assert calls == 2
+
+@pytest.mark.asyncio
+async def test_loader_errors_reach_every_waiter(cache):
+    async def loader():
+        await asyncio.sleep(0.01)
+        raise ValueError("backend down")
+    results = await asyncio.gather(*(cache.get_or_load("token", loader) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert cache.get("token") is None
+
+@pytest.mark.asyncio
+async def test_cancelled_starter_does_not_cancel_waiters(cache):
+    calls = 0
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"valid": True}
+    starter = asyncio.ensure_future(cache.get_or_load("token", loader))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(cache.get_or_load("token", loader))
+    await asyncio.sleep(0)
+    starter.cancel()
+    assert await waiter == {"valid": True}
+    assert starter.cancelled()
+    assert calls == 1
+    assert cache.get("token") == {"valid": True}
@@ -0,0 +1,157 @@
+import pytest, threading
+import numpy as np
+
+import workflow.util.vector_index.disk_index as disk_index
+from workflow.util.vector_index import VectorIndex, SimilarityEngine
+
+# Fixtures
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    return {f"chunk_{i}": rng.normal(size=16).tolist() for i in range(50)}
+
+@pytest.fixture
+def index(tmp_path):
+    return VectorIndex.for_cluster("cluster_1", root=str(tmp_path))
+
+# Sync Tests
+def test_sync_adds_all_vectors(index, vectors):
+    added, removed = index.sync(vectors.keys(), vectors.__getitem__)
+    assert (added, removed) == (50, 0)
+    assert len(index) == 50
+    assert index.sync(vectors.keys(), vectors.__getitem__) == (0, 0)
+
+def test_sync_only_fetches_missing_vectors(index, vectors):
+    index.sync(list(vectors.keys())[:40], vectors.__getitem__)
+    fetched = []
+    def get_vector(key):
+        fetched.append(key)
+        return vectors[key]
+    index.sync(vectors.keys(), get_vector)
+    assert sorted(fetched) == sorted(list(vectors.keys())[40:])
+
+def test_sync_removes_stale_keys(index, vectors):
+    index.sync(vectors.keys(), vectors.__getitem__)
+    kept = list(vectors.keys())[:10]
+    added, removed = index.sync(kept, vectors.__getitem__)
+    assert (added, removed) == (0, 40)
+    keys, scores = index.score(vectors[kept[0]])
+    assert sorted(keys) == sorted(kept)
+    assert len(scores) == 10
+
+def test_dimension_change_rebuilds(index, vectors):
+    index.sync(vectors.keys(), vectors.__getitem__)
+    new_vectors = {"other": [1.0, 0.0, 0.0]}
+    index.sync(new_vectors.keys(), new_vectors.__getitem__)
+    assert index.dimension == 3
+    assert index.keys() == ["other"]
+
+# Search Tests
+def test_scores_match_in_memory_engine(index, vectors):
+    index.sync(vectors.keys(), vectors.__getitem__)
+    query = vectors["chunk_3"]
+    keys, scores = index.score(query)
+    expected = SimilarityEngine.from_vectors([vectors[key] for key in keys]).score(query)
+    np.testing.assert_allclose(scores, expected, atol=1e-6)
+    assert keys[int(np.argmax(scores))] == "chunk_3"
+
+def test_index_persists_and_reuses_rows(tmp_path, vectors):
+    first = VectorIndex(str(tmp_path / "cluster_1"))
+    first.sync(vectors.keys(), vectors.__getitem__)
+    first.sync(list(vectors.keys())[:30], vectors.__getitem__)
+    reopened = VectorIndex(str(tmp_path / "cluster_1"))
+    assert len(reopened) == 30
+    reopened.sync(list(vectors.keys())[:30] + ["new"], lambda key: vectors.get(key, vectors["chunk_0"]))
+    assert len(reopened.row_keys) == 50
+    keys, _ = reopened.score(vectors["chunk_0"])
+    assert "new" in keys and len(keys) == 31
+
+def test_sync_version_reads_entries_once_per_version(index, vectors):
+    calls = []
+    def entries():
+        calls.append(1)
+        return ((key, ("chunks", i), vector) for i, (key, vector) in enumerate(vectors.items()))
+    assert index.sync_version(("v1",), entries) == (50, 0)
+    assert index.sync_version(("v1",), entries) == (0, 0)
+    assert len(calls) == 1
+    keys, scores = index.score(vectors["chunk_4"])
+    assert index.payload(keys[int(np.argmax(scores))]) == ("chunks", 4)
+    index.clear()
+    assert index.sync_version(("v1",), entries) == (50, 0)
+    assert len(calls) == 2
+
+def test_search_returns_payloads(index, vectors):
+    index.sync_version(("v1",), lambda: ((key, ("chunks", i), vector) for i, (key, vector) in enumerate(vectors.items())))
+    payloads, scores = index.search(vectors["chunk_7"])
+    assert len(payloads) == len(scores) == 50
+    assert payloads[int(np.argmax(scores))] == ("chunks", 7)
+
+def test_concurrent_syncs_keep_payloads_matched(index, vectors):
+    # Each version indexes the same vectors under its own keys; a search must never mix them up
+    def entries(prefix):
+        return lambda: ((f"{prefix}_{key}", (prefix, key), vector) for key, vector in vectors.items())
+    errors = []
+    def sync_loop():
+        for i in range(20):
+            index.sync_version((i,), entries("ab"[i % 2]))
+    def search_loop():
+        for _ in range(40):
+            payloads, _ = index.search(vectors["chunk_0"])
+            if not payloads or any(payload is None for payload in payloads) or len({p[0] for p in payloads}) != 1:
+                errors.append(payloads)
+    index.sync_version((-1,), entries("b"))
+    threads = [threading.Thread(target=sync_loop), threading.Thread(target=search_loop), threading.Thread(target=search_loop)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+def test_clear(index, vectors):
+    index.sync(vectors.keys(), vectors.__getitem__)
+    index.clear()
+    keys, scores = index.score(vectors["chunk_0"])
+    assert keys == [] and len(scores) == 0
+
+def test_open_indexes_are_bounded(tmp_path, vectors, monkeypatch):
+    monkeypatch.setattr(disk_index, "VECTOR_INDEX_MAX_OPEN", 2)
+    monkeypatch.setattr(disk_index, "_OPEN_INDEXES", disk_index.OrderedDict())
+    first = VectorIndex.for_cluster("cluster_a", root=str(tmp_path))
+    first.sync(vectors.keys(), vectors.__getitem__)
+    VectorIndex.for_cluster("cluster_b", root=str(tmp_path))
+    assert VectorIndex.for_cluster("cluster_a", root=str(tmp_path)) is first  # Now the most recently used
+    VectorIndex.for_cluster("cluster_c", root=str(tmp_path))
+    assert len(disk_index._OPEN_INDEXES) == 2
+    assert str(tmp_path / "cluster_b") not in disk_index._OPEN_INDEXES
+
+def test_closed_index_reloads_from_disk(index, vectors):
+    index.sync(vectors.keys(), vectors.__getitem__)
+    index.close()
+    assert len(index) == 0
+    keys, _ = index.score(vectors["chunk_0"])
+    assert len(keys) == 50
+
+# ANN Tests
+def test_ann_with_all_probes_matches_exact(index, vectors):
+    index.sync(vectors.keys(), vectors.__getitem__)
+    index.build_ann(n_lists=5)
+    assert index.has_ann
+    query = vectors["chunk_7"]
+    exact_keys, exact_scores = index.score(query)
+    ann_keys, ann_scores = index.score(query, n_probes=5)
+    assert dict(zip(ann_keys, ann_scores)) == pytest.approx(dict(zip(exact_keys, exact_scores)))
+
+def test_ann_returns_subset_and_finds_query(index, vectors):
+    index.sync(vectors.keys(), vectors.__getitem__)
+    index.build_ann(n_lists=5)
+    keys, scores = index.score(vectors["chunk_7"], n_probes=1)
+    assert len(keys) < len(vectors)
+    assert keys[int(np.argmax(scores))] == "chunk_7"
+
+def test_ann_follows_sync(index, vectors):
+    index.sync(vectors.keys(), vectors.__getitem__)
+    index.build_ann(n_lists=5)
+    kept = list(vectors.keys())[:45]
+    index.sync(kept + ["new"], lambda key: vectors.get(key, vectors["chunk_49"]))
+    keys, _ = index.score(vectors["chunk_0"], n_probes=5)
+    assert sorted(keys) == sorted(kept + ["new"])
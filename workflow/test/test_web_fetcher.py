@@ -0,0 +1,153 @@
+import os
+import time
+import pytest
+import asyncio
+import aiohttp
+from aiohttp import web
+
+from workflow.util.web_fetcher import WebFetcher, WebPageCache, FetchedPage, has_credentials
+
+PAGE = "<html><head><title>Cached page</title></head><body>Hello</body></html>"
+
+async def serve(handler_counts: dict):
+    async def page(request: web.Request) -> web.Response:
+        handler_counts["page"] = handler_counts.get("page", 0) + 1
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304, headers={"ETag": '"v1"'})
+        return web.Response(text=PAGE, content_type="text/html", headers={"ETag": '"v1"'})
+
+    async def plain(request: web.Request) -> web.Response:
+        return web.Response(text="no validators", content_type="text/html")
+
+    async def missing(request: web.Request) -> web.Response:
+        return web.Response(status=404)
+
+    async def slow(request: web.Request) -> web.Response:
+        await asyncio.sleep(0.2)
+        return web.Response(text="slow", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/page", page)
+    app.router.add_get("/plain", plain)
+    app.router.add_get("/missing", missing)
+    app.router.add_get("/slow", slow)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+# Fixtures
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "web_cache")
+
+def run(coroutine_factory):
+    async def wrapper():
+        counts: dict = {}
+        runner, base_url = await serve(counts)
+        try:
+            return await coroutine_factory(base_url, counts)
+        finally:
+            await runner.cleanup()
+    return asyncio.run(wrapper())
+
+# Conditional GET Tests
+def test_unchanged_page_served_from_cache(cache_dir):
+    async def scenario(base_url, counts):
+        fetcher = WebFetcher(cache=WebPageCache(cache_dir))
+        first = await fetcher.fetch(f"{base_url}/page")
+        second = await fetcher.fetch(f"{base_url}/page")
+        await fetcher.close()
+        return first, second, counts
+    first, second, counts = run(scenario)
+    assert first.text == PAGE and not first.from_cache
+    assert second.text == PAGE and second.from_cache
+    assert counts["page"] == 2
+
+def test_cache_shared_across_fetchers(cache_dir):
+    async def scenario(base_url, counts):
+        for _ in range(2):
+            fetcher = WebFetcher(cache=WebPageCache(cache_dir))
+            page = await fetcher.fetch(f"{base_url}/page")
+            await fetcher.close()
+        return page
+    assert run(scenario).from_cache
+
+def test_pages_without_validators_are_not_cached(cache_dir):
+    async def scenario(base_url, counts):
+        fetcher = WebFetcher(cache=WebPageCache(cache_dir))
+        await fetcher.fetch(f"{base_url}/plain")
+        page = await fetcher.fetch(f"{base_url}/plain")
+        await fetcher.close()
+        return page
+    page = run(scenario)
+    assert page.text == "no validators" and not page.from_cache
+
+# Cache Bound Tests
+def page(url: str) -> FetchedPage:
+    return FetchedPage(url=url, status=200, text="body", etag='"v1"')
+
+def test_cache_keeps_most_recently_used_pages(cache_dir):
+    cache = WebPageCache(cache_dir, max_entries=2)
+    now = time.time()
+    for index, url in enumerate(["https://a.test/", "https://b.test/", "https://c.test/"]):
+        cache.put(page(url))
+        os.utime(cache._path(url, "json"), (now - 100 + index, now - 100 + index))
+    os.utime(cache._path("https://a.test/", "json"), (now, now))  # Used after the others
+    assert cache.prune() == 1
+    assert cache.get("https://a.test/") is not None and cache.get("https://c.test/") is not None
+    assert cache.get("https://b.test/") is None
+    assert not os.path.exists(cache._path("https://b.test/", "html"))
+
+def test_expired_pages_are_dropped(cache_dir):
+    cache = WebPageCache(cache_dir, max_age=60)
+    cache.put(page("https://a.test/"))
+    assert cache.get("https://a.test/") is not None
+    cache.max_age = -1
+    assert cache.get("https://a.test/") is None
+    assert not os.path.exists(cache._path("https://a.test/", "json"))
+
+def test_urls_with_credentials_are_not_cached(cache_dir):
+    cache = WebPageCache(cache_dir)
+    for url in ["https://a.test/?api_key=abc", "https://a.test/?x=1&Token=abc", "https://user:pw@a.test/"]:
+        assert has_credentials(url)
+        cache.put(page(url))
+        assert cache.get(url) is None
+    assert not has_credentials("https://a.test/search?q=token")
+    assert not os.path.exists(cache_dir) or not os.listdir(cache_dir)
+
+# Error and Concurrency Tests
+def test_http_errors_raise(cache_dir):
+    async def scenario(base_url, counts):
+        fetcher = WebFetcher(cache=WebPageCache(cache_dir))
+        try:
+            with pytest.raises(aiohttp.ClientResponseError):
+                await fetcher.fetch(f"{base_url}/missing")
+        finally:
+            await fetcher.close()
+    run(scenario)
+
+def test_fetch_many_runs_concurrently(cache_dir):
+    async def scenario(base_url, counts):
+        fetcher = WebFetcher(cache=WebPageCache(cache_dir), limit_per_host=8)
+        start = asyncio.get_running_loop().time()
+        results = await fetcher.fetch_many([f"{base_url}/slow"] * 5 + [f"{base_url}/missing"])
+        elapsed = asyncio.get_running_loop().time() - start
+        await fetcher.close()
+        return results, elapsed
+    results, elapsed = run(scenario)
+    assert [r.text for r in results[:5]] == ["slow"] * 5
+    assert isinstance(results[5], aiohttp.ClientResponseError)
+    assert elapsed < 0.8
+
+def test_timeout(cache_dir):
+    async def scenario(base_url, counts):
+        fetcher = WebFetcher(cache=WebPageCache(cache_dir), timeout=0.05)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await fetcher.fetch(f"{base_url}/slow")
+        finally:
+            await fetcher.close()
+    run(scenario)
@@ -0,0 +1,53 @@
+import pytest
+
+from workflow.util.web_scrape_utils import (
+    apply_parsing_strategy, extract_title, fallback_parsing_strategy, parse_html, prepare_html
+)
+
+PAGE = """<html><head><title>Guide &amp; Notes</title><script>var x = 1;</script></head>
+<body>
+<nav><p>Menu</p></nav>
+<div id="content">
+  <h1>Heading</h1>
+  <p class="intro">First paragraph.</p>
+  <div class="body"><p>Second paragraph.</p><p>Third paragraph.</p></div>
+</div>
+<footer><p>Footer</p></footer>
+</body></html>"""
+
+# Fixtures
+@pytest.fixture
+def prepared():
+    return prepare_html(PAGE)
+
+# Title Tests
+def test_extract_title():
+    assert extract_title(PAGE) == "Guide & Notes"
+    assert extract_title("<html><body>No title</body></html>") == "No title found"
+
+# Preprocessing Tests
+def test_prepare_html_removes_non_content(prepared):
+    soup, cleaned_html = prepared
+    assert "Menu" not in cleaned_html and "Footer" not in cleaned_html and "var x" not in cleaned_html
+    assert soup.find("nav") is None
+
+def test_parse_html_passes_trees_through(prepared):
+    soup, _ = prepared
+    assert parse_html(soup) is soup
+
+# Parsing Strategy Tests
+def test_selectors_keep_reading_order_and_skip_nested_matches(prepared):
+    soup, _ = prepared
+    # The more specific `.body p` selectors are applied first, `#content h1` must still come first in the output
+    content = apply_parsing_strategy(soup, ["#content h1", "#content .body p", "#content .body"])
+    assert content == "Heading Second paragraph. Third paragraph."
+
+def test_tree_and_string_inputs_agree(prepared):
+    soup, cleaned_html = prepared
+    selectors = ["#content p", "h1"]
+    assert apply_parsing_strategy(soup, selectors) == apply_parsing_strategy(cleaned_html, selectors)
+    assert fallback_parsing_strategy(soup) == fallback_parsing_strategy(cleaned_html)
+
+def test_no_matches_returns_none(prepared):
+    soup, _ = prepared
+    assert apply_parsing_strategy(soup, ["article"]) is None
@@ -0,0 +1,135 @@
+import sys, time, random, re, argparse
+from pathlib import Path
+
+current_dir = Path(__file__).parent.absolute()
+parent_dir = current_dir.parent
+if parent_dir not in sys.path:
+    sys.path.insert(0, str(parent_dir))
+from workflow.util import LOGGER
+from workflow.util.code_utils import Language, get_separators_for_language
+from workflow.util.text_splitters.text_splitter import TextSplitter, LengthType
+from workflow.util.text_splitters.utils.regex_utils import split_text_with_regex
+
+WORDS = ("the of and to in is was for on that with as by at from it an be this are or have which one had not but what all were "
+         "when we there can been has more if will would who so about out up into them than its time only could new some these "
+         "retrieval embedding vector chunk token splitter context window überprüfung naïve café 東京 データ").split()
+
+def build_corpus(size: int, seed: int = 0) -> str:
+    """About `size` characters of prose, markdown and Python, in paragraphs of varying length."""
+    rng = random.Random(seed)
+    sentence = lambda: " ".join(rng.choices(WORDS, k=rng.randint(4, 30))).capitalize() + rng.choice([".", ".", "!", "?"])
+    parts, total = [], 0
+    while total < size:
+        kind = rng.random()
+        if kind < 0.6:
+            part = " ".join(sentence() for _ in range(rng.randint(1, 12)))
+        elif kind < 0.8:
+            part = f"## {sentence()}\n\n- " + "\n- ".join(sentence() for _ in range(rng.randint(1, 6)))
+        else:
+            name = rng.choice(WORDS[:40])
+            body = "\n".join(f"    {rng.choice(WORDS[:40])}_{i} = {rng.randint(0, 999)}  # {sentence()}" for i in range(rng.randint(2, 15)))
+            part = f"class {name.capitalize()}Handler:\n    def {name}(self):\n{body}\n\ndef run_{name}():\n    return {name}"
+        parts.append(part)
+        total += len(part) + 2
+    return "\n\n".join(parts)[:size]
+
+def legacy_split(splitter: TextSplitter, text: str) -> list:
+    """The previous algorithm: lists at every level, re.escape/re.search per separator, slicing pops, sizes re-measured."""
+    def merge(chunks, separator):
+        separator_len = splitter.get_string_size(separator)
+        docs, current_doc, total = [], [], 0
+        for d in chunks:
+            _len = splitter.get_string_size(d)
+            if total + _len + (separator_len if len(current_doc) > 0 else 0) > splitter.chunk_size:
+                if len(current_doc) > 0:
+                    doc = splitter._join_docs(current_doc, separator)
+                    if doc is not None:
+                        docs.append(doc)
+                    while total > splitter.chunk_overlap or (
+                        total + _len + (separator_len if len(current_doc) > 0 else 0) > splitter.chunk_size and total > 0
+                    ):
+                        total -= splitter.get_string_size(current_doc[0]) + (separator_len if len(current_doc) > 1 else 0)
+                        current_doc = current_doc[1:]
+            current_doc.append(d)
+            total += _len + (separator_len if len(current_doc) > 1 else 0)
+        doc = splitter._join_docs(current_doc, separator)
+        if doc is not None:
+            docs.append(doc)
+        return docs
+
+    def recurse(text, separators):
+        final_chunks = []
+        separator = separators[-1]
+        new_separators = []
+        for i, _s in enumerate(separators):
+            _separator = _s if splitter.is_separator_regex else re.escape(_s)
+            if _s == "":
+                separator = _s
+                break
+            if re.search(_separator, text):
+                separator = _s
+                new_separators = separators[i + 1:]
+                break
+        _separator = separator if splitter.is_separator_regex else re.escape(separator)
+        chunks = split_text_with_regex(text, _separator, splitter.keep_separator)
+        _good_chunks = []
+        _separator = "" if splitter.keep_separator else separator
+        for s in chunks:
+            if splitter.get_string_size(s) < splitter.chunk_size:
+                _good_chunks.append(s)
+            else:
+                if _good_chunks:
+                    final_chunks.extend(merge(_good_chunks, _separator))
+                    _good_chunks = []
+                if not new_separators:
+                    final_chunks.append(s)
+                else:
+                    final_chunks.extend(recurse(s, new_separators))
+        if _good_chunks:
+            final_chunks.extend(merge(_good_chunks, _separator))
+        return final_chunks
+
+    return recurse(text, splitter.separators or get_separators_for_language(splitter.language))
+
+CONFIGS = {
+    "text/token": TextSplitter(),
+    "text/char": TextSplitter(length_function=LengthType.CHARACTER, chunk_size=1000, chunk_overlap=100),
+    "python/char": TextSplitter(language=Language.PYTHON, length_function=LengthType.CHARACTER, chunk_size=1000, chunk_overlap=100),
+    "markdown/token": TextSplitter(language=Language.MARKDOWN, chunk_size=300, chunk_overlap=50),
+}
+
+def time_call(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmark(sizes_mb: list, repeats: int, skip_legacy_above: float):
+    LOGGER.setLevel("ERROR")  # Oversized chunks are logged as warnings
+    rows = []
+    for size_mb in sizes_mb:
+        text = build_corpus(int(size_mb * 1_000_000))
+        megabytes = len(text.encode("utf-8")) / 1_000_000
+        for name, splitter in CONFIGS.items():
+            if splitter.split_text(text) != legacy_split(splitter, text):
+                raise AssertionError(f"{name} diverged from the previous algorithm on {size_mb} MB")
+            current_s = time_call(lambda: splitter.split_text(text), repeats)
+            legacy_s = time_call(lambda: legacy_split(splitter, text), repeats) if size_mb <= skip_legacy_above else None
+            rows.append((size_mb, name, megabytes, legacy_s, current_s))
+    LOGGER.setLevel("INFO")
+    LOGGER.info(f"TextSplitter throughput (best of {repeats})")
+    LOGGER.info(f"{'MB':>6}  {'config':<16}{'previous MB/s':>15}{'current MB/s':>14}{'speedup':>9}")
+    for size_mb, name, megabytes, legacy_s, current_s in rows:
+        legacy_rate = f"{megabytes / legacy_s:.2f}" if legacy_s is not None else "skipped"
+        speedup = f"{legacy_s / current_s:.1f}x" if legacy_s is not None else "-"
+        LOGGER.info(f"{size_mb:>6}  {name:<16}{legacy_rate:>15}{megabytes / current_s:>14.2f}{speedup:>9}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TextSplitter throughput in MB/s, against the previous list-based algorithm")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[0.5, 2, 8], help="Corpus sizes in MB")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--skip-legacy-above", type=float, default=8, help="Don't time the previous algorithm on larger corpora")
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.repeats, args.skip_legacy_above)
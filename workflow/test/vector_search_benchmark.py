@@ -0,0 +1,63 @@
+import sys, time, argparse, tempfile
+import numpy as np
+from pathlib import Path
+
+current_dir = Path(__file__).parent.absolute()
+parent_dir = current_dir.parent
+if parent_dir not in sys.path:
+    sys.path.insert(0, str(parent_dir))
+from workflow.util import LOGGER
+from workflow.util.vector_index import VectorIndex, select_top_k
+
+def generate_clustered_vectors(n_vectors: int, dimension: int, n_topics: int, seed: int = 0) -> np.ndarray:
+    """Vectors drawn around random topic centers, which is closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(n_topics, dimension)).astype(np.float32)
+    labels = rng.integers(0, n_topics, size=n_vectors)
+    return topics[labels] + 0.6 * rng.normal(size=(n_vectors, dimension)).astype(np.float32)
+
+def build_index(directory: str, vectors: np.ndarray) -> VectorIndex:
+    index = VectorIndex(directory)
+    keys = [f"chunk_{i}" for i in range(len(vectors))]
+    start = time.perf_counter()
+    index.sync(keys, lambda key: vectors[int(key.split("_")[1])])
+    LOGGER.info(f"Indexed {len(vectors)} vectors in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    index.build_ann()
+    LOGGER.info(f"Trained IVF structure in {time.perf_counter() - start:.2f}s")
+    return index
+
+def timed_search(index: VectorIndex, queries: np.ndarray, k: int, n_probes: int = None):
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        keys, scores = index.score(query, n_probes=n_probes)
+        top = select_top_k(scores, k)
+        latencies.append(time.perf_counter() - start)
+        results.append({keys[i] for i in top})
+    return results, np.array(latencies) * 1000
+
+def run_benchmark(n_vectors: int, dimension: int, n_queries: int, k: int, probes: list):
+    vectors = generate_clustered_vectors(n_vectors, dimension, n_topics=max(10, n_vectors // 500))
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(0, n_vectors, size=n_queries)] + 0.3 * rng.normal(size=(n_queries, dimension)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = build_index(directory, vectors)
+        exact_results, exact_ms = timed_search(index, queries, k)
+        LOGGER.info(f"{'mode':<12}{'recall@' + str(k):>12}{'p50 ms':>10}{'p95 ms':>10}")
+        LOGGER.info(f"{'exact':<12}{1.0:>12.3f}{np.percentile(exact_ms, 50):>10.2f}{np.percentile(exact_ms, 95):>10.2f}")
+        for n_probes in probes:
+            ann_results, ann_ms = timed_search(index, queries, k, n_probes=n_probes)
+            recall = np.mean([len(a & e) / len(e) for a, e in zip(ann_results, exact_results)])
+            LOGGER.info(f"{'ivf/' + str(n_probes):<12}{recall:>12.3f}{np.percentile(ann_ms, 50):>10.2f}{np.percentile(ann_ms, 95):>10.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall vs latency of exact and IVF retrieval over a VectorIndex")
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    args = parser.parse_args()
+    run_benchmark(args.vectors, args.dimension, args.queries, args.k, args.probes)
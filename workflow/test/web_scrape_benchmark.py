@@ -0,0 +1,68 @@
+import sys, time, argparse
+import numpy as np
+from pathlib import Path
+from bs4 import BeautifulSoup
+
+current_dir = Path(__file__).parent.absolute()
+parent_dir = current_dir.parent
+if parent_dir not in sys.path:
+    sys.path.insert(0, str(parent_dir))
+from workflow.util import LOGGER
+from workflow.util.web_scrape_utils import (
+    HTML_PARSER, apply_parsing_strategy, clean_text, extract_title, fallback_parsing_strategy, parse_html, preprocess_soup
+)
+
+DEFAULT_SELECTORS = ["article p", "main p", "#content p", "h1", "h2", "h3", "p", "li"]
+
+def load_corpus(corpus_dir: str = None):
+    """Saved pages (*.html) from `corpus_dir`, or the Wikipedia page saved in web_scrape_test."""
+    if corpus_dir:
+        pages = [(path.name, path.read_text(encoding="utf-8", errors="replace")) for path in sorted(Path(corpus_dir).glob("*.html"))]
+        return pages, DEFAULT_SELECTORS
+    from workflow.test.web_scrape_test import inputs
+    return [("web_scrape_test", inputs["original_content"])], inputs["selectors"]
+
+def reparse_pipeline(html: str, selectors: list, parser: str) -> str:
+    """The previous flow: every stage takes a string and parses it again."""
+    title_soup = BeautifulSoup(html, parser)
+    title_soup.title.string if title_soup.title else None
+    cleaned_html = str(preprocess_soup(BeautifulSoup(html, parser)))
+    content = apply_parsing_strategy(BeautifulSoup(cleaned_html, parser), selectors)
+    fallback = fallback_parsing_strategy(BeautifulSoup(cleaned_html, parser))
+    return clean_text((content or "") + " " + (fallback or ""))
+
+def single_parse_pipeline(html: str, selectors: list, parser: str) -> str:
+    """The current flow: one parse, and the cleaned tree is passed to every stage."""
+    extract_title(html)
+    soup = preprocess_soup(parse_html(html, parser))
+    str(soup)  # serialized for sampling
+    content = apply_parsing_strategy(soup, selectors)
+    fallback = fallback_parsing_strategy(soup)
+    return clean_text((content or "") + " " + (fallback or ""))
+
+def run_benchmark(corpus_dir: str, repeats: int):
+    pages, selectors = load_corpus(corpus_dir)
+    total_mb = sum(len(html.encode("utf-8")) for _, html in pages) / 1e6
+    LOGGER.info(f"Corpus: {len(pages)} pages, {total_mb:.2f} MB, fast parser: {HTML_PARSER}")
+    modes = [
+        ("re-parse/html.parser", reparse_pipeline, "html.parser"),
+        ("single/html.parser", single_parse_pipeline, "html.parser"),
+        (f"single/{HTML_PARSER}", single_parse_pipeline, HTML_PARSER),
+    ]
+    LOGGER.info(f"{'pipeline':<24}{'p50 ms':>10}{'total s':>10}{'MB/s':>8}")
+    for name, pipeline, parser in modes:
+        latencies = []
+        for _ in range(repeats):
+            for _, html in pages:
+                start = time.perf_counter()
+                pipeline(html, selectors, parser)
+                latencies.append(time.perf_counter() - start)
+        total = sum(latencies)
+        LOGGER.info(f"{name:<24}{np.percentile(latencies, 50) * 1000:>10.1f}{total:>10.2f}{total_mb * repeats / total:>8.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPU cost of the web scrape HTML pipeline over a corpus of saved pages")
+    parser.add_argument("--corpus", type=str, default=None, help="Directory of saved *.html pages (defaults to the page in web_scrape_test)")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    run_benchmark(args.corpus, args.repeats)
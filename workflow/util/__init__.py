@@ -1,16 +1,35 @@
 from .logger import LOGGER, LOG_LEVEL
 from .const import BACKEND_PORT, FRONTEND_PORT, WORKFLOW_PORT, HOST, CHAR_TO_TOKEN
-from .text_splitters import SemanticTextSplitter, TextSplitter, EmbeddingGenerator, SplitterType, LengthType, est_token_count, est_messages_token_count
-from .message_prune import MessagePruner, MessageScore, MessageStats, MessageApiFormat, RoleTypes, ReplacementStrategy, ScoreConfig
+from .message_prune import MessagePruner, MessageScore, MessageStats, MessageApiFormat, RoleTypes, ReplacementStrategy, ScoreConfig, get_pruning_states, pruning_conversation
 from .type_utils import resolve_json_type, convert_value_to_type, json_to_python_type_mapping
 from .utils import (
     check_cuda_availability, cosine_similarity, 
     get_traceback, sanitize_string, sanitize_and_limit_string
     )
-from .code_utils import DockerCodeRunner, Language, get_language_matching, get_separators_for_language
+from .token_counter import TokenCounter, get_token_counter, register_token_counter
+from .streaming import is_streaming, stream_deltas, emit_delta, get_stream_sink
+from .lazy_imports import lazy_exports
+
+# Utilities with heavy dependencies (docker, aiohttp, bs4, the splitters) load on first access
+_EXPORTS = {
+    **{name: ".text_splitters" for name in ["SemanticTextSplitter", "BaseTextSplitter", "TextSplitter", "EmbeddingGenerator", "SplitterType", "LengthType", "est_token_count", "est_messages_token_count"]},
+    **{name: ".code_utils" for name in ["DockerCodeRunner", "Language", "get_language_matching", "get_separators_for_language"]},
+    "SimilarityEngine": ".vector_index",
+    "EmbeddingCache": ".embedding_cache", "get_embedding_cache": ".embedding_cache",
+    "create_client_session": ".http_session",
+    "AsyncTTLCache": ".ttl_cache",
+    "ModelResidencyManager": ".model_residency", "get_model_residency": ".model_residency", "model_key": ".model_residency",
+    "WebFetcher": ".web_fetcher", "get_web_fetcher": ".web_fetcher",
+    "SelectorCache": ".selector_cache", "get_selector_cache": ".selector_cache",
+}
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = ['BACKEND_PORT', 'FRONTEND_PORT',  'LOGGER', 'WORKFLOW_PORT', 'HOST', 'LOG_LEVEL', 'est_token_count', 'LengthType', 'json_to_python_type_mapping', 
            'est_messages_token_count', 'RecursiveTextSplitter', 'Language', 'cosine_similarity', 'convert_value_to_type', 'CHAR_TO_TOKEN',
            'get_traceback', 'sanitize_string', 'sanitize_and_limit_string', 'check_cuda_availability', 'get_language_matching', 'get_separators_for_language',
-           'resolve_json_type', 'TextSplitter', 'EmbeddingGenerator', 'SplitterType', 'RecursiveTextSplitter', 'SemanticTextSplitter', 
-           'MessagePruner', 'MessageScore', 'MessageStats', 'MessageApiFormat', 'RoleTypes', 'ReplacementStrategy', 'ScoreConfig', 'DockerCodeRunner']
\ No newline at end of file
+           'resolve_json_type', 'BaseTextSplitter', 'TextSplitter', 'EmbeddingGenerator', 'SplitterType', 'RecursiveTextSplitter', 'SemanticTextSplitter', 
+           'MessagePruner', 'MessageScore', 'MessageStats', 'MessageApiFormat', 'RoleTypes', 'ReplacementStrategy', 'ScoreConfig', 'DockerCodeRunner',
+           'SimilarityEngine', 'EmbeddingCache', 'get_embedding_cache', 'create_client_session', 'AsyncTTLCache',
+           'ModelResidencyManager', 'get_model_residency', 'model_key', 'WebFetcher', 'get_web_fetcher',
+           'SelectorCache', 'get_selector_cache', 'get_pruning_states', 'pruning_conversation',
+           'is_streaming', 'stream_deltas', 'emit_delta', 'get_stream_sink', 'TokenCounter', 'get_token_counter', 'register_token_counter']
\ No newline at end of file
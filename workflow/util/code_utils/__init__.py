@@ -1,4 +1,5 @@
 from .code_utils import Language, get_language_matching, get_separators_for_language
 from .run_code_in_docker import DockerCodeRunner
+from .container_pool import DockerContainerPool, get_container_pool, close_container_pools
 
-__all__ = ['Language', 'get_language_matching', 'get_separators_for_language', 'DockerCodeRunner', 'run_code']
+__all__ = ['Language', 'get_language_matching', 'get_separators_for_language', 'DockerCodeRunner', 'DockerContainerPool', 'get_container_pool', 'close_container_pools', 'run_code']
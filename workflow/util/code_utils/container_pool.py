@@ -0,0 +1,226 @@
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import docker
+from workflow.util.const import CODE_RUNNER_POOL_SIZE, CODE_RUNNER_MAX_RUNS
+from workflow.util.logger import LOGGER
+
+# Pooled containers run as `nobody` on a read-only root filesystem, so the tmpfs mounts are the only
+# places a run can write to. Each run gets its own directory there, used as working directory and $HOME.
+RUN_DIR_COMMAND = "mktemp -d /tmp/run.XXXXXXXX"
+# Removes everything the last run wrote and kills anything it left running (PID 1 is spared by `kill -1`)
+RESET_COMMAND = "bash -c 'rm -rf /tmp/* /tmp/.[!.]* /dev/shm/* /dev/shm/.[!.]* 2>/dev/null; kill -9 -1 2>/dev/null; true'"
+TIMEOUT_EXIT_CODES = (124, 137)  # coreutils `timeout`: 124 after SIGTERM, 128 + 9 after SIGKILL
+SKIPPED_AFTER_TIMEOUT = "Skipped: an earlier command of the session timed out"
+DEFAULT_CONTAINER_OPTIONS = {
+    "mem_limit": "512m",
+    "cpu_quota": 50000,
+    "network_disabled": False,
+    "user": "nobody",
+    "read_only": True,
+    "tmpfs": {"/tmp": "rw,exec,nosuid,nodev,size=512m,mode=1777"},
+}
+
+def run_environment(run_dir: str) -> Dict[str, str]:
+    """Environment for a run in `run_dir`: home, caches and user package installs all stay inside it."""
+    return {
+        "HOME": run_dir,
+        "TMPDIR": run_dir,
+        "PYTHONUSERBASE": f"{run_dir}/.local",
+        "PIP_USER": "1",
+        "PIP_CACHE_DIR": f"{run_dir}/.cache/pip",
+        "npm_config_cache": f"{run_dir}/.npm",
+        "NODE_PATH": "/app/node_modules",  # Packages preinstalled in the image's WORKDIR
+        "TS_NODE_PROJECT": "/app/tsconfig.json",
+    }
+
+class PooledContainer:
+    """A started, idle-by-default container and the number of executions it has served."""
+    def __init__(self, container: Any, language: str):
+        self.container = container
+        self.language = language
+        self.runs = 0
+
+class DockerContainerPool:
+    """
+    Pool of pre-started containers per language, so short code blocks don't pay for a container start.
+
+    Containers run `sleep infinity` and code is executed in them with `exec`. By default they run as an
+    unprivileged user on a read-only root filesystem, with tmpfs for the writable paths, and every run
+    works in a fresh directory of its own. After each run the container is reset (everything written to
+    the tmpfs mounts removed, leftover processes killed), so the next run, which may belong to another
+    user, starts clean. It is then returned to the pool, unless:
+    - it ran setup commands, which may have changed its environment (e.g. pip installs)
+    - it timed out or failed to reset
+    - it has served `max_runs` executions
+    - the pool for its language already holds `pool_size` idle containers
+    - `container_options` don't isolate runs (writable root filesystem or root user), in which case no
+      reset can guarantee a clean container and every container is used for a single run
+    in which case it is removed. All methods block on the Docker API; call them from a worker thread.
+    """
+    def __init__(
+        self,
+        images: Dict[str, str],
+        pool_size: int = CODE_RUNNER_POOL_SIZE,
+        max_runs: int = CODE_RUNNER_MAX_RUNS,
+        container_options: Optional[Dict[str, Any]] = None,
+        client_factory: Callable[[], Any] = docker.from_env,
+    ):
+        self.images = images
+        self.pool_size = pool_size
+        self.max_runs = max_runs
+        self.container_options = container_options or dict(DEFAULT_CONTAINER_OPTIONS)
+        self.client_factory = client_factory
+        self._client: Optional[Any] = None
+        self._idle: Dict[str, List[PooledContainer]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self._client = self.client_factory()
+        return self._client
+
+    @property
+    def isolated(self) -> bool:
+        """Whether a reset leaves nothing of a run behind: root filesystem read-only and a non-root user."""
+        user = str(self.container_options.get("user") or "root")
+        return bool(self.container_options.get("read_only")) and user.split(":")[0] not in ("root", "0")
+
+    def idle_count(self, language: str) -> int:
+        return len(self._idle[language])
+
+    def _start(self, language: str) -> PooledContainer:
+        container = self.client.containers.run(
+            self.images[language],
+            "sleep infinity",
+            detach=True,
+            labels={"project_alice.code_runner_pool": language},
+            **self.container_options
+        )
+        return PooledContainer(container, language)
+
+    def _remove(self, pooled: PooledContainer) -> None:
+        try:
+            pooled.container.remove(force=True)
+        except Exception as e:
+            LOGGER.warning(f"Error while removing pooled container: {e}")
+
+    def acquire(self, language: str) -> PooledContainer:
+        """Take an idle container for `language`, starting a new one if there is none."""
+        if language not in self.images:
+            raise ValueError(f"Unsupported language: {language}")
+        with self._lock:
+            if self._idle[language]:
+                return self._idle[language].pop()
+        return self._start(language)
+
+    def release(self, pooled: PooledContainer, reusable: bool = True) -> None:
+        """Reset `pooled` and put it back in the pool, or remove it when it shouldn't be reused."""
+        pooled.runs += 1
+        if reusable and self.isolated and pooled.runs < self.max_runs and self.idle_count(pooled.language) < self.pool_size:
+            try:
+                exit_code, _ = pooled.container.exec_run(RESET_COMMAND)
+                reusable = exit_code == 0
+            except Exception as e:
+                LOGGER.warning(f"Error resetting pooled container: {e}")
+                reusable = False
+            if reusable:
+                with self._lock:
+                    if len(self._idle[pooled.language]) < self.pool_size:
+                        self._idle[pooled.language].append(pooled)
+                        return
+        self._remove(pooled)
+
+    def _make_run_dir(self, pooled: PooledContainer) -> str:
+        exit_code, output = pooled.container.exec_run(RUN_DIR_COMMAND)
+        run_dir = (output or b"").decode("utf-8", errors="replace").strip()
+        if exit_code != 0 or not run_dir.startswith("/tmp/"):
+            raise RuntimeError(f"Could not create a run directory in the pooled container: {run_dir}")
+        return run_dir
+
+    def _exec(self, pooled: PooledContainer, command: str, timeout: int, run_dir: str) -> Tuple[str, int]:
+        exit_code, output = pooled.container.exec_run(
+            f"timeout -s KILL {timeout} {command}", workdir=run_dir, environment=run_environment(run_dir)
+        )
+        logs = (output or b"").decode("utf-8", errors="replace")
+        if exit_code in TIMEOUT_EXIT_CODES:
+            raise TimeoutError(f"Timeout: Execution exceeded {timeout} seconds. Partial logs: {logs}")
+        return logs, exit_code
+
+    def execute_session(self, commands: List[str], language: str, timeout: int, reusable: bool = True) -> List[Tuple[str, int]]:
+        """
+        Run `commands` one after another in the same pooled container and run directory, so later
+        commands see the files and packages left by earlier ones. Each command is killed after
+        `timeout` seconds; a command that times out gets the timeout message and exit code 1, and
+        the commands after it, which may depend on it, are skipped.
+
+        Returns:
+            One tuple of (combined stdout/stderr, exit code) per command
+        """
+        pooled = self.acquire(language)
+        outputs: List[Tuple[str, int]] = []
+        try:
+            run_dir = self._make_run_dir(pooled)
+            for command in commands:
+                try:
+                    outputs.append(self._exec(pooled, command, timeout, run_dir))
+                except TimeoutError as e:
+                    reusable = False
+                    outputs.append((str(e), 1))
+                    outputs.extend([(SKIPPED_AFTER_TIMEOUT, 1)] * (len(commands) - len(outputs)))
+                    break
+            return outputs
+        except Exception:
+            reusable = False
+            raise
+        finally:
+            self.release(pooled, reusable=reusable)
+
+    def execute(self, command: str, language: str, timeout: int, reusable: bool = True) -> Tuple[str, int]:
+        """
+        Run a single command in a pooled container; see `execute_session`.
+
+        Raises:
+            TimeoutError: If the command exceeded the timeout
+        """
+        pooled = self.acquire(language)
+        try:
+            return self._exec(pooled, command, timeout, self._make_run_dir(pooled))
+        except Exception:
+            reusable = False
+            raise
+        finally:
+            self.release(pooled, reusable=reusable)
+
+    def warm_up(self, languages: Optional[List[str]] = None) -> None:
+        """Start containers until every language's pool holds `pool_size` idle containers."""
+        for language in languages or list(self.images.keys()):
+            while self.idle_count(language) < self.pool_size:
+                pooled = self._start(language)
+                with self._lock:
+                    self._idle[language].append(pooled)
+
+    def close(self) -> None:
+        """Remove every idle container."""
+        with self._lock:
+            idle = [pooled for containers in self._idle.values() for pooled in containers]
+            self._idle.clear()
+        for pooled in idle:
+            self._remove(pooled)
+        if idle:
+            LOGGER.info(f"Removed {len(idle)} pooled code runner containers")
+
+_CONTAINER_POOLS: Dict[Tuple[Tuple[str, str], ...], DockerContainerPool] = {}
+
+def get_container_pool(images: Dict[str, str]) -> DockerContainerPool:
+    """Returns the process-wide container pool for this set of images."""
+    key = tuple(sorted(images.items()))
+    if key not in _CONTAINER_POOLS:
+        _CONTAINER_POOLS[key] = DockerContainerPool(images)
+    return _CONTAINER_POOLS[key]
+
+def close_container_pools() -> None:
+    """Remove the idle containers of every pool. Called on application shutdown."""
+    for pool in _CONTAINER_POOLS.values():
+        pool.close()
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 import docker
-import base64, time
+import base64, time, asyncio
+from concurrent.futures import Executor
 from threading import Thread
 from queue import Queue
 from typing import Dict, Tuple, Optional, List
@@ -8,11 +9,19 @@ from docker.errors import DockerException, ContainerError, APIError
 from requests.exceptions import ReadTimeout, ConnectionError
 from urllib3.exceptions import ReadTimeoutError
 from workflow.util import LOGGER
+from workflow.util.const import CODE_RUNNER_POOL_SIZE
+from workflow.util.code_utils.container_pool import get_container_pool
 
 class DockerCodeRunner(BaseModel):
     """
     Handles code execution in Docker containers with optional setup commands.
     Maintains a simple interface while providing reliable code execution capabilities.
+
+    By default code runs in warm containers from the process-wide DockerContainerPool for these
+    images, each run in a directory of its own that is wiped before the container is reused; set
+    `use_pool` to False to start a fresh container per run. Scripts are written to the working
+    directory: the image's WORKDIR in a fresh container, the run directory in a pooled one. Blocking Docker calls are
+    made from a worker thread, never on the event loop.
     """
     timeout: int = Field(default=60, description="Timeout in seconds for code execution")
     retries: int = Field(default=1, description="Number of retry attempts")
@@ -26,6 +35,7 @@ class DockerCodeRunner(BaseModel):
         },
         description="Mapping of languages to Docker images"
     )
+    use_pool: bool = Field(default=CODE_RUNNER_POOL_SIZE > 0, description="Run code in pooled, pre-started containers")
 
     def _prepare_code(self, code: str) -> str:
         """Normalize and encode code for container execution"""
@@ -38,16 +48,34 @@ class DockerCodeRunner(BaseModel):
             setup_cmd = f'$(echo {setup_b64} | base64 -d) && ' if setup_b64 else ''
             return f'bash -c "{setup_cmd}python -c \\"import base64; exec(base64.b64decode(\'{code_b64}\').decode())\\"\"'
         elif language == 'shell':
-            return f'bash -c "echo {code_b64} | base64 -d > /tmp/script.sh && chmod +x /tmp/script.sh && /tmp/script.sh"'
+            return f'bash -c "echo {code_b64} | base64 -d > script.sh && chmod +x script.sh && ./script.sh"'
         elif language == 'javascript':
             setup_cmd = f'$(echo {setup_b64} | base64 -d) && ' if setup_b64 else ''
-            return f'bash -c "{setup_cmd}echo {code_b64} | base64 -d > /app/script.js && node /app/script.js"'
+            return f'bash -c "{setup_cmd}echo {code_b64} | base64 -d > script.js && node script.js"'
         elif language == 'typescript':
             setup_cmd = f'$(echo {setup_b64} | base64 -d) && ' if setup_b64 else ''
-            return f'bash -c "{setup_cmd}echo {code_b64} | base64 -d > /app/script.ts && ts-node /app/script.ts"'
+            return f'bash -c "{setup_cmd}echo {code_b64} | base64 -d > script.ts && ts-node script.ts"'
         else:
             raise ValueError(f"Unsupported language: {language}")
         
+    def warm_up(self) -> None:
+        """Pre-start the pooled containers for every language. Blocking; failures are only logged."""
+        if not self.use_pool:
+            return
+        try:
+            get_container_pool(self.images).warm_up()
+        except DockerException as e:
+            LOGGER.warning(f"Could not pre-start code runner containers: {e}")
+
+    def start_warm_up(self, executor: Optional[Executor] = None) -> asyncio.Future:
+        """
+        Run `warm_up` in `executor` (the loop's default if None) without waiting for it. How it ended
+        is logged; keep the returned future so it isn't lost.
+        """
+        future = asyncio.get_running_loop().run_in_executor(executor, self.warm_up)
+        future.add_done_callback(log_warm_up_result)
+        return future
+
     async def run(self, code: str, language: str, setup_commands: Optional[str] = None) -> Tuple[str, int]:
         """
         Execute code in a Docker container.
@@ -64,71 +92,121 @@ class DockerCodeRunner(BaseModel):
             ValueError: If language is not supported
             DockerException: If container execution fails
         """
-        client = docker.from_env()
         if language not in self.images:
             raise ValueError(f"Unsupported language: {language}")
 
         code_b64 = self._prepare_code(code)
         setup_b64 = self._prepare_code(setup_commands) if setup_commands else None
-        image = self.images[language]
+        command = self._get_command(code_b64, language, setup_b64)
+        loop = asyncio.get_running_loop()
         errors: List[str] = []
 
         for attempt in range(self.retries):
             LOGGER.debug(f"Attempt {attempt + 1}...")
             try:
-                command = self._get_command(code_b64, language, setup_b64)
-                
-                container = client.containers.run(
-                    image,
-                    command,
-                    detach=True,
-                    stdout=True,
-                    stderr=True,
-                    network_disabled=False,
-                    mem_limit='512m',
-                    cpu_quota=50000
-                )
-
-                try:
-                    log_collector = ContainerLogCollector(container)
-                    log_collector.start()
-                    
-                    exit_status = container.wait(timeout=self.timeout)
-                    logs = log_collector.get_logs()
-                    
-                    # Check collector status
-                    if log_collector.collection_error:
-                        LOGGER.warning(f"Note: Log collection encountered an error: {log_collector.collection_error}")
-                        
-                    LOGGER.debug(f"Exit status: {exit_status['StatusCode']} - Execution logs: {logs}")
-                    return logs, exit_status['StatusCode']
-                    
-                except (ReadTimeout, ReadTimeoutError, ConnectionError) as e:
-                    try:
-                        logs = log_collector.get_logs()
-                        # Check collector status in timeout case
-                        if log_collector.collection_error:
-                            LOGGER.warning(f"Log collection failed during timeout: {log_collector.collection_error}")
-                            
-                        LOGGER.warning(f"Timeout reached. Partial logs: {logs}")
-                        container.kill()
-                    except Exception as e:
-                        LOGGER.warning(f"Error killing container in timeout handler: {e}")
-                    raise TimeoutError(f"Timeout: Execution exceeded {self.timeout} seconds. Partial logs: {logs}")
-                finally:
-                    try:
-                        if log_collector.is_running:
-                            time.sleep(0.1)  # Give collector a chance to get final logs
-                        container.remove()
-                    except Exception as e:
-                        LOGGER.warning(f"Error while removing container: {e}")
+                if self.use_pool:
+                    # Setup commands may install packages, so those containers are not reused
+                    logs, exit_code = await loop.run_in_executor(
+                        None, get_container_pool(self.images).execute, command, language, self.timeout, setup_commands is None
+                    )
+                else:
+                    logs, exit_code = await loop.run_in_executor(None, self._run_in_new_container, command, language)
+                LOGGER.debug(f"Exit status: {exit_code} - Execution logs: {logs}")
+                return logs, exit_code
 
             except (ContainerError, DockerException, APIError, TimeoutError) as e:
                 LOGGER.warning(f"Attempt {attempt + 1} failed: {str(e)}")
                 errors.append(str(e))
                 continue
-        return "{} attempts failed: {}".format(attempt + 1, '\n'.join(errors)), 1    
+        return "{} attempts failed: {}".format(attempt + 1, '\n'.join(errors)), 1
+
+    async def run_session(self, codes: List[str], language: str, setup_commands: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Execute several code snippets in sequence within one container session, running
+        `setup_commands` once, before the first snippet. Without the pool every snippet gets its
+        own container, so the setup is repeated for each of them. A snippet that times out keeps
+        the outputs of the snippets before it; the ones after it are skipped.
+
+        Returns:
+            One tuple of (execution logs, exit code) per snippet, in order
+        """
+        if not self.use_pool or len(codes) == 1:
+            return [await self.run(code, language, setup_commands) for code in codes]
+        if language not in self.images:
+            raise ValueError(f"Unsupported language: {language}")
+
+        setup_b64 = self._prepare_code(setup_commands) if setup_commands else None
+        commands = [
+            self._get_command(self._prepare_code(code), language, setup_b64 if index == 0 else None)
+            for index, code in enumerate(codes)
+        ]
+        errors: List[str] = []
+        for attempt in range(self.retries):
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, get_container_pool(self.images).execute_session, commands, language, self.timeout, setup_commands is None
+                )
+            except (ContainerError, DockerException, APIError, TimeoutError) as e:
+                LOGGER.warning(f"Session attempt {attempt + 1} failed: {str(e)}")
+                errors.append(str(e))
+        failure = "{} attempts failed: {}".format(self.retries, '\n'.join(errors))
+        return [(failure, 1)] * len(codes)
+
+    def _run_in_new_container(self, command: str, language: str) -> Tuple[str, int]:
+        """Run `command` in a new container that is removed afterwards. Blocking."""
+        client = docker.from_env()
+        container = client.containers.run(
+            self.images[language],
+            command,
+            detach=True,
+            stdout=True,
+            stderr=True,
+            network_disabled=False,
+            mem_limit='512m',
+            cpu_quota=50000
+        )
+
+        try:
+            log_collector = ContainerLogCollector(container)
+            log_collector.start()
+            
+            exit_status = container.wait(timeout=self.timeout)
+            logs = log_collector.get_logs()
+            
+            # Check collector status
+            if log_collector.collection_error:
+                LOGGER.warning(f"Note: Log collection encountered an error: {log_collector.collection_error}")
+                
+            return logs, exit_status['StatusCode']
+            
+        except (ReadTimeout, ReadTimeoutError, ConnectionError) as e:
+            try:
+                logs = log_collector.get_logs()
+                # Check collector status in timeout case
+                if log_collector.collection_error:
+                    LOGGER.warning(f"Log collection failed during timeout: {log_collector.collection_error}")
+                    
+                LOGGER.warning(f"Timeout reached. Partial logs: {logs}")
+                container.kill()
+            except Exception as e:
+                LOGGER.warning(f"Error killing container in timeout handler: {e}")
+            raise TimeoutError(f"Timeout: Execution exceeded {self.timeout} seconds. Partial logs: {logs}")
+        finally:
+            try:
+                if log_collector.is_running:
+                    time.sleep(0.1)  # Give collector a chance to get final logs
+                container.remove()
+            except Exception as e:
+                LOGGER.warning(f"Error while removing container: {e}")
     
+def log_warm_up_result(future: asyncio.Future) -> None:
+    if future.cancelled():
+        LOGGER.debug("Code runner warm-up cancelled")
+    elif future.exception() is not None:
+        LOGGER.error(f"Code runner warm-up failed: {future.exception()}")
+    else:
+        LOGGER.info("Code runner containers warmed up")
+
 class ContainerLogCollector:
     def __init__(self, container, max_size: int = 10000):
         self.container = container
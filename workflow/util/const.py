@@ -18,6 +18,45 @@ FRONTEND_HOST = os.getenv("FRONTEND_HOST", "frontend")
 BACKEND_HOST = os.getenv("REACT_APP_BACKEND_HOST", "backend")
 ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 SHARED_UPLOAD_DIR = os.getenv("SHARED_UPLOAD_DIR", "/app/shared-uploads")
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(SHARED_UPLOAD_DIR, "embedding_cache"))
+EMBEDDING_CACHE_MEMORY_ITEMS = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "10000"))
+VECTOR_INDEX_MAX_OPEN = int(os.getenv("VECTOR_INDEX_MAX_OPEN", "64"))  # Data cluster indexes kept loaded per process, least recently used closed first
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "128"))  # Inputs per embeddings request
+EMBEDDING_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", "64000"))  # Estimated tokens per embeddings request, capped by the model's ctx_size
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))  # Embeddings requests in flight at once
+SEMANTIC_POOL_EMBEDDINGS = os.getenv("SEMANTIC_POOL_EMBEDDINGS", "false").lower() in ("1", "true", "yes")  # Semantic chunks get vectors pooled from their window embeddings instead of a second embedding pass
+API_CLIENT_MAX_CONNECTIONS = int(os.getenv("API_CLIENT_MAX_CONNECTIONS", "100"))
+API_CLIENT_MAX_KEEPALIVE = int(os.getenv("API_CLIENT_MAX_KEEPALIVE", "20"))
+API_CLIENT_KEEPALIVE_EXPIRY = float(os.getenv("API_CLIENT_KEEPALIVE_EXPIRY", "30"))
+BACKEND_HTTP_CONNECTION_LIMIT = int(os.getenv("BACKEND_HTTP_CONNECTION_LIMIT", "100"))
+BACKEND_HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("BACKEND_HTTP_KEEPALIVE_TIMEOUT", "30"))
+BACKEND_HTTP_DNS_CACHE_TTL = int(os.getenv("BACKEND_HTTP_DNS_CACHE_TTL", "300"))
+BACKEND_HTTP_TIMEOUT = float(os.getenv("BACKEND_HTTP_TIMEOUT", "60"))
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "60"))
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+QUEUE_CONSUME_IN_APP = os.getenv("QUEUE_CONSUME_IN_APP", "true").lower() in ("1", "true", "yes")
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", str(os.cpu_count() or 1)))
+LOCAL_MODEL_MEMORY_BUDGET_GB = float(os.getenv("LOCAL_MODEL_MEMORY_BUDGET_GB", "8"))
+LOCAL_MODEL_IDLE_TIMEOUT = float(os.getenv("LOCAL_MODEL_IDLE_TIMEOUT", "1800"))
+LOCAL_MODEL_WARMUP = os.getenv("LOCAL_MODEL_WARMUP", "")
+LOCAL_MODEL_INFERENCE_THREADS = int(os.getenv("LOCAL_MODEL_INFERENCE_THREADS", "1"))
+BARK_BATCH_SIZE = int(os.getenv("BARK_BATCH_SIZE", "4"))
+CODE_RUNNER_POOL_SIZE = int(os.getenv("CODE_RUNNER_POOL_SIZE", "2"))
+CODE_RUNNER_MAX_RUNS = int(os.getenv("CODE_RUNNER_MAX_RUNS", "20"))
+WEB_FETCH_CACHE_DIR = os.getenv("WEB_FETCH_CACHE_DIR", os.path.join(SHARED_UPLOAD_DIR, "web_cache"))
+WEB_FETCH_CACHE_MAX_ENTRIES = int(os.getenv("WEB_FETCH_CACHE_MAX_ENTRIES", "5000"))  # Cached pages kept on disk, least recently used removed first
+WEB_FETCH_CACHE_MAX_AGE = float(os.getenv("WEB_FETCH_CACHE_MAX_AGE", str(7 * 24 * 3600)))  # Seconds a cached page is revalidated before it is dropped
+WEB_FETCH_CONNECTION_LIMIT = int(os.getenv("WEB_FETCH_CONNECTION_LIMIT", "100"))
+WEB_FETCH_LIMIT_PER_HOST = int(os.getenv("WEB_FETCH_LIMIT_PER_HOST", "4"))
+WEB_FETCH_TIMEOUT = float(os.getenv("WEB_FETCH_TIMEOUT", "30"))
+SELECTOR_CACHE_DIR = os.getenv("SELECTOR_CACHE_DIR", os.path.join(SHARED_UPLOAD_DIR, "selector_cache"))
+SELECTOR_CACHE_MIN_CONTENT_RATIO = float(os.getenv("SELECTOR_CACHE_MIN_CONTENT_RATIO", "0.2"))  # Share of the page text cached selectors must extract to stay valid
+PRUNING_HEADROOM = float(os.getenv("PRUNING_HEADROOM", "0.1"))  # Share of the context freed below the limit when a conversation is pruned
+STREAM_LLM_RESPONSES = os.getenv("STREAM_LLM_RESPONSES", "true").lower() in ("1", "true", "yes")  # Publish chat token deltas to updates:<task_id> while generating
+PRUNING_STATE_MAX_CONVERSATIONS = int(os.getenv("PRUNING_STATE_MAX_CONVERSATIONS", "256"))
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")  # BPE encoding for models tiktoken doesn't know; "heuristic" counts characters / CHAR_TO_TOKEN
+TOKENIZER_CACHE_DIR = os.getenv("TOKENIZER_CACHE_DIR", os.path.join(SHARED_UPLOAD_DIR, "tokenizer_cache"))
+TOKEN_COUNT_CACHE_SIZE = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", "50000"))  # Memoized counts per encoding
 # Environment variable to control log level
 LOG_LEVEL = os.getenv("REACT_APP_LOG_LEVEL", "INFO")
 
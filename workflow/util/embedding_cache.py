@@ -0,0 +1,217 @@
+import os, json, fcntl, hashlib
+import numpy as np
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from pydantic import BaseModel, Field
+from workflow.util.const import EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MEMORY_ITEMS
+from workflow.util.logger import LOGGER
+
+DIGEST_SIZE = 32  # sha256
+
+class EmbeddingCacheStats(BaseModel):
+    """Running counters for an EmbeddingCache"""
+    memory_hits: int = Field(default=0, description="Lookups served from the in-memory LRU tier")
+    disk_hits: int = Field(default=0, description="Lookups served from the on-disk tier")
+    misses: int = Field(default=0, description="Lookups that had to be embedded by the API")
+    bytes_saved: int = Field(default=0, description="UTF-8 bytes of text not sent to the API thanks to hits")
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.hits} hits ({self.memory_hits} memory, {self.disk_hits} disk), {self.misses} misses, "
+                f"hit rate {self.hit_rate:.1%}, {self.bytes_saved} bytes saved")
+
+class EmbeddingDiskStore:
+    """
+    Append-only binary store of vectors for one embedding namespace (model).
+
+    `keys.bin` holds the 32-byte sha256 digests and `vectors.f32` the float32 vectors, row for row.
+    Vectors are always written before their digest, so a digest is only visible once its vector
+    is complete. Other processes' appends are picked up by reading the tail of `keys.bin`.
+    """
+    def __init__(self, directory: str, namespace: str):
+        self.directory = directory
+        self.namespace = namespace
+        self.dimension: Optional[int] = None
+        self.offsets: Dict[bytes, int] = {}
+        self._keys_read = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def keys_path(self) -> str:
+        return os.path.join(self.directory, "keys.bin")
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.directory, "vectors.f32")
+
+    @contextmanager
+    def _locked(self, shared: bool = False) -> Iterator[None]:
+        with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """Read digests appended since the last refresh."""
+        if not os.path.exists(self.keys_path):
+            return
+        if self.dimension is None:
+            with open(os.path.join(self.directory, "meta.json"), "r") as f:
+                self.dimension = json.load(f).get("dimension")
+        size = os.path.getsize(self.keys_path) // DIGEST_SIZE * DIGEST_SIZE
+        if size <= self._keys_read:
+            return
+        with open(self.keys_path, "rb") as f:
+            f.seek(self._keys_read)
+            data = f.read(size - self._keys_read)
+        start_row = self._keys_read // DIGEST_SIZE
+        for i in range(len(data) // DIGEST_SIZE):
+            self.offsets.setdefault(data[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE], start_row + i)
+        self._keys_read = size
+
+    def get(self, digests: List[bytes]) -> Dict[bytes, np.ndarray]:
+        with self._locked(shared=True):
+            if any(digest not in self.offsets for digest in digests):
+                self._refresh()
+            found = [(digest, self.offsets[digest]) for digest in digests if digest in self.offsets]
+            if not found or not self.dimension:
+                return {}
+            stored = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._keys_read // DIGEST_SIZE, self.dimension))
+            vectors = np.array(stored[[row for _, row in found]])
+            del stored
+        return {digest: vectors[i] for i, (digest, _) in enumerate(found)}
+
+    def put(self, items: Dict[bytes, np.ndarray]) -> None:
+        if not items:
+            return
+        with self._locked():
+            self._refresh()
+            new_items = [(digest, vector) for digest, vector in items.items() if digest not in self.offsets]
+            if not new_items:
+                return
+            dimension = len(new_items[0][1])
+            if self.dimension is None:
+                self.dimension = dimension
+                with open(os.path.join(self.directory, "meta.json"), "w") as f:
+                    json.dump({"namespace": self.namespace, "dimension": dimension}, f)
+            new_items = [(digest, vector) for digest, vector in new_items if len(vector) == self.dimension]
+            if not new_items:
+                LOGGER.warning(f"Embedding cache dimension mismatch for {self.namespace}: got {dimension}, expected {self.dimension}")
+                return
+            rows = self._keys_read // DIGEST_SIZE
+            matrix = np.asarray([vector for _, vector in new_items], dtype=np.float32)
+            with open(self.vectors_path, "ab") as f:
+                # Drop any partial rows left by a crash before appending
+                f.truncate(rows * self.dimension * matrix.itemsize)
+                f.write(matrix.tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.truncate(self._keys_read)
+                f.write(b"".join(digest for digest, _ in new_items))
+            for i, (digest, _) in enumerate(new_items):
+                self.offsets[digest] = rows + i
+            self._keys_read += len(new_items) * DIGEST_SIZE
+
+class EmbeddingCache:
+    """
+    Two-tier cache of embedding vectors keyed by (namespace, sha256 of text), where the namespace
+    identifies the embedding model. Vectors do not depend on how a document was split, so the
+    same chunk text is shared across splitters, tasks, data clusters and chats.
+
+    - Memory tier: LRU of up to `max_memory_items` float32 vectors
+    - Disk tier: one EmbeddingDiskStore per namespace under `directory` (None disables it)
+    """
+    def __init__(self, directory: Optional[str] = EMBEDDING_CACHE_DIR, max_memory_items: int = EMBEDDING_CACHE_MEMORY_ITEMS):
+        self.directory = directory
+        self.max_memory_items = max_memory_items
+        self.stats = EmbeddingCacheStats()
+        self._memory: "OrderedDict[Tuple[str, bytes], np.ndarray]" = OrderedDict()
+        self._stores: Dict[str, EmbeddingDiskStore] = {}
+
+    @staticmethod
+    def text_digest(text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def _store(self, namespace: str) -> Optional[EmbeddingDiskStore]:
+        if self.directory is None:
+            return None
+        if namespace not in self._stores:
+            directory = os.path.join(self.directory, hashlib.sha256(namespace.encode("utf-8")).hexdigest()[:16])
+            try:
+                self._stores[namespace] = EmbeddingDiskStore(directory, namespace)
+            except OSError as e:
+                LOGGER.warning(f"Embedding cache disk tier disabled: {e}")
+                self.directory = None
+                return None
+        return self._stores[namespace]
+
+    def _remember(self, key: Tuple[str, bytes], vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, namespace: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up each text; returns its cached vector or None, in input order."""
+        digests = [self.text_digest(text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        disk_lookups: Dict[bytes, List[int]] = {}
+        for i, digest in enumerate(digests):
+            vector = self._memory.get((namespace, digest))
+            if vector is not None:
+                self._memory.move_to_end((namespace, digest))
+                results[i] = vector
+                self.stats.memory_hits += 1
+            else:
+                disk_lookups.setdefault(digest, []).append(i)
+
+        store = self._store(namespace) if disk_lookups else None
+        if store is not None:
+            try:
+                for digest, vector in store.get(list(disk_lookups.keys())).items():
+                    self._remember((namespace, digest), vector)
+                    for i in disk_lookups[digest]:
+                        results[i] = vector
+                        self.stats.disk_hits += 1
+            except OSError as e:
+                LOGGER.warning(f"Embedding cache disk read failed for {namespace}: {e}")
+
+        for text, vector in zip(texts, results):
+            if vector is None:
+                self.stats.misses += 1
+            else:
+                self.stats.bytes_saved += len(text.encode("utf-8"))
+        return [vector.tolist() if vector is not None else None for vector in results]
+
+    def put_many(self, namespace: str, texts: List[str], vectors: List[List[float]]) -> None:
+        """Store freshly generated vectors in both tiers."""
+        items: Dict[bytes, np.ndarray] = {}
+        for text, vector in zip(texts, vectors):
+            digest = self.text_digest(text)
+            items[digest] = np.asarray(vector, dtype=np.float32)
+            self._remember((namespace, digest), items[digest])
+        store = self._store(namespace)
+        if store is not None:
+            try:
+                store.put(items)
+            except OSError as e:
+                LOGGER.warning(f"Embedding cache disk write failed for {namespace}: {e}")
+
+_EMBEDDING_CACHE: Optional[EmbeddingCache] = None
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Returns the process-wide embedding cache."""
+    global _EMBEDDING_CACHE
+    if _EMBEDDING_CACHE is None:
+        _EMBEDDING_CACHE = EmbeddingCache()
+    return _EMBEDDING_CACHE
@@ -0,0 +1,39 @@
+import aiohttp
+from typing import Optional
+from workflow.util.const import BACKEND_HTTP_CONNECTION_LIMIT, BACKEND_HTTP_KEEPALIVE_TIMEOUT, BACKEND_HTTP_DNS_CACHE_TTL, BACKEND_HTTP_TIMEOUT
+
+def create_client_session(
+    limit: int = BACKEND_HTTP_CONNECTION_LIMIT,
+    limit_per_host: int = 0,
+    keepalive_timeout: float = BACKEND_HTTP_KEEPALIVE_TIMEOUT,
+    dns_cache_ttl: int = BACKEND_HTTP_DNS_CACHE_TTL,
+    timeout: float = BACKEND_HTTP_TIMEOUT,
+    connect_timeout: Optional[float] = 10,
+    **session_kwargs
+) -> aiohttp.ClientSession:
+    """
+    Creates a long-lived aiohttp session whose TCPConnector keeps connections alive and caches DNS,
+    so repeated requests to the same host skip the TCP (and TLS) setup.
+
+    Args:
+        limit: Maximum simultaneous connections (0 for no limit)
+        limit_per_host: Maximum simultaneous connections per host (0 for no limit)
+        keepalive_timeout: Seconds an idle connection is kept for reuse
+        dns_cache_ttl: Seconds resolved addresses are cached
+        timeout: Default total timeout per request, overridable per call with `timeout=`
+        connect_timeout: Timeout for acquiring a connection
+
+    Must be called from within a running event loop; the session is bound to it.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=dns_cache_ttl,
+        use_dns_cache=True,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout, connect=connect_timeout),
+        **session_kwargs
+    )
@@ -0,0 +1,28 @@
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+def import_from_path(path: str) -> Any:
+    """Import and return the object at a dotted path, e.g. `package.module.ClassName`."""
+    module_name, _, attribute = path.rpartition(".")
+    return getattr(importlib.import_module(module_name), attribute)
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Module-level `__getattr__` and `__dir__` (PEP 562) for a package whose public names are only
+    imported on first access. `exports` maps each name to the module that defines it, relative to
+    `package` (".llm_engine") or absolute. Resolved names are cached on the package module.
+
+        __getattr__, __dir__ = lazy_exports(__name__, {"LLMEngine": ".llm_engine"})
+    """
+    def __getattr__(name: str) -> Any:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(importlib.import_module(package))) | set(exports))
+
+    return __getattr__, __dir__
@@ -1,6 +1,8 @@
 from .message_prune import MessagePruner
+from .pruning_state import PruningState, PruningStateStore, get_pruning_states, message_fingerprint, pruning_conversation
 from .message_score import MessageStats, ScoreConfig, MessageScore
 from .message_prune_utils import MessageApiFormat, calculate_content_size, calculate_message_size, calculate_tool_size, truncate_with_marker, truncate_tool_arguments, replace_content, RoleTypes, PruningStrategy, ReplacementStrategy
 
 __all__ = ['MessagePruner', 'MessageStats', 'ScoreConfig', 'MessageScore', 'MessageApiFormat', 'calculate_content_size', 'calculate_message_size', 
-           'calculate_tool_size', 'truncate_with_marker', 'truncate_tool_arguments', 'replace_content', 'RoleTypes', 'PruningStrategy', 'ReplacementStrategy']
+           'calculate_tool_size', 'truncate_with_marker', 'truncate_tool_arguments', 'replace_content', 'RoleTypes', 'PruningStrategy', 'ReplacementStrategy',
+           'PruningState', 'PruningStateStore', 'get_pruning_states', 'message_fingerprint', 'pruning_conversation']
@@ -1,11 +1,20 @@
-from typing import List, Optional, Any, Tuple
+import heapq
+from typing import List, Optional, Any, Set, Tuple
 from pydantic import BaseModel, Field
 from workflow.util.message_prune.message_score import ScoreConfig, MessageStats, MessageScore
 from workflow.util.logger import LOGGER
-from workflow.util.message_prune.message_prune_utils import PruningStrategy, ReplacementStrategy, LLMEngine, calculate_message_size, MessageApiFormat, replace_content
+from workflow.util.const import PRUNING_HEADROOM
+from workflow.util.message_prune.message_prune_utils import PruningStrategy, ReplacementStrategy, LLMEngine, calculate_content_size, calculate_tool_size, calculate_message_size, MessageApiFormat, replace_content
+from workflow.util.token_counter import TokenCounter
+from workflow.util.message_prune.pruning_state import PruningState, message_fingerprint
 
 class MessagePruner(BaseModel):
-    max_total_size: int = Field(..., description="Maximum total size allowed")
+    max_total_size: int = Field(..., description="Maximum total size allowed, in tokens when a token_counter is set, otherwise in characters")
+    token_counter: Optional[TokenCounter] = Field(
+        default=None,
+        exclude=True,
+        description="Measures message sizes in tokens; without one, sizes are character counts"
+    )
     pruning_strategy: PruningStrategy = Field(
         default=PruningStrategy.HYBRID,
         description="Strategy for selecting messages to prune"
@@ -14,7 +23,15 @@ class MessagePruner(BaseModel):
         default="[ctx_exceeded]",
         description="Marker to use for pruned content"
     )
+    headroom: float = Field(
+        default=PRUNING_HEADROOM,
+        ge=0.0, lt=1.0,
+        description="Fraction of max_total_size to free below the limit when pruning with a PruningState, so later turns fit without re-pruning"
+    )
     
+    class Config:
+        arbitrary_types_allowed = True
+
     # Scoring weights
     score_config: ScoreConfig = Field(
         default=ScoreConfig(),
@@ -44,21 +61,35 @@ class MessagePruner(BaseModel):
         description="System prompt for summarization"
     )
 
+    def _message_sizes(self, messages: List[MessageApiFormat]) -> List[Tuple[int, int]]:
+        """(content_size, tool_size) of each message, in the pruner's unit."""
+        if self.token_counter is None:
+            return [(calculate_content_size(m), calculate_tool_size(m)) for m in messages]
+        return [self.token_counter.message_sizes(m) for m in messages]
+
     def _score_messages(
         self, 
-        messages: List[MessageApiFormat]
+        messages: List[MessageApiFormat],
+        sizes: Optional[List[Tuple[int, int]]] = None
     ) -> List[Tuple[MessageApiFormat, MessageScore, MessageStats]]:
-        """Score messages using MessageStats and return with MessageScore objects"""
-        total_length = sum(calculate_message_size(m) for m in messages)
+        """
+        Score messages using MessageStats and return with MessageScore objects.
+        `sizes` optionally holds precomputed (content_size, tool_size) pairs, one per message.
+        """
+        if sizes is None:
+            sizes = self._message_sizes(messages)
+        total_length = sum(content_size + tool_size for content_size, tool_size in sizes)
         
-        scored_messages: List[Tuple[MessageApiFormat, MessageScore]] = []
+        scored_messages: List[Tuple[MessageApiFormat, MessageScore, MessageStats]] = []
         
-        for idx, message in enumerate(messages):
+        for idx, (message, (content_size, tool_size)) in enumerate(zip(messages, sizes)):
             stats = MessageStats.from_message(
                 message=message,
                 index=idx,
                 total_messages=len(messages),
-                total_length=total_length
+                total_length=total_length,
+                content_size=content_size,
+                tool_size=tool_size
             )
             score = stats.calculate_score(self.score_config)
             scored_messages.append((message, score, stats))
@@ -69,70 +100,112 @@ class MessagePruner(BaseModel):
         self,
         messages: List[MessageApiFormat],
         llm_engine: Optional[LLMEngine] = None,
-        api_data: Any = None
+        api_data: Any = None,
+        state: Optional[PruningState] = None
     ) -> List[MessageApiFormat]:
-        """Prune messages to fit within size limit"""
-        total_size = sum(calculate_message_size(m) for m in messages)
-        if total_size <= self.max_total_size:
-            return messages
+        """
+        Prune messages to fit within size limit.
+
+        Sizes are computed once per message and candidates are popped from a max-heap on their
+        pruning score (ties in conversation order), so each pruned message costs O(log n).
+        Only pruned messages are copied; the rest of the returned list shares the input messages.
+
+        With a `state` from an earlier turn of the same conversation, the unchanged prefix is
+        reused exactly as it was sent last time and only the new tail is measured. When the result
+        no longer fits, messages that were not truncated yet are pruned first, down to
+        `headroom` below the limit so the next turns fit again without touching the prefix.
+        """
+        if state is None:
+            sizes = self._message_sizes(messages)
+            if sum(content_size + tool_size for content_size, tool_size in sizes) <= self.max_total_size:
+                return messages
+            pruned_messages, _, _ = self._prune_to_size(messages, sizes, self.max_total_size)
+            return pruned_messages
+
+        fingerprints = [message_fingerprint(m) for m in messages]
+        reused = state.matching_prefix(fingerprints)
+        candidate_messages = state.messages[:reused] + messages[reused:]
+        sizes = state.sizes[:reused] + self._message_sizes(messages[reused:])
+        truncated = {idx for idx in state.truncated if idx < reused}
+        LOGGER.debug(f"Reusing {reused} of {len(messages)} messages from the previous pruning pass")
+
+        if sum(content_size + tool_size for content_size, tool_size in sizes) > self.max_total_size:
+            target_size = int(self.max_total_size * (1 - self.headroom))
+            candidate_messages, sizes, newly_truncated = self._prune_to_size(candidate_messages, sizes, target_size, truncated)
+            truncated |= newly_truncated
+        state.update(fingerprints, candidate_messages, sizes, truncated)
+        return candidate_messages
+
+    def _prune_to_size(
+        self,
+        messages: List[MessageApiFormat],
+        sizes: List[Tuple[int, int]],
+        target_total_size: int,
+        frozen: Set[int] = frozenset()
+    ) -> Tuple[List[MessageApiFormat], List[Tuple[int, int]], Set[int]]:
+        """
+        Truncate the most prunable messages until the total fits `target_total_size`. Indices in
+        `frozen` are only touched once every other message has been pruned.
+        Returns the new messages, their (content_size, tool_size) and the truncated indices.
+        """
+        message_sizes = [content_size + tool_size for content_size, tool_size in sizes]
+        total_size = sum(message_sizes)
+        unit = "chars" if self.token_counter is None else "tokens"
 
         # Calculate initial reduction needed
-        size_to_reduce = total_size - self.max_total_size
+        remaining_to_reduce = total_size - target_total_size
 
-        # Score messages and sort by pruning priority 
-        scored_messages = self._score_messages(messages)
-        sorted_with_idx = sorted(
-            [(msg, score, stats, idx) for idx, (msg, score, stats) in enumerate(scored_messages)],
-            key=lambda x: x[1].final_score,
-            reverse=True
-        )
+        # Score messages and heap them by pruning priority
+        scored_messages = self._score_messages(messages, sizes)
+        candidates = [(idx in frozen, -score.final_score, idx) for idx, (_, score, _) in enumerate(scored_messages)]
+        heapq.heapify(candidates)
 
-        # Initialize pruned messages and tracking variables
-        pruned_messages = [msg.copy() for msg, _, _ in scored_messages]
-        remaining_to_reduce = size_to_reduce
-        processed_indices = set()
+        pruned_messages = list(messages)
+        pruned_sizes = list(sizes)
+        truncated: Set[int] = set()
+        final_size = total_size
 
         while remaining_to_reduce > 0:
-            # Find next most prunable message
-            next_message = None
-            for message, score, stats, original_idx in sorted_with_idx:
-                if original_idx not in processed_indices:
-                    next_message = (message, score, stats, original_idx)
-                    break
-
-            if next_message is None:
+            if not candidates:
                 LOGGER.warning(
                     f"Could not reduce messages to target size. "
-                    f"Remaining overage: {remaining_to_reduce} characters"
+                    f"Remaining overage: {remaining_to_reduce} {unit}"
                 )
                 break
 
-            message, score, stats, original_idx = next_message
-            processed_indices.add(original_idx)
+            # Next most prunable message
+            _, _, original_idx = heapq.heappop(candidates)
             
             # Calculate target size for this message
-            message_size = calculate_message_size(message)
+            message_size = message_sizes[original_idx]
             target_size = max(
                 len(self.replacement_marker),
                 message_size - remaining_to_reduce
             )
             
-            # Replace content and track size reduction
-            pruned_message, new_size = replace_content(
+            # Replace content and track size reduction. Truncation works on characters, so a token
+            # target is converted with the message's own characters-per-token ratio
+            message = messages[original_idx]
+            if self.token_counter is not None:
+                target_size = int(target_size * calculate_message_size(message) / max(message_size, 1))
+            pruned_message, _ = replace_content(
                 message,
                 target_size,
                 self.replacement_marker
             )
             
             pruned_messages[original_idx] = pruned_message
+            pruned_sizes[original_idx] = self._message_sizes([pruned_message])[0]
+            new_size = sum(pruned_sizes[original_idx])
+            truncated.add(original_idx)
             size_reduced = message_size - new_size
             remaining_to_reduce -= size_reduced
+            final_size -= size_reduced
             
-            LOGGER.info(f"Pruned message {original_idx}: {message_size} -> {new_size} chars "
+            LOGGER.info(f"Pruned message {original_idx}: {message_size} -> {new_size} {unit} "
                     f"({remaining_to_reduce} remaining to reduce)")
 
-        final_size = sum(calculate_message_size(m) for m in pruned_messages)
-        LOGGER.info(f"Final pruning result: {total_size} -> {final_size} chars "
-                    f"(target: {self.max_total_size})")
+        LOGGER.info(f"Final pruning result: {total_size} -> {final_size} {unit} "
+                    f"(target: {target_total_size})")
         
-        return pruned_messages
\ No newline at end of file
+        return pruned_messages, pruned_sizes, truncated
@@ -91,13 +91,14 @@ class ContentStats(TypedDict):
 
 def get_content_stats(message: Dict[str, Any]) -> ContentStats:
     """Calculate size statistics for different parts of a message"""
+    content_size = calculate_content_size(message)
     total_tool = calculate_tool_size(message)
     only_args = calculate_tool_size(message, arguments_only=True)
     return {
-        "content_size": calculate_content_size(message),
+        "content_size": content_size,
         "tool_args_size": only_args,
         "tool_other_size": total_tool - only_args,
-        "total_size": calculate_message_size(message)
+        "total_size": content_size + total_tool
     }
 
 def truncate_with_marker(text: str, max_chars: int, marker: str) -> str:
@@ -128,7 +129,8 @@ def replace_content(
     Replace message content to fit within target size while properly handling tool calls.
     """
     stats = get_content_stats(message)
-    new_message = deepcopy(message)
+    # Shallow copy: content and tool_calls are replaced below, never mutated in place
+    new_message = dict(message)
     composed_marker = f"... {marker}"
     
     # If target is too small, return minimal message
@@ -1,5 +1,5 @@
 import math
-from typing import Dict
+from typing import Dict, Optional
 from pydantic import BaseModel, Field
 from workflow.util.message_prune.message_prune_utils import RoleTypes, calculate_content_size, calculate_tool_size, MessageApiFormat
 
@@ -156,7 +156,9 @@ class MessageStats(BaseModel):
         message: MessageApiFormat,
         index: int,
         total_messages: int,
-        total_length: int
+        total_length: int,
+        content_size: Optional[int] = None,
+        tool_size: Optional[int] = None
     ) -> "MessageStats":
         """
         Create MessageStats from a message and its context.
@@ -166,15 +168,21 @@ class MessageStats(BaseModel):
             index: Position in the message list
             total_messages: Total number of messages
             total_length: Total length of all messages
+            content_size: Precomputed content size of the message, if already known
+            tool_size: Precomputed tool call size of the message, if already known
         """
         # Calculate position in [0,1]
         position = index / (total_messages - 1) if total_messages > 1 else 0.0
         
         # Calculate normalized content length
-        length = calculate_content_size(message) / total_length if total_length > 0 else 0.0
+        if content_size is None:
+            content_size = calculate_content_size(message)
+        length = content_size / total_length if total_length > 0 else 0.0
         
         # Calculate normalized tool length
-        tool_length = calculate_tool_size(message) / total_length if total_length > 0 else 0.0
+        if tool_size is None:
+            tool_size = calculate_tool_size(message)
+        tool_length = tool_size / total_length if total_length > 0 else 0.0
 
         return cls(
             position=position,
@@ -0,0 +1,113 @@
+import json, hashlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Sequence, Set, Tuple
+from workflow.util.const import PRUNING_STATE_MAX_CONVERSATIONS
+from workflow.util.message_prune.message_prune_utils import MessageApiFormat
+
+# Id of the conversation (e.g. the chat) whose LLM calls are being made, see pruning_conversation
+_CONVERSATION_ID: ContextVar[Optional[str]] = ContextVar("pruning_conversation_id", default=None)
+
+@contextmanager
+def pruning_conversation(conversation_id: Optional[str]) -> Iterator[None]:
+    """
+    Keep the pruning state of every LLM call made inside the block under `conversation_id`, so the
+    next turn of the same conversation reuses its pruned prefix. None opts the block out, e.g. for
+    LLM calls made by tools, which are not part of the conversation.
+    """
+    token = _CONVERSATION_ID.set(conversation_id)
+    try:
+        yield
+    finally:
+        _CONVERSATION_ID.reset(token)
+
+def message_fingerprint(message: MessageApiFormat) -> str:
+    """Stable hash of a message's full API payload (role, content, tool calls, ...)."""
+    payload = json.dumps(message, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+class PruningState:
+    """
+    What a MessagePruner last sent for one conversation: the fingerprint of every original
+    message, the message actually emitted in its place, the emitted (content_size, tool_size)
+    and which positions were truncated.
+
+    On the next turn the longest prefix of unchanged messages is taken from here verbatim, so the
+    pruned prefix stays byte-identical between turns (and provider prompt caches keep hitting),
+    and only the new tail needs measuring.
+    """
+    def __init__(self):
+        self.fingerprints: List[str] = []
+        self.messages: List[MessageApiFormat] = []
+        self.sizes: List[Tuple[int, int]] = []
+        self.truncated: Set[int] = set()
+
+    def matching_prefix(self, fingerprints: Sequence[str]) -> int:
+        """Number of leading messages that are unchanged since the last turn."""
+        matched = 0
+        for previous, current in zip(self.fingerprints, fingerprints):
+            if previous != current:
+                break
+            matched += 1
+        return matched
+
+    def update(self, fingerprints: List[str], messages: List[MessageApiFormat], sizes: List[Tuple[int, int]], truncated: Set[int]) -> None:
+        self.fingerprints = fingerprints
+        self.messages = messages
+        self.sizes = sizes
+        self.truncated = truncated
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+class PruningStateStore:
+    """
+    LRU map from conversation to PruningState. States are keyed by the conversation id set with
+    `pruning_conversation` (plus a scope such as the model and size limit), never by message
+    content, so two conversations that open identically don't overwrite each other's pruned
+    prefix. The message fingerprints kept in each state only check that the prefix still matches.
+    """
+    def __init__(self, max_conversations: int = PRUNING_STATE_MAX_CONVERSATIONS):
+        self.max_conversations = max_conversations
+        self._states: "OrderedDict[str, PruningState]" = OrderedDict()
+
+    @staticmethod
+    def conversation_key(conversation_id: str, scope: str = "") -> str:
+        return f"{scope}|{conversation_id}"
+
+    def get(self, key: str) -> PruningState:
+        state = self._states.get(key)
+        if state is None:
+            state = PruningState()
+            self._states[key] = state
+            while len(self._states) > self.max_conversations:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(key)
+        return state
+
+    def for_messages(self, messages: Sequence[MessageApiFormat], scope: str = "", conversation_id: Optional[str] = None) -> PruningState:
+        """
+        State for the current conversation (`conversation_id`, or the one set with `pruning_conversation`).
+        Outside of a conversation a fresh state is returned and nothing is kept.
+        """
+        conversation_id = conversation_id or _CONVERSATION_ID.get()
+        if not conversation_id:
+            return PruningState()
+        return self.get(self.conversation_key(conversation_id, scope))
+
+    def clear(self) -> None:
+        self._states.clear()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+_PRUNING_STATES: Optional[PruningStateStore] = None
+
+def get_pruning_states() -> PruningStateStore:
+    """Returns the process-wide pruning state store."""
+    global _PRUNING_STATES
+    if _PRUNING_STATES is None:
+        _PRUNING_STATES = PruningStateStore()
+    return _PRUNING_STATES
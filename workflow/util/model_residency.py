@@ -0,0 +1,228 @@
+import gc, time, asyncio, threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from workflow.util.const import LOCAL_MODEL_MEMORY_BUDGET_GB, LOCAL_MODEL_IDLE_TIMEOUT, LOCAL_MODEL_WARMUP, LOCAL_MODEL_INFERENCE_THREADS
+from workflow.util.logger import LOGGER
+
+ModelKey = Tuple[str, str, str]  # (model_name, device, dtype)
+ModelLoader = Callable[[], Any]
+
+def model_key(model_name: str, device: str, dtype: Any) -> ModelKey:
+    return model_name, str(device), str(dtype)
+
+def estimate_model_bytes(model: Any) -> int:
+    """
+    Bytes held by the parameters and buffers of a torch module, a diffusers pipeline (its
+    `components`), or a tuple/list/dict of those. Anything else counts as 0.
+    """
+    if isinstance(model, (tuple, list)):
+        return sum(estimate_model_bytes(part) for part in model)
+    if isinstance(model, dict):
+        return sum(estimate_model_bytes(part) for part in model.values())
+    components = getattr(model, "components", None)
+    if isinstance(components, dict):
+        return estimate_model_bytes(components)
+    if callable(getattr(model, "parameters", None)) and callable(getattr(model, "buffers", None)):
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+    return 0
+
+def release_device_memory() -> None:
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+class ResidentModel:
+    """A loaded model with its size estimate and usage bookkeeping."""
+    def __init__(self, model: Any, size: int, now: float):
+        self.model = model
+        self.size = size
+        self.last_used = now
+        self.in_use = 0
+
+class ModelResidencyManager:
+    """
+    Keeps local models (Bark, PixArt, ...) resident between requests instead of loading and
+    discarding the weights every time.
+
+    - Models are keyed by (model_name, device, dtype) and loaded once by the caller's loader,
+      in a worker thread, with concurrent requests for the same key sharing that load
+    - The least recently used idle models are unloaded when the loaded total would exceed
+      `memory_budget` bytes; models in use are never evicted
+    - `unload_idle` drops models unused for `idle_timeout` seconds (see `run_idle_unloader`)
+    """
+    def __init__(
+        self,
+        memory_budget: int = int(LOCAL_MODEL_MEMORY_BUDGET_GB * 1024**3),
+        idle_timeout: float = LOCAL_MODEL_IDLE_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+        size_estimator: Callable[[Any], int] = estimate_model_bytes,
+    ):
+        self.memory_budget = memory_budget
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.size_estimator = size_estimator
+        self._models: "OrderedDict[ModelKey, ResidentModel]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def __contains__(self, key: ModelKey) -> bool:
+        return key in self._models
+
+    @property
+    def loaded_bytes(self) -> int:
+        return sum(entry.size for entry in self._models.values())
+
+    def _evict_for(self, size: int) -> List[ModelKey]:
+        """Unload idle models, oldest first, until `size` more bytes fit in the budget."""
+        evicted = []
+        for key in list(self._models.keys()):
+            if self.loaded_bytes + size <= self.memory_budget:
+                break
+            if self._models[key].in_use == 0:
+                del self._models[key]
+                evicted.append(key)
+        if evicted:
+            LOGGER.info(f"Unloaded models to stay within the memory budget: {evicted}")
+        return evicted
+
+    def _resident(self, key: ModelKey, acquire: bool) -> Optional[ResidentModel]:
+        entry = self._models.get(key)
+        if entry is not None:
+            entry.last_used = self.clock()
+            entry.in_use += int(acquire)
+            self._models.move_to_end(key)
+        return entry
+
+    def load(self, key: ModelKey, loader: ModelLoader, acquire: bool = False) -> Any:
+        """
+        Return the resident model for `key`, loading it with `loader` if needed (blocking).
+        With `acquire`, the model is also marked in use until `release` is called.
+        """
+        with self._lock:
+            entry = self._resident(key, acquire)
+            if entry is not None:
+                return entry.model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            with self._lock:
+                entry = self._resident(key, acquire)
+                if entry is not None:
+                    return entry.model
+            LOGGER.info(f"Loading model {key[0]} on {key[1]} ({key[2]})")
+            start = time.perf_counter()
+            model = loader()
+            size = self.size_estimator(model)
+            LOGGER.info(f"Loaded model {key[0]} ({size / 1e9:.2f}GB) in {time.perf_counter() - start:.1f}s")
+            with self._lock:
+                evicted = self._evict_for(size)
+                if self.loaded_bytes + size > self.memory_budget:
+                    LOGGER.warning(f"Model {key[0]} exceeds the remaining memory budget, keeping it loaded anyway")
+                self._models[key] = ResidentModel(model, size, self.clock())
+                self._models[key].in_use = int(acquire)
+                self._load_locks.pop(key, None)
+        if evicted:
+            release_device_memory()
+        return model
+
+    def release(self, key: ModelKey) -> None:
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None and entry.in_use:
+                entry.in_use -= 1
+                entry.last_used = self.clock()
+
+    async def acquire(self, key: ModelKey, loader: ModelLoader) -> Any:
+        """Load (in a worker thread) and mark in use the model for `key`; pair with `release`."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.load, key, loader, True)
+
+    @asynccontextmanager
+    async def lease(self, key: ModelKey, loader: ModelLoader) -> AsyncIterator[Any]:
+        """Borrow the model for `key` for the duration of the block; it can't be evicted meanwhile."""
+        model = await self.acquire(key, loader)
+        try:
+            yield model
+        finally:
+            self.release(key)
+
+    def unload(self, key: ModelKey) -> bool:
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None or entry.in_use:
+                return False
+            del self._models[key]
+        release_device_memory()
+        return True
+
+    def unload_idle(self) -> List[ModelKey]:
+        """Unload models not used for `idle_timeout` seconds."""
+        cutoff = self.clock() - self.idle_timeout
+        with self._lock:
+            idle = [key for key, entry in self._models.items() if entry.in_use == 0 and entry.last_used <= cutoff]
+            for key in idle:
+                del self._models[key]
+        if idle:
+            LOGGER.info(f"Unloaded idle models: {idle}")
+            release_device_memory()
+        return idle
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+        release_device_memory()
+
+    async def run_idle_unloader(self, interval: Optional[float] = None) -> None:
+        """Periodically unload idle models; meant to run as a background task."""
+        interval = interval or max(self.idle_timeout / 4, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            self.unload_idle()
+
+    async def warm_up(self, models: Iterable[Tuple[ModelKey, ModelLoader]]) -> None:
+        """Load the given models ahead of the first request."""
+        for key, loader in models:
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.load, key, loader)
+            except Exception as e:
+                LOGGER.error(f"Failed to warm up model {key[0]}: {e}")
+
+def parse_warmup_spec(spec: str = LOCAL_MODEL_WARMUP) -> List[Tuple[str, str]]:
+    """Parse 'engine=model_name' pairs separated by commas, e.g. 'bark=suno/bark-small'."""
+    pairs = []
+    for item in spec.split(","):
+        engine, _, model_name = item.strip().partition("=")
+        if engine and model_name:
+            pairs.append((engine.strip(), model_name.strip()))
+        elif item.strip():
+            LOGGER.warning(f"Ignoring invalid LOCAL_MODEL_WARMUP entry: {item}")
+    return pairs
+
+_MODEL_RESIDENCY: Optional[ModelResidencyManager] = None
+
+def get_model_residency() -> ModelResidencyManager:
+    """Returns the process-wide model residency manager."""
+    global _MODEL_RESIDENCY
+    if _MODEL_RESIDENCY is None:
+        _MODEL_RESIDENCY = ModelResidencyManager()
+    return _MODEL_RESIDENCY
+
+_INFERENCE_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    """
+    Returns the process-wide executor for blocking local-model inference. It is kept apart from
+    the default executor, so long generations can't starve file I/O and other short blocking calls.
+    """
+    global _INFERENCE_EXECUTOR
+    if _INFERENCE_EXECUTOR is None:
+        _INFERENCE_EXECUTOR = ThreadPoolExecutor(max_workers=LOCAL_MODEL_INFERENCE_THREADS, thread_name_prefix="local-model")
+    return _INFERENCE_EXECUTOR
@@ -0,0 +1,144 @@
+import os, re, json, time, hashlib
+from typing import List, Optional
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup
+from pydantic import BaseModel, Field
+from workflow.util.const import SELECTOR_CACHE_DIR, SELECTOR_CACHE_MIN_CONTENT_RATIO
+from workflow.util.logger import LOGGER
+
+FINGERPRINT_DEPTH = 6  # Levels below <body> that make up the page skeleton
+_CLASS_SEPARATOR = re.compile(r"([-_]+)")
+
+class SelectorCacheStats(BaseModel):
+    """Running counters for a SelectorCache"""
+    hits: int = Field(default=0, description="Pages parsed with cached selectors that extracted enough content")
+    misses: int = Field(default=0, description="Pages that needed new selectors from the LLM")
+    invalidations: int = Field(default=0, description="Cached selectors dropped because they extracted too little content")
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {self.invalidations} invalidations, hit rate {self.hit_rate:.1%}"
+
+def url_domain(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+def normalize_class(name: str) -> str:
+    """
+    Class name with every dash/underscore-separated part that contains a digit replaced by `#`,
+    so per-page classes like `post-1234` or generated ones like `css-1x8b2` match across pages.
+    """
+    return "".join("#" if any(char.isdigit() for char in part) else part for part in _CLASS_SEPARATOR.split(name))
+
+def structural_fingerprint(soup: BeautifulSoup, depth: int = FINGERPRINT_DEPTH) -> str:
+    """
+    Hash of the page's layout skeleton: the set of tag/class paths in the top `depth` levels
+    below <body>. Text, ids, attribute values, numeric parts of class names (see normalize_class)
+    and the number of repeated siblings are ignored, so two articles from the same template share
+    a fingerprint.
+    """
+    root = soup.body or soup
+    paths = set()
+    stack = [(child, "", 1) for child in root.find_all(True, recursive=False)]
+    while stack:
+        element, parent_path, level = stack.pop()
+        classes = ".".join(sorted({normalize_class(name) for name in element.get("class") or []}))
+        path = f"{parent_path}/{element.name}{'.' + classes if classes else ''}"
+        paths.add(path)
+        if level < depth:
+            stack.extend((child, path, level + 1) for child in element.find_all(True, recursive=False))
+    return hashlib.sha256("\n".join(sorted(paths)).encode("utf-8")).hexdigest()[:32]
+
+class SelectorCache:
+    """
+    Persistent cache of LLM-generated CSS selectors, keyed by (domain, structural fingerprint),
+    so pages built from the same template reuse one set of selectors instead of an LLM call each.
+
+    Entries are small JSON files under `directory` (None, or an unwritable directory, keeps the
+    cache in memory only). Selectors that extract less than `min_content_ratio` of a page's text
+    are considered stale, e.g. after a redesign; `validate` drops them. A page only counts as a hit
+    once `validate` accepted what its cached selectors extracted.
+    """
+    def __init__(self, directory: Optional[str] = SELECTOR_CACHE_DIR, min_content_ratio: float = SELECTOR_CACHE_MIN_CONTENT_RATIO):
+        self.directory = directory
+        self.min_content_ratio = min_content_ratio
+        self.stats = SelectorCacheStats()
+        self._memory = {}
+
+    @staticmethod
+    def cache_key(url: str, fingerprint: str) -> str:
+        return hashlib.sha256(f"{url_domain(url)}|{fingerprint}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, url: str, fingerprint: str) -> Optional[List[str]]:
+        """Cached selectors for pages like this one, or None (counted as a miss). Check their output with `validate`."""
+        key = self.cache_key(url, fingerprint)
+        selectors = self._memory.get(key)
+        if selectors is None and self.directory is not None:
+            try:
+                with open(self._path(key), "r") as f:
+                    selectors = json.load(f).get("selectors")
+                self._memory[key] = selectors
+            except (OSError, ValueError):
+                selectors = None
+        if not selectors:
+            self.stats.misses += 1
+        return selectors or None
+
+    def put(self, url: str, fingerprint: str, selectors: List[str]) -> None:
+        key = self.cache_key(url, fingerprint)
+        self._memory[key] = selectors
+        if self.directory is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(key) + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"domain": url_domain(url), "fingerprint": fingerprint, "selectors": selectors, "created_at": time.time()}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            LOGGER.warning(f"Selector cache persistence disabled: {e}")
+            self.directory = None
+
+    def invalidate(self, url: str, fingerprint: str) -> None:
+        key = self.cache_key(url, fingerprint)
+        self._memory.pop(key, None)
+        self.stats.invalidations += 1
+        if self.directory is not None:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def validate(self, url: str, fingerprint: str, content: Optional[str], page_text_length: int) -> bool:
+        """
+        Check the content cached selectors extracted from a page: a hit when it is sufficient,
+        otherwise the entry is invalidated and the page counts as a miss.
+        """
+        if self.is_sufficient(content, page_text_length):
+            self.stats.hits += 1
+            return True
+        self.invalidate(url, fingerprint)
+        self.stats.misses += 1
+        return False
+
+    def is_sufficient(self, content: Optional[str], page_text_length: int) -> bool:
+        """Whether selectors extracted enough of the page's text to be trusted."""
+        if not content or not content.strip():
+            return False
+        return len(content) >= self.min_content_ratio * page_text_length
+
+_SELECTOR_CACHE: Optional[SelectorCache] = None
+
+def get_selector_cache() -> SelectorCache:
+    """Returns the process-wide selector cache."""
+    global _SELECTOR_CACHE
+    if _SELECTOR_CACHE is None:
+        _SELECTOR_CACHE = SelectorCache()
+    return _SELECTOR_CACHE
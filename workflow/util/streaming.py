@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+from workflow.util.logger import LOGGER
+
+# Receives incremental generation events, e.g. {"type": "delta", "content": "Hel"}
+StreamSink = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_STREAM_SINK: ContextVar[Optional[StreamSink]] = ContextVar("stream_sink", default=None)
+
+def get_stream_sink() -> Optional[StreamSink]:
+    return _STREAM_SINK.get()
+
+def is_streaming() -> bool:
+    """Whether whoever is waiting on the current request wants token deltas."""
+    return _STREAM_SINK.get() is not None
+
+@contextmanager
+def stream_deltas(sink: Optional[StreamSink]) -> Iterator[None]:
+    """
+    Route the deltas of every LLM call made inside the block (including tasks it spawns) to `sink`.
+    A sink of None turns streaming off for the block, e.g. for LLM calls made by tools.
+    """
+    token = _STREAM_SINK.set(sink)
+    try:
+        yield
+    finally:
+        _STREAM_SINK.reset(token)
+
+async def emit_delta(content: str, **fields: Any) -> None:
+    """
+    Send a text delta to the current sink, if any. A failing sink (e.g. a dropped Redis connection)
+    never interrupts the generation; the full message is still returned as usual.
+    """
+    sink = _STREAM_SINK.get()
+    if sink is None or not content:
+        return
+    try:
+        await sink({"type": "delta", "content": content, **fields})
+    except Exception as e:
+        LOGGER.debug(f"Dropping stream delta: {e}")
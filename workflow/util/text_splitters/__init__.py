@@ -1,6 +1,6 @@
-from .text_splitter import TextSplitter, EmbeddingGenerator, SplitterType, LengthType
+from .text_splitter import BaseTextSplitter, TextSplitter, EmbeddingGenerator, SplitterType, LengthType
 from .semantic_text_splitter import SemanticTextSplitter
 from .utils import cosine_similarity, split_text_with_regex, est_messages_token_count, est_token_count
 
-__all__ = ['TextSplitter', 'EmbeddingGenerator', 'SplitterType', 'SemanticTextSplitter', 'LengthType', 
+__all__ = ['BaseTextSplitter', 'TextSplitter', 'EmbeddingGenerator', 'SplitterType', 'SemanticTextSplitter', 'LengthType', 
             'cosine_similarity', 'split_text_with_regex', 'est_messages_token_count', 'est_token_count' ]
@@ -1,11 +1,11 @@
 import re
-from typing import List, Any
+from typing import List, Any, Optional, Tuple
 from pydantic import Field
 from workflow.util import LOGGER
-from workflow.util.text_splitters.utils import cosine_similarity, est_token_count
-from workflow.util.text_splitters.text_splitter import TextSplitter, SplitterType, EmbeddingGenerator
+from workflow.util.text_splitters.utils import adjacent_cosine_similarities, weighted_mean_pool, est_token_count
+from workflow.util.text_splitters.text_splitter import BaseTextSplitter, TextSplitter, SplitterType, EmbeddingGenerator
 
-class SemanticTextSplitter(TextSplitter):
+class SemanticTextSplitter(BaseTextSplitter):
     splitter_type: SplitterType = SplitterType.SEMANTIC
     similarity_threshold: float = Field(
         default=0.5,
@@ -20,17 +20,35 @@ class SemanticTextSplitter(TextSplitter):
             - chunk_overlap: Number of tokens to overlap between chunks
             - similarity_threshold: Threshold for cosine similarity between sentence embeddings, defaults to 0.5
         """
+        chunks, _ = await self._split(text, embedding_generator, api_data, pool=False)
+        return chunks
+
+    async def split_text_with_embeddings(
+        self, text: str, embedding_generator: EmbeddingGenerator, api_data: Any
+    ) -> Tuple[List[str], Optional[List[List[float]]]]:
+        """
+        Split like `split_text`, and also return a vector per chunk: the token-weighted mean of the
+        embeddings of the windows (and overlap pieces) it is made of, so the chunks don't need a
+        second embedding pass. Vectors are None when nothing was embedded (text too short to split)
+        or some window embeddings are missing.
+        """
+        return await self._split(text, embedding_generator, api_data, pool=True)
+
+    async def _split(
+        self, text: str, embedding_generator: EmbeddingGenerator, api_data: Any, pool: bool
+    ) -> Tuple[List[str], Optional[List[List[float]]]]:
         # If the text is too short, return it as is
-        if est_token_count(text) < self.chunk_size * 2:
-            return [text]
+        if est_token_count(text, model=self.tokenizer_model) < self.chunk_size * 2:
+            return [text], None
             
         LOGGER.info(f"Semantic text chunking for input text with total char length {len(text)} "
-                   f"with est token count {est_token_count(text)}")
+                   f"with est token count {est_token_count(text, model=self.tokenizer_model)}")
         
         text_splitter = TextSplitter(
             chunk_size=self.chunk_size//4,
             chunk_overlap=0,
             length_function=self.length_function,
+            tokenizer_model=self.tokenizer_model,
             language=self.language,
         )
 
@@ -42,11 +60,21 @@ class SemanticTextSplitter(TextSplitter):
         breakpoints = self._find_breakpoints(embeddings, chunks)
         LOGGER.info(f"Breakpoints found: {breakpoints}")
         
-        final_chunks = self._create_final_chunks(breakpoints, chunks)
+        parts = self._final_chunk_parts(breakpoints, chunks)
+        final_chunks = [' '.join(piece for _, piece in chunk_parts) for chunk_parts in parts]
         LOGGER.info(f"Final chunks generated: {len(final_chunks)} with total char length "
                    f"{[len(chunk) for chunk in final_chunks]}")
-        
-        return final_chunks
+
+        if not pool or len(embeddings) != len(chunks):
+            return final_chunks, None
+        vectors = [
+            weighted_mean_pool(
+                [embeddings[idx] for idx, _ in chunk_parts],
+                [max(est_token_count(piece, model=self.tokenizer_model), 1) for _, piece in chunk_parts]
+            )
+            for chunk_parts in parts
+        ]
+        return final_chunks, vectors
         
     def _create_final_chunks(
         self,
@@ -54,8 +82,19 @@ class SemanticTextSplitter(TextSplitter):
         chunks: List[str]
     ) -> List[str]:
         """Create final text chunks with proper overlap using TextSplitter for overlap boundaries."""
+        return [' '.join(piece for _, piece in chunk_parts) for chunk_parts in self._final_chunk_parts(breakpoints, chunks)]
+
+    def _final_chunk_parts(
+        self,
+        breakpoints: List[int],
+        chunks: List[str]
+    ) -> List[List[Tuple[int, str]]]:
+        """
+        The pieces each final chunk is joined from, as (window index, text): its windows plus, with
+        chunk_overlap, the end of the previous window and the start of the next one.
+        """
         if not self.chunk_overlap:
-            return [' '.join(chunks[breakpoints[i]:breakpoints[i+1]]) 
+            return [[(j, chunks[j]) for j in range(breakpoints[i], breakpoints[i+1])]
                     for i in range(len(breakpoints)-1)]
         
         text_splitter = TextSplitter(
@@ -63,32 +102,33 @@ class SemanticTextSplitter(TextSplitter):
             chunk_overlap=0, 
             language=self.language,
             length_function=self.length_function,
+            tokenizer_model=self.tokenizer_model,
         )
         
-        final_chunks = []
+        final_parts = []
         for idx in range(len(breakpoints) - 1):
-            current_text = []
+            current_parts = []
             
             # Get overlap from previous chunk if not first
             if idx > 0:
-                prev_chunk = chunks[breakpoints[idx]-1]
-                prev_splits = text_splitter.split_text(prev_chunk)
+                prev_idx = breakpoints[idx]-1
+                prev_splits = text_splitter.split_text(chunks[prev_idx])
                 if prev_splits:
-                    current_text.append(prev_splits[-1])  # Take the last split that fits our overlap size
+                    current_parts.append((prev_idx, prev_splits[-1]))  # Take the last split that fits our overlap size
             
             # Add main chunk content
-            current_text.extend(chunks[breakpoints[idx]:breakpoints[idx+1]])
+            current_parts.extend((j, chunks[j]) for j in range(breakpoints[idx], breakpoints[idx+1]))
             
             # Add overlap to next chunk if not last
             if idx < len(breakpoints) - 2:
-                next_chunk = chunks[breakpoints[idx+1]]
-                next_splits = text_splitter.split_text(next_chunk)
+                next_idx = breakpoints[idx+1]
+                next_splits = text_splitter.split_text(chunks[next_idx])
                 if next_splits:
-                    current_text.append(next_splits[0])  # Take the first split that fits our overlap size
+                    current_parts.append((next_idx, next_splits[0]))  # Take the first split that fits our overlap size
             
-            final_chunks.append(' '.join(current_text))
+            final_parts.append(current_parts)
         
-        return final_chunks
+        return final_parts
     
     def _find_breakpoints(
         self,
@@ -114,14 +154,15 @@ class SemanticTextSplitter(TextSplitter):
             
         breakpoints = [0]
         current_tokens = 0
+        # All adjacent similarities in one pass; similarities[i - 1] is between windows i - 1 and i
+        similarities = adjacent_cosine_similarities(embeddings)
         
         for i in range(1, len(embeddings)):
-            similarity = cosine_similarity(embeddings[i - 1], embeddings[i])
-            tokens = est_token_count(windows[i])
+            tokens = est_token_count(windows[i], model=self.tokenizer_model)
             current_tokens += tokens
             
             if (current_tokens >= self.chunk_size * MIN_SIZE_RATIO and 
-                similarity < self.similarity_threshold) or \
+                similarities[i - 1] < self.similarity_threshold) or \
             current_tokens >= self.chunk_size * MAX_SIZE_RATIO:
                 breakpoints.append(i)
                 current_tokens = 0
@@ -1,13 +1,31 @@
 import re
-from typing import List, Iterable, Optional, Protocol, Any, Literal
+from collections import deque
+from functools import lru_cache
+from typing import Callable, List, Iterable, Iterator, Deque, Optional, Pattern, Protocol, Any, Literal, Tuple, Union
 from pydantic import BaseModel, Field
 from enum import Enum
 from workflow.util.code_utils import Language
-from workflow.util.text_splitters.utils.regex_utils import split_text_with_regex
-from workflow.util.text_splitters.utils.token_utils import est_token_count
+from workflow.util.text_splitters.utils.regex_utils import compile_separator, split_text_with_pattern
+from workflow.util.token_counter import get_token_counter
 from workflow.util.logger import LOGGER
 from workflow.util.code_utils import get_separators_for_language
 
+# (separator, pattern to search for it or None for a literal, pattern to split on it)
+CompiledSeparator = Tuple[str, Optional[Pattern], Optional[Pattern]]
+
+@lru_cache(maxsize=128)
+def compile_separators(
+    separators: Tuple[str, ...], is_separator_regex: bool, keep_separator: Union[bool, Literal["start", "end"]]
+) -> Tuple[CompiledSeparator, ...]:
+    """Compile a separator list once, e.g. the one of a language, instead of at every recursion level."""
+    compiled = []
+    for separator in separators:
+        pattern = separator if is_separator_regex else re.escape(separator)
+        # Literal separators are looked up with `in`, which is much faster than a regex search
+        search_pattern = re.compile(pattern) if is_separator_regex and separator else None
+        compiled.append((separator, search_pattern, compile_separator(pattern, keep_separator)))
+    return tuple(compiled)
+
 class EmbeddingGenerator(Protocol):
     """Protocol defining the interface for embedding generation"""
     async def generate_embedding(self, inputs: List[str]) -> List[List[float]]:
@@ -24,8 +42,8 @@ class SplitterType(str, Enum):
     SEMANTIC = "semantic"
     RECURSIVE = "recursive"
 
-class TextSplitter(BaseModel):
-    """Base class for text splitters"""
+class BaseTextSplitter(BaseModel):
+    """Base class for text splitters: the shared configuration and length function"""
     splitter_type: SplitterType = Field(
         default=SplitterType.RECURSIVE,
         description="Type of text splitter being used"
@@ -48,6 +66,10 @@ class TextSplitter(BaseModel):
         default=LengthType.TOKEN,
         description="Metric to use for calculating length: 'token' or 'character'"
     )
+    tokenizer_model: Optional[str] = Field(
+        default=None,
+        description="Model whose tokenizer measures 'token' lengths. If None, the default encoding is used"
+    )
     is_separator_regex: bool = Field(
         default=False,
         description="Whether separators should be treated as regex patterns"
@@ -73,10 +95,6 @@ class TextSplitter(BaseModel):
     class Config:
         arbitrary_types_allowed = True
 
-    def split_text(self, text: str, embedding_generator: EmbeddingGenerator = None, api_data: Any = None) -> List[str]:
-        separators = self.separators or get_separators_for_language(self.language)
-        return self._recursive_split_text(text, separators)
-
     def get_string_size(self, text: str) -> int:
         """
         Calculate the size of a chunk of text using the configured length function.
@@ -87,94 +105,110 @@ class TextSplitter(BaseModel):
         Returns:
             Size of the text according to the configured length function
         """
+        return self._size_function()(text)
+
+    def _size_function(self) -> Callable[[str], int]:
+        """The configured length function, resolved once so splitting doesn't dispatch per piece."""
         if self.length_function == "token":
-            return est_token_count(text)
+            return get_token_counter(self.tokenizer_model).count
         elif self.length_function == "character":
-            return len(text)
+            return len
         else:
             raise ValueError(f"Unknown length function: {self.length_function}")
 
+class TextSplitter(BaseTextSplitter):
+    """Recursive text splitter: splits on the language's separators, coarsest first, and merges the pieces into chunks"""
+    def split_text(self, text: str, embedding_generator: EmbeddingGenerator = None, api_data: Any = None) -> List[str]:
+        return list(self.iter_split_text(text))
+
+    def iter_split_text(self, text: str) -> Iterator[str]:
+        """Yield the chunks of `text` one by one, in order, without building the full list."""
+        separators = self.separators or get_separators_for_language(self.language)
+        compiled = compile_separators(tuple(separators), self.is_separator_regex, self.keep_separator)
+        return self._iter_split_text(text, compiled)
+
     def _recursive_split_text(self, text: str, separators: List[str]) -> List[str]:
         """Split incoming text and return chunks."""
-        final_chunks = []
+        return list(self._iter_split_text(text, compile_separators(tuple(separators), self.is_separator_regex, self.keep_separator)))
+
+    def _iter_split_text(self, text: str, separators: Tuple[CompiledSeparator, ...]) -> Iterator[str]:
+        """Split incoming text and yield chunks. Each piece is measured once and its size carried along."""
         # Get appropriate separator to use
-        separator = separators[-1]
-        new_separators = []
-        for i, _s in enumerate(separators):
-            _separator = _s if self.is_separator_regex else re.escape(_s)
+        separator, split_pattern = separators[-1][0], separators[-1][2]
+        new_separators: Tuple[CompiledSeparator, ...] = ()
+        for i, (_s, search_pattern, _split_pattern) in enumerate(separators):
             if _s == "":
-                separator = _s
+                separator, split_pattern = _s, _split_pattern
                 break
-            if re.search(_separator, text):
-                separator = _s
-                new_separators = separators[i + 1 :]
+            if (_s in text) if search_pattern is None else search_pattern.search(text):
+                separator, split_pattern = _s, _split_pattern
+                new_separators = separators[i + 1:]
                 break
 
-        _separator = separator if self.is_separator_regex else re.escape(separator)
-        chunks = split_text_with_regex(text, _separator, self.keep_separator)
+        chunks = split_text_with_pattern(text, split_pattern, self.keep_separator)
 
         # Now go merging things, recursively splitting longer texts.
-        _good_chunks = []
+        measure, chunk_size = self._size_function(), self.chunk_size
+        _good_chunks: List[Tuple[str, int]] = []
         _separator = "" if self.keep_separator else separator
         for s in chunks:
-            if self.get_string_size(s) < self.chunk_size:
-                _good_chunks.append(s)
+            size = measure(s)
+            if size < chunk_size:
+                _good_chunks.append((s, size))
             else:
                 if _good_chunks:
-                    merged_text = self._merge_chunks(_good_chunks, _separator)
-                    final_chunks.extend(merged_text)
+                    yield from self._iter_merge_chunks(_good_chunks, _separator)
                     _good_chunks = []
                 if not new_separators:
-                    final_chunks.append(s)
+                    yield s
                 else:
-                    other_info = self._recursive_split_text(s, new_separators)
-                    final_chunks.extend(other_info)
+                    yield from self._iter_split_text(s, new_separators)
         if _good_chunks:
-            merged_text = self._merge_chunks(_good_chunks, _separator)
-            final_chunks.extend(merged_text)
-        return final_chunks
-        
+            yield from self._iter_merge_chunks(_good_chunks, _separator)
+
     def _merge_chunks(self, chunks: Iterable[str], separator: str) -> List[str]:
+        return list(self._iter_merge_chunks(((d, self.get_string_size(d)) for d in chunks), separator))
+
+    def _iter_merge_chunks(self, sized_chunks: Iterable[Tuple[str, int]], separator: str) -> Iterator[str]:
         # We now want to combine these smaller pieces into medium size
-        # chunks to send to the LLM.
+        # chunks to send to the LLM. Pieces come with their size, and the
+        # current window is a deque so dropping from its front is O(1).
         separator_len = self.get_string_size(separator)
+        chunk_size, chunk_overlap = self.chunk_size, self.chunk_overlap
 
-        docs = []
-        current_doc: List[str] = []
+        current_doc: Deque[Tuple[str, int]] = deque()
         total = 0
-        for d in chunks:
-            _len = self.get_string_size(d)
+        for d, _len in sized_chunks:
             if (
                 total + _len + (separator_len if len(current_doc) > 0 else 0)
-                > self.chunk_size
+                > chunk_size
             ):
-                if total > self.chunk_size:
+                if total > chunk_size:
                     LOGGER.warning(
                         f"Created a chunk of size {total}, "
-                        f"which is longer than the specified {self.chunk_size}"
+                        f"which is longer than the specified {chunk_size}"
                     )
                 if len(current_doc) > 0:
-                    doc = self._join_docs(current_doc, separator)
+                    doc = self._join_docs([piece for piece, _ in current_doc], separator)
                     if doc is not None:
-                        docs.append(doc)
+                        yield doc
                     # Keep on popping if:
                     # - we have a larger chunk than in the chunk overlap
                     # - or if we still have any chunks and the length is long
-                    while total > self.chunk_overlap or (
+                    while total > chunk_overlap or (
                         total + _len + (separator_len if len(current_doc) > 0 else 0)
-                        > self.chunk_size
+                        > chunk_size
                         and total > 0
                     ):
-                        total -= self.get_string_size(current_doc[0]) + (
+                        total -= current_doc[0][1] + (
                             separator_len if len(current_doc) > 1 else 0
                         )
-                        current_doc = current_doc[1:]
-            current_doc.append(d)
+                        current_doc.popleft()
+            current_doc.append((d, _len))
             total += _len + (separator_len if len(current_doc) > 1 else 0)
-        doc = self._join_docs(current_doc, separator)
+        doc = self._join_docs([piece for piece, _ in current_doc], separator)
         if doc is not None:
-            docs.append(doc)
-        return docs
+            yield doc
     
     def _join_docs(self, docs: List[str], separator: str) -> Optional[str]:
         text = separator.join(docs)
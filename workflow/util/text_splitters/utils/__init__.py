@@ -1,5 +1,5 @@
-from .embedding_utils import cosine_similarity
+from .embedding_utils import cosine_similarity, adjacent_cosine_similarities, weighted_mean_pool
 from .regex_utils import split_text_with_regex
 from .token_utils import est_messages_token_count, est_token_count
 
-__all__ = ['RecursiveTextSplitter', 'cosine_similarity', 'est_messages_token_count', 'est_token_count', 'split_text_with_regex']
+__all__ = ['RecursiveTextSplitter', 'cosine_similarity', 'adjacent_cosine_similarities', 'weighted_mean_pool', 'est_messages_token_count', 'est_token_count', 'split_text_with_regex']
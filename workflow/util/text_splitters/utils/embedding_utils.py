@@ -11,3 +11,23 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
         return 0.0
     return float(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)))
 
+
+
+def adjacent_cosine_similarities(vectors: List[List[float]]) -> np.ndarray:
+    """
+    Cosine similarity of every vector with the next one, in one vectorized pass: n vectors give
+    n - 1 values. Pairs involving a zero vector get 0.0, like `cosine_similarity`.
+    """
+    matrix = np.asarray(vectors, dtype=np.float64)
+    if len(matrix) < 2:
+        return np.zeros(0)
+    norms = np.linalg.norm(matrix, axis=1)
+    dots = np.einsum("ij,ij->i", matrix[:-1], matrix[1:])
+    denominators = norms[:-1] * norms[1:]
+    return np.divide(dots, denominators, out=np.zeros_like(dots), where=denominators != 0)
+
+def weighted_mean_pool(vectors: List[List[float]], weights: List[float]) -> List[float]:
+    """Weighted mean of vectors, L2-normalized like the vectors embedding APIs return."""
+    pooled = np.average(np.asarray(vectors, dtype=np.float64), axis=0, weights=np.asarray(weights, dtype=np.float64))
+    norm = np.linalg.norm(pooled)
+    return (pooled / norm if norm else pooled).tolist()
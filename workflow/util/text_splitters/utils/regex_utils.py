@@ -1,14 +1,25 @@
 import re
-from typing import List, Literal, Union
+from typing import List, Literal, Optional, Pattern, Union
 
 def split_text_with_regex(
     text: str, separator: str, keep_separator: Union[bool, Literal["start", "end"]]
+) -> List[str]:
+    return split_text_with_pattern(text, compile_separator(separator, keep_separator), keep_separator)
+
+def compile_separator(separator: str, keep_separator: Union[bool, Literal["start", "end"]]) -> Optional[Pattern]:
+    """The pattern `split_text_with_pattern` splits on, or None for the empty separator (split into characters)."""
+    if not separator:
+        return None
+    # The parentheses in the pattern keep the delimiters in the result.
+    return re.compile(f"({separator})" if keep_separator else separator)
+
+def split_text_with_pattern(
+    text: str, pattern: Optional[Pattern], keep_separator: Union[bool, Literal["start", "end"]]
 ) -> List[str]:
     # Now that we have the separator, split the text
-    if separator:
+    if pattern is not None:
         if keep_separator:
-            # The parentheses in the pattern keep the delimiters in the result.
-            _splits = re.split(f"({separator})", text)
+            _splits = pattern.split(text)
             splits = (
                 ([_splits[i] + _splits[i + 1] for i in range(0, len(_splits) - 1, 2)])
                 if keep_separator == "end"
@@ -22,7 +33,7 @@ def split_text_with_regex(
                 else ([_splits[0]] + splits)
             )
         else:
-            splits = re.split(separator, text)
+            splits = pattern.split(text)
     else:
         splits = list(text)
     return [s for s in splits if s != ""]
\ No newline at end of file
@@ -1,14 +1,11 @@
-from typing import List, Any, Dict
-from workflow.util.const import CHAR_TO_TOKEN, EST_TOKENS_PER_TOOL
-from workflow.util.message_prune.message_prune_utils import calculate_message_size, MessageApiFormat
+from typing import List, Any, Optional
+from workflow.util.token_counter import get_token_counter
+from workflow.util.message_prune.message_prune_utils import MessageApiFormat
 
-def est_token_count(text: str) -> int:
-    """Estimate token count for a given string."""
-    return int(len(text) // CHAR_TO_TOKEN)
+def est_token_count(text: str, model: Optional[str] = None) -> int:
+    """Token count of a string, with the tokenizer of `model` when one is available."""
+    return get_token_counter(model).count(text)
 
-def est_messages_token_count(messages: List[MessageApiFormat], tools: List[Any] = None) -> int:
-    """Estimate token count for a list of messages and optional tools."""
-    total_tokens = sum(calculate_message_size(msg) / CHAR_TO_TOKEN for msg in messages)
-    if tools:
-        total_tokens += EST_TOKENS_PER_TOOL * len(tools)
-    return total_tokens
\ No newline at end of file
+def est_messages_token_count(messages: List[MessageApiFormat], tools: List[Any] = None, model: Optional[str] = None) -> int:
+    """Token count of a list of messages and optional tools, with the tokenizer of `model` when one is available."""
+    return get_token_counter(model).count_messages(messages, tools)
@@ -0,0 +1,125 @@
+import os, json, hashlib, threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from workflow.util.const import CHAR_TO_TOKEN, EST_TOKENS_PER_TOOL, TOKENIZER_ENCODING, TOKENIZER_CACHE_DIR, TOKEN_COUNT_CACHE_SIZE
+from workflow.util.logger import LOGGER
+
+HEURISTIC = "heuristic"
+_fallback_warned = False
+
+class TokenCounter:
+    """
+    Counts the tokens of text and of chat messages in API format. This base class is the
+    character heuristic (len / CHAR_TO_TOKEN); subclasses plug in a real tokenizer.
+    """
+    name: str = HEURISTIC
+    tokens_per_message: int = 0  # Role and delimiter tokens the chat format adds to every message
+
+    def count(self, text: str) -> int:
+        return int(len(text) // CHAR_TO_TOKEN) if text else 0
+
+    def message_sizes(self, message: Dict[str, Any]) -> Tuple[int, int]:
+        """(content_tokens, tool_call_tokens) of a message."""
+        content = message.get("content") or ""
+        tool_calls = message.get("tool_calls") or []
+        return (
+            self.count(content if isinstance(content, str) else str(content)),
+            sum(self.count(str(tool_call)) for tool_call in tool_calls),
+        )
+
+    def count_tool(self, tool: Any) -> int:
+        return EST_TOKENS_PER_TOOL
+
+    def count_messages(self, messages: Sequence[Dict[str, Any]], tools: Optional[List[Any]] = None) -> int:
+        total = sum(sum(self.message_sizes(message)) + self.tokens_per_message for message in messages)
+        return total + sum(self.count_tool(tool) for tool in tools or [])
+
+class TiktokenCounter(TokenCounter):
+    """
+    Exact counts from a tiktoken BPE encoding. Counts are memoized by content hash, so messages
+    that don't change between turns are never re-tokenized.
+    """
+    tokens_per_message = 3
+
+    def __init__(self, encoding: Any, max_entries: int = TOKEN_COUNT_CACHE_SIZE):
+        self.encoding = encoding
+        self.name = encoding.name
+        self.max_entries = max_entries
+        self._counts: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._lock:
+            tokens = self._counts.get(key)
+            if tokens is not None:
+                self._counts.move_to_end(key)
+                return tokens
+        tokens = len(self.encoding.encode_ordinary(text))
+        with self._lock:
+            self._counts[key] = tokens
+            if len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return tokens
+
+    def count_tool(self, tool: Any) -> int:
+        if hasattr(tool, "model_dump"):
+            tool = tool.model_dump()
+        return self.count(json.dumps(tool, default=str))
+
+# Model name prefix -> counter; checked before tiktoken's own model table
+_REGISTERED: Dict[str, TokenCounter] = {}
+
+def register_token_counter(model_prefix: str, counter: TokenCounter) -> None:
+    """Use `counter` for every model whose name starts with `model_prefix` (longest prefix wins)."""
+    _REGISTERED[model_prefix] = counter
+    get_token_counter.cache_clear()
+
+def _encoding_name_for(model: Optional[str]) -> str:
+    if TOKENIZER_ENCODING == HEURISTIC:
+        return HEURISTIC
+    if model:
+        try:
+            from tiktoken.model import encoding_name_for_model
+            return encoding_name_for_model(model)
+        except (ImportError, KeyError):
+            pass
+    return TOKENIZER_ENCODING
+
+def _heuristic_fallback(reason: str) -> TokenCounter:
+    """The heuristic counter, warning the first time a tokenizer is unavailable (later fallbacks only log at debug)."""
+    global _fallback_warned
+    if _fallback_warned:
+        LOGGER.debug(reason)
+    else:
+        _fallback_warned = True
+        LOGGER.warning(f"{reason}; token counts are estimated from characters (len / {CHAR_TO_TOKEN})")
+    return TokenCounter()
+
+@lru_cache(maxsize=None)
+def _counter_for_encoding(encoding_name: str) -> TokenCounter:
+    """One counter per encoding, falling back to the heuristic when the BPE file can't be loaded."""
+    if encoding_name == HEURISTIC:
+        return TokenCounter()
+    try:
+        import tiktoken
+    except ImportError:
+        return _heuristic_fallback("tiktoken is not installed")
+    # tiktoken downloads BPE files once and reads them from here afterwards (or offline, if pre-seeded)
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", TOKENIZER_CACHE_DIR)
+    try:
+        return TiktokenCounter(tiktoken.get_encoding(encoding_name))
+    except Exception as e:
+        return _heuristic_fallback(f"Could not load tokenizer {encoding_name}: {e}")
+
+@lru_cache(maxsize=256)
+def get_token_counter(model: Optional[str] = None) -> TokenCounter:
+    """The token counter for `model`; None gives the default encoding's counter."""
+    if model:
+        prefixes = [prefix for prefix in _REGISTERED if model.startswith(prefix)]
+        if prefixes:
+            return _REGISTERED[max(prefixes, key=len)]
+    return _counter_for_encoding(_encoding_name_for(model))
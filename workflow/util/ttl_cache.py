@@ -0,0 +1,83 @@
+import time, asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class AsyncTTLCache(Generic[T]):
+    """
+    Bounded, in-process cache of async lookups with a per-entry time-to-live.
+
+    - Entries expire `ttl` seconds after they were stored
+    - At most `max_size` entries are kept; the least recently used is evicted first
+    - Concurrent `get_or_load` calls for the same key share a single in-flight load
+      ("single flight"), so a burst of requests triggers one backend call. The load runs in a task
+      of its own, so cancelling any caller, including the one that started it, leaves it running
+      for the others
+    """
+    def __init__(self, ttl: float, max_size: int, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, T]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, "asyncio.Future[T]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[T]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: T) -> None:
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]],
+        should_cache: Callable[[T], bool] = lambda value: True
+    ) -> T:
+        """
+        Returns the cached value for `key`, or awaits `loader()` to produce it. Only values for which
+        `should_cache` is true are stored; loader errors propagate to every waiting caller.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        load = self._in_flight.get(key)
+        if load is None:
+            load = asyncio.ensure_future(self._load(key, loader, should_cache))
+            load.add_done_callback(_retrieve_exception)
+            self._in_flight[key] = load
+        return await asyncio.shield(load)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[T]], should_cache: Callable[[T], bool]) -> T:
+        try:
+            value = await loader()
+            if should_cache(value):
+                self.set(key, value)
+            return value
+        finally:
+            self._in_flight.pop(key, None)
+
+def _retrieve_exception(load: "asyncio.Future[Any]") -> None:
+    """Mark a load's exception as retrieved, in case every caller waiting on it was cancelled."""
+    if not load.cancelled():
+        load.exception()
@@ -0,0 +1,6 @@
+from .similarity_engine import SimilarityEngine, normalize_rows, normalize_vector, relax_similarity_threshold, select_top_k
+from .ann_index import IVFFlatIndex
+from .disk_index import VectorIndex, VECTOR_INDEX_ROOT
+
+__all__ = ['SimilarityEngine', 'IVFFlatIndex', 'VectorIndex', 'VECTOR_INDEX_ROOT', 'normalize_rows', 'normalize_vector', 
+           'relax_similarity_threshold', 'select_top_k']
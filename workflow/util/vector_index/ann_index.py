@@ -0,0 +1,167 @@
+import os, json
+import numpy as np
+from typing import List, Optional, Tuple
+from workflow.util.logger import LOGGER
+from workflow.util.vector_index.similarity_engine import normalize_rows
+
+IVF_DATA_FILE = "ivf.npz"
+IVF_KEYS_FILE = "ivf.json"
+ASSIGN_BATCH_SIZE = 8192
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLES_PER_LIST = 64
+
+class IVFFlatIndex:
+    """
+    Inverted-file ("IVF-flat") approximate nearest-neighbour index over a row-normalized matrix.
+
+    Rows are partitioned into `n_lists` clusters by spherical k-means. A query is compared to
+    the list centroids, and only the rows of the `n_probes` closest lists are scored exactly.
+    More probes trade latency for recall; probing every list gives the exact result.
+
+    Row assignments are tracked together with the key each row held when it was assigned,
+    so the index can be refreshed after the owning VectorIndex adds, removes or reuses rows
+    without retraining the centroids.
+    """
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray, assigned_keys: List[Optional[str]]):
+        self.centroids = centroids
+        self.assignments = assignments
+        self.assigned_keys = assigned_keys
+        self.trained_rows = int(np.count_nonzero(assignments >= 0))
+        self._build_lists()
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    @staticmethod
+    def default_n_lists(n_rows: int) -> int:
+        return int(min(4096, max(1, round(np.sqrt(n_rows)))))
+
+    @classmethod
+    def train(cls, matrix: np.ndarray, row_keys: List[Optional[str]], n_lists: Optional[int] = None, seed: int = 0) -> "IVFFlatIndex":
+        """Train centroids on a sample of the live rows and assign every live row to its closest list."""
+        live_rows = np.array([row for row, key in enumerate(row_keys) if key is not None], dtype=np.int64)
+        n_lists = min(n_lists or cls.default_n_lists(len(live_rows)), max(1, len(live_rows)))
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(live_rows), n_lists * KMEANS_SAMPLES_PER_LIST)
+        sample_rows = np.sort(rng.choice(live_rows, size=sample_size, replace=False)) if sample_size else live_rows
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+        if len(sample) == 0:
+            centroids = np.zeros((1, matrix.shape[1]), dtype=np.float32)
+        else:
+            centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+            for _ in range(KMEANS_ITERATIONS):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, sample)
+                empty = np.bincount(labels, minlength=n_lists) == 0
+                # Re-seed empty lists with random sample rows so every list stays useful
+                sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+                centroids = normalize_rows(sums)
+        index = cls(centroids, np.full(len(row_keys), -1, dtype=np.int32), [None] * len(row_keys))
+        index.refresh(matrix, row_keys)
+        index.trained_rows = len(live_rows)
+        LOGGER.info(f"Trained IVF index with {n_lists} lists over {len(live_rows)} rows")
+        return index
+
+    def _assign(self, matrix: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        labels = np.empty(len(rows), dtype=np.int32)
+        for start in range(0, len(rows), ASSIGN_BATCH_SIZE):
+            batch = np.asarray(matrix[rows[start:start + ASSIGN_BATCH_SIZE]], dtype=np.float32)
+            labels[start:start + len(batch)] = np.argmax(batch @ self.centroids.T, axis=1)
+        return labels
+
+    def _build_lists(self) -> None:
+        """Group rows by list as CSR-style offsets into a row array."""
+        assigned = np.flatnonzero(self.assignments >= 0)
+        order = np.argsort(self.assignments[assigned], kind="stable")
+        self.list_rows = assigned[order]
+        counts = np.bincount(self.assignments[assigned], minlength=self.n_lists)
+        self.list_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def refresh(self, matrix: np.ndarray, row_keys: List[Optional[str]]) -> int:
+        """
+        Re-assign rows whose key changed since they were last assigned (new, reused or removed rows).
+
+        Returns:
+            Number of rows whose assignment changed
+        """
+        n_rows = len(row_keys)
+        resized = n_rows != len(self.assignments)
+        if resized:
+            assignments = np.full(n_rows, -1, dtype=np.int32)
+            keep = min(n_rows, len(self.assignments))
+            assignments[:keep] = self.assignments[:keep]
+            self.assignments = assignments
+            self.assigned_keys = (self.assigned_keys + [None] * n_rows)[:n_rows]
+        changed = [row for row in range(n_rows) if row_keys[row] != self.assigned_keys[row]]
+        if not changed:
+            if resized:
+                self._build_lists()
+            return 0
+        changed_rows = np.array(changed, dtype=np.int64)
+        live = np.array([row_keys[row] is not None for row in changed], dtype=bool)
+        self.assignments[changed_rows[~live]] = -1
+        if live.any():
+            self.assignments[changed_rows[live]] = self._assign(matrix, changed_rows[live])
+        for row in changed:
+            self.assigned_keys[row] = row_keys[row]
+        self._build_lists()
+        return len(changed)
+
+    def needs_retraining(self, row_keys: List[Optional[str]]) -> bool:
+        """Centroids trained on a much smaller set stop partitioning the data evenly."""
+        live = sum(1 for key in row_keys if key is not None)
+        return live > 4 * max(self.trained_rows, 1) or self.n_lists < self.default_n_lists(live) // 4
+
+    def candidate_rows(self, query: np.ndarray, n_probes: int) -> np.ndarray:
+        """Rows from the `n_probes` lists whose centroids are closest to the (normalized) query."""
+        n_probes = max(1, min(n_probes, self.n_lists))
+        centroid_scores = self.centroids @ query
+        probes = np.argpartition(-centroid_scores, n_probes - 1)[:n_probes] if n_probes < self.n_lists else np.arange(self.n_lists)
+        ranges = [self.list_rows[self.list_offsets[p]:self.list_offsets[p + 1]] for p in probes]
+        return np.sort(np.concatenate(ranges)) if ranges else np.empty(0, dtype=np.int64)
+
+    def search(self, matrix: np.ndarray, query: np.ndarray, n_probes: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            Tuple of (rows, scores) for every candidate row
+        """
+        rows = self.candidate_rows(query, n_probes)
+        if len(rows) == 0:
+            return rows, np.empty(0, dtype=np.float32)
+        return rows, np.asarray(matrix[rows], dtype=np.float32) @ query
+
+    def save(self, directory: str) -> None:
+        data_path = os.path.join(directory, IVF_DATA_FILE)
+        keys_path = os.path.join(directory, IVF_KEYS_FILE)
+        with open(data_path + ".tmp", "wb") as f:
+            np.savez(f, centroids=self.centroids, assignments=self.assignments)
+        with open(keys_path + ".tmp", "w") as f:
+            json.dump({"trained_rows": self.trained_rows, "keys": self.assigned_keys}, f)
+        os.replace(data_path + ".tmp", data_path)
+        os.replace(keys_path + ".tmp", keys_path)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["IVFFlatIndex"]:
+        data_path = os.path.join(directory, IVF_DATA_FILE)
+        keys_path = os.path.join(directory, IVF_KEYS_FILE)
+        if not os.path.exists(data_path) or not os.path.exists(keys_path):
+            return None
+        with np.load(data_path) as data:
+            centroids, assignments = data["centroids"], data["assignments"]
+        with open(keys_path, "r") as f:
+            meta = json.load(f)
+        if len(meta["keys"]) != len(assignments):
+            LOGGER.warning(f"IVF index files in {directory} are out of step, ignoring them")
+            return None
+        index = cls(centroids, assignments, meta["keys"])
+        index.trained_rows = meta.get("trained_rows", index.trained_rows)
+        return index
+
+    @staticmethod
+    def remove(directory: str) -> None:
+        for filename in (IVF_DATA_FILE, IVF_KEYS_FILE):
+            path = os.path.join(directory, filename)
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,374 @@
+import os, json, fcntl, threading
+import numpy as np
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+from workflow.util.const import SHARED_UPLOAD_DIR, VECTOR_INDEX_MAX_OPEN
+from workflow.util.logger import LOGGER
+from workflow.util.vector_index.similarity_engine import VectorLike, normalize_rows, normalize_vector
+from workflow.util.vector_index.ann_index import IVFFlatIndex, IVF_KEYS_FILE
+
+VECTOR_INDEX_ROOT = os.path.join(SHARED_UPLOAD_DIR, "vector_indexes")
+VECTORS_FILE = "vectors.f32"
+SIDECAR_FILE = "index.json"
+LOCK_FILE = ".lock"
+
+# Open indexes for this process, keyed by directory, in least recently used order; each one reloads
+# itself when the files change. Past VECTOR_INDEX_MAX_OPEN, the least recently used one is closed.
+_OPEN_INDEXES: "OrderedDict[str, VectorIndex]" = OrderedDict()
+_OPEN_INDEXES_LOCK = threading.Lock()
+
+class VectorIndex:
+    """
+    Persistent, memory-mapped vector index for a single DataCluster.
+
+    Vectors are stored row-normalized as raw float32 in `vectors.f32`, and a small JSON
+    sidecar maps each row offset to its key. Removed rows are zeroed and marked free, to be
+    reused by later additions; the file is compacted once free rows outnumber live ones.
+    Reads take a shared file lock and writes an exclusive one, so several worker processes
+    can use the same index.
+
+    An optional IVF-flat ANN structure (see IVFFlatIndex) can be built with `build_ann`; once
+    present, it is kept up to date on every sync and used by `score` when `n_probes` is given.
+
+    `sync_version` syncs from a versioned source and keeps a payload per key in memory, so a
+    caller that can cheaply tell its data hasn't changed pays nothing per query beyond `search`.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.dimension: Optional[int] = None
+        self.row_keys: List[Optional[str]] = []
+        self.offsets: Dict[str, int] = {}
+        self.live_rows: np.ndarray = np.empty(0, dtype=np.int64)
+        self._sidecar_stat: Optional[Tuple[int, int]] = None
+        self._ivf: Optional[IVFFlatIndex] = None
+        self._ivf_stat: Optional[Tuple[int, int]] = None
+        # (version, payloads) of the last sync_version, swapped as one under the exclusive lock
+        self._synced: Tuple[Optional[Hashable], Dict[str, Any]] = (None, {})
+        os.makedirs(directory, exist_ok=True)
+        with self._locked(shared=True):
+            self._load_sidecar()
+
+    @classmethod
+    def for_cluster(cls, cluster_id: str, root: Optional[str] = None) -> "VectorIndex":
+        """Returns the index for a cluster, reusing this process's open instance if there is one."""
+        directory = os.path.join(root or VECTOR_INDEX_ROOT, cluster_id)
+        evicted: List[VectorIndex] = []
+        with _OPEN_INDEXES_LOCK:
+            index = _OPEN_INDEXES.get(directory)
+            if index is None:
+                index = _OPEN_INDEXES[directory] = cls(directory)
+                while len(_OPEN_INDEXES) > max(1, VECTOR_INDEX_MAX_OPEN):
+                    evicted.append(_OPEN_INDEXES.popitem(last=False)[1])
+            else:
+                _OPEN_INDEXES.move_to_end(directory)
+        for old_index in evicted:
+            old_index.close()
+        return index
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.directory, VECTORS_FILE)
+
+    @property
+    def sidecar_path(self) -> str:
+        return os.path.join(self.directory, SIDECAR_FILE)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.offsets
+
+    def keys(self) -> List[str]:
+        return list(self.offsets.keys())
+
+    @contextmanager
+    def _locked(self, shared: bool = False) -> Iterator[None]:
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_sidecar(self) -> None:
+        if not os.path.exists(self.sidecar_path):
+            self.dimension, self.row_keys = None, []
+            self._refresh_offsets()
+            self._sidecar_stat = None
+            return
+        stat = os.stat(self.sidecar_path)
+        if (stat.st_mtime_ns, stat.st_size) == self._sidecar_stat:
+            return
+        with open(self.sidecar_path, "r") as f:
+            data = json.load(f)
+        self._sidecar_stat = (stat.st_mtime_ns, stat.st_size)
+        self.dimension = data.get("dimension")
+        self.row_keys = data.get("keys", [])
+        self._refresh_offsets()
+
+    def _refresh_offsets(self) -> None:
+        self.offsets = {key: row for row, key in enumerate(self.row_keys) if key is not None}
+        self.live_rows = np.fromiter(self.offsets.values(), dtype=np.int64, count=len(self.offsets))
+
+    def _write_sidecar(self) -> None:
+        tmp_path = self.sidecar_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"dimension": self.dimension, "keys": self.row_keys}, f)
+        os.replace(tmp_path, self.sidecar_path)
+        stat = os.stat(self.sidecar_path)
+        self._sidecar_stat = (stat.st_mtime_ns, stat.st_size)
+
+    def _open_matrix(self, mode: str = "r") -> Optional[np.memmap]:
+        if not self.row_keys or not self.dimension:
+            return None
+        return np.memmap(self.vectors_path, dtype=np.float32, mode=mode, shape=(len(self.row_keys), self.dimension))
+
+    def _reset(self) -> None:
+        self.dimension, self.row_keys = None, []
+        self._refresh_offsets()
+        if os.path.exists(self.vectors_path):
+            os.remove(self.vectors_path)
+
+    def _add(self, vectors: Dict[str, VectorLike]) -> None:
+        if not vectors:
+            return
+        keys = list(vectors.keys())
+        if self.dimension is None:
+            self.dimension = len(vectors[keys[0]])
+        matrix = np.empty((len(keys), self.dimension), dtype=np.float32)
+        for row, key in enumerate(keys):
+            if len(vectors[key]) != self.dimension:
+                raise ValueError(f"Vector for {key} has dimension {len(vectors[key])}, expected {self.dimension}")
+            matrix[row] = vectors[key]
+        normalize_rows(matrix)
+
+        # Reuse free rows first, then append the rest to the end of the file
+        free_rows = [row for row, key in enumerate(self.row_keys) if key is None]
+        reused = min(len(free_rows), len(keys))
+        if reused:
+            stored = self._open_matrix(mode="r+")
+            for i in range(reused):
+                stored[free_rows[i]] = matrix[i]
+                self.row_keys[free_rows[i]] = keys[i]
+            stored.flush()
+            del stored
+        if reused < len(keys):
+            # Truncate to the rows the sidecar knows about, dropping any partial write from a crash
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(len(self.row_keys) * self.dimension * matrix.itemsize)
+                f.write(matrix[reused:].tobytes())
+            self.row_keys.extend(keys[reused:])
+        self._refresh_offsets()
+
+    def _remove(self, keys: Iterable[str]) -> None:
+        rows = [self.offsets.pop(key) for key in keys if key in self.offsets]
+        if not rows:
+            return
+        stored = self._open_matrix(mode="r+")
+        stored[rows] = 0.0
+        stored.flush()
+        del stored
+        for row in rows:
+            self.row_keys[row] = None
+        self._refresh_offsets()
+
+    def _compact(self) -> None:
+        live_rows = [row for row, key in enumerate(self.row_keys) if key is not None]
+        if len(self.row_keys) - len(live_rows) <= len(live_rows):
+            return
+        LOGGER.debug(f"Compacting vector index {self.directory}: {len(self.row_keys)} -> {len(live_rows)} rows")
+        stored = self._open_matrix()
+        live = np.array(stored[live_rows]) if live_rows else np.empty((0, self.dimension), dtype=np.float32)
+        del stored
+        tmp_path = self.vectors_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(live.tobytes())
+        os.replace(tmp_path, self.vectors_path)
+        self.row_keys = [self.row_keys[row] for row in live_rows]
+        self._refresh_offsets()
+
+    def sync(self, keys: Iterable[str], get_vector: Callable[[str], VectorLike]) -> Tuple[int, int]:
+        """
+        Bring the index in line with the given keys: vectors are fetched (via `get_vector`)
+        only for keys not yet indexed, and keys no longer present are removed.
+        A dimension change (e.g. a new embedding model) triggers a full rebuild.
+
+        Returns:
+            Tuple of (added, removed) counts
+        """
+        with self._locked():
+            return self._sync(keys, get_vector)
+
+    def _sync(self, keys: Iterable[str], get_vector: Callable[[str], VectorLike]) -> Tuple[int, int]:
+        """`sync`, for a caller holding the exclusive lock."""
+        keys = list(dict.fromkeys(keys))
+        wanted = set(keys)
+        try:
+            self._load_sidecar()
+            missing = [key for key in keys if key not in self.offsets]
+            stale = [key for key in self.offsets if key not in wanted]
+            if not missing and not stale:
+                return 0, 0
+            new_vectors = {key: get_vector(key) for key in missing}
+            if self.dimension is not None and new_vectors and len(next(iter(new_vectors.values()))) != self.dimension:
+                LOGGER.info(f"Embedding dimension changed for vector index {self.directory}, rebuilding.")
+                stale = list(self.offsets.keys())
+                self._reset()
+                new_vectors = {key: get_vector(key) for key in keys}
+            # Add before removing, so a rejected vector leaves the stored rows untouched
+            self._add(new_vectors)
+            self._remove(stale)
+            self._compact()
+            self._write_sidecar()
+            self._update_ann()
+            return len(new_vectors), len(stale)
+        except Exception:
+            # Drop the in-memory state so the next call reloads it from disk
+            self._sidecar_stat = None
+            raise
+
+    def sync_version(self, version: Hashable, entries: Callable[[], Iterable[Tuple[str, Any, VectorLike]]]) -> Tuple[int, int]:
+        """
+        Sync to the (key, payload, vector) triples returned by `entries`, unless this index was
+        already synced to `version` in this process, in which case `entries` is not called at all.
+        The payloads are kept in memory, for `search` to map scored rows back to the caller's data.
+        Vectors and payloads are replaced together under the exclusive lock, so a concurrent
+        `search` sees either the old pair or the new one.
+
+        Returns:
+            Tuple of (added, removed) counts
+        """
+        if version is not None and version == self._synced[0]:
+            return 0, 0
+        with self._locked():
+            # Another thread may have synced to this version while we waited for the lock
+            if version is not None and version == self._synced[0]:
+                return 0, 0
+            payloads: Dict[str, Any] = {}
+            vectors: Dict[str, VectorLike] = {}
+            for key, payload, vector in entries():
+                payloads[key] = payload
+                vectors[key] = vector
+            try:
+                counts = self._sync(payloads.keys(), vectors.__getitem__)
+            except Exception:
+                self._synced = (None, {})
+                raise
+            self._synced = (version, payloads)
+            return counts
+
+    def payload(self, key: str) -> Any:
+        """The payload stored for `key` by the last `sync_version`, or None."""
+        return self._synced[1].get(key)
+
+    def close(self) -> None:
+        """
+        Release the loaded keys and ANN structure, once in-flight reads and writes are done.
+        The files are kept; the index reloads them if it is used again.
+        """
+        with self._locked():
+            self.dimension, self.row_keys = None, []
+            self._refresh_offsets()
+            self._sidecar_stat = None
+            self._ivf, self._ivf_stat = None, None
+            self._synced = (None, {})
+
+    def clear(self) -> None:
+        """Remove every vector from the index."""
+        with self._locked():
+            self._synced = (None, {})
+            self._reset()
+            self._write_sidecar()
+            IVFFlatIndex.remove(self.directory)
+            self._ivf, self._ivf_stat = None, None
+
+    @property
+    def has_ann(self) -> bool:
+        return os.path.exists(os.path.join(self.directory, IVF_KEYS_FILE))
+
+    def _load_ann(self) -> Optional[IVFFlatIndex]:
+        keys_path = os.path.join(self.directory, IVF_KEYS_FILE)
+        if not os.path.exists(keys_path):
+            self._ivf, self._ivf_stat = None, None
+            return None
+        stat = os.stat(keys_path)
+        if (stat.st_mtime_ns, stat.st_size) != self._ivf_stat:
+            self._ivf = IVFFlatIndex.load(self.directory)
+            self._ivf_stat = (stat.st_mtime_ns, stat.st_size)
+        return self._ivf
+
+    def _save_ann(self, ivf: IVFFlatIndex) -> None:
+        ivf.save(self.directory)
+        stat = os.stat(os.path.join(self.directory, IVF_KEYS_FILE))
+        self._ivf, self._ivf_stat = ivf, (stat.st_mtime_ns, stat.st_size)
+
+    def _update_ann(self) -> None:
+        """Bring an existing ANN structure in line with the rows, retraining if the data outgrew it."""
+        ivf = self._load_ann()
+        if ivf is None:
+            return
+        stored = self._open_matrix()
+        if stored is None:
+            IVFFlatIndex.remove(self.directory)
+            self._ivf, self._ivf_stat = None, None
+            return
+        if ivf.needs_retraining(self.row_keys) or ivf.centroids.shape[1] != self.dimension:
+            ivf = IVFFlatIndex.train(stored, self.row_keys)
+        else:
+            ivf.refresh(stored, self.row_keys)
+        del stored
+        self._save_ann(ivf)
+
+    def build_ann(self, n_lists: Optional[int] = None) -> None:
+        """Train the IVF-flat ANN structure over the current vectors (no-op for an empty index)."""
+        with self._locked():
+            self._load_sidecar()
+            stored = self._open_matrix()
+            if stored is None:
+                return
+            ivf = IVFFlatIndex.train(stored, self.row_keys, n_lists=n_lists)
+            del stored
+            self._save_ann(ivf)
+
+    def score(self, query: VectorLike, n_probes: Optional[int] = None) -> Tuple[List[str], np.ndarray]:
+        """
+        Cosine similarity between `query` and every live vector, or, when `n_probes` is given
+        and an ANN structure exists, only the vectors in the `n_probes` closest IVF lists.
+
+        Returns:
+            Tuple of (keys, scores), aligned with each other
+        """
+        with self._locked(shared=True):
+            return self._score(query, n_probes)
+
+    def search(self, query: VectorLike, n_probes: Optional[int] = None) -> Tuple[List[Any], np.ndarray]:
+        """
+        `score`, with each key mapped to its payload from the last `sync_version` (None for keys it
+        didn't provide). Rows and payloads are read under the same shared lock, so they always match.
+
+        Returns:
+            Tuple of (payloads, scores), aligned with each other
+        """
+        with self._locked(shared=True):
+            keys, scores = self._score(query, n_probes)
+            payloads = self._synced[1]
+            return [payloads.get(key) for key in keys], scores
+
+    def _score(self, query: VectorLike, n_probes: Optional[int]) -> Tuple[List[str], np.ndarray]:
+        """`score`, for a caller holding the lock."""
+        self._load_sidecar()
+        stored = self._open_matrix()
+        if stored is None:
+            return [], np.empty(0, dtype=np.float32)
+        query_vec = normalize_vector(query)
+        if query_vec.shape[0] != self.dimension:
+            raise ValueError(f"Query dimension {query_vec.shape[0]} does not match index dimension {self.dimension}")
+        ivf = self._load_ann() if n_probes else None
+        if ivf is not None:
+            rows, scores = ivf.search(stored, query_vec, n_probes)
+        else:
+            rows, scores = self.live_rows, np.asarray(stored @ query_vec)[self.live_rows]
+        del stored
+        return [self.row_keys[row] for row in rows], scores
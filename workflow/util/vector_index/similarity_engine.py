@@ -0,0 +1,99 @@
+import numpy as np
+from typing import List, Optional, Sequence, Tuple, Union
+
+VectorLike = Union[Sequence[float], np.ndarray]
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize each row of a float32 matrix in place. Zero rows are left as zeros,
+    so they always score 0.0, matching `cosine_similarity`.
+    """
+    norms = np.linalg.norm(matrix, axis=1)
+    nonzero = norms > 0
+    matrix[nonzero] /= norms[nonzero, np.newaxis]
+    return matrix
+
+def normalize_vector(vector: VectorLike) -> np.ndarray:
+    """Return a normalized float32 copy of a single vector (zeros if the norm is 0)."""
+    vec = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vec)
+    if norm == 0:
+        return np.zeros_like(vec)
+    return vec / norm
+
+def relax_similarity_threshold(
+    scores: np.ndarray,
+    max_results: int,
+    similarity_threshold: float,
+    min_threshold: float,
+    decay: float = 0.75
+) -> float:
+    """
+    Lower the threshold by `decay` until at least `max_results` scores pass it,
+    or until it drops to `min_threshold` or below.
+    """
+    threshold = similarity_threshold
+    while np.count_nonzero(scores >= threshold) < max_results and threshold > min_threshold:
+        threshold *= decay
+    return threshold
+
+def select_top_k(scores: np.ndarray, k: int, threshold: Optional[float] = None) -> np.ndarray:
+    """
+    Return the indices of the top `k` scores (at or above `threshold`, if given),
+    ordered by descending score. Ties keep their original order.
+    """
+    candidates = np.arange(len(scores)) if threshold is None else np.flatnonzero(scores >= threshold)
+    if k <= 0 or len(candidates) == 0:
+        return np.empty(0, dtype=np.int64)
+    candidate_scores = scores[candidates]
+    if len(candidates) > k:
+        top = np.argpartition(-candidate_scores, k - 1)[:k]
+        candidates, candidate_scores = candidates[top], candidate_scores[top]
+    order = np.lexsort((candidates, -candidate_scores))
+    return candidates[order]
+
+class SimilarityEngine:
+    """
+    Batched cosine similarity over a set of embedding vectors.
+
+    Vectors are packed into one contiguous, row-normalized float32 matrix, so scoring
+    a query against every vector is a single matrix-vector product.
+    """
+    def __init__(self, matrix: np.ndarray, normalized: bool = False):
+        if matrix.ndim != 2:
+            raise ValueError(f"Expected a 2D matrix of vectors, got shape {matrix.shape}")
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.matrix = matrix if normalized else normalize_rows(matrix.copy())
+
+    @classmethod
+    def from_vectors(cls, vectors: List[VectorLike], dimension: Optional[int] = None) -> "SimilarityEngine":
+        """Build an engine from a list of vectors, all of which must share the same dimension."""
+        if not vectors:
+            return cls(np.zeros((0, dimension or 0), dtype=np.float32), normalized=True)
+        dimension = dimension or len(vectors[0])
+        matrix = np.empty((len(vectors), dimension), dtype=np.float32)
+        for row, vector in enumerate(vectors):
+            if len(vector) != dimension:
+                raise ValueError(f"Vector {row} has dimension {len(vector)}, expected {dimension}")
+            matrix[row] = vector
+        return cls(normalize_rows(matrix), normalized=True)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    def score(self, query: VectorLike) -> np.ndarray:
+        """Cosine similarity between `query` and every vector, as a float32 array."""
+        query_vec = normalize_vector(query)
+        if query_vec.shape[0] != self.dimension:
+            raise ValueError(f"Query dimension {query_vec.shape[0]} does not match index dimension {self.dimension}")
+        return self.matrix @ query_vec
+
+    def top_k(self, query: VectorLike, k: int, threshold: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (indices, scores) of the `k` most similar vectors, best first."""
+        scores = self.score(query)
+        indices = select_top_k(scores, k, threshold)
+        return indices, scores[indices]
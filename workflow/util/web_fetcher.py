@@ -0,0 +1,229 @@
+import os, json, time, asyncio, hashlib
+import aiohttp
+from typing import Dict, List, Optional, Union
+from urllib.parse import urlsplit, parse_qsl
+from pydantic import BaseModel, Field
+from workflow.util.const import (
+    WEB_FETCH_CACHE_DIR, WEB_FETCH_CACHE_MAX_ENTRIES, WEB_FETCH_CACHE_MAX_AGE,
+    WEB_FETCH_CONNECTION_LIMIT, WEB_FETCH_LIMIT_PER_HOST, WEB_FETCH_TIMEOUT
+)
+from workflow.util.http_session import create_client_session
+from workflow.util.logger import LOGGER
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; AliceWebFetcher/1.0)",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+# Query parameters that carry secrets; URLs with any of them are never cached
+CREDENTIAL_PARAMETERS = {
+    "token", "access_token", "refresh_token", "id_token", "auth", "authorization", "api_key", "apikey",
+    "key", "secret", "client_secret", "password", "passwd", "pwd", "session", "sessionid", "sid",
+    "signature", "sig", "x-amz-signature", "x-amz-credential", "x-amz-security-token", "code",
+}
+
+def has_credentials(url: str) -> bool:
+    """Whether `url` carries credentials, in its user info or in a query parameter."""
+    parts = urlsplit(url)
+    if parts.username or parts.password:
+        return True
+    return any(name.lower() in CREDENTIAL_PARAMETERS for name, _ in parse_qsl(parts.query, keep_blank_values=True))
+
+class FetchedPage(BaseModel):
+    """A fetched web page, decoded to text."""
+    url: str = Field(..., description="The requested URL")
+    status: int = Field(..., description="HTTP status of the response (200 for cache revalidations)")
+    text: str = Field(..., description="Decoded body of the page")
+    etag: Optional[str] = Field(default=None, description="ETag validator, if the server sent one")
+    last_modified: Optional[str] = Field(default=None, description="Last-Modified validator, if the server sent one")
+    from_cache: bool = Field(default=False, description="Whether the body came from the cache after a 304 Not Modified")
+
+class WebPageCache:
+    """
+    On-disk store of fetched pages and their validators (ETag / Last-Modified), used for conditional
+    GETs. Each URL is kept as `<sha256>.json` (metadata) plus `<sha256>.html` (body). A directory of
+    None, or one that can't be written, disables the cache.
+
+    Pages older than `max_age` seconds are dropped instead of revalidated, and every `prune_interval`
+    writes the directory is pruned back to `max_entries` pages, least recently used first. URLs that
+    carry credentials (see `has_credentials`) are never stored.
+    """
+    def __init__(
+        self,
+        directory: Optional[str] = WEB_FETCH_CACHE_DIR,
+        max_entries: int = WEB_FETCH_CACHE_MAX_ENTRIES,
+        max_age: float = WEB_FETCH_CACHE_MAX_AGE,
+        prune_interval: int = 100,
+    ):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.prune_interval = prune_interval
+        self._writes = 0
+
+    def _path(self, url: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.{extension}")
+
+    def _remove(self, meta_path: str) -> None:
+        for path in (meta_path, meta_path[:-len("json")] + "html"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get(self, url: str) -> Optional[FetchedPage]:
+        if self.directory is None or has_credentials(url):
+            return None
+        meta_path = self._path(url, "json")
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            with open(self._path(url, "html"), "r", encoding="utf-8") as f:
+                text = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        if time.time() - meta.get("fetched_at", 0) > self.max_age:
+            self._remove(meta_path)
+            return None
+        try:
+            os.utime(meta_path)  # Recency for pruning
+        except OSError:
+            pass
+        return FetchedPage(url=url, status=200, text=text, etag=meta.get("etag"), last_modified=meta.get("last_modified"))
+
+    def put(self, page: FetchedPage) -> None:
+        if self.directory is None or not (page.etag or page.last_modified) or has_credentials(page.url):
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Body first, metadata last, so validators never describe a body that isn't on disk yet
+            for extension, content in (
+                ("html", page.text),
+                ("json", json.dumps({"url": page.url, "etag": page.etag, "last_modified": page.last_modified, "fetched_at": time.time()})),
+            ):
+                tmp_path = self._path(page.url, extension) + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.replace(tmp_path, self._path(page.url, extension))
+        except OSError as e:
+            LOGGER.warning(f"Web page cache disabled: {e}")
+            self.directory = None
+            return
+        self._writes += 1
+        if (self._writes - 1) % max(1, self.prune_interval) == 0:  # On the first write, then every prune_interval
+            self.prune()
+
+    def prune(self) -> int:
+        """Remove pages unused for `max_age`, then the least recently used ones over `max_entries`. Returns how many were removed."""
+        if self.directory is None:
+            return 0
+        try:
+            meta_paths = [entry.path for entry in os.scandir(self.directory) if entry.name.endswith(".json")]
+        except OSError:
+            return 0
+        entries = []
+        for path in meta_paths:
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        entries.sort(reverse=True)
+        now = time.time()
+        expired = [path for mtime, path in entries if now - mtime > self.max_age]
+        fresh = [path for mtime, path in entries if now - mtime <= self.max_age]
+        removed = expired + fresh[self.max_entries:]
+        for path in removed:
+            self._remove(path)
+        if removed:
+            LOGGER.debug(f"Pruned {len(removed)} pages from the web page cache")
+        return len(removed)
+
+class WebFetcher:
+    """
+    Async HTML fetcher for scraping tasks.
+
+    - One pooled aiohttp session per event loop, with keep-alive, DNS caching and a per-host connection
+      limit, so pages from the same site are fetched in parallel without hammering it
+    - Total and connect timeouts on every request
+    - gzip/deflate decoding, plus brotli when the Brotli package is installed (aiohttp then advertises it)
+    - Conditional GETs against a WebPageCache: unchanged pages come back as 304 and are served from disk
+    """
+    def __init__(
+        self,
+        cache: Optional[WebPageCache] = None,
+        limit: int = WEB_FETCH_CONNECTION_LIMIT,
+        limit_per_host: int = WEB_FETCH_LIMIT_PER_HOST,
+        timeout: float = WEB_FETCH_TIMEOUT,
+    ):
+        self.cache = cache if cache is not None else WebPageCache()
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Returns the shared session, creating a new one on first use or when called from a different loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = create_client_session(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                timeout=self.timeout,
+                headers=DEFAULT_HEADERS,
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def fetch(self, url: str) -> FetchedPage:
+        """
+        Fetch `url`, revalidating a cached copy when there is one.
+
+        Raises:
+            aiohttp.ClientResponseError: If the server returned an unsuccessful status code
+            asyncio.TimeoutError: If the request exceeded the timeout
+        """
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(None, self.cache.get, url)
+        headers: Dict[str, str] = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        async with self.get_session().get(url, headers=headers) as response:
+            if response.status == 304 and cached is not None:
+                LOGGER.debug(f"Not modified, serving cached copy of {url}")
+                return cached.model_copy(update={"from_cache": True})
+            response.raise_for_status()
+            text = await response.text(errors="replace")
+            page = FetchedPage(
+                url=url,
+                status=response.status,
+                text=text,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        await loop.run_in_executor(None, self.cache.put, page)
+        return page
+
+    async def fetch_many(self, urls: List[str]) -> List[Union[FetchedPage, Exception]]:
+        """Fetch several URLs concurrently; failures are returned in place of their page."""
+        return await asyncio.gather(*(self.fetch(url) for url in urls), return_exceptions=True)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session, self._session_loop = None, None
+
+_WEB_FETCHER: Optional[WebFetcher] = None
+
+def get_web_fetcher() -> WebFetcher:
+    """Returns the process-wide web fetcher."""
+    global _WEB_FETCHER
+    if _WEB_FETCHER is None:
+        _WEB_FETCHER = WebFetcher()
+    return _WEB_FETCHER
@@ -1,8 +1,22 @@
 import requests
 import re
-from bs4 import BeautifulSoup
-from typing import List, Optional
+import html as html_lib
+import asyncio
+from bs4 import BeautifulSoup, Tag
+from typing import Dict, List, Optional, Tuple, Union
 from workflow.util import LOGGER
+from workflow.util.web_fetcher import get_web_fetcher
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+NON_CONTENT_TAGS = ["script", "style", "noscript", "iframe", "header", "footer", "nav", "aside"]
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+
+HTMLInput = Union[str, BeautifulSoup]
 
 def extract_json(text: str) -> str:
 
@@ -30,22 +44,60 @@ def fetch_webpage_and_title(url: str) -> tuple[str, str]:
         requests.HTTPError: If the HTTP request returned an unsuccessful status code.
     """
     LOGGER.info(f"Fetching webpage content from URL: {url}")
-    response = requests.get(url)
+    response = requests.get(url, timeout=30)
     response.raise_for_status()
     LOGGER.info("Webpage fetched successfully.")
     
     html_content = response.text
-    
-    # Parse the HTML content
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Extract the title
-    title = soup.title.string if soup.title else "No title found"
-    
+    title = extract_title(html_content)
     LOGGER.info(f"Extracted title: {title}")
     
     return html_content, title
 
+async def fetch_webpage_and_title_async(url: str) -> tuple[str, str]:
+    """
+    Async counterpart of fetch_webpage_and_title, using the shared WebFetcher (pooled connections,
+    timeouts, conditional-GET cache). Title extraction runs in a worker thread.
+
+    Raises:
+        aiohttp.ClientResponseError: If the HTTP request returned an unsuccessful status code.
+    """
+    LOGGER.info(f"Fetching webpage content from URL: {url}")
+    page = await get_web_fetcher().fetch(url)
+    LOGGER.info(f"Webpage fetched successfully{' (not modified, cached copy)' if page.from_cache else ''}.")
+    title = await asyncio.get_running_loop().run_in_executor(None, extract_title, page.text)
+    LOGGER.info(f"Extracted title: {title}")
+    return page.text, title
+
+def extract_title(html_content: str) -> str:
+    """Read the <title> without parsing the whole document."""
+    match = TITLE_PATTERN.search(html_content)
+    title = html_lib.unescape(match.group(1)).strip() if match else ""
+    return title or "No title found"
+
+def parse_html(html: HTMLInput, parser: Optional[str] = None) -> BeautifulSoup:
+    """
+    Parse HTML with the fastest available backend (lxml when installed, else html.parser).
+    An already parsed tree is returned as is, so every pipeline step accepts either.
+    """
+    if isinstance(html, BeautifulSoup):
+        return html
+    return BeautifulSoup(html, parser or HTML_PARSER)
+
+def preprocess_soup(soup: BeautifulSoup) -> BeautifulSoup:
+    """Remove scripts, styles, and non-content elements from a parsed tree, in place."""
+    for element in soup(NON_CONTENT_TAGS):
+        element.decompose()
+    return soup
+
+def prepare_html(html: str) -> Tuple[BeautifulSoup, str]:
+    """
+    Parse a page once and preprocess it. Returns the cleaned tree, to pass on to
+    apply_parsing_strategy / fallback_parsing_strategy, and its serialization, for sampling.
+    """
+    soup = preprocess_soup(parse_html(html))
+    return soup, str(soup)
+
 
 def preprocess_html(html: str) -> str:
     """
@@ -58,10 +110,7 @@ def preprocess_html(html: str) -> str:
         str: The cleaned HTML content.
     """
     LOGGER.info("Preprocessing HTML content.")
-    soup = BeautifulSoup(html, 'html.parser')
-    for element in soup(["script", "style", "noscript", "iframe", "header", "footer", "nav", "aside"]):
-        element.extract()
-    cleaned_html = str(soup)
+    cleaned_html = str(preprocess_soup(parse_html(html)))
     LOGGER.info("HTML preprocessing completed.")
     return cleaned_html
 
@@ -115,19 +164,19 @@ def sample_html(html: str, max_length: int = 4000, num_samples: int = 4) -> List
     LOGGER.debug(f"HTML content split into {len(samples)} samples.")
     return samples
 
-def apply_parsing_strategy(html: str, selectors: List[str]) -> Optional[str]:
+def apply_parsing_strategy(html: HTMLInput, selectors: List[str]) -> Optional[str]:
     """
     Apply CSS selectors intelligently by handling specificity and preventing duplicate content.
     
     Args:
-        html (str): The cleaned HTML content.
+        html (HTMLInput): The cleaned HTML content, or its already parsed tree.
         selectors (List[str]): A list of CSS selectors.
         
     Returns:
         Optional[str]: The extracted text content or None if extraction fails.
     """
     LOGGER.info("Applying parsing strategy with generated selectors.")
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = parse_html(html)
     
     # Sort selectors by specificity (more specific selectors first)
     def get_selector_specificity(selector: str) -> int:
@@ -140,16 +189,11 @@ def apply_parsing_strategy(html: str, selectors: List[str]) -> Optional[str]:
     sorted_selectors = sorted(selectors, key=get_selector_specificity, reverse=True)
     LOGGER.debug(f"Sorted selectors by specificity: {sorted_selectors}")
 
-    # Keep track of which elements we've matched
-    matched_elements = set()
-    content_elements = []
-    
-    def is_descendant_of_matched(element) -> bool:
-        """Check if element is contained within any previously matched elements."""
-        for matched in matched_elements:
-            if element in matched.descendants:
-                return True
-        return False
+    # Keep track of the matched elements and of every ancestor of a matched element (by identity),
+    # so both containment checks walk the element's ancestors instead of the matches' descendants
+    matched_ids = set()
+    matched_ancestor_ids = set()
+    content_elements: List[Tag] = []
     
     for selector in sorted_selectors:
         # Find all elements matching this selector
@@ -157,20 +201,19 @@ def apply_parsing_strategy(html: str, selectors: List[str]) -> Optional[str]:
         
         for element in elements:
             # Skip if we've already matched this element or any of its ancestors
-            if element in matched_elements or is_descendant_of_matched(element):
+            if id(element) in matched_ids or any(id(parent) in matched_ids for parent in element.parents):
                 continue
             
             # Skip if this element contains any previously matched elements
-            has_matched_children = any(matched in element.descendants 
-                                     for matched in matched_elements)
-            if has_matched_children:
+            if id(element) in matched_ancestor_ids:
                 continue
                 
-            matched_elements.add(element)
+            matched_ids.add(id(element))
+            matched_ancestor_ids.update(id(parent) for parent in element.parents)
             content_elements.append(element)
     
     # Sort elements by their position in document to maintain reading order
-    content_elements.sort(key=lambda x: x.sourceline or 0)
+    content_elements = sort_in_document_order(soup, content_elements)
     
     # Extract text from matched elements
     text_content = ' '.join(
@@ -179,15 +222,26 @@ def apply_parsing_strategy(html: str, selectors: List[str]) -> Optional[str]:
     )
     
     if text_content.strip():
-        LOGGER.info(f"Successfully extracted content using {len(matched_elements)} unique elements")
+        LOGGER.info(f"Successfully extracted content using {len(content_elements)} unique elements")
         return text_content
     else:
         LOGGER.warning("No content extracted using the selectors")
         return None
+
+def sort_in_document_order(soup: BeautifulSoup, elements: List[Tag]) -> List[Tag]:
+    """Order elements as they appear in the document (parsers other than html.parser don't record source lines)."""
+    if len(elements) < 2:
+        return elements
+    wanted = {id(element) for element in elements}
+    position: Dict[int, int] = {}
+    for index, element in enumerate(soup.find_all(True)):
+        if id(element) in wanted:
+            position[id(element)] = index
+    return sorted(elements, key=lambda element: position.get(id(element), 0))
     
-def fallback_parsing_strategy(html: str, selectors: List[str] = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']) -> Optional[str]:
+def fallback_parsing_strategy(html: HTMLInput, selectors: List[str] = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']) -> Optional[str]:
     LOGGER.info("Applying fallback parsing strategy by extracting all <p> tags.")
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = parse_html(html)
     content_elements = []
     for selector in selectors:
         paragraphs = soup.select(selector)
@@ -0,0 +1,103 @@
+"""
+Standalone queue consumers for the workflow service.
+
+    python -m workflow.worker --processes 4
+
+Runs N consumer processes, each with its own event loop, ContainerAPI and QueueManager, against
+the same Redis queues the FastAPI app enqueues into. Set QUEUE_CONSUME_IN_APP=false on the app so
+it only enqueues and serves WebSockets; results still reach them through `updates:<task_id>`.
+Crashed consumer processes are restarted, and the messages they held are re-queued by the
+surviving consumers once their heartbeat expires.
+"""
+import os
+import sys
+import time
+import signal
+import asyncio
+import argparse
+import multiprocessing
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+SHUTDOWN_GRACE_PERIOD = 60  # Seconds running requests get to finish on shutdown
+
+async def run_consumer() -> None:
+    from workflow.util import LOGGER, DockerCodeRunner, get_model_residency, get_web_fetcher
+    from workflow.util.code_utils import close_container_pools
+    from workflow.db_app import ContainerAPI
+    from workflow.core.api import APIManager
+    from workflow.api_app.util.queue_manager import QueueManager
+
+    db_app = ContainerAPI()
+    queue_manager = QueueManager(db_app=db_app)
+    await queue_manager.initialize()
+    loop = asyncio.get_running_loop()
+    await APIManager.warm_up_local_models()
+    model_unloader = asyncio.create_task(get_model_residency().run_idle_unloader())
+    code_runner_warm_up = DockerCodeRunner().start_warm_up()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, queue_manager.request_stop)
+    LOGGER.info(f"Queue consumer {queue_manager.consumer_id} started")
+    try:
+        await queue_manager.process_requests()
+    finally:
+        await queue_manager.drain(timeout=SHUTDOWN_GRACE_PERIOD)
+        model_unloader.cancel()
+        code_runner_warm_up.cancel()
+        await queue_manager.cleanup()
+        await APIManager.close_clients()
+        await db_app.close_session()
+        await get_web_fetcher().close()
+        await loop.run_in_executor(None, close_container_pools)
+        LOGGER.info(f"Queue consumer {queue_manager.consumer_id} stopped")
+
+def consumer_main() -> None:
+    asyncio.run(run_consumer())
+
+def run_workers(processes: int) -> None:
+    """Start `processes` consumers and restart any that exit until asked to stop."""
+    from workflow.util import LOGGER
+    if processes <= 1:
+        consumer_main()
+        return
+
+    context = multiprocessing.get_context("spawn")
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    def start(index: int) -> multiprocessing.Process:
+        process = context.Process(target=consumer_main, name=f"workflow-worker-{index}")
+        process.start()
+        return process
+
+    workers = [start(index) for index in range(processes)]
+    LOGGER.info(f"Started {processes} queue consumer processes")
+    while not stopping:
+        time.sleep(1)
+        for index, process in enumerate(workers):
+            if not process.is_alive() and not stopping:
+                LOGGER.warning(f"{process.name} exited with code {process.exitcode}, restarting")
+                workers[index] = start(index)
+
+    for process in workers:
+        if process.is_alive():
+            process.terminate()  # SIGTERM: the consumer stops taking messages and drains
+    for process in workers:
+        process.join(SHUTDOWN_GRACE_PERIOD + 5)
+        if process.is_alive():
+            process.kill()
+
+if __name__ == "__main__":
+    from workflow.util.const import WORKER_PROCESSES
+    parser = argparse.ArgumentParser(description="Run workflow queue consumer processes")
+    parser.add_argument("--processes", type=int, default=WORKER_PROCESSES, help="Number of consumer processes")
+    args = parser.parse_args()
+    run_workers(args.processes)